@@ -5,13 +5,18 @@
 # Veritabanı ile etkileşim için tüm fonksiyonlar burada tanımlıdır.
 # ===================================================================
 
-from typing import Optional, List
-from datetime import datetime
+from collections import defaultdict
+from typing import Dict, Optional, List, Sequence, Tuple
+from datetime import date, datetime, timedelta
 
+from sqlalchemy import bindparam, func, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from passlib.context import CryptContext
 
-from . import models, schemas
+from . import models, outbox, schemas
+from .dialects import bulk_insert, day_bucket
+from .sqlite_writes import get_write_serializer
 
 # Şifre hashleme için pbkdf2_sha256 algoritması kullanılıyor
 # bcrypt yerine tercih edilmiş (daha hızlı ve güvenli)
@@ -57,6 +62,20 @@ def get_user(db: Session, user_id: int) -> Optional[models.AppUser]:
     return db.get(models.AppUser, user_id)
 
 
+def get_users(db: Session, user_ids: Sequence[int]) -> List[models.AppUser]:
+    """
+    Birden fazla kullanıcıyı tek IN (...) sorgusuyla getirir.
+    Sonuç istenen id sırasındadır; bulunamayan id'ler atlanır.
+    """
+    if not user_ids:
+        return []
+    users = {
+        user.id: user
+        for user in db.query(models.AppUser).filter(models.AppUser.id.in_(set(user_ids)))
+    }
+    return [users[user_id] for user_id in dict.fromkeys(user_ids) if user_id in users]
+
+
 def list_users_by_role(db: Session, role: str) -> List[models.AppUser]:
     """
     Belirli bir role sahip tüm kullanıcıları listeler.
@@ -149,11 +168,15 @@ def delete_task_template(db: Session, template: models.TaskTemplate) -> None:
 # GÖREV ÖRNEĞİ (TASK INSTANCE) CRUD İŞEMLERİ
 # ===================================================================
 
-def create_task_instance(db: Session, task_in: schemas.TaskInstanceCreate) -> models.TaskInstance:
+def create_task_instance(
+    db: Session, task_in: schemas.TaskInstanceCreate, commit: bool = True
+) -> models.TaskInstance:
     """
     Yeni görev örneği oluşturur (görev ataması).
     Hasta yakını bir şablondan görev oluşturur ve bakıcıya atar.
     Başlangıç durumu "pending" olarak ayarlanır.
+    commit=False ise görev sadece flush edilir (id atanır); çağıran aynı
+    transaction'a başka kayıtlar (ör. bildirim olayı) ekleyip commit eder.
     """
     db_task = models.TaskInstance(
         template_id=task_in.template_id,
@@ -167,6 +190,9 @@ def create_task_instance(db: Session, task_in: schemas.TaskInstanceCreate) -> mo
         updated_at=datetime.utcnow(),
     )
     db.add(db_task)
+    if not commit:
+        db.flush()
+        return db_task
     db.commit()
     db.refresh(db_task)
     return db_task
@@ -177,6 +203,7 @@ def list_tasks_for_user(
     user_id: int,
     status: Optional[str] = None,
     sort_by_scheduled: bool = True,
+    options: Sequence = (),
 ) -> List[models.TaskInstance]:
     """
     Bir kullanıcıya (bakıcıya) atanmış görevleri listeler.
@@ -186,8 +213,9 @@ def list_tasks_for_user(
     - user_id: Görevleri görüntülenecek kullanıcı (bakıcı)
     - status: Durum filtreleme (pending, done, vb.) - opsiyonel
     - sort_by_scheduled: Tarihe göre sırala (en yakın tarih önce)
+    - options: Yükleme seçenekleri (fieldsets.TaskSelection.options())
     """
-    q = db.query(models.TaskInstance).filter(models.TaskInstance.assigned_to_id == user_id)
+    q = db.query(models.TaskInstance).options(*options).filter(models.TaskInstance.assigned_to_id == user_id)
     if status:
         q = q.filter(models.TaskInstance.status == status)
     if sort_by_scheduled:
@@ -200,6 +228,7 @@ def list_tasks_created_by(
     user_id: int,
     status: Optional[str] = None,
     sort_by_scheduled: bool = True,
+    options: Sequence = (),
 ) -> List[models.TaskInstance]:
     """
     Bir kullanıcının (hasta yakınının) oluşturduğu görevleri listeler.
@@ -210,8 +239,9 @@ def list_tasks_created_by(
     - user_id: Görevleri oluşturan kullanıcı (hasta yakını)
     - status: Durum filtreleme - opsiyonel
     - sort_by_scheduled: Tarihe göre sırala
+    - options: Yükleme seçenekleri (fieldsets.TaskSelection.options())
     """
-    q = db.query(models.TaskInstance).filter(models.TaskInstance.created_by_id == user_id)
+    q = db.query(models.TaskInstance).options(*options).filter(models.TaskInstance.created_by_id == user_id)
     if status:
         q = q.filter(models.TaskInstance.status == status)
     if sort_by_scheduled:
@@ -219,6 +249,56 @@ def list_tasks_created_by(
     return q.all()
 
 
+def _task_scope(q, created_by_id: Optional[int], assigned_to_id: Optional[int]):
+    if created_by_id is not None:
+        q = q.filter(models.TaskInstance.created_by_id == created_by_id)
+    if assigned_to_id is not None:
+        q = q.filter(models.TaskInstance.assigned_to_id == assigned_to_id)
+    return q
+
+
+def count_tasks_by_day(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    created_by_id: Optional[int] = None,
+    assigned_to_id: Optional[int] = None,
+) -> Dict[date, Dict[str, int]]:
+    """
+    [start, end) aralığındaki görevleri gün ve duruma göre sayar (takvim).
+    Tek GROUP BY sorgusudur; (kullanıcı, scheduled_for, status) indeksinden
+    tablo satırları okunmadan hesaplanır.
+    Dönüş: {gün: {durum: sayı}}
+    """
+    day = day_bucket(models.TaskInstance.scheduled_for)
+    q = db.query(day, models.TaskInstance.status, func.count()).filter(
+        models.TaskInstance.scheduled_for >= start,
+        models.TaskInstance.scheduled_for < end,
+    )
+    q = _task_scope(q, created_by_id, assigned_to_id)
+    counts: Dict[date, Dict[str, int]] = {}
+    for bucket, task_status, count in q.group_by(day, models.TaskInstance.status):
+        counts.setdefault(bucket, {})[task_status] = count
+    return counts
+
+
+def list_tasks_in_range(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    created_by_id: Optional[int] = None,
+    assigned_to_id: Optional[int] = None,
+    options: Sequence = (),
+) -> List[models.TaskInstance]:
+    """[start, end) aralığındaki görevleri zamana göre sıralı listeler."""
+    q = db.query(models.TaskInstance).options(*options).filter(
+        models.TaskInstance.scheduled_for >= start,
+        models.TaskInstance.scheduled_for < end,
+    )
+    q = _task_scope(q, created_by_id, assigned_to_id)
+    return q.order_by(models.TaskInstance.scheduled_for.asc()).all()
+
+
 def get_task_instance(db: Session, task_id: int) -> Optional[models.TaskInstance]:
     """
     Görev ID'sine göre belirli bir görev örneğini getirir.
@@ -268,6 +348,122 @@ def update_task_status(
     return task
 
 
+def get_task_instances(db: Session, task_ids: Sequence[int]) -> List[models.TaskInstance]:
+    """
+    Birden fazla görevi tek IN (...) sorgusuyla getirir.
+    Sonuç istenen id sırasındadır; bulunamayan id'ler atlanır.
+    """
+    if not task_ids:
+        return []
+    tasks = {
+        task.id: task
+        for task in db.query(models.TaskInstance).filter(models.TaskInstance.id.in_(set(task_ids)))
+    }
+    return [tasks[task_id] for task_id in dict.fromkeys(task_ids) if task_id in tasks]
+
+
+# Toplu durum bildirimlerinde kullanılan durum adları
+STATUS_LABELS = {
+    "pending": "beklemeye alındı",
+    "in_progress": "başladı",
+    "done": "tamamlandı",
+    "problem": "sorun bildirildi",
+    "cancelled": "iptal edildi",
+}
+
+# Sorun seviyeleri (en ciddisi en sonda)
+SEVERITY_ORDER = ("mild", "moderate", "critical")
+
+
+def update_task_statuses(
+    db: Session,
+    user: models.AppUser,
+    changes: Sequence[Tuple[models.TaskInstance, schemas.TaskStatusBulkItem]],
+) -> List[models.TaskInstance]:
+    """
+    Bakıcının birden fazla görev durumu değişikliğini TEK transaction'da
+    uygular (sabah turu gibi):
+    - Görevler tek bir executemany UPDATE ... WHERE id = ? AND version = ?
+      ile güncellenir; bir satır bile eşleşmezse StaleDataError (409)
+    - Aktivite kayıtları tek toplu INSERT ile yazılır
+    - Her hasta yakınına, onun görevlerindeki tüm değişiklikleri özetleyen
+      TEK bildirim gider; içinde sorun varsa en ciddi seviyeyle önceliklenir
+
+    Sahiplik ve sürüm kontrolleri çağıran tarafından yapılmış olmalıdır.
+    """
+    now = datetime.utcnow()
+    task_ids = [task.id for task, _ in changes]
+    table = models.TaskInstance.__table__
+    rows = []
+    per_owner = defaultdict(list)
+    for task, item in changes:
+        is_problem = item.status == "problem"
+        rows.append({
+            "b_id": task.id,
+            "b_version": task.version,
+            "status": item.status,
+            "problem_message": item.problem_message if is_problem else task.problem_message,
+            "problem_severity": item.problem_severity if is_problem else task.problem_severity,
+            "resolution_note": item.resolution_note or task.resolution_note,
+            "updated_at": now,
+        })
+        per_owner[task.created_by_id].append((task, item))
+
+    # Karşılaştır-ve-değiştir: Her satır okunduğu sürümdeyse güncellenir.
+    # Etkilenen satır sayısı eksikse arada biri görevi değiştirmiştir.
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"), table.c.version == bindparam("b_version"))
+        .values(version=table.c.version + 1)
+    )
+    conn = db.connection()
+    if conn.dialect.supports_sane_multi_rowcount:
+        updated = conn.execute(stmt, rows).rowcount
+    else:
+        updated = sum(conn.execute(stmt, row).rowcount for row in rows)
+    if updated != len(rows):
+        raise StaleDataError(f"Toplu durum güncellemesi: {len(rows)} görevden {updated} tanesi güncellenebildi.")
+
+    bulk_insert(conn, models.ActivityLog.__table__, [
+        {
+            "user_id": user.id,
+            "action": "UPDATE_TASK_STATUS",
+            "entity_type": "TaskInstance",
+            "entity_id": task.id,
+            "timestamp": now,
+            "details": f"status={item.status}, problem_message={item.problem_message}, bulk=1",
+        }
+        for task, item in changes
+    ])
+
+    for owner_id, owner_changes in per_owner.items():
+        counts = defaultdict(int)
+        for _, item in owner_changes:
+            counts[item.status] += 1
+        summary = ", ".join(
+            f"{count} {STATUS_LABELS.get(status_name, status_name)}"
+            for status_name, count in counts.items()
+        )
+        msg = f"{len(owner_changes)} görevin durumu güncellendi: {summary}"
+        problems = [item for _, item in owner_changes if item.status == "problem"]
+        if problems:
+            msg += ". Sorunlar: " + "; ".join(item.problem_message or "" for item in problems)
+        severities = [item.problem_severity for item in problems if item.problem_severity in SEVERITY_ORDER]
+        enqueue_notification(
+            db,
+            user_id=owner_id,
+            message=msg,
+            event_type="task_problem" if problems else "task_status",
+            entity_type="TaskInstance",
+            entity_id=owner_changes[0][0].id if len(owner_changes) == 1 else None,
+            severity=max(severities, key=SEVERITY_ORDER.index) if severities else None,
+        )
+
+    db.commit()
+    # Güncel halleri (yeni sürümler) tek sorguda yeniden yüklenir
+    return get_task_instances(db, task_ids)
+
+
 def delete_task_instance(db: Session, task: models.TaskInstance) -> None:
     """
     Bir görev örneğini siler.
@@ -300,10 +496,74 @@ def create_notification(
         is_read=False,  # Yeni bildirim okunmamış olarak başlar
         created_at=datetime.utcnow(),
     )
-    db.add(notif)
-    db.commit()
-    db.refresh(notif)
-    return notif
+    return _append(db, notif)
+
+
+def enqueue_notification(
+    db: Session,
+    user_id: int,
+    message: str,
+    event_type: str,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    severity: Optional[str] = None,
+) -> models.NotificationOutbox:
+    """
+    Bildirimi outbox'a ekler (outbox.py); commit ETMEZ.
+    Görev değişikliğini kaydeden commit'ten ÖNCE çağrılır, böylece olay
+    değişiklikle aynı transaction'da yazılır. Bildirim teslimat worker'ı
+    tarafından oluşturulur; istek süresine dağıtım (fan-out) dahil olmaz.
+    """
+    return outbox.enqueue(
+        db,
+        user_id=user_id,
+        message=message,
+        event_type=event_type,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        severity=severity,
+    )
+
+
+def get_badge_counts(db: Session, user: models.AppUser, today: date) -> Dict[str, int]:
+    """
+    Ana sayfa rozetlerinin sayaçlarını TEK sorguda hesaplar (skaler alt
+    sorgular). Her alt sorgu kendi indeksinden okunur:
+    - unread_messages: ix_message_receiver_unread
+    - unread_notifications: ix_notification_user_read
+    - tasks_today / open_problems: (kullanıcı, scheduled_for, status) indeksleri
+    Görev sayaçları hasta yakını için oluşturduğu, bakıcı için atanan görevlerdir.
+    """
+    Task = models.TaskInstance
+    task_owner = Task.created_by_id if user.role == "hasta_yakini" else Task.assigned_to_id
+    start = datetime.combine(today, datetime.min.time())
+    end = start + timedelta(days=1)
+
+    def count(model, *conditions):
+        return select(func.count()).select_from(model).where(*conditions).scalar_subquery()
+
+    row = db.execute(select(
+        count(
+            models.Message,
+            models.Message.receiver_id == user.id,
+            models.Message.is_read == False,
+            models.Message.is_deleted == False,
+        ).label("unread_messages"),
+        count(
+            models.Notification,
+            models.Notification.user_id == user.id,
+            models.Notification.is_read == False,
+        ).label("unread_notifications"),
+        count(
+            Task,
+            task_owner == user.id,
+            Task.scheduled_for >= start,
+            Task.scheduled_for < end,
+            Task.status.in_(("pending", "in_progress")),
+        ).label("tasks_today"),
+        count(Task, task_owner == user.id, Task.status == "problem").label("open_problems"),
+    )).one()
+    return dict(row._mapping)
 
 
 def list_notifications_for_user(db: Session, user_id: int) -> List[models.Notification]:
@@ -356,10 +616,32 @@ def log_activity(
         timestamp=datetime.utcnow(),
         details=details,
     )
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-    return log
+    return _append(db, log)
+
+
+def _append(db: Session, obj):
+    """
+    Bildirim/aktivite kaydı gibi küçük eklemeleri kaydeder.
+    SQLITE_WRITE_SERIALIZER=1 ise kayıt yazma sıralayıcısına gönderilir ve
+    diğer isteklerin eklemeleriyle aynı transaction'da commit edilir.
+    """
+    serializer = get_write_serializer(db.get_bind())
+    if serializer is None:
+        db.add(obj)
+        db.commit()
+        db.refresh(obj)
+        return obj
+
+    # Çağıranın açık transaction'ı yazma kilidini tutuyor olabilir
+    # (ör. commit sonrası refresh); sıralayıcı beklemeden önce bırakılır
+    if db.in_transaction():
+        db.commit()
+
+    def add(session):
+        session.add(obj)
+        return obj
+
+    return serializer.submit(add).result()
 
 
 # ===================================================================
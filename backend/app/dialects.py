@@ -0,0 +1,113 @@
+# ===================================================================
+# VERİTABANI DİYALEKT YARDIMCILARI (dialects.py)
+# ===================================================================
+# Uygulama SQLite (varsayılan) ve PostgreSQL (DATABASE_URL) ile çalışır.
+# İki veritabanı arasındaki farklar burada toplanır:
+#
+# - day_bucket(sütun): Tarih-saat sütununu güne yuvarlar (GROUP BY için).
+#   SQLite'ta date(), PostgreSQL'de CAST(... AS DATE) olarak derlenir;
+#   her ikisinde de Python'a datetime.date olarak döner
+# - bulk_insert(): Çok sayıda satırı ekler. PostgreSQL'de COPY FROM STDIN
+#   (tek round-trip, satır başına INSERT ayrıştırma maliyeti yok), diğer
+#   veritabanlarında executemany INSERT kullanılır
+# - reset_sequences(): id'leri açıkça verilerek yüklenen tabloların
+#   PostgreSQL sequence'larını en büyük id'ye taşır
+# - is_transient_error(): İstemcinin tekrar deneyebileceği hatalar
+#   (SQLite kilidi, PostgreSQL statement/lock timeout, deadlock); 503 döner
+# ===================================================================
+
+import csv
+import io
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import Date
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import Table
+from sqlalchemy.sql.expression import FunctionElement, insert
+
+from .sqlite_writes import is_busy_error
+
+# PostgreSQL SQLSTATE kodları: query_canceled (statement_timeout),
+# lock_not_available (lock_timeout), serialization_failure, deadlock_detected
+TRANSIENT_PG_CODES = frozenset({"57014", "55P03", "40001", "40P01"})
+
+
+class day_bucket(FunctionElement):
+    """Tarih-saat ifadesinin gün kısmı (GROUP BY day_bucket(...) için)."""
+
+    type = Date()
+    name = "day_bucket"
+    inherit_cache = True
+
+
+@compiles(day_bucket)
+def _day_bucket_default(element, compiler, **kw):
+    return "CAST(%s AS DATE)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(day_bucket, "sqlite")
+def _day_bucket_sqlite(element, compiler, **kw):
+    return "date(%s)" % compiler.process(element.clauses, **kw)
+
+
+def _pg_code(exc: BaseException) -> Optional[str]:
+    orig = exc.orig if isinstance(exc, DBAPIError) else exc
+    # psycopg2: pgcode, psycopg 3: sqlstate
+    return getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Kısa süre sonra tekrar denendiğinde başarılı olabilecek hata mı?"""
+    return is_busy_error(exc) or _pg_code(exc) in TRANSIENT_PG_CODES
+
+
+def _copy_rows(conn: Connection, table: Table, columns: Sequence[str], rows: Iterable[dict]) -> None:
+    column_sql = ", ".join(f'"{c}"' for c in columns)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if conn.dialect.driver == "psycopg":
+            with cursor.copy(f'COPY "{table.name}" ({column_sql}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row([row.get(c) for c in columns])
+            return
+
+        # psycopg2: CSV; NULL ile boş metni ayırmak için NULL açıkça işaretlenir
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["\\N" if row.get(c) is None else row.get(c) for c in columns])
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY \"{table.name}\" ({column_sql}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def bulk_insert(conn: Connection, table: Table, rows: List[dict]) -> None:
+    """
+    Satırları conn'un açık transaction'ı içinde ekler. Sütunlar ilk satırın
+    anahtarlarıdır; COPY sütun varsayılanlarını (default=...) uygulamadığı
+    için satırlarda tüm değerler verilmelidir (id hariç).
+    """
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql" and conn.dialect.driver in ("psycopg2", "psycopg"):
+        _copy_rows(conn, table, list(rows[0]), rows)
+    else:
+        conn.execute(insert(table), rows)
+
+
+def reset_sequences(conn: Connection, tables: Iterable[Table]) -> None:
+    """PostgreSQL'de id sequence'larını tablodaki en büyük id'ye ayarlar."""
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        if "id" not in table.c or table.c.id.type.python_type is not int:
+            continue
+        conn.exec_driver_sql(
+            f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM \"{table.name}\"), 0) + 1, false)"
+        )
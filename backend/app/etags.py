@@ -0,0 +1,66 @@
+# ===================================================================
+# KOŞULLU GET YARDIMCILARI (etags.py)
+# ===================================================================
+# Sık sorgulanan küçük yanıtlar için ETag üretimi ve If-None-Match
+# kontrolü. İstemci son aldığı ETag'i If-None-Match header'ında
+# gönderir; yanıt değişmediyse gövdesiz 304 Not Modified döner.
+#
+# Sürümlü kayıtlarda (görevler) ETag sürüm numarasından üretilir; istemci
+# güncellemede bunu If-Match ile geri gönderir (iyimser eşzamanlılık).
+# ===================================================================
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def make_etag(payload: Any) -> str:
+    """Yanıt içeriğinden zayıf (weak) ETag üretir."""
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return 'W/"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Zayıf karşılaştırma: W/ öneki yok sayılır
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Yanıta ETag header'ını ekler. İstemcinin If-None-Match değeri ETag ile
+    eşleşiyorsa döndürülecek 304 yanıtını, aksi halde None döndürür.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def version_etag(version: int) -> str:
+    """Sürüm numarasından güçlü (strong) ETag üretir."""
+    return '"v%d"' % version
+
+
+def if_match_version(request: Request) -> Optional[int]:
+    """
+    If-Match header'ındaki sürüm numarası (version_etag formatında).
+    Header yoksa veya "*" ise None döner.
+    """
+    if_match = request.headers.get("if-match")
+    if not if_match or if_match.strip() == "*":
+        return None
+    tag = if_match.split(",")[0].strip().removeprefix("W/").strip('"')
+    if not tag.startswith("v") or not tag[1:].isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz If-Match header'ı.",
+        )
+    return int(tag[1:])
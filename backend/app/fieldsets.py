@@ -0,0 +1,99 @@
+# ===================================================================
+# SEYREK ALAN SEÇİMİ VE İLİŞKİ GENİŞLETME (fieldsets.py)
+# ===================================================================
+# Görev listeleri varsayılan olarak tüm sütunları (uzun açıklama ve not
+# metinleri dahil) döndürür; istemci kartlardaki isimler için ayrıca
+# /users/{user_id} çağırır. Liste endpoint'leri iki query parametresi alır:
+#
+# - fields=id,title,status,scheduled_for: Sadece bu sütunlar veritabanından
+#   okunur (load_only) ve yanıtta döner. id her zaman döner
+# - expand=assigned_to,created_by,template: İlişkiler aynı sorguda
+#   (joinedload, sadece gösterilen sütunlarla) yüklenir ve görevin içinde
+#   döner; istemcinin kullanıcı/şablon başına istek atması gerekmez
+#
+# Örnek: GET /tasks/assigned/5?fields=title,status,scheduled_for&expand=created_by
+# ===================================================================
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy.orm import joinedload, load_only
+
+from . import models, schemas
+
+TASK_FIELDS: Tuple[str, ...] = tuple(schemas.TaskInstanceRead.model_fields)
+
+# expand adı -> (ilişki, yüklenecek sütunlar, yanıt şeması)
+TASK_EXPANSIONS = {
+    "assigned_to": (
+        models.TaskInstance.assigned_to,
+        (models.AppUser.id, models.AppUser.full_name, models.AppUser.role),
+        schemas.UserSummary,
+    ),
+    "created_by": (
+        models.TaskInstance.created_by,
+        (models.AppUser.id, models.AppUser.full_name, models.AppUser.role),
+        schemas.UserSummary,
+    ),
+    "template": (
+        models.TaskInstance.template,
+        tuple(getattr(models.TaskTemplate, name) for name in schemas.TaskTemplateRead.model_fields),
+        schemas.TaskTemplateRead,
+    ),
+}
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+class TaskSelection:
+    """
+    fields= ve expand= parametrelerini doğrulayan FastAPI bağımlılığı.
+    options() sorguya eklenecek yükleme seçeneklerini, serialize() yanıt
+    sözlüklerini üretir (response_model_exclude_unset=True ile kullanılır).
+    """
+
+    def __init__(
+        self,
+        fields: Optional[str] = Query(None, description="Virgülle ayrılmış alanlar (ör. title,status,scheduled_for)"),
+        expand: Optional[str] = Query(None, description="Virgülle ayrılmış ilişkiler: assigned_to, created_by, template"),
+    ):
+        requested = _split(fields)
+        unknown = [name for name in requested if name not in TASK_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Bilinmeyen alan: {', '.join(unknown)}. Geçerli alanlar: {', '.join(TASK_FIELDS)}",
+            )
+        self.fields: Sequence[str] = (
+            ("id",) + tuple(dict.fromkeys(name for name in requested if name != "id"))
+            if requested else TASK_FIELDS
+        )
+
+        self.expand: Sequence[str] = tuple(dict.fromkeys(_split(expand)))
+        unknown = [name for name in self.expand if name not in TASK_EXPANSIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Genişletilemeyen ilişki: {', '.join(unknown)}. Geçerli ilişkiler: {', '.join(TASK_EXPANSIONS)}",
+            )
+
+    def options(self) -> list:
+        """Sadece seçili sütunları ve genişletilen ilişkileri yükleyen seçenekler."""
+        opts = [load_only(*(getattr(models.TaskInstance, name) for name in self.fields), raiseload=True)]
+        for name in self.expand:
+            relation, columns, _ = TASK_EXPANSIONS[name]
+            opts.append(joinedload(relation).load_only(*columns))
+        return opts
+
+    def serialize(self, task: models.TaskInstance) -> Dict[str, object]:
+        data = {name: getattr(task, name) for name in self.fields}
+        for name in self.expand:
+            related = getattr(task, name)
+            schema = TASK_EXPANSIONS[name][2]
+            data[name] = schema.model_validate(related) if related is not None else None
+        return data
+
+    def serialize_all(self, tasks: Sequence[models.TaskInstance]) -> List[Dict[str, object]]:
+        return [self.serialize(task) for task in tasks]
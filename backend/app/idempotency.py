@@ -0,0 +1,261 @@
+# ===================================================================
+# IDEMPOTENCY KEY (idempotency.py)
+# ===================================================================
+# Mobil istemciler zaman aşımında isteği tekrar gönderir. Tekrarlanan
+# görev oluşturma / mesaj gönderme isteği çift kayıt, fazladan bildirim ve
+# aktivite logu üretir. İstemci isteğe `Idempotency-Key` header'ı (ör.
+# UUID) eklerse:
+# - İlk istek normal işlenir; yanıtı anahtar ve gövde özetiyle (SHA-256)
+#   saklanır
+# - Aynı anahtar ve aynı gövdeyle gelen tekrar, yazma yoluna (session,
+#   BEGIN IMMEDIATE, commit) hiç girmeden saklı yanıtı döner
+#   (`Idempotent-Replayed: true` header'ı ile)
+# - Aynı anahtar farklı gövdeyle kullanılırsa 422 döner
+# - İlk istek hâlâ işlenirken gelen eşzamanlı tekrar, ilkinin bitmesini
+#   bekler ve onun yanıtını alır; IDEMPOTENCY_WAIT saniyede bitmezse 409
+#   döner
+#
+# Sadece 2xx ve 4xx yanıtlar saklanır (429 hariç); 5xx/503 yanıtlardan
+# sonra aynı anahtarla tekrar denemek isteği yeniden işletir.
+#
+# Anahtarlar isteği yapan kullanıcıya göre ayrılır: X-User-Id header'ı,
+# yoksa JSON gövdesindeki user_id / created_by_id / sender_id (sharding ile
+# aynı PRINCIPAL_KEYS). Farklı kullanıcıların aynı anahtarı çakışmaz.
+#
+# Depo bellek içidir ve süreç başınadır: En fazla IDEMPOTENCY_MAX_KEYS
+# anahtar (en eski atılır), her biri IDEMPOTENCY_TTL saniye tutulur. Birden
+# fazla worker'la çalışırken başka bir worker'a düşen tekrar yeniden işlenir.
+#
+# Ayarlar: IDEMPOTENCY_TTL=86400, IDEMPOTENCY_MAX_KEYS=10000,
+#          IDEMPOTENCY_WAIT=10, IDEMPOTENCY_MAX_BODY=65536 (byte)
+# ===================================================================
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from .sharding import PRINCIPAL_KEYS
+
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_WAIT = float(os.environ.get("IDEMPOTENCY_WAIT", "10"))
+# Bundan büyük yanıtlar saklanmaz (tekrar isteği yeniden işlenir)
+IDEMPOTENCY_MAX_BODY = int(os.environ.get("IDEMPOTENCY_MAX_BODY", "65536"))
+
+# Idempotency-Key desteklenen istekler (method, path)
+IDEMPOTENT_ROUTES = {
+    ("POST", "/tasks/instances"),
+    ("PATCH", "/tasks/instances/status"),
+    ("PATCH", "/tasks/instances/status/bulk"),
+    ("POST", "/messages/send"),
+}
+
+MAX_KEY_LENGTH = 255
+
+
+class _Entry:
+    """Bir anahtarın durumu: işleniyor (response None) veya tamamlandı."""
+
+    __slots__ = ("fingerprint", "expires_at", "done", "response")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.expires_at = time.monotonic() + IDEMPOTENCY_TTL
+        self.done = asyncio.Event()
+        # (durum kodu, header'lar, gövde)
+        self.response: Optional[Tuple[int, List[Tuple[bytes, bytes]], bytes]] = None
+
+
+class IdempotencyStore:
+    """
+    Sınırlı, TTL'li anahtar deposu. Sadece event loop içinden kullanılır
+    (ASGI middleware), bu yüzden kilit gerekmez.
+    """
+
+    def __init__(self, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def begin(self, key: tuple, fingerprint: str) -> _Entry:
+        entry = self._entries[key] = _Entry(fingerprint)
+        self._evict()
+        return entry
+
+    def discard(self, key: tuple, entry: _Entry) -> None:
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        # Eklenme sırası = süre dolma sırası; baştan süresi dolanları at
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.expires_at > now and len(self._entries) <= self.max_keys:
+                break
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+store = IdempotencyStore()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _principal(scope, body: bytes) -> Optional[str]:
+    """
+    Anahtarın sahibi: X-User-Id header'ı, yoksa JSON gövdesindeki ilk
+    PRINCIPAL_KEYS alanı (mobil istemci header göndermez).
+    """
+    user_id = _header(scope, b"x-user-id")
+    if user_id:
+        return user_id
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    for key in PRINCIPAL_KEYS:
+        value = payload.get(key)
+        if isinstance(value, (int, str)) and not isinstance(value, bool):
+            return str(value)
+    return None
+
+
+async def _send_json(send, status_code: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _replay(send, response) -> None:
+    status_code, headers, body = response
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": headers + [(b"idempotent-replayed", b"true")],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def _cacheable(status_code: int) -> bool:
+    return 200 <= status_code < 500 and status_code != 429
+
+
+class IdempotencyMiddleware:
+    """
+    IDEMPOTENT_ROUTES'taki isteklerde Idempotency-Key header'ını uygular.
+    Anahtar; isteği yapan kullanıcı (_principal), method ve path ile
+    birlikte saklanır, böylece farklı kullanıcıların anahtarları çakışmaz.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in IDEMPOTENT_ROUTES:
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = _header(scope, b"idempotency-key")
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key 1-{MAX_KEY_LENGTH} karakter olmalıdır.")
+            return
+
+        # Gövde özet için okunur, uygulamaya aynen tekrar verilir
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        key = (_principal(scope, body), scope["method"], scope["path"], idempotency_key)
+
+        while True:
+            entry = store.get(key)
+            if entry is None:
+                break
+            if entry.fingerprint != fingerprint:
+                await _send_json(send, 422, "Bu Idempotency-Key farklı bir istek gövdesiyle kullanılmış.")
+                return
+            if entry.response is None:
+                # Aynı istek şu anda işleniyor: bitmesini bekle
+                try:
+                    await asyncio.wait_for(entry.done.wait(), IDEMPOTENCY_WAIT)
+                except asyncio.TimeoutError:
+                    await _send_json(send, 409, "Bu Idempotency-Key ile gönderilen istek hâlâ işleniyor.")
+                    return
+            if entry.response is not None:
+                await _replay(send, entry.response)
+                return
+            # İlk istek saklanmayan bir yanıtla (5xx) bitti: depoya tekrar
+            # bak (bekleyenlerden biri yeniden işlemeye başlamış olabilir)
+
+        entry = store.begin(key, fingerprint)
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        headers: List[Tuple[bytes, bytes]] = []
+        response_chunks: List[bytes] = []
+        size = 0
+
+        async def capture_send(message):
+            nonlocal status_code, headers, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if size <= IDEMPOTENCY_MAX_BODY:
+                    response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        finally:
+            if _cacheable(status_code) and size <= IDEMPOTENCY_MAX_BODY:
+                entry.response = (status_code, headers, b"".join(response_chunks))
+            else:
+                store.discard(key, entry)
+            entry.done.set()
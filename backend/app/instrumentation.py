@@ -0,0 +1,226 @@
+# ===================================================================
+# SQL ENSTRÜMANTASYONU (instrumentation.py)
+# ===================================================================
+# Her HTTP isteği için çalıştırılan SQL ifadelerini sayar ve veritabanında
+# geçen süreyi ölçer. Amaç, endpoint'lerde gizli kalan N+1 sorgu
+# kalıplarını (ör. döngü içinde lazy-load edilen ilişkiler) görünür kılmak.
+#
+# - Her yanıta Server-Timing header'ı eklenir; tarayıcı geliştirici
+#   araçlarında "db" (SQL süresi, sorgu sayısı) ve "app" (toplam) görünür
+# - Aynı SQL metni bir istekte N_PLUS_ONE_THRESHOLD kez veya daha fazla
+#   çalıştıysa "muhtemel N+1" olarak WARNING seviyesinde loglanır
+# - SQL_DEBUG_LOG=1 ise her istek için sorgu özeti DEBUG seviyesinde loglanır
+# - capture_queries(): Test veya betiklerde bir kod bloğundaki sorguları
+#   sayar (pytest eklentisi: app/pytest_plugin.py)
+# - Raiseload modu (SQL_RAISELOAD=1 veya raiseload_mode()): ORM sorgularına
+#   raiseload("*") eklenir; açıkça yüklenmemiş (selectinload/joinedload)
+#   bir ilişkiye erişmek sessizce sorgu çalıştırmak yerine hata verir.
+#   Serileştirme sırasındaki lazy-load'lar (N+1) testlerde hemen yakalanır
+#
+# Ölçüm SQLAlchemy'nin Engine seviyesindeki cursor olaylarıyla yapılır;
+# uygulamadaki tüm engine'ler için geçerlidir. "db" süresi cursor.execute
+# süresidir; SQLite'ta satırların bir kısmı fetch sırasında üretildiği için
+# büyük sonuç kümelerinde gerçek süre biraz daha yüksektir.
+# ===================================================================
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, raiseload
+
+logger = logging.getLogger(__name__)
+
+# Aynı ifadenin kaç tekrarı N+1 şüphesi sayılır
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+
+# Her istek için sorgu özetini logla (geliştirme ortamı için)
+SQL_DEBUG_LOG = os.environ.get("SQL_DEBUG_LOG", "0") == "1"
+
+# Lazy-load'ları hataya çevir (testler ve geliştirme ortamı için)
+SQL_RAISELOAD = os.environ.get("SQL_RAISELOAD", "0") == "1"
+
+
+class QueryStats:
+    """Bir istek (veya capture_queries bloğu) boyunca çalışan sorguların özeti."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # saniye
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[tuple]:
+        """threshold kez veya daha fazla tekrarlanan ifadeler: [(sql, adet), ...]"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def summary(self) -> str:
+        lines = [f"{self.count} sorgu, {self.duration * 1000:.1f} ms"]
+        for sql, n in self.statements.most_common():
+            lines.append(f"  {n:>4d}x {_shorten(sql)}")
+        return "\n".join(lines)
+
+
+# İstek bazlı istatistik; sync endpoint'ler threadpool'da çalışsa da
+# context kopyalandığı için aynı QueryStats nesnesine yazarlar
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+# İsteğin ASGI scope'u; routing sonrası scope["route"] eşleşen route'u içerir
+_request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+# capture_queries() blokları (thread'den bağımsız; TestClient uygulamayı
+# ayrı bir thread'de çalıştırdığı için context değişkeni yeterli değil)
+_captures: List[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+def _shorten(sql: str, limit: int = 160) -> str:
+    sql = " ".join(sql.split())
+    return sql if len(sql) <= limit else sql[:limit] + "..."
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if _captures:
+        with _captures_lock:
+            for capture in _captures:
+                capture.record(statement, duration)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """
+    Blok içinde (hangi thread'de olursa olsun) çalışan tüm sorguları sayar.
+
+    Örnek:
+        with capture_queries() as stats:
+            client.get("/messages/conversations/1")
+        assert stats.count <= 5, stats.summary()
+    """
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+_raiseload_depth = 0
+_raiseload_lock = threading.Lock()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _add_raiseload(orm_execute_state):
+    if not (SQL_RAISELOAD or _raiseload_depth):
+        return
+    # İlişki yüklemeleri ve expire edilmiş sütunların yeniden okunması hariç
+    if (
+        orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+@contextmanager
+def raiseload_mode() -> Iterator[None]:
+    """
+    Blok boyunca (tüm thread'lerde) ORM sorgularıyla yüklenen nesnelerin
+    açıkça yüklenmemiş ilişkilerine erişim sqlalchemy.exc.InvalidRequestError
+    verir. Açık yükleme seçenekleri (selectinload vb.) raiseload("*")'dan önceliklidir.
+    """
+    global _raiseload_depth
+    with _raiseload_lock:
+        _raiseload_depth += 1
+    try:
+        yield
+    finally:
+        with _raiseload_lock:
+            _raiseload_depth -= 1
+
+
+def current_route() -> Optional[str]:
+    """
+    O an işlenen isteğin route'u ("GET /tasks/assigned/{user_id}");
+    istek dışında (betikler, arka plan işleri) None döner.
+    """
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', None) or scope['path']}"
+
+
+def server_timing(stats: QueryStats, total: float) -> str:
+    return (
+        f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+        f"app;dur={total * 1000:.1f}"
+    )
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Her HTTP isteği için sorgu istatistiği toplar ve yanıt başlarken
+    Server-Timing header'ını ekler (saf ASGI middleware; akış halindeki
+    yanıtları tamponlamaz).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+        scope_token = _request_scope.set(scope)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, time.perf_counter() - started).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            _request_scope.reset(scope_token)
+            self._report(scope, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _report(scope, stats: QueryStats, total: float) -> None:
+        request_line = f"{scope['method']} {scope['path']}"
+        for sql, n in stats.repeated():
+            logger.warning(
+                "Muhtemel N+1: %s isteğinde aynı sorgu %d kez çalıştı: %s",
+                request_line, n, _shorten(sql),
+            )
+        if SQL_DEBUG_LOG:
+            logger.debug("%s (%.1f ms): %s", request_line, total * 1000, stats.summary())
@@ -5,21 +5,55 @@
 # Tüm router'ları birleştirir ve CORS ayarlarını yapılandırır.
 # ===================================================================
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-import os
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
+
+from .database import engine
+from .migrations import check_schema_version
+from .sharding import check_shard_schemas, sharding_enabled
+from .instrumentation import SQLInstrumentationMiddleware
+from .metrics import MetricsMiddleware, instrument_engine
+from .dialects import is_transient_error
+from .sqlite_writes import DatabaseBusyError
+from .outbox import start_worker, stop_worker
+from .idempotency import IdempotencyMiddleware
+from .rate_limit import RateLimitMiddleware
+from .routers import auth, tasks, notifications, users, messages, statistics, uploads, resumable_uploads, exports, metrics, admin, batch
+
+# Veritabanı şema sürümünü kontrol et (tablolar migrasyonlarla oluşturulur:
+# backend/ klasöründe "python migrate.py"). Şema geride ise uygulama açılmaz;
+# geliştirme ortamında AUTO_MIGRATE=1 ile migrasyonlar açılışta uygulanır.
+check_schema_version(engine)
+# SHARD_COUNT > 0 ise shard veritabanlarının da sürümü kontrol edilir
+# (shard'lar "python shards.py init" ile oluşturulur)
+if sharding_enabled():
+    check_shard_schemas()
+
 
-from .database import Base, engine
-from . import models
-from .routers import auth, tasks, notifications, users, messages, statistics, uploads
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bildirim outbox'ının teslimat worker'ı (OUTBOX_WORKER=0 ise başlatılmaz;
+    # bu durumda "python deliver_notifications.py" ayrı süreçte çalıştırılır)
+    start_worker()
+    yield
+    stop_worker()
 
-# Veritabanı tablolarını otomatik oluştur
-# Uygulama ilk çalıştığında models.py'deki tüm modeller için tablolar yaratılır
-Base.metadata.create_all(bind=engine)
 
 # FastAPI uygulaması oluştur
-app = FastAPI(title="HealthCare API (New)")
+app = FastAPI(title="HealthCare API (New)", lifespan=lifespan)
+
+# Idempotency-Key: Tekrarlanan görev oluşturma/durum güncelleme/mesaj
+# gönderme isteklerine saklı yanıt döner (idempotency.py). Hız sınırının
+# içinde kalır; tekrarlar da sınırlanır, 429 yanıtları saklanmaz
+app.add_middleware(IdempotencyMiddleware)
+
+# Hız sınırı ve yük atma (rate_limit.py): CORS'un içinde kalır, böylece
+# 429/503 yanıtları da CORS header'larını taşır
+app.add_middleware(RateLimitMiddleware, router=app.router)
 
 # CORS Middleware ekle - Frontend'in API'ye erişebilmesi için gerekli
 # Development ortamı için tüm originlere izin verilmiş (*)
@@ -32,10 +66,41 @@ app.add_middleware(
     allow_headers=["*"],  # Tüm header'lara izin ver
 )
 
-# Uploads klasörü için statik dosya sunucu
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+# SQL enstrümantasyonu: İstek başına sorgu sayısı/süresi, Server-Timing
+# header'ı ve muhtemel N+1 uyarıları (instrumentation.py)
+app.add_middleware(SQLInstrumentationMiddleware)
+
+# Prometheus metrikleri: Route gecikmeleri, durum kodları, SQL ve havuz
+# göstergeleri (metrics.py, GET /metrics)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
+
+# SQLite yazma kilidi alınamazsa veya PostgreSQL'de statement timeout /
+# deadlock olursa 500 yerine 503 + Retry-After döner; istemci isteği kısa
+# süre sonra tekrar deneyebilir (sqlite_writes.py, dialects.py)
+def _busy_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Veritabanı şu anda meşgul, lütfen tekrar deneyin."},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(DatabaseBusyError)
+async def database_busy_handler(request: Request, exc: DatabaseBusyError):
+    return _busy_response()
+
+
+@app.exception_handler(OperationalError)
+async def operational_error_handler(request: Request, exc: OperationalError):
+    if is_transient_error(exc):
+        return _busy_response()
+    raise exc
+
+
+# Not: /uploads/* dosyaları uploads router'ı üzerinden sunulur (storage.py).
+# Yerel backend'de dosya diskten döner, S3 backend'de imzalı URL'e yönlendirilir.
 
 # Root endpoint - API'nin çalıştığını kontrol etmek için
 @app.get("/")
@@ -50,4 +115,9 @@ app.include_router(notifications.router)  # Bildirim yönetimi
 app.include_router(users.router)  # Kullanıcı bilgileri
 app.include_router(messages.router)  # Mesajlaşma
 app.include_router(statistics.router)  # İstatistikler
-app.include_router(uploads.router)  # Dosya yükleme
+app.include_router(exports.router)  # CSV/NDJSON dışa aktarma
+app.include_router(metrics.router)  # Prometheus metrikleri
+app.include_router(admin.router)  # Yönetim/tanılama (yavaş sorgular)
+app.include_router(batch.router)  # Birden fazla GET isteği tek çağrıda
+app.include_router(resumable_uploads.router)  # Parça parça (devam ettirilebilir) yükleme
+app.include_router(uploads.router)  # Dosya yükleme (genel /uploads/{key} yolu içerdiği için en sonda)
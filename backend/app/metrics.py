@@ -0,0 +1,285 @@
+# ===================================================================
+# METRİKLER (metrics.py)
+# ===================================================================
+# Prometheus metin formatında (text exposition 0.0.4) uygulama metrikleri.
+# GET /metrics ile okunur (routers/metrics.py).
+#
+# Toplanan metrikler:
+# - HTTP: Route bazında istek sayısı (durum koduna göre), gecikme
+#   histogramı ve anlık işlenen istek sayısı
+# - Veritabanı: SQL ifade sayısı/süresi, commit ve rollback sayıları,
+#   bağlantı havuzundan bağlantı alma bekleme süresi, bağlantının
+#   havuz dışında kalma süresi ve havuz doluluk göstergeleri
+# - SQLite yazma çekişmesi: Yazma kilidi bekleme süresi, SQLITE_BUSY
+#   tekrarları/başarısızlıkları ve yazma grupları (sqlite_writes.py)
+# - Yüklemeler: Türe göre yüklenen byte sayısı
+#
+# Kilit maliyeti: Her thread kendi sayaç "shard"ına yazar; kayıt sırasında
+# kilit alınmaz. Kilit sadece bir thread ilk kez metrik yazarken (shard
+# kaydı) ve /metrics okunurken shard listesi kopyalanırken kullanılır.
+# Okuma sırasında shard'lar toplanır; değerler okuma anında en fazla birkaç
+# istek kadar geride olabilir, bu Prometheus için yeterlidir.
+# ===================================================================
+
+import bisect
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Saniye cinsinden histogram sınırları
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+# Metrik tanımları: isim -> (tip, açıklama, histogram sınırları)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP istek sayısı", None),
+    "http_request_duration_seconds": ("histogram", "HTTP istek süresi", LATENCY_BUCKETS),
+    "http_requests_in_flight": ("gauge", "Şu anda işlenen HTTP istekleri", None),
+    "db_statements_total": ("counter", "Çalıştırılan SQL ifadeleri", None),
+    "db_statement_duration_seconds": ("histogram", "SQL ifadesi süresi", DB_BUCKETS),
+    "db_commits_total": ("counter", "Veritabanı commit sayısı", None),
+    "db_rollbacks_total": ("counter", "Veritabanı rollback sayısı (salt okunur session kapanışları dahil)", None),
+    "db_pool_wait_seconds": ("histogram", "Havuzdan bağlantı alırken beklenen süre", DB_BUCKETS),
+    "db_pool_checkout_seconds": ("histogram", "Bağlantının havuz dışında kaldığı süre", LATENCY_BUCKETS),
+    "db_pool_checked_out": ("gauge", "Havuz dışındaki (kullanımdaki) bağlantılar", None),
+    "db_pool_size": ("gauge", "Havuz boyutu", None),
+    "db_pool_overflow": ("gauge", "Havuz boyutunu aşan ek bağlantılar", None),
+    "db_write_lock_wait_seconds": ("histogram", "SQLite yazma kilidi (BEGIN IMMEDIATE) için beklenen süre", LATENCY_BUCKETS),
+    "db_busy_retries_total": ("counter", "SQLITE_BUSY sonrası tekrar denenen BEGIN IMMEDIATE sayısı", None),
+    "db_busy_failures_total": ("counter", "Tüm denemelere rağmen alınamayan yazma kilitleri (503)", None),
+    "db_write_batches_total": ("counter", "Yazma sıralayıcısının commit ettiği gruplar", None),
+    "db_write_batch_size": ("histogram", "Yazma sıralayıcısının bir grupta commit ettiği işlem sayısı", BATCH_BUCKETS),
+    "upload_bytes_total": ("counter", "Yüklenen byte sayısı", None),
+    "http_throttled_total": ("counter", "Hız sınırı (429) veya yük atma (503) ile reddedilen istekler", None),
+    "outbox_delivered_total": ("counter", "Teslim edilen bildirim olayları (önceliğe göre)", None),
+    "outbox_retries_total": ("counter", "Tekrar denemeye bırakılan bildirim teslimatları", None),
+    "outbox_failed_total": ("counter", "Tüm denemelere rağmen teslim edilemeyen bildirim olayları", None),
+    "outbox_lease_lost_total": ("counter", "Teslimat sırasında kiralaması başka bir worker'a geçen bildirim olayları", None),
+    "outbox_delivery_delay_seconds": ("histogram", "Olayın outbox'a yazılmasından teslimine kadar geçen süre", LATENCY_BUCKETS),
+    "outbox_batch_size": ("histogram", "Worker'ın bir grupta işlediği olay sayısı", BATCH_BUCKETS),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Shard:
+    """Tek bir thread'in sayaçları (sadece sahibi thread yazar)."""
+
+    def __init__(self):
+        self.values: Dict[Tuple[str, Labels], float] = {}
+        # (isim, etiketler) -> [bucket_0, ..., bucket_n, +Inf, sum]
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+
+_local = threading.local()
+_shards: List[_Shard] = []
+_shards_lock = threading.Lock()
+
+# Havuz göstergeleri okuma anında hesaplanır
+_engines: List[Engine] = []
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def inc(name: str, labels: Labels = (), value: float = 1.0) -> None:
+    """Sayacı (veya gauge'u) artırır; azaltmak için negatif değer verilir."""
+    values = _shard().values
+    key = (name, labels)
+    values[key] = values.get(key, 0.0) + value
+
+
+def observe(name: str, value: float, labels: Labels = ()) -> None:
+    """Histogram'a bir gözlem ekler."""
+    histograms = _shard().histograms
+    key = (name, labels)
+    buckets = METRICS[name][2]
+    counts = histograms.get(key)
+    if counts is None:
+        counts = histograms[key] = [0.0] * (len(buckets) + 2)
+    counts[bisect.bisect_left(buckets, value)] += 1
+    counts[-1] += value
+
+
+def observe_upload(kind: str, size: int) -> None:
+    inc("upload_bytes_total", (("kind", kind),), size)
+
+
+# -------------------------------------------------------------------
+# Veritabanı olayları
+# -------------------------------------------------------------------
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["metrics_start_time"].pop()
+    inc("db_statements_total")
+    observe("db_statement_duration_seconds", duration)
+
+
+@event.listens_for(Engine, "commit")
+def _on_commit(conn):
+    inc("db_commits_total")
+
+
+@event.listens_for(Engine, "rollback")
+def _on_rollback(conn):
+    inc("db_rollbacks_total")
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Engine'in bağlantı havuzunu izlemeye alır:
+    - Bekleme süresi: Havuzdan bağlantı alma çağrısı sarmalanarak ölçülür
+      (SQLAlchemy'de "checkout öncesi" olayı olmadığı için)
+    - Kullanım süresi: checkout -> checkin arası
+    - Doluluk: Okuma anında pool.checkedout()/size()/overflow()
+    """
+    pool = engine.pool
+    original_do_get = pool._do_get
+
+    def timed_do_get():
+        started = time.perf_counter()
+        try:
+            return original_do_get()
+        finally:
+            observe("db_pool_wait_seconds", time.perf_counter() - started)
+
+    pool._do_get = timed_do_get
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        record.info["metrics_checkout_time"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        started = record.info.pop("metrics_checkout_time", None)
+        if started is not None:
+            observe("db_pool_checkout_seconds", time.perf_counter() - started)
+
+    _engines.append(engine)
+
+
+# -------------------------------------------------------------------
+# HTTP middleware
+# -------------------------------------------------------------------
+
+class MetricsMiddleware:
+    """
+    Route bazında istek sayısı, süre ve anlık istek sayısını kaydeder.
+    Route etiketi gerçek path değil şablondur (/tasks/assigned/{user_id}),
+    böylece etiket sayısı sınırlı kalır.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        inc("http_requests_in_flight")
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            inc("http_requests_in_flight", value=-1)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            inc("http_requests_total", (("method", method), ("route", path), ("status", str(status_code))))
+            observe("http_request_duration_seconds", time.perf_counter() - started,
+                    (("method", method), ("route", path)))
+
+
+# -------------------------------------------------------------------
+# Metin formatı
+# -------------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def render() -> str:
+    """Tüm shard'ları toplayıp Prometheus metin formatında döndürür."""
+    with _shards_lock:
+        shards = list(_shards)
+
+    values: Dict[Tuple[str, Labels], float] = {}
+    histograms: Dict[Tuple[str, Labels], List[float]] = {}
+    for shard in shards:
+        for key, value in list(shard.values.items()):
+            values[key] = values.get(key, 0.0) + value
+        for key, counts in list(shard.histograms.items()):
+            total = histograms.setdefault(key, [0.0] * len(counts))
+            for i, count in enumerate(list(counts)):
+                total[i] += count
+
+    for index, engine in enumerate(_engines):
+        labels = (("engine", str(index)),)
+        pool = engine.pool
+        for name, reader in (
+            ("db_pool_checked_out", "checkedout"),
+            ("db_pool_size", "size"),
+            ("db_pool_overflow", "overflow"),
+        ):
+            if hasattr(pool, reader):
+                # overflow(), henüz açılmamış bağlantılar için negatif döner
+                values[(name, labels)] = float(max(0, getattr(pool, reader)()))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (metric, labels), counts in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0.0
+                for bound, count in zip(buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels, (('le', le),))} {_format_number(cumulative)}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {repr(counts[-1])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {_format_number(cumulative)}")
+        else:
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+    return "\n".join(lines) + "\n"
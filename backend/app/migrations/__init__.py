@@ -0,0 +1,347 @@
+# ===================================================================
+# ŞEMA MİGRASYONLARI (migrations/)
+# ===================================================================
+# Veritabanı şeması sıralı migrasyon dosyalarıyla yönetilir:
+#
+#   app/migrations/v0001_baseline.py
+#   app/migrations/v0002_upload_gc_indexes.py
+#   ...
+#
+# Her dosya şunları tanımlar:
+# - description: Kısa açıklama
+# - transactional: True ise migrasyon tek transaction'da uygulanır (DDL
+#   dahil; yarıda kalırsa hiçbir değişiklik kalmaz). İndeks oluşturan
+#   migrasyonlar False'tur: her indeks ayrı ve kısa bir işlemde oluşturulur,
+#   böylece uygulama çalışırken yazmalar sadece o indeks süresince bekler
+#   (online indeks oluşturma). Bu migrasyonlar tekrar çalıştırılabilir olmalıdır.
+# - upgrade(conn): Şemayı bir sonraki sürüme taşır
+#
+# Uygulanan sürümler schema_version tablosunda tutulur. Migrasyonlar
+# "python migrate.py" ile uygulanır; uygulama açılışta sadece sürüm
+# numarasını kontrol eder (check_schema_version).
+#
+# DDL SQLite sözdizimiyle yazılır ve exec_ddl() ile çalıştırılır;
+# PostgreSQL'de tip farkları (DATETIME, 64 bit INTEGER, BIGSERIAL id)
+# adapt_ddl() ile çevrilir.
+#
+# Yeni migrasyon eklerken: Sıradaki numarayla yeni bir dosya oluşturun,
+# models.py'yi güncelleyin ve "python migrate.py verify" ile modellerin
+# veritabanıyla uyumlu olduğunu kontrol edin. Uygulanmış bir migrasyon
+# dosyası sonradan değiştirilmemelidir.
+# ===================================================================
+
+import importlib
+import logging
+import os
+import pkgutil
+import re
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+# 1 ise açılışta bekleyen migrasyonlar otomatik uygulanır (geliştirme/test için)
+AUTO_MIGRATE = os.environ.get("AUTO_MIGRATE", "0") == "1"
+
+SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description VARCHAR NOT NULL,
+    applied_at DATETIME NOT NULL,
+    duration_ms INTEGER NOT NULL
+)
+"""
+
+
+class Migration:
+    def __init__(self, version: int, name: str, module):
+        self.version = version
+        self.name = name
+        self.description = module.description
+        self.transactional = getattr(module, "transactional", True)
+        self.upgrade = module.upgrade
+
+
+class SchemaVersionError(RuntimeError):
+    """Veritabanı şeması uygulamanın beklediği sürümde değil."""
+
+
+def load_migrations() -> List[Migration]:
+    """Bu paketteki vNNNN_*.py dosyalarını sürüm sırasına göre yükler."""
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        if not (info.name.startswith("v") and info.name[1:5].isdigit()):
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        migrations.append(Migration(int(info.name[1:5]), info.name, module))
+    migrations.sort(key=lambda m: m.version)
+
+    versions = [m.version for m in migrations]
+    if versions != list(range(1, len(versions) + 1)):
+        raise RuntimeError(f"Migrasyon numaraları 1'den başlayıp ardışık olmalıdır: {versions}")
+    return migrations
+
+
+def latest_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(conn: Connection) -> int:
+    """Veritabanında uygulanmış en yüksek sürüm (schema_version yoksa 0)."""
+    try:
+        version = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    except (OperationalError, ProgrammingError):
+        conn.rollback()
+        return 0
+    return version or 0
+
+
+def applied_versions(conn: Connection) -> List[dict]:
+    try:
+        rows = conn.execute(text(
+            "SELECT version, description, applied_at, duration_ms "
+            "FROM schema_version ORDER BY version"
+        )).mappings().all()
+    except (OperationalError, ProgrammingError):
+        conn.rollback()
+        return []
+    return [dict(row) for row in rows]
+
+
+# -------------------------------------------------------------------
+# Migrasyonlarda kullanılan yardımcılar
+# -------------------------------------------------------------------
+
+_DATETIME = re.compile(r"\bDATETIME\b")
+_INTEGER = re.compile(r"\bINTEGER\b")
+_INTEGER_ID = re.compile(r"^(\s*)id INTEGER NOT NULL,", re.M)
+_ID_PRIMARY_KEY = re.compile(r",\s*PRIMARY KEY \(id\)")
+
+# Bağlantı bilgisinde (conn.info) bu anahtar varsa SQLite id'leri AUTOINCREMENT
+# olur: id sayacı sqlite_sequence'ta tutulur; shard'lar yeni id'leri bu sayaçtan
+# açıkça verir ve id'ler shard'ın aralığında kalır (sharding._assign_range_ids)
+AUTOINCREMENT_IDS = "autoincrement_ids"
+
+
+def adapt_ddl(conn: Connection, statement: str) -> str:
+    """
+    Migrasyonlar DDL'i SQLite sözdizimiyle yazar; PostgreSQL'de:
+    - DATETIME -> TIMESTAMP
+    - "id INTEGER NOT NULL" birincil anahtarı -> BIGSERIAL (SQLite'ta INTEGER
+      PRIMARY KEY rowid olduğu için zaten otomatik artar)
+    - Diğer INTEGER sütunlar -> BIGINT: SQLite'ın INTEGER'ı 64 bittir;
+      shard id aralıkları (k * SHARD_ID_SPAN) 32 bitlik INTEGER'a sığmaz
+    SQLite shard'larında id birincil anahtarı AUTOINCREMENT olarak oluşturulur.
+    """
+    if conn.dialect.name == "sqlite":
+        if conn.info.get(AUTOINCREMENT_IDS) and _ID_PRIMARY_KEY.search(statement):
+            statement = _ID_PRIMARY_KEY.sub("", statement)
+            statement = _INTEGER_ID.sub(r"\1id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,", statement)
+        return statement
+    if conn.dialect.name != "postgresql":
+        return statement
+    statement = _DATETIME.sub("TIMESTAMP", statement)
+    if "PRIMARY KEY (id)" in statement:
+        statement = _INTEGER_ID.sub(r"\1id BIGSERIAL NOT NULL,", statement)
+    return _INTEGER.sub("BIGINT", statement)
+
+
+def exec_ddl(conn: Connection, statement: str) -> None:
+    conn.exec_driver_sql(adapt_ddl(conn, statement))
+
+
+def table_exists(conn: Connection, table: str) -> bool:
+    if conn.dialect.name == "sqlite":
+        return conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = :name"),
+            {"name": table},
+        ).first() is not None
+    return conn.dialect.has_table(conn, table)
+
+
+def column_names(conn: Connection, table: str) -> List[str]:
+    if conn.dialect.name == "sqlite":
+        return [row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")]
+    return [col["name"] for col in conn.dialect.get_columns(conn, table)]
+
+
+def add_column_if_missing(conn: Connection, table: str, column: str, ddl_type: str) -> bool:
+    """Sütun yoksa ekler; eklendiyse True döner."""
+    if column in column_names(conn, table):
+        return False
+    exec_ddl(conn, f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}")
+    return True
+
+
+def create_index(
+    conn: Connection,
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    unique: bool = False,
+) -> None:
+    """
+    İndeksi (yoksa) oluşturur ve hemen commit eder.
+    - SQLite: CREATE INDEX IF NOT EXISTS; tablo sadece bu indeks oluşturulurken
+      yazmaya kapanır
+    - PostgreSQL: CREATE INDEX CONCURRENTLY; tablo yazmaya kapanmaz
+    Sadece transactional = False olan migrasyonlarda kullanılmalıdır.
+    """
+    unique_sql = "UNIQUE " if unique else ""
+    cols = ", ".join(columns)
+    if conn.dialect.name == "postgresql":
+        conn.commit()
+        autocommit = conn.execution_options(isolation_level="AUTOCOMMIT")
+        autocommit.exec_driver_sql(
+            f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({cols})"
+        )
+        return
+    started = time.perf_counter()
+    conn.exec_driver_sql(f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({cols})")
+    conn.commit()
+    logger.info("İndeks hazır: %s (%.0f ms)", name, (time.perf_counter() - started) * 1000)
+
+
+def drop_index(conn: Connection, name: str) -> None:
+    """
+    İndeksi (varsa) siler ve hemen commit eder (PostgreSQL'de CONCURRENTLY).
+    Sadece transactional = False olan migrasyonlarda kullanılmalıdır.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.commit()
+        autocommit = conn.execution_options(isolation_level="AUTOCOMMIT")
+        autocommit.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        return
+    conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+
+
+# -------------------------------------------------------------------
+# Uygulama
+# -------------------------------------------------------------------
+
+def _begin(conn: Connection) -> None:
+    """
+    SQLite sürücüsü (pysqlite) DDL'den önce transaction başlatmaz; DDL'lerin
+    de geri alınabilmesi için transaction açıkça başlatılır. Engine'in
+    BEGIN'i kendisi gönderdiği durumda (sqlite_writes.configure_sqlite_engine,
+    isolation_level=None) transaction'ı başlatmak yeterlidir.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    dbapi_conn = conn.connection.dbapi_connection
+    if dbapi_conn.in_transaction:
+        return
+    if dbapi_conn.isolation_level is None:
+        conn.begin()
+    else:
+        conn.exec_driver_sql("BEGIN")
+
+
+def _record(conn: Connection, migration: Migration, duration_ms: int) -> None:
+    conn.execute(
+        text(
+            "INSERT INTO schema_version (version, description, applied_at, duration_ms) "
+            "VALUES (:version, :description, :applied_at, :duration_ms)"
+        ),
+        {
+            "version": migration.version,
+            "description": migration.description,
+            "applied_at": datetime.utcnow(),
+            "duration_ms": duration_ms,
+        },
+    )
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    with engine.connect() as conn:
+        version = current_version(conn)
+    return [m for m in load_migrations() if m.version > version]
+
+
+def upgrade(
+    engine: Engine,
+    target: Optional[int] = None,
+    log: Callable[[str], None] = logger.info,
+) -> List[int]:
+    """
+    Bekleyen migrasyonları sırayla uygular (target verilirse o sürüme kadar).
+    Uygulanan sürüm numaralarını döndürür.
+    """
+    with engine.begin() as conn:
+        exec_ddl(conn, SCHEMA_VERSION_DDL)
+
+    applied = []
+    for migration in pending_migrations(engine):
+        if target is not None and migration.version > target:
+            break
+        log(f"v{migration.version:04d} uygulanıyor: {migration.description}")
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            if migration.transactional:
+                _begin(conn)
+                migration.upgrade(conn)
+                _record(conn, migration, int((time.perf_counter() - started) * 1000))
+                conn.commit()
+            else:
+                migration.upgrade(conn)
+                conn.commit()
+                _record(conn, migration, int((time.perf_counter() - started) * 1000))
+                conn.commit()
+        applied.append(migration.version)
+        log(f"v{migration.version:04d} tamamlandı ({(time.perf_counter() - started) * 1000:.0f} ms)")
+    return applied
+
+
+def check_schema_version(engine: Engine) -> int:
+    """
+    Uygulama açılışında çağrılır: Sadece schema_version'daki sürümü okur
+    (şema introspection'ı yapılmaz). Şema geride ise AUTO_MIGRATE=1 değilse
+    hata verir; ileride ise (yeni kod geri alınmış) her durumda hata verir.
+    """
+    expected = latest_version()
+    with engine.connect() as conn:
+        version = current_version(conn)
+
+    if version == expected:
+        return version
+    if version > expected:
+        raise SchemaVersionError(
+            f"Veritabanı şeması (v{version}) bu uygulama sürümünden (v{expected}) daha yeni."
+        )
+    if AUTO_MIGRATE:
+        upgrade(engine)
+        return expected
+    raise SchemaVersionError(
+        f"Veritabanı şeması güncel değil (v{version}, beklenen v{expected}). "
+        f"backend/ klasöründe 'python migrate.py' çalıştırın."
+    )
+
+
+def schema_problems(engine: Engine, metadata: MetaData) -> List[str]:
+    """
+    models.py'deki (metadata) tablo, sütun ve indekslerden veritabanında
+    olmayanları listeler ("python migrate.py verify").
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    problems = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            problems.append(f"Eksik tablo: {table.name}")
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                problems.append(f"Eksik sütun: {table.name}.{column.name}")
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                problems.append(f"Eksik indeks: {index.name} ({table.name})")
+    return problems
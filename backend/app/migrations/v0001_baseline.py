@@ -0,0 +1,145 @@
+# ===================================================================
+# v0001: Temel şema
+# ===================================================================
+# Kullanıcılar, görev şablonları/örnekleri, bildirimler, aktivite
+# kayıtları ve mesajlaşma tabloları.
+#
+# Migrasyon sistemi öncesinde create_all ve update_db.py ile oluşturulmuş
+# veritabanlarında tablolar zaten vardır; bu durumda sadece eksik
+# task_instance sütunları eklenir.
+# ===================================================================
+
+from . import add_column_if_missing, exec_ddl
+
+description = "Temel şema (kullanıcı, görev, bildirim, aktivite, mesaj)"
+transactional = True
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS app_user (
+        id INTEGER NOT NULL,
+        full_name VARCHAR NOT NULL,
+        email VARCHAR NOT NULL,
+        role VARCHAR NOT NULL,
+        hashed_password VARCHAR NOT NULL,
+        is_active BOOLEAN,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_app_user_id ON app_user (id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_app_user_email ON app_user (email)",
+    """
+    CREATE TABLE IF NOT EXISTS task_template (
+        id INTEGER NOT NULL,
+        title VARCHAR NOT NULL,
+        description TEXT,
+        default_time VARCHAR,
+        created_by_id INTEGER NOT NULL,
+        is_active BOOLEAN,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(created_by_id) REFERENCES app_user (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_task_template_id ON task_template (id)",
+    """
+    CREATE TABLE IF NOT EXISTS task_instance (
+        id INTEGER NOT NULL,
+        template_id INTEGER NOT NULL,
+        title VARCHAR,
+        description TEXT,
+        scheduled_for DATETIME NOT NULL,
+        status VARCHAR,
+        problem_message TEXT,
+        problem_severity VARCHAR,
+        resolution_note TEXT,
+        completion_photo_url VARCHAR,
+        rating INTEGER,
+        review_note TEXT,
+        created_at DATETIME,
+        updated_at DATETIME,
+        created_by_id INTEGER NOT NULL,
+        assigned_to_id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(template_id) REFERENCES task_template (id),
+        FOREIGN KEY(created_by_id) REFERENCES app_user (id),
+        FOREIGN KEY(assigned_to_id) REFERENCES app_user (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_task_instance_id ON task_instance (id)",
+    """
+    CREATE TABLE IF NOT EXISTS notification (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        message TEXT NOT NULL,
+        is_read BOOLEAN,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES app_user (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_notification_id ON notification (id)",
+    """
+    CREATE TABLE IF NOT EXISTS activity_log (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        action VARCHAR NOT NULL,
+        entity_type VARCHAR,
+        entity_id INTEGER,
+        timestamp DATETIME,
+        details TEXT,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES app_user (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_activity_log_id ON activity_log (id)",
+    """
+    CREATE TABLE IF NOT EXISTS message (
+        id INTEGER NOT NULL,
+        sender_id INTEGER NOT NULL,
+        receiver_id INTEGER NOT NULL,
+        content TEXT,
+        sent_at DATETIME,
+        is_edited BOOLEAN,
+        edited_at DATETIME,
+        is_deleted BOOLEAN,
+        is_read BOOLEAN,
+        PRIMARY KEY (id),
+        FOREIGN KEY(sender_id) REFERENCES app_user (id),
+        FOREIGN KEY(receiver_id) REFERENCES app_user (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_message_id ON message (id)",
+    """
+    CREATE TABLE IF NOT EXISTS message_attachment (
+        id INTEGER NOT NULL,
+        message_id INTEGER NOT NULL,
+        file_type VARCHAR NOT NULL,
+        file_path VARCHAR NOT NULL,
+        file_name VARCHAR NOT NULL,
+        file_size INTEGER,
+        uploaded_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(message_id) REFERENCES message (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_message_attachment_id ON message_attachment (id)",
+]
+
+# Eski veritabanlarında sonradan eklenen task_instance sütunları (eski update_db.py)
+TASK_INSTANCE_COLUMNS = [
+    ("title", "VARCHAR"),
+    ("description", "TEXT"),
+    ("problem_severity", "VARCHAR"),
+    ("resolution_note", "TEXT"),
+    ("completion_photo_url", "VARCHAR"),
+    ("rating", "INTEGER"),
+    ("review_note", "TEXT"),
+]
+
+
+def upgrade(conn):
+    for statement in TABLES:
+        exec_ddl(conn, statement)
+    for column, ddl_type in TASK_INSTANCE_COLUMNS:
+        add_column_if_missing(conn, "task_instance", column, ddl_type)
@@ -0,0 +1,13 @@
+# ===================================================================
+# v0002: Yetim dosya temizleyicisinin (upload_gc) kullandığı indeksler
+# ===================================================================
+
+from . import create_index
+
+description = "Dosya yolu indeksleri (görev fotoğrafı, mesaj eki)"
+transactional = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_task_instance_completion_photo_url", "task_instance", ["completion_photo_url"])
+    create_index(conn, "ix_message_attachment_file_path", "message_attachment", ["file_path"])
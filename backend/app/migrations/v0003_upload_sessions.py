@@ -0,0 +1,30 @@
+# ===================================================================
+# v0003: Devam ettirilebilir yükleme oturumları
+# ===================================================================
+
+from . import exec_ddl
+
+description = "upload_session tablosu"
+transactional = True
+
+
+def upgrade(conn):
+    exec_ddl(conn, """
+        CREATE TABLE IF NOT EXISTS upload_session (
+            id VARCHAR NOT NULL,
+            user_id INTEGER NOT NULL,
+            purpose VARCHAR NOT NULL,
+            target_id INTEGER NOT NULL,
+            file_name VARCHAR NOT NULL,
+            total_size INTEGER NOT NULL,
+            "offset" INTEGER NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            expires_at DATETIME NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY(user_id) REFERENCES app_user (id)
+        )
+    """)
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_upload_session_expires_at ON upload_session (expires_at)"
+    )
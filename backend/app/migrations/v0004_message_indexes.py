@@ -0,0 +1,15 @@
+# ===================================================================
+# v0004: Mesaj gönderen/alıcı indeksleri
+# ===================================================================
+# Konuşma listesi ve mesaj araması için.
+# ===================================================================
+
+from . import create_index
+
+description = "Mesaj gönderen/alıcı indeksleri"
+transactional = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_message_sender_id", "message", ["sender_id"])
+    create_index(conn, "ix_message_receiver_id", "message", ["receiver_id"])
@@ -0,0 +1,14 @@
+# ===================================================================
+# v0005: Mesaj tam metin arama indeksi (FTS5)
+# ===================================================================
+# SQLite FTS5 yoksa atlanır; arama LIKE ile çalışmaya devam eder.
+# ===================================================================
+
+from ..search import ensure_message_fts
+
+description = "Mesaj tam metin arama indeksi (FTS5)"
+transactional = True
+
+
+def upgrade(conn):
+    ensure_message_fts(conn)
@@ -0,0 +1,14 @@
+# ===================================================================
+# v0006: Görev listesi ve görev araması indeksleri
+# ===================================================================
+
+from . import create_index
+
+description = "Görev listesi/arama indeksleri"
+transactional = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_task_instance_created_by_scheduled", "task_instance", ["created_by_id", "scheduled_for"])
+    create_index(conn, "ix_task_instance_assigned_to_scheduled", "task_instance", ["assigned_to_id", "scheduled_for"])
+    create_index(conn, "ix_task_instance_template_id", "task_instance", ["template_id"])
@@ -0,0 +1,12 @@
+# ===================================================================
+# v0007: Görev ve şablon tam metin arama indeksleri (FTS5)
+# ===================================================================
+
+from ..search import ensure_task_fts
+
+description = "Görev/şablon tam metin arama indeksleri (FTS5)"
+transactional = True
+
+
+def upgrade(conn):
+    ensure_task_fts(conn)
@@ -0,0 +1,13 @@
+# ===================================================================
+# v0008: Aktivite kaydı dışa aktarma indeksleri
+# ===================================================================
+
+from . import create_index
+
+description = "Aktivite kaydı indeksleri"
+transactional = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_activity_log_user_timestamp", "activity_log", ["user_id", "timestamp"])
+    create_index(conn, "ix_activity_log_entity", "activity_log", ["entity_type", "entity_id"])
@@ -0,0 +1,31 @@
+# ===================================================================
+# v0009: Hane bazlı sharding dizini
+# ===================================================================
+# Kullanıcı -> shard eşlemesi (sharding.py). Tablo her veritabanında
+# oluşturulur ama sadece ana veritabanındaki kullanılır.
+# ===================================================================
+
+from . import exec_ddl
+
+description = "shard_directory tablosu"
+transactional = True
+
+
+def upgrade(conn):
+    exec_ddl(conn, """
+        CREATE TABLE IF NOT EXISTS shard_directory (
+            user_id INTEGER NOT NULL,
+            household_id INTEGER,
+            shard INTEGER NOT NULL,
+            state VARCHAR NOT NULL,
+            updated_at DATETIME,
+            PRIMARY KEY (user_id),
+            FOREIGN KEY(user_id) REFERENCES app_user (id)
+        )
+    """)
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_shard_directory_household_id ON shard_directory (household_id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_shard_directory_shard ON shard_directory (shard)"
+    )
@@ -0,0 +1,43 @@
+# ===================================================================
+# v0010: Bildirim outbox'ı
+# ===================================================================
+# Görev değişiklikleriyle aynı transaction'da yazılan bildirim olayları;
+# teslimat worker'ı tarafından işlenir (outbox.py).
+# ===================================================================
+
+from . import exec_ddl
+
+description = "notification_outbox tablosu"
+transactional = True
+
+
+def upgrade(conn):
+    exec_ddl(conn, """
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            id INTEGER NOT NULL,
+            event_type VARCHAR NOT NULL,
+            user_id INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            severity VARCHAR,
+            priority INTEGER NOT NULL,
+            entity_type VARCHAR,
+            entity_id INTEGER,
+            status VARCHAR NOT NULL,
+            attempts INTEGER NOT NULL,
+            delivered_channels VARCHAR,
+            last_error TEXT,
+            created_at DATETIME NOT NULL,
+            available_at DATETIME NOT NULL,
+            locked_until DATETIME,
+            delivered_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(user_id) REFERENCES app_user (id)
+        )
+    """)
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_notification_outbox_id ON notification_outbox (id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_notification_outbox_claim "
+        "ON notification_outbox (status, priority, available_at)"
+    )
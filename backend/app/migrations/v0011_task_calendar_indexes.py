@@ -0,0 +1,26 @@
+# ===================================================================
+# v0011: Görev takvimi indeksleri
+# ===================================================================
+# GET /tasks/calendar gün/durum sayımlarını kullanıcı + tarih aralığında
+# yapar. (kullanıcı, scheduled_for) indeksleri status ile genişletilir;
+# sayım sadece indeksten okunur. Yeni indeksler eskilerin yerini tutar
+# (aynı ön ek), eskiler silinir.
+# ===================================================================
+
+from . import create_index, drop_index
+
+description = "Görev takvimi indeksleri (kullanıcı, tarih, durum)"
+transactional = False
+
+
+def upgrade(conn):
+    create_index(
+        conn, "ix_task_instance_created_by_scheduled_status", "task_instance",
+        ["created_by_id", "scheduled_for", "status"],
+    )
+    create_index(
+        conn, "ix_task_instance_assigned_to_scheduled_status", "task_instance",
+        ["assigned_to_id", "scheduled_for", "status"],
+    )
+    drop_index(conn, "ix_task_instance_created_by_scheduled")
+    drop_index(conn, "ix_task_instance_assigned_to_scheduled")
@@ -0,0 +1,15 @@
+# ===================================================================
+# v0012: Mesaj eki - mesaj indeksi
+# ===================================================================
+# Konuşma yüklenirken ekler selectinload ile tek sorguda alınır
+# (message_id IN (...)); indeks olmadan her seferinde tablo taranır.
+# ===================================================================
+
+from . import create_index
+
+description = "message_attachment.message_id indeksi"
+transactional = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_message_attachment_message_id", "message_attachment", ["message_id"])
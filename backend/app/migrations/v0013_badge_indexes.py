@@ -0,0 +1,17 @@
+# ===================================================================
+# v0013: Okunmamış sayaç indeksleri
+# ===================================================================
+# GET /users/{user_id}/badges sık sık (birkaç saniyede bir) çağrılır;
+# okunmamış bildirim ve mesaj sayıları tablo taranmadan indeksten
+# hesaplanır. Bildirim listesi de kullanıcıya göre indeksten okunur.
+# ===================================================================
+
+from . import create_index
+
+description = "Okunmamış bildirim/mesaj sayaç indeksleri"
+transactional = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_notification_user_read", "notification", ["user_id", "is_read"])
+    create_index(conn, "ix_message_receiver_unread", "message", ["receiver_id", "is_read", "is_deleted"])
@@ -0,0 +1,16 @@
+# ===================================================================
+# v0014: Görev sürüm numarası (iyimser eşzamanlılık)
+# ===================================================================
+# task_instance.version her güncellemede bir artar; güncellemeler
+# "UPDATE ... WHERE id = ? AND version = ?" ile yapılır, arada başka biri
+# görevi değiştirdiyse 409 döner. Mevcut görevler sürüm 1 ile başlar.
+# ===================================================================
+
+from . import add_column_if_missing
+
+description = "task_instance.version sütunu"
+transactional = True
+
+
+def upgrade(conn):
+    add_column_if_missing(conn, "task_instance", "version", "INTEGER NOT NULL DEFAULT 1")
@@ -0,0 +1,18 @@
+# ===================================================================
+# v0015: Yükleme oturumu parça sahipliği (claim)
+# ===================================================================
+# Bir parça yazılırken oturum "UPDATE ... WHERE offset = ? AND
+# claimed_until boş/geçmiş" ile sahiplenilir. Böylece aynı oturuma aynı
+# anda iki parça yazılamaz (süreçler ve sunucular arasında da) ve yazma
+# kilidi parça akışı boyunca tutulmaz.
+# ===================================================================
+
+from . import add_column_if_missing
+
+description = "upload_session.claim_token ve claimed_until sütunları"
+transactional = True
+
+
+def upgrade(conn):
+    add_column_if_missing(conn, "upload_session", "claim_token", "VARCHAR")
+    add_column_if_missing(conn, "upload_session", "claimed_until", "DATETIME")
@@ -0,0 +1,39 @@
+# ===================================================================
+# v0016: PostgreSQL'de 64 bit id'ler
+# ===================================================================
+# Eski PostgreSQL veritabanlarında id'ler SERIAL, diğer tamsayı sütunlar
+# INTEGER (32 bit) olarak oluşturuldu. Shard id aralıkları (shard k:
+# k * SHARD_ID_SPAN'den başlar) bu sınırı aşar; shard oluşturma ve hane
+# taşıma "out of range" hatası verir. Mevcut şemadaki tüm INTEGER sütunlar
+# BIGINT'e, sequence'lar BIGINT'e çevrilir (adapt_ddl artık yeni
+# tabloları doğrudan BIGINT/BIGSERIAL ile oluşturur).
+#
+# SQLite'ta INTEGER zaten 64 bittir; migrasyon bir şey yapmaz.
+# ALTER ... TYPE BIGINT tabloyu yeniden yazar; büyük veritabanlarında
+# bakım penceresinde uygulanmalıdır.
+# ===================================================================
+
+description = "PostgreSQL: INTEGER sütunlar ve id sequence'ları BIGINT"
+transactional = True
+
+
+def upgrade(conn):
+    if conn.dialect.name != "postgresql":
+        return
+    columns = conn.exec_driver_sql(
+        "SELECT c.table_name, c.column_name FROM information_schema.columns c "
+        "JOIN information_schema.tables t "
+        "ON t.table_schema = c.table_schema AND t.table_name = c.table_name "
+        "WHERE c.table_schema = current_schema() AND t.table_type = 'BASE TABLE' "
+        "AND c.data_type = 'integer' "
+        "ORDER BY c.table_name, c.ordinal_position"
+    ).all()
+    for table, column in columns:
+        conn.exec_driver_sql(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE BIGINT')
+
+    sequences = conn.exec_driver_sql(
+        "SELECT sequencename FROM pg_sequences "
+        "WHERE schemaname = current_schema() AND data_type = 'integer'::regtype"
+    ).scalars().all()
+    for sequence in sequences:
+        conn.exec_driver_sql(f'ALTER SEQUENCE "{sequence}" AS BIGINT')
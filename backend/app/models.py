@@ -6,7 +6,7 @@
 # ===================================================================
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -115,12 +115,20 @@ class TaskInstance(Base):
     pending/in_progress -> cancelled (iptal edildi)
     """
     __tablename__ = "task_instance"
+    __table_args__ = (
+        # Görev listeleri, arama ve takvim kullanıcıya + tarihe göre filtreler;
+        # status sütunu takvimin gün/durum sayımlarını tablo satırlarını
+        # okumadan (covering index) yapmasını sağlar
+        Index("ix_task_instance_created_by_scheduled_status", "created_by_id", "scheduled_for", "status"),
+        Index("ix_task_instance_assigned_to_scheduled_status", "assigned_to_id", "scheduled_for", "status"),
+    )
 
     # Birincil anahtar
     id = Column(Integer, primary_key=True, index=True)
     
     # Hangi şablondan oluşturuldu
-    template_id = Column(Integer, ForeignKey("task_template.id"), nullable=False)
+    # İndeksli: şablon metninden yapılan aramalar görevlere bu alanla bağlanır
+    template_id = Column(Integer, ForeignKey("task_template.id"), nullable=False, index=True)
     
     # Görev başlığı (şablondan kopyalanabilir veya özel yazılabilir)
     title = Column(String, nullable=True)
@@ -145,7 +153,8 @@ class TaskInstance(Base):
     resolution_note = Column(Text, nullable=True)
     
     # Tamamlama fotoğrafı URL'i
-    completion_photo_url = Column(String, nullable=True)
+    # İndeksli: yetim dosya temizleyicisi (upload_gc) URL ile arama yapar
+    completion_photo_url = Column(String, nullable=True, index=True)
     
     # Değerlendirme puanı (1-5)
     rating = Column(Integer, nullable=True)
@@ -159,6 +168,12 @@ class TaskInstance(Base):
     # Son güncelleme zamanı (durum değişikliğinde güncellenir)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
+    # Sürüm numarası (iyimser eşzamanlılık): Her ORM güncellemesi
+    # "UPDATE ... WHERE id = ? AND version = ?" ile yapılır ve sürümü bir
+    # artırır; arada başka biri görevi değiştirdiyse StaleDataError oluşur
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+
     # Görevi oluşturan kullanıcı (hasta_yakini)
     created_by_id = Column(Integer, ForeignKey("app_user.id"), nullable=False)
     
@@ -176,6 +191,9 @@ class TaskInstance(Base):
         back_populates="assigned_task_instances"
     )
 
+    # Görevi oluşturan kullanıcı (hasta yakını)
+    created_by = relationship("AppUser", foreign_keys=[created_by_id])
+
 
 # ===================================================================
 # BİLDİRİM MODELİ (Notification)
@@ -188,6 +206,10 @@ class Notification(Base):
     - Hasta yakınına: "Görev tamamlandı" veya "Görevde sorun var"
     """
     __tablename__ = "notification"
+    __table_args__ = (
+        # Bildirim listesi ve okunmamış sayısı (GET /users/{id}/badges)
+        Index("ix_notification_user_read", "user_id", "is_read"),
+    )
 
     # Birincil anahtar
     id = Column(Integer, primary_key=True, index=True)
@@ -219,6 +241,11 @@ class ActivityLog(Base):
     Denetim (audit) ve sonuç analizi için kullanılır.
     """
     __tablename__ = "activity_log"
+    __table_args__ = (
+        # Dışa aktarma: kullanıcının aktiviteleri tarihe göre, görev üzerindeki aktiviteler
+        Index("ix_activity_log_user_timestamp", "user_id", "timestamp"),
+        Index("ix_activity_log_entity", "entity_type", "entity_id"),
+    )
 
     # Birincil anahtar
     id = Column(Integer, primary_key=True, index=True)
@@ -254,10 +281,15 @@ class Message(Base):
     Hasta yakını ve bakıcı arasında iletişim.
     """
     __tablename__ = "message"
+    __table_args__ = (
+        # Okunmamış mesaj sayısı sadece indeksten hesaplanır (badges)
+        Index("ix_message_receiver_unread", "receiver_id", "is_read", "is_deleted"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    sender_id = Column(Integer, ForeignKey("app_user.id"), nullable=False)
-    receiver_id = Column(Integer, ForeignKey("app_user.id"), nullable=False)
+    # İndeksli: konuşma listeleri ve arama kullanıcıya göre filtreler
+    sender_id = Column(Integer, ForeignKey("app_user.id"), nullable=False, index=True)
+    receiver_id = Column(Integer, ForeignKey("app_user.id"), nullable=False, index=True)
     content = Column(Text, nullable=True)
     sent_at = Column(DateTime, default=datetime.utcnow)
     is_edited = Column(Boolean, default=False)
@@ -281,12 +313,135 @@ class MessageAttachment(Base):
     __tablename__ = "message_attachment"
 
     id = Column(Integer, primary_key=True, index=True)
-    message_id = Column(Integer, ForeignKey("message.id"), nullable=False)
+    # Mesajların eklerini toplu yükleme (selectinload: message_id IN (...))
+    message_id = Column(Integer, ForeignKey("message.id"), nullable=False, index=True)
     file_type = Column(String, nullable=False)  # image, document, etc.
-    file_path = Column(String, nullable=False)
+    file_path = Column(String, nullable=False, index=True)
     file_name = Column(String, nullable=False)
     file_size = Column(Integer, nullable=True)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
 
     # İlişki
     message = relationship("Message", back_populates="attachments")
+
+
+# ===================================================================
+# DEVAM ETTİRİLEBİLİR YÜKLEME OTURUMU (UploadSession)
+# ===================================================================
+class UploadSession(Base):
+    """
+    Parça parça (chunked) yapılan, bağlantı koparsa kaldığı yerden devam
+    ettirilebilen dosya yüklemelerini takip eder.
+    Yükleme tamamlanınca dosya MessageAttachment'a veya görev fotoğrafına dönüşür.
+    """
+    __tablename__ = "upload_session"
+
+    # Oturum ID'si (tahmin edilemez olması için UUID)
+    id = Column(String, primary_key=True)
+
+    # Yüklemeyi başlatan kullanıcı
+    user_id = Column(Integer, ForeignKey("app_user.id"), nullable=False)
+
+    # Yüklemenin amacı: message_attachment | task_photo
+    purpose = Column(String, nullable=False)
+
+    # Hedef kayıt ID'si (mesaj ID'si veya görev ID'si)
+    target_id = Column(Integer, nullable=False)
+
+    # Orijinal dosya adı
+    file_name = Column(String, nullable=False)
+
+    # Toplam dosya boyutu (byte) ve şu ana kadar alınan byte sayısı
+    total_size = Column(Integer, nullable=False)
+    offset = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    # Bu zamandan sonra oturum geçersiz olur ve temizlenir
+    # İndeksli: süresi dolan oturumlar bu alana göre bulunur
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    # Parça yazan isteğin sahiplik anahtarı ve sahipliğin bitiş zamanı
+    # (istek yarıda ölürse claimed_until geçince oturum tekrar yazılabilir)
+    claim_token = Column(String, nullable=True)
+    claimed_until = Column(DateTime, nullable=True)
+
+
+# ===================================================================
+# SHARD DİZİNİ (ShardDirectory)
+# ===================================================================
+class ShardDirectory(Base):
+    """
+    Her kullanıcının verisinin hangi shard'da tutulduğunu gösterir (sharding.py).
+    Bir hanenin (hasta yakını ve bakıcıları) tüm verisi aynı shard'dadır.
+    Dizin ana veritabanında tutulur; kaydı olmayan kullanıcılar shard 0'dadır.
+    """
+    __tablename__ = "shard_directory"
+
+    user_id = Column(Integer, ForeignKey("app_user.id"), primary_key=True)
+
+    # Hane kimliği: Hasta yakınının kullanıcı ID'si. Henüz bir haneye
+    # bağlanmamış bakıcılar için boş
+    household_id = Column(Integer, nullable=True, index=True)
+
+    # Verinin bulunduğu shard (0 = ana veritabanı)
+    shard = Column(Integer, nullable=False, index=True)
+
+    # active | moving (taşınırken istekler 503 + Retry-After alır)
+    state = Column(String, nullable=False, default="active")
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ===================================================================
+# BİLDİRİM OUTBOX'I (NotificationOutbox)
+# ===================================================================
+class NotificationOutbox(Base):
+    """
+    Gönderilmeyi bekleyen bildirim olayları (transactional outbox, outbox.py).
+    Görev değişikliğiyle aynı transaction'da yazılır; teslimat worker'ı
+    olayları öncelik sırasıyla okuyup kanallara (uygulama içi bildirim,
+    webhook, ...) dağıtır.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Worker'ın sıradaki olayları seçmesi: durum, öncelik, zaman
+        Index("ix_notification_outbox_claim", "status", "priority", "available_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Olay türü (task_assigned, task_status, task_rescheduled, ...)
+    event_type = Column(String, nullable=False)
+
+    # Bildirimin alıcısı
+    user_id = Column(Integer, ForeignKey("app_user.id"), nullable=False)
+
+    message = Column(Text, nullable=False)
+
+    # Sorun bildirimlerinde sorun seviyesi (mild, moderate, critical)
+    severity = Column(String, nullable=True)
+
+    # Küçük değer önce teslim edilir (0 = kritik sorun)
+    priority = Column(Integer, nullable=False)
+
+    # İlgili kayıt (ör. TaskInstance, 42); görev silinmiş olabilir, yabancı anahtar yok
+    entity_type = Column(String, nullable=True)
+    entity_id = Column(Integer, nullable=True)
+
+    # pending | processing | delivered | failed
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+
+    # Başarıyla teslim edilen kanallar (virgülle ayrılmış); tekrar
+    # denemelerde bu kanallara yeniden gönderilmez
+    delivered_channels = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Bir sonraki deneme zamanı (tekrar denemelerde ileri alınır)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Worker'ın olayı işleme süresi; dolarsa (worker çöktüyse) olay tekrar alınır
+    locked_until = Column(DateTime, nullable=True)
+    delivered_at = Column(DateTime, nullable=True)
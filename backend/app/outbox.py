@@ -0,0 +1,580 @@
+# ===================================================================
+# BİLDİRİM OUTBOX'I VE TESLİMAT WORKER'I (outbox.py)
+# ===================================================================
+# Görev endpoint'leri bildirimi doğrudan oluşturmaz: enqueue() ile
+# notification_outbox tablosuna bir olay ekler ve olay görev
+# değişikliğiyle aynı transaction'da commit edilir (transactional outbox).
+# Görev değişikliği kaydedildiyse bildirim de kaybolmaz; istek süresi
+# bildirim dağıtımını (fan-out) içermez.
+#
+# Teslimat worker'ı (arka plan thread'i):
+# - Olayları gruplar halinde (OUTBOX_BATCH_SIZE) öncelik sırasıyla alır:
+#   Kritik sorun bildirimleri (problem_severity == "critical") önce, diğer
+#   sorun bildirimleri sonra, geri kalanlar en son
+# - Her olayı kayıtlı kanallara dağıtır. "in_app" kanalı notification
+#   satırlarını olayları "delivered" işaretleyen transaction'da yazar
+#   (uygulama içi bildirim tam bir kez oluşur); harici kanallar (webhook,
+#   log) en az bir kez teslim edilir
+# - Alınan olaylar OUTBOX_LEASE_SECONDS süreyle kiralanır. Harici teslimat
+#   bu süreyi aşarsa başka bir worker (ör. diğer uvicorn süreci) olayları
+#   tekrar alabilir; son yazma sadece kiralaması hâlâ geçerli olan olaylara
+#   yapılır (status = processing ve locked_until = kendi kiralaması)
+# - Başarısız teslimatlar jitter'lı üstel beklemeyle tekrar denenir;
+#   OUTBOX_MAX_ATTEMPTS denemeden sonra olay "failed" olarak kalır
+# - Olay commit edilince worker uyandırılır (after_commit), ayrıca
+#   OUTBOX_POLL_INTERVAL saniyede bir tablo kontrol edilir
+# - Sharding açıksa her shard'ın outbox'ı ayrı ayrı işlenir
+#
+# Kanallar NOTIFY_CHANNELS ile seçilir (varsayılan: in_app); yeni kanallar
+# register_channel() ile eklenir. MemoryChannel yerel geliştirme ve testler
+# için sahte (fake) bir kanaldır.
+#
+# Worker uygulama süreci içinde çalışır (OUTBOX_WORKER=1, varsayılan);
+# ayrı bir süreçte çalıştırmak için: "python deliver_notifications.py"
+#
+# Metrikler (GET /metrics): outbox_delivered_total, outbox_retries_total,
+# outbox_failed_total, outbox_lease_lost_total, outbox_delivery_delay_seconds,
+# outbox_batch_size
+# ===================================================================
+
+import json
+import logging
+from abc import ABC, abstractmethod
+import os
+import random
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .metrics import inc, observe
+from .sharding import Shard, all_shards
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_WORKER = os.environ.get("OUTBOX_WORKER", "1") == "1"
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_INTERVAL = float(os.environ.get("OUTBOX_POLL_INTERVAL", "1.0"))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "8"))
+# Tekrar denemeler arası bekleme sınırları (saniye)
+OUTBOX_RETRY_BASE = float(os.environ.get("OUTBOX_RETRY_BASE", "2"))
+OUTBOX_RETRY_MAX = float(os.environ.get("OUTBOX_RETRY_MAX", "600"))
+# İşlenmekte olan olayın kilidi; worker çökerse bu süre sonunda tekrar alınır
+OUTBOX_LEASE_SECONDS = float(os.environ.get("OUTBOX_LEASE_SECONDS", "60"))
+# Teslim edilmiş olayların saklanma süresi (saat)
+OUTBOX_RETENTION_HOURS = float(os.environ.get("OUTBOX_RETENTION_HOURS", "72"))
+
+NOTIFY_CHANNELS = os.environ.get("NOTIFY_CHANNELS", "in_app")
+NOTIFY_WEBHOOK_URL = os.environ.get("NOTIFY_WEBHOOK_URL")
+NOTIFY_WEBHOOK_TIMEOUT = float(os.environ.get("NOTIFY_WEBHOOK_TIMEOUT", "5"))
+
+PENDING = "pending"
+PROCESSING = "processing"
+DELIVERED = "delivered"
+FAILED = "failed"
+
+# Öncelikler (küçük olan önce)
+PRIORITY_CRITICAL = 0
+PRIORITY_PROBLEM = 1
+PRIORITY_NORMAL = 5
+
+
+def priority_for(severity: Optional[str], event_type: str) -> int:
+    if severity == "critical":
+        return PRIORITY_CRITICAL
+    if event_type == "task_problem":
+        return PRIORITY_PROBLEM
+    return PRIORITY_NORMAL
+
+
+def enqueue(
+    db: Session,
+    user_id: int,
+    message: str,
+    event_type: str,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    severity: Optional[str] = None,
+) -> models.NotificationOutbox:
+    """
+    Bildirim olayını session'a ekler; commit ETMEZ. Çağıranın bir sonraki
+    commit'i (ör. görev güncellemesi) olayı da kaydeder.
+    """
+    now = datetime.utcnow()
+    outbox_event = models.NotificationOutbox(
+        event_type=event_type,
+        user_id=user_id,
+        message=message,
+        severity=severity,
+        priority=priority_for(severity, event_type),
+        entity_type=entity_type,
+        entity_id=entity_id,
+        status=PENDING,
+        attempts=0,
+        created_at=now,
+        available_at=now,
+    )
+    db.add(outbox_event)
+    db.info["outbox_pending"] = True
+    return outbox_event
+
+
+def outbox_row(user_id: int, message: str, event_type: str, now: datetime, **fields) -> dict:
+    """Toplu ekleme (bulk_insert) için outbox satırı; varsayılanlar açıkça doldurulur."""
+    severity = fields.get("severity")
+    return {
+        "event_type": event_type,
+        "user_id": user_id,
+        "message": message,
+        "severity": severity,
+        "priority": priority_for(severity, event_type),
+        "entity_type": fields.get("entity_type"),
+        "entity_id": fields.get("entity_id"),
+        "status": PENDING,
+        "attempts": 0,
+        "delivered_channels": None,
+        "last_error": None,
+        "created_at": now,
+        "available_at": now,
+        "locked_until": None,
+        "delivered_at": None,
+    }
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop("outbox_pending", False):
+        wake_worker()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session, previous_transaction):
+    session.info.pop("outbox_pending", None)
+
+
+# -------------------------------------------------------------------
+# Kanallar
+# -------------------------------------------------------------------
+
+class Channel(ABC):
+    """
+    Bildirim kanalı. deliver() olay grubunu teslim eder ve başarısız olan
+    olayların hata mesajlarını {olay id: hata} olarak döndürür.
+    transactional=True olan kanallar, olayları "delivered" işaretleyen
+    session'da çalışır (sadece veritabanına yazan kanallar için).
+    """
+
+    name = "channel"
+    transactional = False
+
+    @abstractmethod
+    def deliver(self, db: Session, events: List[models.NotificationOutbox]) -> Dict[int, str]:
+        """Olayları teslim eder; başarısız olanlar için {olay id: hata} döndürür."""
+
+
+class InAppChannel(Channel):
+    """Uygulama içi bildirim (notification tablosu; GET /notifications/{user_id})."""
+
+    name = "in_app"
+    transactional = True
+
+    def deliver(self, db, events):
+        db.add_all(
+            models.Notification(
+                user_id=e.user_id,
+                message=e.message,
+                is_read=False,
+                created_at=datetime.utcnow(),
+            )
+            for e in events
+        )
+        return {}
+
+
+class LogChannel(Channel):
+    """Bildirimleri uygulama log'una yazar (geliştirme ortamı için)."""
+
+    name = "log"
+
+    def deliver(self, db, events):
+        for e in events:
+            logger.info("Bildirim [%s] kullanıcı=%s öncelik=%s: %s", e.event_type, e.user_id, e.priority, e.message)
+        return {}
+
+
+def event_payload(e: models.NotificationOutbox) -> dict:
+    return {
+        "id": e.id,
+        "event_type": e.event_type,
+        "user_id": e.user_id,
+        "message": e.message,
+        "severity": e.severity,
+        "priority": e.priority,
+        "entity_type": e.entity_type,
+        "entity_id": e.entity_id,
+        "created_at": e.created_at.isoformat(),
+    }
+
+
+class WebhookChannel(Channel):
+    """
+    Her olayı JSON olarak NOTIFY_WEBHOOK_URL'e POST eder (push bildirim
+    servisi, SMS ağ geçidi vb.). 2xx dışı yanıtlar ve bağlantı hataları
+    tekrar denenir; alıcı olay "id"sine göre tekrarları ayıklamalıdır.
+    """
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = NOTIFY_WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, db, events):
+        errors = {}
+        for e in events:
+            request = urllib.request.Request(
+                self.url,
+                data=json.dumps(event_payload(e), ensure_ascii=False).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    if not 200 <= response.status < 300:
+                        errors[e.id] = f"HTTP {response.status}"
+            except Exception as exc:
+                errors[e.id] = f"{type(exc).__name__}: {exc}"
+        return errors
+
+
+class MemoryChannel(Channel):
+    """
+    Sahte kanal: Teslim edilen olayları bellekte tutar. fail_times > 0 ise
+    her olayın ilk fail_times teslimatı hata verir (tekrar deneme testleri için).
+    """
+
+    def __init__(self, name: str = "memory", fail_times: int = 0):
+        self.name = name
+        self.fail_times = fail_times
+        self.delivered: List[dict] = []
+        self._failures: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def deliver(self, db, events):
+        errors = {}
+        with self._lock:
+            for e in events:
+                failures = self._failures.get(e.id, 0)
+                if failures < self.fail_times:
+                    self._failures[e.id] = failures + 1
+                    errors[e.id] = "sahte hata"
+                else:
+                    self.delivered.append(event_payload(e))
+        return errors
+
+
+def _configured_channels() -> List[Channel]:
+    channels: List[Channel] = []
+    for name in (n.strip() for n in NOTIFY_CHANNELS.split(",")):
+        if name == "in_app":
+            channels.append(InAppChannel())
+        elif name == "log":
+            channels.append(LogChannel())
+        elif name == "webhook":
+            if not NOTIFY_WEBHOOK_URL:
+                raise RuntimeError("NOTIFY_CHANNELS=webhook için NOTIFY_WEBHOOK_URL tanımlanmalıdır.")
+            channels.append(WebhookChannel(NOTIFY_WEBHOOK_URL))
+        elif name == "memory":
+            channels.append(MemoryChannel())
+        elif name:
+            raise RuntimeError(f"Bilinmeyen bildirim kanalı: {name}")
+    return channels
+
+
+_channels: List[Channel] = _configured_channels()
+
+
+def get_channels() -> List[Channel]:
+    return list(_channels)
+
+
+def register_channel(channel: Channel) -> None:
+    """Kanal ekler (aynı isimde bir kanal varsa yerine geçer)."""
+    global _channels
+    _channels = [c for c in _channels if c.name != channel.name] + [channel]
+
+
+# -------------------------------------------------------------------
+# Teslimat
+# -------------------------------------------------------------------
+
+def retry_delay(attempts: int) -> float:
+    """Tam jitter'lı üstel bekleme: [base, min(max, base * 2^attempts)]"""
+    ceiling = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * (2 ** attempts))
+    return random.uniform(min(OUTBOX_RETRY_BASE, ceiling), ceiling)
+
+
+def _claim(shard: Shard, batch_size: int) -> List[models.NotificationOutbox]:
+    """
+    Sıradaki olayları öncelik sırasıyla seçip "processing" işaretler
+    (kısa bir yazma transaction'ı). PostgreSQL'de FOR UPDATE SKIP LOCKED ile
+    birden fazla worker aynı olayları almaz; SQLite'ta BEGIN IMMEDIATE
+    zaten tek yazara izin verir.
+    """
+    Outbox = models.NotificationOutbox
+    now = datetime.utcnow()
+    db = shard.session(write=True)
+    try:
+        ids = db.scalars(
+            select(Outbox.id)
+            .where(
+                or_(
+                    (Outbox.status == PENDING) & (Outbox.available_at <= now),
+                    (Outbox.status == PROCESSING) & (Outbox.locked_until < now),
+                )
+            )
+            .order_by(Outbox.priority, Outbox.available_at, Outbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            db.commit()
+            return []
+        db.execute(
+            update(Outbox)
+            .where(Outbox.id.in_(ids))
+            .values(status=PROCESSING, locked_until=now + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+        )
+        events = db.scalars(
+            select(Outbox).where(Outbox.id.in_(ids)).order_by(Outbox.priority, Outbox.id)
+        ).all()
+        # commit nesneleri expire eder; olaylar session dışında kullanılır
+        db.expunge_all()
+        db.commit()
+        return list(events)
+    finally:
+        db.close()
+
+
+def deliver_batch(shard: Shard, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Shard'ın outbox'ından bir grup olayı teslim eder; işlenen olay sayısını döndürür."""
+    events = _claim(shard, batch_size)
+    if not events:
+        return 0
+
+    channels = get_channels()
+    done = {e.id: set(filter(None, (e.delivered_channels or "").split(","))) for e in events}
+    errors: Dict[int, str] = {}
+
+    # Harici kanallar: Veritabanı kilidi tutulmadan
+    for channel in channels:
+        if channel.transactional:
+            continue
+        pending = [e for e in events if channel.name not in done[e.id]]
+        if not pending:
+            continue
+        try:
+            failed = channel.deliver(None, pending)
+        except Exception as exc:
+            logger.exception("%s kanalı teslimatı başarısız", channel.name)
+            failed = {e.id: f"{type(exc).__name__}: {exc}" for e in pending}
+        for e in pending:
+            if e.id in failed:
+                errors.setdefault(e.id, f"{channel.name}: {failed[e.id]}")
+            else:
+                done[e.id].add(channel.name)
+
+    now = datetime.utcnow()
+    Outbox = models.NotificationOutbox
+    db = shard.session(write=True)
+    try:
+        # Harici teslimat kiralama süresini (OUTBOX_LEASE_SECONDS) aştıysa
+        # olaylar başka bir worker tarafından tekrar alınmış olabilir: Sadece
+        # hâlâ bu worker'ın kiraladığı olaylar yazılır (uygulama içi bildirim
+        # iki kez oluşmaz). Satırlar bu transaction sonuna kadar kilitlenir.
+        owned = set(db.scalars(
+            select(Outbox.id)
+            .where(
+                Outbox.id.in_([e.id for e in events]),
+                Outbox.status == PROCESSING,
+                Outbox.locked_until == events[0].locked_until,
+            )
+            .with_for_update()
+        ))
+        if len(owned) < len(events):
+            logger.warning("%d bildirim olayının kiralaması kaybedildi; başka bir worker işliyor",
+                           len(events) - len(owned))
+            inc("outbox_lease_lost_total", value=len(events) - len(owned))
+            events = [e for e in events if e.id in owned]
+
+        for channel in channels:
+            if not channel.transactional:
+                continue
+            # Harici kanallarda hata alan olaylar da veritabanı kanalına
+            # yazılır; tekrar denemede sadece eksik kanallar gönderilir
+            pending = [e for e in events if channel.name not in done[e.id]]
+            if pending:
+                failed = channel.deliver(db, pending)
+                for e in pending:
+                    if e.id in failed:
+                        errors.setdefault(e.id, f"{channel.name}: {failed[e.id]}")
+                    else:
+                        done[e.id].add(channel.name)
+
+        for e in events:
+            values = {"delivered_channels": ",".join(sorted(done[e.id])) or None, "locked_until": None}
+            if e.id not in errors:
+                values.update(status=DELIVERED, delivered_at=now, last_error=None)
+                inc("outbox_delivered_total", (("priority", str(e.priority)),))
+                observe("outbox_delivery_delay_seconds", (now - e.created_at).total_seconds(),
+                        (("priority", str(e.priority)),))
+            elif e.attempts + 1 >= OUTBOX_MAX_ATTEMPTS:
+                values.update(status=FAILED, attempts=e.attempts + 1, last_error=errors[e.id])
+                inc("outbox_failed_total")
+                logger.error("Bildirim %s %d denemede teslim edilemedi: %s", e.id, e.attempts + 1, errors[e.id])
+            else:
+                values.update(
+                    status=PENDING,
+                    attempts=e.attempts + 1,
+                    last_error=errors[e.id],
+                    available_at=now + timedelta(seconds=retry_delay(e.attempts)),
+                )
+                inc("outbox_retries_total")
+            db.execute(update(Outbox).where(Outbox.id == e.id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+
+    observe("outbox_batch_size", len(done))
+    return len(done)
+
+
+def drain(batch_size: int = OUTBOX_BATCH_SIZE, max_batches: Optional[int] = None) -> int:
+    """Tüm shard'larda teslim edilebilir olay kalmayana kadar (veya max_batches) teslim eder."""
+    total, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        delivered = 0
+        for shard in all_shards():
+            delivered += deliver_batch(shard, batch_size)
+        total += delivered
+        batches += 1
+        if delivered == 0:
+            break
+    return total
+
+
+def purge_delivered(older_than_hours: float = OUTBOX_RETENTION_HOURS) -> int:
+    """Saklama süresi dolmuş teslim edilmiş olayları siler."""
+    cutoff = datetime.utcnow() - timedelta(hours=older_than_hours)
+    removed = 0
+    for shard in all_shards():
+        db = shard.session(write=True)
+        try:
+            result = db.execute(
+                models.NotificationOutbox.__table__.delete().where(
+                    (models.NotificationOutbox.status == DELIVERED)
+                    & (models.NotificationOutbox.delivered_at < cutoff)
+                )
+            )
+            db.commit()
+            removed += result.rowcount or 0
+        finally:
+            db.close()
+    return removed
+
+
+# -------------------------------------------------------------------
+# Arka plan worker'ı
+# -------------------------------------------------------------------
+
+class OutboxWorker:
+    """
+    Outbox'ı arka plan thread'inde işler. wake() ile hemen uyandırılır;
+    aksi halde poll_interval saniyede bir kontrol eder.
+    """
+
+    def __init__(self, batch_size: int = OUTBOX_BATCH_SIZE, poll_interval: float = OUTBOX_POLL_INTERVAL):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._last_purge = 0.0
+        self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            try:
+                drain(self.batch_size)
+                if time.monotonic() - self._last_purge > 3600:
+                    purge_delivered()
+                    self._last_purge = time.monotonic()
+            except Exception:
+                logger.exception("Bildirim outbox'ı işlenemedi")
+            self._wakeup.wait(self.poll_interval)
+
+
+_worker: Optional[OutboxWorker] = None
+_worker_lock = threading.Lock()
+
+
+def start_worker() -> Optional[OutboxWorker]:
+    """OUTBOX_WORKER=1 ise süreç genelindeki worker'ı başlatır (zaten çalışıyorsa onu döndürür)."""
+    global _worker
+    if not OUTBOX_WORKER:
+        return None
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = OutboxWorker()
+    return _worker
+
+
+def stop_worker() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop()
+            _worker = None
+
+
+def wake_worker() -> None:
+    """
+    Uygulama başlangıcında başlatılmış worker'ı uyandırır. Worker yoksa
+    (migrate.py, shards.py, benchmark'lar, gc_uploads.py gibi komut
+    satırı araçları) bir şey yapmaz; olaylar sonraki worker turunda veya
+    deliver_notifications.py ile teslim edilir.
+    """
+    worker = _worker
+    if worker is not None:
+        worker.wake()
+
+
+def outbox_stats() -> Dict[str, int]:
+    """Tüm shard'lardaki olay sayıları (duruma göre)."""
+    counts: Dict[str, int] = {PENDING: 0, PROCESSING: 0, DELIVERED: 0, FAILED: 0}
+    Outbox = models.NotificationOutbox
+    for shard in all_shards():
+        db = shard.session()
+        try:
+            for state, count in db.execute(
+                select(Outbox.status, func.count()).group_by(Outbox.status)
+            ):
+                counts[state] = counts.get(state, 0) + count
+        finally:
+            db.close()
+    return counts
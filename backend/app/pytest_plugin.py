@@ -0,0 +1,95 @@
+# ===================================================================
+# SORGU BÜTÇESİ PYTEST EKLENTİSİ (pytest_plugin.py)
+# ===================================================================
+# Endpoint testlerinde en fazla kaç SQL sorgusu çalışabileceğini
+# doğrulamak için. N+1 kalıpları veri büyüdükçe sorgu sayısını artırdığı
+# için, küçük test verisiyle bile bütçe aşımı olarak yakalanır.
+#
+# Eklenti etkinken tüm testler raiseload modunda çalışır
+# (instrumentation.raiseload_mode): Yanıt serileştirilirken açıkça
+# yüklenmemiş bir ilişkiye erişilirse test hata verir. Kapatmak için
+# --allow-lazy-loads veya testte @pytest.mark.allow_lazy_loads.
+#
+# Etkinleştirme (backend/ klasöründen):
+#   pytest -p app.pytest_plugin
+# veya conftest.py içinde:
+#   pytest_plugins = ["app.pytest_plugin"]
+#
+# Kullanım:
+#   @pytest.mark.query_budget(5)
+#   def test_conversations(client):
+#       client.get("/messages/conversations/1")
+#
+#   def test_overview(client, query_counter):
+#       client.get("/statistics/relative/1/overview")
+#       assert query_counter.count <= 10
+# ===================================================================
+
+import pytest
+
+from .instrumentation import N_PLUS_ONE_THRESHOLD, capture_queries, raiseload_mode
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--allow-lazy-loads",
+        action="store_true",
+        default=False,
+        help="Raiseload modunu kapatır (lazy-load edilen ilişkiler hata vermez).",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries, allow_repeats=False): Testin çalıştırdığı SQL "
+        "sorgusu sayısını sınırlar; allow_repeats=False iken N+1 tekrarları da hata sayılır.",
+    )
+    config.addinivalue_line(
+        "markers",
+        "allow_lazy_loads: Bu testte raiseload modunu kapatır.",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _raiseload(request):
+    """Testi raiseload modunda çalıştırır (lazy-load'lar hata verir)."""
+    if request.config.getoption("--allow-lazy-loads") or request.node.get_closest_marker("allow_lazy_loads"):
+        yield
+        return
+    with raiseload_mode():
+        yield
+
+
+@pytest.fixture
+def query_counter():
+    """Test boyunca çalışan sorguların QueryStats nesnesi."""
+    with capture_queries() as stats:
+        yield stats
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    max_queries = marker.args[0] if marker.args else marker.kwargs["max_queries"]
+    allow_repeats = marker.kwargs.get("allow_repeats", False)
+
+    # Test hata verirse exception buradan geçer; bütçe kontrol edilmez
+    with capture_queries() as stats:
+        result = yield
+
+    if stats.count > max_queries:
+        pytest.fail(
+            f"Sorgu bütçesi aşıldı: {stats.count} > {max_queries}\n{stats.summary()}",
+            pytrace=False,
+        )
+    repeated = stats.repeated(N_PLUS_ONE_THRESHOLD)
+    if repeated and not allow_repeats:
+        pytest.fail(
+            f"Muhtemel N+1: {len(repeated)} ifade {N_PLUS_ONE_THRESHOLD}+ kez tekrarlandı\n{stats.summary()}",
+            pytrace=False,
+        )
+    return result
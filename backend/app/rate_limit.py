@@ -0,0 +1,298 @@
+# ===================================================================
+# HIZ SINIRLAMA VE YÜK ATMA (rate_limit.py)
+# ===================================================================
+# İstemci başına token bucket hız sınırı ve aşırı yükte öncelikli yük atma
+# (load shedding). Bellek içidir; her uygulama süreci kendi sayaçlarını
+# tutar.
+#
+# İstekler route'a göre sınıflara ayrılır (öncelik sırasıyla):
+# - critical: Görev durumu güncellemeleri ve sorun bildirimleri
+#   (PATCH /tasks/instances/status[/bulk]); yük atmada HİÇ reddedilmez
+# - write:    Diğer yazma istekleri (POST/PUT/PATCH/DELETE)
+# - auth:     /auth/* (giriş: CPU yoğun pbkdf2_sha256 doğrulaması)
+# - read:     Diğer GET istekleri
+# - expensive: İstatistikler, dışa aktarma, aramalar
+#
+# POST /batch zarfı sınırlanmaz: Alt istekleri bu middleware'den tek tek
+# geçer ve her biri kendi sınıfından token harcar (routers/batch.py).
+#
+# Hız sınırı: Her sınıf için kullanıcı başına (X-User-Id header'ı veya
+# path/query'deki user_id, current_user_id, ...) ve IP başına ayrı bucket
+# tutulur; IP bucket'ı aynı ağdaki (NAT) kullanıcılar için RATE_LIMIT_IP_FACTOR
+# kat geniştir (auth hariç: girişte kullanıcı bilinmez, sadece IP sınırlanır).
+# Sınır aşılınca 429 + Retry-After döner.
+#
+# Yük atma: İşlenmekte olan istek sayısı SHED_MAX_IN_FLIGHT'ın belirli bir
+# oranını aşınca önce tekrar denemesi ucuz okumalar (expensive, read),
+# sonra girişler ve yazmalar 503 + Retry-After ile reddedilir.
+#
+# Ayarlar:
+#   RATE_LIMIT_ENABLED=1 (varsayılan)
+#   RATE_LIMITS="auth=0.2/5,read=20/60"  sınıf=saniyede_token/kapasite
+#   RATE_LIMIT_IP_FACTOR=10, SHED_MAX_IN_FLIGHT=64
+#   TRUST_FORWARDED_FOR=1: İstemci IP'si X-Forwarded-For'dan alınır
+#   (sadece güvenilir bir proxy arkasında)
+#
+# Metrikler: http_throttled_total{class, reason="rate_limit"|"shed"}
+# ===================================================================
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.routing import Match
+
+from .metrics import inc
+from .sharding import PRINCIPAL_KEYS
+from .sqlite_writes import WRITE_METHODS
+
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_IP_FACTOR = float(os.environ.get("RATE_LIMIT_IP_FACTOR", "10"))
+SHED_MAX_IN_FLIGHT = int(os.environ.get("SHED_MAX_IN_FLIGHT", "64"))
+TRUST_FORWARDED_FOR = os.environ.get("TRUST_FORWARDED_FOR", "0") == "1"
+
+CRITICAL = "critical"
+WRITE = "write"
+AUTH = "auth"
+READ = "read"
+EXPENSIVE = "expensive"
+
+# Sınıf -> (saniyede eklenen token, kapasite)
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    CRITICAL: (20.0, 60.0),
+    WRITE: (10.0, 30.0),
+    AUTH: (0.2, 5.0),
+    READ: (20.0, 60.0),
+    EXPENSIVE: (2.0, 10.0),
+}
+
+# Sınıfın reddedilmeye başladığı doluluk (SHED_MAX_IN_FLIGHT oranı);
+# None: yük atmada reddedilmez
+SHED_AT: Dict[str, Optional[float]] = {
+    CRITICAL: None,
+    WRITE: 0.9,
+    AUTH: 0.75,
+    READ: 0.75,
+    EXPENSIVE: 0.5,
+}
+
+CRITICAL_ROUTES = {("PATCH", "/tasks/instances/status"), ("PATCH", "/tasks/instances/status/bulk")}
+EXPENSIVE_PREFIXES = ("/statistics/", "/exports/", "/admin/")
+EXPENSIVE_ROUTES = {"/tasks/search", "/messages/search"}
+EXEMPT_ROUTES = {"/", "/metrics", "/batch"}
+
+# Bu kadar süre kullanılmayan bucket'lar silinir (bellek sınırı)
+BUCKET_IDLE_SECONDS = 600
+
+
+def _parse_limits(value: str) -> Dict[str, Tuple[float, float]]:
+    limits = dict(DEFAULT_LIMITS)
+    for item in (part.strip() for part in value.split(",")):
+        if not item:
+            continue
+        name, _, spec = item.partition("=")
+        rate, _, burst = spec.partition("/")
+        if name.strip() not in limits:
+            raise RuntimeError(f"RATE_LIMITS: Bilinmeyen sınıf: {name}")
+        limits[name.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+LIMITS = _parse_limits(os.environ.get("RATE_LIMITS", ""))
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route şablonunun sınıfı (None: sınırlanmaz)."""
+    if path in EXEMPT_ROUTES:
+        return None
+    if path.startswith("/auth/"):
+        return AUTH
+    if (method, path) in CRITICAL_ROUTES:
+        return CRITICAL
+    if path in EXPENSIVE_ROUTES or path.startswith(EXPENSIVE_PREFIXES):
+        return EXPENSIVE
+    if method in WRITE_METHODS:
+        return WRITE
+    return READ
+
+
+class TokenBucketLimiter:
+    """Anahtar başına token bucket'lar (thread-safe)."""
+
+    def __init__(self):
+        self._buckets: Dict[tuple, List[float]] = {}  # anahtar -> [token, son güncelleme]
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+
+    def acquire(self, checks: List[Tuple[tuple, float, float]]) -> float:
+        """
+        checks: [(anahtar, saniyede_token, kapasite), ...]. Hepsinde token
+        varsa her birinden bir token alır ve 0 döner; yoksa hiçbirinden
+        almaz ve tekrar denemeden önce beklenmesi gereken süreyi döner.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_prune > BUCKET_IDLE_SECONDS:
+                self._prune(now)
+            wait = 0.0
+            buckets = []
+            for key, rate, burst in checks:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = [burst, now]
+                else:
+                    bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                    bucket[1] = now
+                if bucket[0] < 1:
+                    wait = max(wait, (1 - bucket[0]) / rate)
+                buckets.append(bucket)
+            if wait:
+                return wait
+            for bucket in buckets:
+                bucket[0] -= 1
+            return 0.0
+
+    def _prune(self, now: float) -> None:
+        idle = [key for key, (_, updated) in self._buckets.items() if now - updated > BUCKET_IDLE_SECONDS]
+        for key in idle:
+            del self._buckets[key]
+        self._last_prune = now
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+limiter = TokenBucketLimiter()
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _client_ip(scope) -> str:
+    headers = dict(scope["headers"])
+    if TRUST_FORWARDED_FOR and b"x-forwarded-for" in headers:
+        return headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _user_id(scope, path_params: dict) -> Optional[int]:
+    """İsteği yapan kullanıcı (gövde okunmaz; header, path ve query)."""
+    headers = dict(scope["headers"])
+    user_id = _as_int(headers.get(b"x-user-id"))
+    if user_id is not None:
+        return user_id
+    for key in PRINCIPAL_KEYS:
+        user_id = _as_int(path_params.get(key))
+        if user_id is not None:
+            return user_id
+    if scope.get("query_string"):
+        query = parse_qs(scope["query_string"].decode("latin-1"))
+        for key in PRINCIPAL_KEYS:
+            if key in query:
+                user_id = _as_int(query[key][0])
+                if user_id is not None:
+                    return user_id
+    return None
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """
+    Hız sınırı ve yük atma. Route eşleştirmesini kendisi yapar (sınıf ve
+    path'teki kullanıcı id'si için); reddedilen isteklerde de metriklerin
+    route etiketi doğru olsun diye scope["route"] ayarlanır.
+    """
+
+    def __init__(self, app, router):
+        self.app = app
+        self.router = router
+        self.in_flight = 0
+        self._routes = None
+
+    def _flat_routes(self) -> list:
+        """
+        include_router ile eklenen router'lar tek bir route olarak görünür;
+        eşleştirme için içlerindeki route'lar düzleştirilir (router'lar
+        include_router'a prefix verilmeden eklendiği için route.path tamdır).
+        """
+        if self._routes is None:
+            routes, pending = [], list(self.router.routes)
+            while pending:
+                route = pending.pop(0)
+                included = getattr(route, "original_router", None)
+                if included is not None:
+                    pending[:0] = included.routes
+                elif hasattr(route, "path"):
+                    routes.append(route)
+            self._routes = routes
+        return self._routes
+
+    def _match(self, scope):
+        for route in self._flat_routes():
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, child_scope.get("path_params", {})
+        return None, {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        route, path_params = self._match(scope)
+        request_class = classify(scope["method"], route.path) if route is not None else READ
+        if request_class is None:
+            await self.app(scope, receive, send)
+            return
+        if route is not None:
+            scope["route"] = route
+
+        # Yük atma: Doluluk sınıfın eşiğini aştıysa reddet
+        shed_at = SHED_AT[request_class]
+        if shed_at is not None and self.in_flight >= SHED_MAX_IN_FLIGHT * shed_at:
+            inc("http_throttled_total", (("class", request_class), ("reason", "shed")))
+            await _reject(send, 503, "Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.", 1)
+            return
+
+        rate, burst = LIMITS[request_class]
+        # Giriş isteklerinde kullanıcı bilinmez (e-posta gövdededir); kaba
+        # kuvvete karşı IP bucket'ı genişletilmez
+        factor = 1 if request_class == AUTH else RATE_LIMIT_IP_FACTOR
+        checks = [((request_class, "ip", _client_ip(scope)), rate * factor, burst * factor)]
+        user_id = _user_id(scope, path_params)
+        if user_id is not None:
+            checks.append(((request_class, "user", user_id), rate, burst))
+        wait = limiter.acquire(checks)
+        if wait:
+            inc("http_throttled_total", (("class", request_class), ("reason", "rate_limit")))
+            await _reject(send, 429, "Çok fazla istek gönderildi, lütfen biraz sonra tekrar deneyin.", wait)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,85 @@
+# ===================================================================
+# YÖNETİM ROUTER'I (admin.py)
+# ===================================================================
+# Operasyon ekibi için tanılama endpoint'leri.
+# İstekler X-Admin-Token header'ında ADMIN_TOKEN ortam değişkeninin
+# değerini göndermelidir. ADMIN_TOKEN tanımlı değilse endpoint'ler kapalıdır
+# (403); sadece geliştirme ortamında ADMIN_OPEN=1 ile token'sız açılabilir.
+#
+# Endpoint'ler: /admin/slow-queries, /admin/shards
+# ===================================================================
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from ..sharding import SHARD_COUNT, shard_overview
+from ..slow_queries import reset_slow_queries, slow_query_report
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+# Sadece geliştirme: ADMIN_TOKEN yokken endpoint'leri herkese açar
+ADMIN_OPEN = os.environ.get("ADMIN_OPEN", "0") == "1"
+
+SORT_KEYS = ("max_ms", "total_ms", "avg_ms", "count")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        if ADMIN_OPEN:
+            return
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Yönetici endpoint'leri kapalı: ADMIN_TOKEN tanımlı değil.",
+        )
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu işlem için yönetici yetkisi gereklidir.",
+        )
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow-queries")
+def get_slow_queries(sort: str = "max_ms", limit: int = 50):
+    """
+    Yavaş sorgu kaydını döndürür.
+
+    - worst: SQL kalıbı başına özet (adet, toplam/ortalama/en yüksek süre,
+      route'lar, parametre şekli, EXPLAIN QUERY PLAN çıktısı)
+    - recent: Son yavaş çalıştırmalar (en yeni önce)
+
+    Query parametreleri:
+    - sort: max_ms | total_ms | avg_ms | count
+    - limit: Döndürülecek kayıt sayısı (1-200)
+    """
+    if sort not in SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort şunlardan biri olmalıdır: {', '.join(SORT_KEYS)}",
+        )
+    return slow_query_report(sort=sort, limit=max(1, min(limit, 200)))
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    """
+    Yavaş sorgu kaydını temizler (ör. bir indeks eklendikten sonra yeniden ölçmek için).
+    """
+    reset_slow_queries()
+    return {"message": "Yavaş sorgu kaydı temizlendi"}
+
+
+@router.get("/shards")
+def get_shards():
+    """
+    Shard'ların durumu (tüm shard'lara sorgu gönderir).
+
+    Her shard için: hane ve kullanıcı sayısı (shard dizininden) ve hane
+    tablolarındaki satır sayıları. Sharding kapalıysa sadece shard 0 döner.
+    Haneleri taşımak/dengelemek için: backend/ klasöründe "python shards.py".
+    """
+    return {"shard_count": SHARD_COUNT, "shards": shard_overview()}
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from .. import schemas, crud, models
 from ..database import get_db
+from ..sharding import register_user
 
 # Router tanımlaması - Tüm endpoint'ler /auth prefix'i ile başlar
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -41,6 +42,8 @@ def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
         )
     # Yeni kullanıcı oluştur
     user = crud.create_user(db, user_in)
+    # Sharding açıksa shard dizinine ekle ve shard'lara kopyala (sharding.py)
+    register_user(db, user)
     return user
 
 
@@ -0,0 +1,132 @@
+# ===================================================================
+# TOPLU İSTEK ROUTER'I (batch.py)
+# ===================================================================
+# Birden fazla okuma (GET) isteğini tek HTTP çağrısında çalıştırır.
+# Örneğin hasta yakını ana sayfası görevleri, istatistikleri ve
+# bildirimleri tek ağ gidiş-dönüşüyle alır:
+#
+#   POST /batch
+#   {"requests": [
+#       {"id": "tasks", "path": "/tasks/created/5?fields=title,status,scheduled_for"},
+#       {"id": "stats", "path": "/statistics/relative/5/overview"},
+#       {"id": "notifications", "path": "/notifications/5"}
+#   ]}
+#
+# - Alt istekler sırayla, uygulamanın tüm middleware zinciri üzerinden
+#   çalışır (aynı doğrulama, yetki kontrolleri ve hata yanıtları). Her alt
+#   istek kendi sınıfına göre hız sınırına takılır (429) veya yük atmada
+#   reddedilir (503) ve metriklerde ayrı bir istek olarak görünür
+# - Alt istekler shard başına TEK bir veritabanı session'ını paylaşır
+#   (database.get_db); SQLite'ta hepsi aynı okuma anlık görüntüsünü görür
+# - Bir alt isteğin hatası diğerlerini etkilemez; her yanıtın kendi
+#   durum kodu vardır. /batch yanıtı her zaman 200 döner
+# ===================================================================
+
+import json
+import logging
+import os
+from typing import Dict
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from .. import schemas
+
+# Tek batch içinde en fazla alt istek
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", "20"))
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["batch"])
+
+
+async def _dispatch(request: Request, path: str, sessions: Dict[int, Session]) -> schemas.BatchItemResult:
+    """Alt isteği uygulamanın middleware zincirinde çalıştırır ve yanıtı toplar."""
+    url = urlsplit(path)
+    headers = [
+        (name, value) for name, value in request.scope["headers"]
+        if name not in (b"content-length", b"content-type")
+    ]
+    scope = {
+        **request.scope,
+        "method": "GET",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "state": {**request.scope.get("state", {}), "batch_sessions": sessions},
+    }
+    for key in ("route", "endpoint", "path_params"):
+        scope.pop(key, None)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    response = {"status": 500, "headers": [], "body": bytearray()}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        logger.exception("Batch alt isteği başarısız: %s", path)
+        # Yarıda kalan sorgunun transaction'ı sonraki alt istekleri etkilemesin
+        for db in sessions.values():
+            db.rollback()
+        return schemas.BatchItemResult(status=500, body={"detail": "Sunucu hatası."})
+
+    content_type = dict(response["headers"]).get(b"content-type", b"")
+    body = bytes(response["body"])
+    if content_type.startswith(b"application/json"):
+        payload = json.loads(body) if body else None
+    else:
+        payload = body.decode("utf-8", errors="replace")
+    return schemas.BatchItemResult(status=response["status"], body=payload)
+
+
+@router.post("/batch", response_model=schemas.BatchResponse)
+async def run_batch(payload: schemas.BatchRequest, request: Request):
+    """
+    Birden fazla GET isteğini tek çağrıda çalıştırır.
+    
+    Request body:
+    - requests: [{"id": "...", "path": "/tasks/assigned/5?status=pending"}, ...]
+      (en fazla 20; sadece GET)
+    
+    Response: responses: Her alt istek için {"id", "status", "body"}, istek sırasıyla
+    """
+    if len(payload.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek batch içinde en fazla {BATCH_MAX_REQUESTS} istek olabilir.",
+        )
+    for item in payload.requests:
+        if item.method.upper() != "GET":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Batch içinde sadece GET istekleri çalıştırılabilir.",
+            )
+        if not item.path.startswith("/") or urlsplit(item.path).path.rstrip("/") == "/batch":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Geçersiz batch yolu: {item.path}",
+            )
+
+    sessions: Dict[int, Session] = {}
+    results = []
+    try:
+        for item in payload.requests:
+            result = await _dispatch(request, item.path, sessions)
+            result.id = item.id
+            results.append(result)
+    finally:
+        for db in sessions.values():
+            db.close()
+
+    return {"responses": results}
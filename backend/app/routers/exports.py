@@ -0,0 +1,216 @@
+# ===================================================================
+# DIŞA AKTARMA ROUTER'I (exports.py)
+# ===================================================================
+# Bakım geçmişinin (görevler, değerlendirmeler, aktivite kayıtları)
+# CSV veya NDJSON olarak dışa aktarılması.
+#
+# Satırlar ORM nesnesi oluşturulmadan, veritabanı cursor'ından parça
+# parça okunur ve bir generator üzerinden StreamingResponse ile istemciye
+# akıtılır. Böylece bellek kullanımı satır sayısından bağımsız kalır.
+# ===================================================================
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .. import crud, models
+from ..database import get_db
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# Cursor'dan tek seferde okunan satır sayısı
+FETCH_SIZE = 1000
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+TASK_EXPORT_COLUMNS = [
+    models.TaskInstance.id,
+    models.TaskInstance.template_id,
+    models.TaskInstance.title,
+    models.TaskInstance.description,
+    models.TaskInstance.scheduled_for,
+    models.TaskInstance.status,
+    models.TaskInstance.problem_message,
+    models.TaskInstance.problem_severity,
+    models.TaskInstance.resolution_note,
+    models.TaskInstance.completion_photo_url,
+    models.TaskInstance.rating,
+    models.TaskInstance.review_note,
+    models.TaskInstance.created_at,
+    models.TaskInstance.updated_at,
+    models.TaskInstance.created_by_id,
+    models.TaskInstance.assigned_to_id,
+]
+
+ACTIVITY_EXPORT_COLUMNS = [
+    models.ActivityLog.id,
+    models.ActivityLog.user_id,
+    models.ActivityLog.action,
+    models.ActivityLog.entity_type,
+    models.ActivityLog.entity_id,
+    models.ActivityLog.timestamp,
+    models.ActivityLog.details,
+]
+
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _stream_rows(stmt: Select, fmt: str, bind: Engine) -> Iterator[str]:
+    """
+    Sorguyu kendi session'ında çalıştırır ve satırları CSV/NDJSON parçaları
+    olarak üretir. Request'in session'ı yanıt akarken kapanmış olabileceği
+    için generator aynı veritabanına (bind: kullanıcının shard'ı) kendi
+    bağlantısını açıp kapatır.
+    """
+    db = Session(bind=bind)
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=FETCH_SIZE))
+        columns = list(result.keys())
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for rows in result.partitions():
+                for row in rows:
+                    writer.writerow(["" if v is None else _format_value(v) for v in row])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(
+                        {c: _format_value(v) for c, v in zip(columns, row)},
+                        ensure_ascii=False,
+                    ) + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
+
+
+def _export_response(db: Session, stmt: Select, fmt: str, name: str) -> StreamingResponse:
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format 'csv' veya 'ndjson' olmalıdır.",
+        )
+    file_name = f"{name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return StreamingResponse(
+        _stream_rows(stmt, fmt, db.get_bind()),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    )
+
+
+def _get_user_or_404(db: Session, user_id: int) -> models.AppUser:
+    user = crud.get_user(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Kullanıcı bulunamadı.",
+        )
+    return user
+
+
+@router.get("/tasks")
+def export_tasks(
+    user_id: int,
+    fmt: str = Query("csv", alias="format"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    caregiver_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Görevleri (durum, sorun, çözüm ve değerlendirme bilgileriyle) dışa aktarır.
+
+    Kapsam:
+    - hasta_yakini: Oluşturduğu görevler (caregiver_id ile bakıcıya göre daraltılabilir)
+    - hasta_bakici: Kendisine atanmış görevler
+
+    Query parametreleri:
+    - format: csv | ndjson
+    - date_from, date_to: Görev zamanı aralığı [date_from, date_to)
+    - caregiver_id: Bakıcı filtresi
+    """
+    user = _get_user_or_404(db, user_id)
+
+    stmt = select(*TASK_EXPORT_COLUMNS)
+    if user.role == "hasta_yakini":
+        stmt = stmt.where(models.TaskInstance.created_by_id == user.id)
+        if caregiver_id is not None:
+            stmt = stmt.where(models.TaskInstance.assigned_to_id == caregiver_id)
+    else:
+        stmt = stmt.where(models.TaskInstance.assigned_to_id == user.id)
+    if date_from is not None:
+        stmt = stmt.where(models.TaskInstance.scheduled_for >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(models.TaskInstance.scheduled_for < date_to)
+    stmt = stmt.order_by(models.TaskInstance.scheduled_for.asc())
+
+    return _export_response(db, stmt, fmt, "tasks")
+
+
+@router.get("/activity")
+def export_activity(
+    user_id: int,
+    fmt: str = Query("csv", alias="format"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    caregiver_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Aktivite kayıtlarını dışa aktarır.
+
+    Kapsam:
+    - hasta_yakini: Kendi aktiviteleri + oluşturduğu görevler üzerindeki tüm
+      aktiviteler (caregiver_id verilirse sadece o bakıcının aktiviteleri)
+    - hasta_bakici: Kendi aktiviteleri
+
+    Query parametreleri:
+    - format: csv | ndjson
+    - date_from, date_to: Aktivite zamanı aralığı [date_from, date_to)
+    - caregiver_id: Bakıcı filtresi
+    """
+    user = _get_user_or_404(db, user_id)
+
+    stmt = select(*ACTIVITY_EXPORT_COLUMNS)
+    if user.role == "hasta_yakini":
+        own_tasks = select(models.TaskInstance.id).where(
+            models.TaskInstance.created_by_id == user.id
+        )
+        on_own_tasks = (models.ActivityLog.entity_type == "TaskInstance") & (
+            models.ActivityLog.entity_id.in_(own_tasks)
+        )
+        if caregiver_id is not None:
+            stmt = stmt.where(models.ActivityLog.user_id == caregiver_id, on_own_tasks)
+        else:
+            stmt = stmt.where(or_(models.ActivityLog.user_id == user.id, on_own_tasks))
+    else:
+        stmt = stmt.where(models.ActivityLog.user_id == user.id)
+    if date_from is not None:
+        stmt = stmt.where(models.ActivityLog.timestamp >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(models.ActivityLog.timestamp < date_to)
+    stmt = stmt.order_by(models.ActivityLog.timestamp.asc())
+
+    return _export_response(db, stmt, fmt, "activity")
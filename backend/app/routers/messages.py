@@ -7,19 +7,22 @@
 from typing import List, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_, and_, func, update
 import os
-import shutil
 
 from .. import schemas, crud, models
-from ..database import get_db
+from ..database import get_db, get_write_db
+from ..metrics import observe_upload
+from ..search import search_messages
+from ..storage import IMAGE_EXTENSIONS, get_storage, is_safe_key, key_to_url, url_to_key
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "..", "uploads", "messages")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+def _get_message(db: Session, message_id: int) -> Optional[models.Message]:
+    """Mesajı ekleriyle birlikte getirir (MessageRead ekleri de döndürür)."""
+    return db.get(models.Message, message_id, options=[selectinload(models.Message.attachments)])
 
 
 @router.post("/send", response_model=schemas.MessageRead)
@@ -46,21 +49,36 @@ def send_message(message_in: schemas.MessageCreate, db: Session = Depends(get_db
     )
     db.add(db_message)
     db.commit()
-    db.refresh(db_message)
     
-    return db_message
+    return _get_message(db, db_message.id)
 
 
 @router.get("/conversation/{other_user_id}", response_model=List[schemas.MessageRead])
 def get_conversation(
     other_user_id: int,
     current_user_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)  # mesajları okundu işaretler
 ):
     """
     İki kullanıcı arasındaki konuşmayı getirir.
+    Ekler selectinload ile tek sorguda yüklenir (mesaj başına sorgu yerine).
     """
-    messages = db.query(models.Message).filter(
+    # Alınan mesajları tek UPDATE ile okundu olarak işaretle
+    db.execute(
+        update(models.Message)
+        .where(
+            models.Message.sender_id == other_user_id,
+            models.Message.receiver_id == current_user_id,
+            models.Message.is_read == False,
+            models.Message.is_deleted == False,
+        )
+        .values(is_read=True)
+    )
+    db.commit()
+
+    messages = db.query(models.Message).options(
+        selectinload(models.Message.attachments)
+    ).filter(
         or_(
             and_(
                 models.Message.sender_id == current_user_id,
@@ -74,19 +92,46 @@ def get_conversation(
         models.Message.is_deleted == False
     ).order_by(models.Message.sent_at.asc()).all()
     
-    # Alınan mesajları okundu olarak işaretle
-    for msg in messages:
-        if msg.receiver_id == current_user_id and not msg.is_read:
-            msg.is_read = True
-    db.commit()
-    
     return messages
 
 
+@router.get("/search", response_model=schemas.MessageSearchResult)
+def search(
+    user_id: int,
+    q: str,
+    other_user_id: Optional[int] = None,
+    limit: int = 20,
+    offset: int = 0,
+    db: Session = Depends(get_db)
+):
+    """
+    Kullanıcının konuşmalarındaki mesajlarda tam metin arama yapar (FTS5).
+    
+    Query parametreleri:
+    - user_id: Aramayı yapan kullanıcı (sadece kendi konuşmaları aranır)
+    - q: Aranacak kelimeler (son kelime önek olarak eşleşir)
+    - other_user_id: Sadece bu kullanıcıyla olan konuşmada ara (opsiyonel)
+    - limit, offset: Sayfalama
+    
+    Response: Alaka düzeyine göre sıralı, eşleşmeleri işaretlenmiş sonuçlar
+    """
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+    hits = search_messages(db, user_id, q, other_user_id=other_user_id, limit=limit, offset=offset)
+    return {
+        "items": hits[:limit],
+        "limit": limit,
+        "offset": offset,
+        "has_more": len(hits) > limit,
+    }
+
+
 @router.get("/conversations/{user_id}", response_model=List[schemas.ConversationPreview])
 def get_conversations(user_id: int, db: Session = Depends(get_db)):
     """
     Kullanıcının tüm konuşmalarını listeler.
+    Karşı taraflar ve okunmamış sayıları konuşma başına sorgu yerine
+    toplu sorgularla alınır (IN ve GROUP BY).
     """
     # Kullanıcının dahil olduğu tüm mesajları bul
     messages = db.query(models.Message).filter(
@@ -97,29 +142,40 @@ def get_conversations(user_id: int, db: Session = Depends(get_db)):
         models.Message.is_deleted == False
     ).order_by(models.Message.sent_at.desc()).all()
     
-    # Konuşmaları grupla
-    conversations = {}
+    # Konuşmaları grupla (mesajlar yeniden eskiye: ilk görülen en son mesajdır)
+    latest = {}
     for msg in messages:
         other_id = msg.receiver_id if msg.sender_id == user_id else msg.sender_id
-        if other_id not in conversations:
-            other_user = crud.get_user(db, other_id)
-            unread = db.query(models.Message).filter(
-                models.Message.sender_id == other_id,
-                models.Message.receiver_id == user_id,
-                models.Message.is_read == False,
-                models.Message.is_deleted == False
-            ).count()
-            
-            conversations[other_id] = {
-                "other_user_id": other_id,
-                "other_user_name": other_user.full_name if other_user else "Bilinmeyen",
-                "other_user_role": other_user.role if other_user else "unknown",
-                "last_message": msg.content,
-                "last_message_time": msg.sent_at,
-                "unread_count": unread
-            }
+        latest.setdefault(other_id, msg)
+    if not latest:
+        return []
+
+    users = {user.id: user for user in crud.get_users(db, list(latest))}
+    unread_counts = dict(
+        db.query(models.Message.sender_id, func.count(models.Message.id))
+        .filter(
+            models.Message.sender_id.in_(list(latest)),
+            models.Message.receiver_id == user_id,
+            models.Message.is_read == False,
+            models.Message.is_deleted == False
+        )
+        .group_by(models.Message.sender_id)
+        .all()
+    )
+
+    conversations = []
+    for other_id, msg in latest.items():
+        other_user = users.get(other_id)
+        conversations.append({
+            "other_user_id": other_id,
+            "other_user_name": other_user.full_name if other_user else "Bilinmeyen",
+            "other_user_role": other_user.role if other_user else "unknown",
+            "last_message": msg.content,
+            "last_message_time": msg.sent_at,
+            "unread_count": unread_counts.get(other_id, 0)
+        })
     
-    return list(conversations.values())
+    return conversations
 
 
 @router.put("/{message_id}", response_model=schemas.MessageRead)
@@ -132,7 +188,7 @@ def update_message(
     """
     Mesajı düzenler (sadece gönderen yapabilir).
     """
-    message = db.get(models.Message, message_id)
+    message = _get_message(db, message_id)
     if not message:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -149,9 +205,8 @@ def update_message(
     message.is_edited = True
     message.edited_at = datetime.utcnow()
     db.commit()
-    db.refresh(message)
     
-    return message
+    return _get_message(db, message_id)
 
 
 @router.delete("/{message_id}")
@@ -183,7 +238,7 @@ def delete_message(
 
 
 @router.post("/upload/{message_id}")
-async def upload_attachment(
+def upload_attachment(
     message_id: int,
     current_user_id: int,
     file: UploadFile = File(...),
@@ -207,25 +262,24 @@ async def upload_attachment(
     
     # Dosya türünü belirle
     file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
+    if file_ext in IMAGE_EXTENSIONS:
         file_type = 'image'
     else:
         file_type = 'document'
     
-    # Dosyayı kaydet
+    # Dosyayı kaydet (parça parça, tamamı belleğe alınmadan)
     file_name = f"{message_id}_{datetime.utcnow().timestamp()}{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, file_name)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    key = f"messages/{file_name}"
+    file_size = get_storage().save(key, file.file)
+    observe_upload("message_attachment", file_size)
     
     # Veritabanına kaydet
     attachment = models.MessageAttachment(
         message_id=message_id,
         file_type=file_type,
-        file_path=f"/uploads/messages/{file_name}",
+        file_path=key_to_url(key),
         file_name=file.filename,
-        file_size=os.path.getsize(file_path),
+        file_size=file_size,
     )
     db.add(attachment)
     db.commit()
@@ -258,9 +312,9 @@ def delete_attachment(
         )
     
     # Dosyayı sil
-    file_path = os.path.join(os.path.dirname(UPLOAD_DIR), attachment.file_path.lstrip('/uploads/'))
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    key = url_to_key(attachment.file_path)
+    if is_safe_key(key):
+        get_storage().delete(key)
     
     db.delete(attachment)
     db.commit()
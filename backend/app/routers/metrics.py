@@ -0,0 +1,21 @@
+# ===================================================================
+# METRİK ROUTER'I (metrics.py)
+# ===================================================================
+# Prometheus'un periyodik olarak okuduğu /metrics endpoint'i.
+# Metriklerin toplanması app/metrics.py'dedir.
+# ===================================================================
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..metrics import render
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Uygulama metriklerini Prometheus metin formatında döndürür.
+    """
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
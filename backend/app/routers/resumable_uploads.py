@@ -0,0 +1,476 @@
+# ===================================================================
+# DEVAM ETTİRİLEBİLİR YÜKLEME ROUTER'I (resumable_uploads.py)
+# ===================================================================
+# Büyük dosyaları zayıf mobil bağlantılarda parça parça yüklemek için
+# tus benzeri bir protokol. Bağlantı koparsa istemci baştan başlamaz,
+# sunucudaki offset'i sorgulayıp kaldığı yerden devam eder.
+#
+# Akış:
+# 1. POST   /uploads/sessions               -> Oturum oluştur
+# 2. PATCH  /uploads/sessions/{id}          -> Parça gönder (Upload-Offset header'ı ile)
+# 3. HEAD   /uploads/sessions/{id}          -> Bağlantı koptuysa güncel offset'i öğren
+# 4. POST   /uploads/sessions/{id}/complete -> Dosyayı mesaj ekine / görev fotoğrafına dönüştür
+#    DELETE /uploads/sessions/{id}          -> Yüklemeyi iptal et
+#
+# Parça yazma (PATCH) veritabanı transaction'ı açık tutmaz: Oturum kısa bir
+# transaction'da koşullu UPDATE ile sahiplenilir (claim), gövde diske
+# threadpool'da yazılır, yeni offset ayrı bir kısa transaction'da
+# kaydedilir ve sahiplik bırakılır.
+# ===================================================================
+
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import BinaryIO, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session
+
+from .. import schemas, crud, models
+from ..database import get_db
+from ..metrics import observe_upload
+from ..sharding import get_shard, request_shard
+from ..storage import IMAGE_EXTENSIONS, get_storage, key_to_url
+from ..task_versions import compare_and_swap
+from ..upload_sessions import (
+    MAX_UPLOAD_SIZE,
+    SESSION_TTL,
+    discard_session,
+    remove_session_file,
+    session_file_path,
+)
+
+router = APIRouter(prefix="/uploads/sessions", tags=["uploads"])
+
+PURPOSES = ("message_attachment", "task_photo")
+
+# Parça yazan isteğin oturum üzerindeki sahiplik süresi. İstek yarıda
+# ölürse (süreç çöktü) bu süre geçince oturuma tekrar yazılabilir.
+CHUNK_CLAIM_TTL = timedelta(seconds=int(os.environ.get("UPLOAD_CHUNK_CLAIM_TTL", "900")))
+
+
+def _get_active_session(db: Session, session_id: str) -> models.UploadSession:
+    """Oturumu getirir; yoksa 404, süresi dolmuşsa 410 döndürür."""
+    upload = db.get(models.UploadSession, session_id)
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Yükleme oturumu bulunamadı."
+        )
+    if upload.expires_at < datetime.utcnow():
+        discard_session(db, session_id)
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Yükleme oturumunun süresi doldu."
+        )
+    return upload
+
+
+def _offset_headers(upload: models.UploadSession) -> dict:
+    return {
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.total_size),
+        "Cache-Control": "no-store",
+    }
+
+
+@router.post("", response_model=schemas.UploadSessionRead, status_code=status.HTTP_201_CREATED)
+def create_upload_session(
+    session_in: schemas.UploadSessionCreate,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """
+    Yeni bir parça parça yükleme oturumu başlatır.
+
+    Hedef kontrolleri:
+    - message_attachment: Mesaj var olmalı ve kullanıcı mesajın göndericisi olmalı
+    - task_photo: Görev var olmalı, kullanıcıya atanmış olmalı ve dosya resim olmalı
+    """
+    if session_in.purpose not in PURPOSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="purpose 'message_attachment' veya 'task_photo' olmalıdır."
+        )
+
+    if session_in.total_size <= 0 or session_in.total_size > MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Dosya boyutu 1 ile {MAX_UPLOAD_SIZE} byte arasında olmalıdır."
+        )
+
+    if session_in.purpose == "message_attachment":
+        message = db.get(models.Message, session_in.target_id)
+        if not message:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Mesaj bulunamadı."
+            )
+        if message.sender_id != session_in.user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Bu mesaja ek yükleme yetkiniz yok."
+            )
+    else:
+        task = crud.get_task_instance(db, session_in.target_id)
+        if not task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Görev bulunamadı."
+            )
+        if task.assigned_to_id != session_in.user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Bu görev bu kullanıcıya atanmış değil."
+            )
+        file_ext = os.path.splitext(session_in.file_name)[1].lower()
+        if file_ext not in IMAGE_EXTENSIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Desteklenmeyen dosya formatı. Sadece jpg, jpeg, png, gif, webp kabul edilir."
+            )
+
+    now = datetime.utcnow()
+    upload = models.UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=session_in.user_id,
+        purpose=session_in.purpose,
+        target_id=session_in.target_id,
+        file_name=session_in.file_name,
+        total_size=session_in.total_size,
+        offset=0,
+        created_at=now,
+        updated_at=now,
+        expires_at=now + SESSION_TTL,
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+
+    # Boş geçici dosyayı oluştur
+    open(session_file_path(upload.id), "wb").close()
+
+    response.headers["Location"] = f"/uploads/sessions/{upload.id}"
+    response.headers.update(_offset_headers(upload))
+    return upload
+
+
+@router.head("/{session_id}")
+def get_upload_offset(session_id: str, db: Session = Depends(get_db)):
+    """
+    Sunucunun şu ana kadar aldığı byte sayısını Upload-Offset header'ında döndürür.
+    İstemci bağlantı koptuktan sonra bu değerden devam eder.
+    """
+    upload = _get_active_session(db, session_id)
+    return Response(status_code=status.HTTP_200_OK, headers=_offset_headers(upload))
+
+
+@router.get("/{session_id}", response_model=schemas.UploadSessionRead)
+def get_upload_session(session_id: str, response: Response, db: Session = Depends(get_db)):
+    """
+    Yükleme oturumunun durumunu JSON olarak döndürür (HEAD ile aynı bilgi).
+    """
+    upload = _get_active_session(db, session_id)
+    response.headers.update(_offset_headers(upload))
+    return upload
+
+
+def _offset_conflict(offset: int, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=detail,
+        headers={"Upload-Offset": str(offset)},
+    )
+
+
+def _claim_session(shard: int, session_id: str, client_offset: int) -> Tuple[int, str]:
+    """
+    Oturumu parça yazmak için sahiplenir (kısa transaction). Offset
+    uyuşmazsa veya başka bir parça yazılıyorsa 409 fırlatır.
+    (toplam boyut, sahiplik anahtarı) döndürür.
+    """
+    db = get_shard(shard).session(write=True, lazy=True)
+    try:
+        upload = _get_active_session(db, session_id)
+        if client_offset != upload.offset:
+            raise _offset_conflict(upload.offset, f"Offset uyuşmuyor. Sunucudaki offset: {upload.offset}")
+
+        token = uuid.uuid4().hex
+        now = datetime.utcnow()
+        Upload = models.UploadSession
+        claimed = db.execute(
+            update(Upload)
+            .where(
+                Upload.id == session_id,
+                Upload.offset == client_offset,
+                or_(Upload.claimed_until.is_(None), Upload.claimed_until < now),
+            )
+            .values(claim_token=token, claimed_until=now + CHUNK_CLAIM_TTL)
+        ).rowcount
+        db.commit()
+        if not claimed:
+            raise _offset_conflict(upload.offset, "Bu oturuma şu anda başka bir parça yazılıyor.")
+        return upload.total_size, token
+    finally:
+        db.close()
+
+
+def _release_session(shard: int, session_id: str, token: str, offset: int) -> bool:
+    """Yeni offset'i kaydeder ve sahipliği bırakır; sahiplik kaybedildiyse False."""
+    db = get_shard(shard).session(write=True, lazy=True)
+    try:
+        now = datetime.utcnow()
+        Upload = models.UploadSession
+        released = db.execute(
+            update(Upload)
+            .where(Upload.id == session_id, Upload.claim_token == token)
+            .values(
+                offset=offset,
+                claim_token=None,
+                claimed_until=None,
+                updated_at=now,
+                expires_at=now + SESSION_TTL,
+            )
+        ).rowcount
+        db.commit()
+        return bool(released)
+    finally:
+        db.close()
+
+
+def _open_chunk_file(session_id: str, offset: int) -> Optional[BinaryIO]:
+    """
+    Geçici dosyayı offset'ten yazmak üzere açar. Önceki bir istek offset
+    kaydedilmeden yarıda kaldıysa fazladan yazılmış byte'lar kesilir.
+    Dosyada offset'ten az byte varsa (dosya silinmiş) None döner.
+    """
+    f = open(session_file_path(session_id), "a+b")
+    if os.fstat(f.fileno()).st_size < offset:
+        f.close()
+        return None
+    f.truncate(offset)
+    return f
+
+
+@router.patch("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(session_id: str, request: Request, shard: int = Depends(request_shard)):
+    """
+    Bir parçayı geçici dosyanın sonuna ekler.
+
+    Header'lar:
+    - Upload-Offset: Parçanın başladığı byte (sunucudaki offset ile aynı olmalı)
+
+    Gövde ham byte olarak akış halinde okunur ve diske yazılır;
+    parçanın tamamı belleğe alınmaz. Offset uyuşmazsa veya oturuma başka
+    bir parça yazılıyorsa 409 döner, istemci HEAD ile doğru offset'i
+    öğrenip tekrar dener. Veritabanı ve dosya işlemleri threadpool'da
+    yapılır; akış sırasında transaction açık kalmaz.
+    """
+    try:
+        client_offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload-Offset header'ı gereklidir."
+        )
+
+    total_size, token = await run_in_threadpool(_claim_session, shard, session_id, client_offset)
+
+    offset = client_offset
+    try:
+        f = await run_in_threadpool(_open_chunk_file, session_id, offset)
+        if f is None:
+            offset = 0
+            raise _offset_conflict(0, "Yüklenen veri kayboldu, yükleme baştan başlamalı.")
+        try:
+            async for chunk in request.stream():
+                if offset + len(chunk) > total_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Gönderilen veri toplam dosya boyutunu aşıyor."
+                    )
+                await run_in_threadpool(f.write, chunk)
+                offset += len(chunk)
+                observe_upload("resumable_chunk", len(chunk))
+        finally:
+            await run_in_threadpool(f.close)
+    finally:
+        # Bağlantı yarıda kopsa bile yazılan kısım kaydedilir
+        released = await run_in_threadpool(_release_session, shard, session_id, token, offset)
+
+    if not released:
+        raise _offset_conflict(offset, "Parça yazılırken oturumun sahipliği zaman aşımına uğradı.")
+
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={
+            "Upload-Offset": str(offset),
+            "Upload-Length": str(total_size),
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+def _claim_for_complete(db: Session, session_id: str) -> str:
+    """
+    Tamamlanmış (offset == total_size) oturumu aktarım için sahiplenir ve
+    hemen commit eder; sahiplik anahtarını döndürür. Oturum başka bir
+    istek tarafından tamamlanıyor veya parçası yazılıyorsa 409 fırlatır.
+    """
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+    Upload = models.UploadSession
+    claimed = db.execute(
+        update(Upload)
+        .where(
+            Upload.id == session_id,
+            Upload.offset == Upload.total_size,
+            or_(Upload.claimed_until.is_(None), Upload.claimed_until < now),
+        )
+        .values(claim_token=token, claimed_until=now + CHUNK_CLAIM_TTL)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Bu yükleme şu anda başka bir istek tarafından işleniyor.",
+        )
+    return token
+
+
+def _delete_claimed_session(db: Session, session_id: str, token: str) -> None:
+    """
+    Oturum kaydını hedef kayıtla aynı transaction'da siler (commit etmez).
+    Sahiplik kaybedildiyse (oturum iptal edildi, sahiplik süresi doldu) 409.
+    """
+    Upload = models.UploadSession
+    deleted = db.execute(
+        delete(Upload).where(Upload.id == session_id, Upload.claim_token == token)
+    ).rowcount
+    if deleted != 1:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Yükleme oturumu aktarım sırasında iptal edildi veya süresi doldu.",
+        )
+
+
+def _release_claim(db: Session, session_id: str, token: str) -> None:
+    Upload = models.UploadSession
+    db.execute(
+        update(Upload)
+        .where(Upload.id == session_id, Upload.claim_token == token)
+        .values(claim_token=None, claimed_until=None)
+    )
+    db.commit()
+
+
+@router.post("/{session_id}/complete")
+def complete_upload(session_id: str, db: Session = Depends(get_db)):
+    """
+    Tüm byte'lar alındıktan sonra dosyayı kalıcı depolamaya aktarır ve
+    hedef kayda bağlar (MessageAttachment oluşturur veya görev fotoğrafını ayarlar).
+
+    Oturum aktarım boyunca sahiplenilir: Aynı oturum için ikinci bir
+    /complete (ör. zaman aşımına uğrayan istemcinin tekrarı) 409 alır,
+    dosya iki kez aktarılmaz. Hedef kayıt ve oturumun silinmesi tek
+    commit'tedir; hata olursa aktarılan dosya silinir ve sahiplik
+    bırakılır, istemci tekrar deneyebilir.
+    """
+    upload = _get_active_session(db, session_id)
+
+    if upload.offset != upload.total_size:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Yükleme tamamlanmadı: {upload.offset}/{upload.total_size} byte alındı.",
+            headers={"Upload-Offset": str(upload.offset)},
+        )
+
+    purpose, target_id, file_name = upload.purpose, upload.target_id, upload.file_name
+    token = _claim_for_complete(db, session_id)
+
+    file_ext = os.path.splitext(file_name)[1].lower()
+    timestamp = datetime.utcnow().timestamp()
+    key = None
+    try:
+        if purpose == "message_attachment":
+            if db.get(models.Message, target_id) is None:
+                discard_session(db, session_id)
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Mesaj bulunamadı."
+                )
+
+            key = f"messages/{target_id}_{timestamp}{file_ext}"
+            with open(session_file_path(session_id), "rb") as f:
+                file_size = get_storage().save(key, f)
+
+            attachment = models.MessageAttachment(
+                message_id=target_id,
+                file_type='image' if file_ext in IMAGE_EXTENSIONS else 'document',
+                file_path=key_to_url(key),
+                file_name=file_name,
+                file_size=file_size,
+            )
+            db.add(attachment)
+            _delete_claimed_session(db, session_id, token)
+            db.commit()
+            result = {"message": "Dosya yüklendi", "attachment_id": attachment.id}
+        else:
+            task = crud.get_task_instance(db, target_id)
+            if not task:
+                discard_session(db, session_id)
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Görev bulunamadı."
+                )
+
+            key = f"task_photos/task_{target_id}_{timestamp}{file_ext}"
+            with open(session_file_path(session_id), "rb") as f:
+                get_storage().save(key, f)
+
+            photo_url = key_to_url(key)
+            task.completion_photo_url = photo_url
+            _delete_claimed_session(db, session_id, token)
+            with compare_and_swap(db, target_id):
+                db.commit()
+            result = {"message": "Fotoğraf yüklendi", "photo_url": photo_url}
+    except BaseException:
+        db.rollback()
+        if key is not None:
+            get_storage().delete(key)
+        _release_claim(db, session_id, token)
+        raise
+
+    remove_session_file(session_id)
+    return result
+
+
+@router.delete("/{session_id}")
+def cancel_upload(session_id: str, db: Session = Depends(get_db)):
+    """
+    Yükleme oturumunu iptal eder ve geçici dosyayı siler.
+    Oturuma o anda parça yazılıyor veya oturum tamamlanıyorsa 409 döner.
+    """
+    upload = db.get(models.UploadSession, session_id)
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Yükleme oturumu bulunamadı."
+        )
+    Upload = models.UploadSession
+    deleted = db.execute(
+        delete(Upload).where(
+            Upload.id == session_id,
+            or_(Upload.claimed_until.is_(None), Upload.claimed_until < datetime.utcnow()),
+        )
+    ).rowcount
+    db.commit()
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Bu yükleme şu anda işleniyor, iptal edilemez."
+        )
+    remove_session_file(session_id)
+    return {"message": "Yükleme iptal edildi"}
@@ -8,10 +8,11 @@ from typing import List
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, case
 
 from .. import schemas, crud, models
 from ..database import get_db
+from ..dialects import day_bucket
 
 router = APIRouter(prefix="/statistics", tags=["statistics"])
 
@@ -86,36 +87,25 @@ def get_caregiver_performance(user_id: int, db: Session = Depends(get_db)):
             detail="Hasta yakını bulunamadı."
         )
     
-    # Bu hasta yakınının görev atadığı bakıcıları bul
-    caregivers = db.query(models.TaskInstance.assigned_to_id).filter(
+    # Bakıcı başına toplam, tamamlanan ve ortalama puan tek GROUP BY
+    # sorgusuyla (bakıcı başına üç sorgu yerine)
+    rows = db.query(
+        models.TaskInstance.assigned_to_id,
+        func.count(models.TaskInstance.id),
+        func.sum(case((models.TaskInstance.status == "done", 1), else_=0)),
+        func.avg(models.TaskInstance.rating),
+    ).filter(
         models.TaskInstance.created_by_id == user_id
-    ).distinct().all()
-    
+    ).group_by(models.TaskInstance.assigned_to_id).all()
+
+    caregivers = {caregiver.id: caregiver for caregiver in crud.get_users(db, [row[0] for row in rows])}
+
     performance_data = []
-    for (caregiver_id,) in caregivers:
-        caregiver = crud.get_user(db, caregiver_id)
+    for caregiver_id, total, completed, avg_rating in rows:
+        caregiver = caregivers.get(caregiver_id)
         if not caregiver:
             continue
-            
-        # Toplam görev
-        total = db.query(models.TaskInstance).filter(
-            models.TaskInstance.created_by_id == user_id,
-            models.TaskInstance.assigned_to_id == caregiver_id
-        ).count()
-        
-        # Tamamlanan görev
-        completed = db.query(models.TaskInstance).filter(
-            models.TaskInstance.created_by_id == user_id,
-            models.TaskInstance.assigned_to_id == caregiver_id,
-            models.TaskInstance.status == "done"
-        ).count()
-        
-        # Ortalama puan
-        avg_rating = db.query(func.avg(models.TaskInstance.rating)).filter(
-            models.TaskInstance.created_by_id == user_id,
-            models.TaskInstance.assigned_to_id == caregiver_id,
-            models.TaskInstance.rating.isnot(None)
-        ).scalar() or 0
+        completed = completed or 0
         
         performance_data.append({
             "caregiver_id": caregiver_id,
@@ -123,7 +113,7 @@ def get_caregiver_performance(user_id: int, db: Session = Depends(get_db)):
             "total_tasks": total,
             "completed_tasks": completed,
             "completion_rate": round(completed / total * 100, 1) if total > 0 else 0,
-            "average_rating": round(float(avg_rating), 1)
+            "average_rating": round(float(avg_rating or 0), 1)
         })
     
     return performance_data
@@ -265,26 +255,28 @@ def get_caregiver_weekly_summary(user_id: int, db: Session = Depends(get_db)):
             detail="Bakıcı bulunamadı."
         )
     
-    weekly_data = []
     today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    
+    week_start = today - timedelta(days=6)
+
+    # Son 7 günün sayıları tek sorguda, güne göre gruplanarak alınır
+    # (gün başına iki COUNT sorgusu yerine); day_bucket SQLite ve
+    # PostgreSQL için uygun tarih ifadesine derlenir
+    day = day_bucket(models.TaskInstance.scheduled_for)
+    rows = db.query(
+        day,
+        func.count(models.TaskInstance.id),
+        func.sum(case((models.TaskInstance.status == "done", 1), else_=0)),
+    ).filter(
+        models.TaskInstance.assigned_to_id == user_id,
+        models.TaskInstance.scheduled_for >= week_start,
+        models.TaskInstance.scheduled_for < today + timedelta(days=1),
+    ).group_by(day).all()
+    counts = {bucket: (total, completed or 0) for bucket, total, completed in rows}
+
+    weekly_data = []
     for i in range(7):
         day_start = today - timedelta(days=i)
-        day_end = day_start + timedelta(days=1)
-        
-        total = db.query(models.TaskInstance).filter(
-            models.TaskInstance.assigned_to_id == user_id,
-            models.TaskInstance.scheduled_for >= day_start,
-            models.TaskInstance.scheduled_for < day_end
-        ).count()
-        
-        completed = db.query(models.TaskInstance).filter(
-            models.TaskInstance.assigned_to_id == user_id,
-            models.TaskInstance.scheduled_for >= day_start,
-            models.TaskInstance.scheduled_for < day_end,
-            models.TaskInstance.status == "done"
-        ).count()
-        
+        total, completed = counts.get(day_start.date(), (0, 0))
         weekly_data.append({
             "date": day_start.strftime("%Y-%m-%d"),
             "day_name": day_start.strftime("%A"),
@@ -7,12 +7,22 @@
 # 2. Task Instances (Atanmış Görevler): /tasks/instances/*
 # ===================================================================
 
+import csv
+from datetime import date, datetime, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
 from .. import schemas, crud, models
 from ..database import get_db
+from ..etags import if_match_version, not_modified, version_etag
+from ..fieldsets import TaskSelection
+from ..search import search_tasks
+from ..sharding import colocate_or_409, scatter, sharding_enabled
+from ..task_import import MAX_IMPORT_ROWS, import_task_instances, read_csv_rows
+from ..task_versions import check_version, compare_and_swap
 
 # Router tanımlaması - Tüm endpoint'ler /tasks prefix'i ile başlar
 router = APIRouter(prefix="/tasks", tags=["tasks"])
@@ -80,7 +90,10 @@ def list_templates(db: Session = Depends(get_db)):
     - Görev atama ekranında dropdown/liste doldurulur
     
     Response: Tüm görev şablonlarının listesi
+    (sharding açıksa tüm shard'lardan toplanır)
     """
+    if sharding_enabled():
+        return scatter(crud.list_task_templates)
     return crud.list_task_templates(db)
 
 
@@ -221,7 +234,20 @@ def create_task_instance(task_in: schemas.TaskInstanceCreate, db: Session = Depe
         )
 
     # (İstersen burada template var mı yok mu diye de kontrol eklenebilir)
-    task = crud.create_task_instance(db, task_in)
+    task = crud.create_task_instance(db, task_in, commit=False)
+
+    # Bildirim: Hasta bakıcıya -> yeni görev atandı (görevle aynı transaction'da outbox'a)
+    message = f"Yeni görev atandı. Tarih/Saat: {task.scheduled_for.isoformat()}"
+    crud.enqueue_notification(
+        db,
+        user_id=assignee.id,
+        message=message,
+        event_type="task_assigned",
+        entity_type="TaskInstance",
+        entity_id=task.id,
+    )
+    db.commit()
+    db.refresh(task)
 
     # Activity Log
     crud.log_activity(
@@ -233,17 +259,93 @@ def create_task_instance(task_in: schemas.TaskInstanceCreate, db: Session = Depe
         details=f"assigned_to={assignee.id}, scheduled_for={task.scheduled_for}",
     )
 
-    # Bildirim: Hasta bakıcıya -> yeni görev atandı
-    message = f"Yeni görev atandı. Tarih/Saat: {task.scheduled_for.isoformat()}"
-    crud.create_notification(db, user_id=assignee.id, message=message)
-
     return task
 
 
-@router.get("/assigned/{user_id}", response_model=List[schemas.TaskInstanceRead])
+def _get_import_creator(db: Session, created_by_id: int) -> models.AppUser:
+    """İçe aktarmayı yapan kullanıcıyı getirir; hasta yakını değilse hata verir."""
+    creator = crud.get_user(db, created_by_id)
+    if not creator:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="created_by_id kullanıcısı bulunamadı.",
+        )
+    if creator.role != "hasta_yakini":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sadece hasta yakını görev atayabilir.",
+        )
+    return creator
+
+
+def _check_import_size(rows: list) -> None:
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Tek seferde en fazla {MAX_IMPORT_ROWS} satır içe aktarılabilir.",
+        )
+
+
+@router.post("/instances/import", response_model=schemas.TaskImportResult)
+def import_task_instances_json(import_in: schemas.TaskImportRequest, db: Session = Depends(get_db)):
+    """
+    Birden fazla görevi tek istekte oluşturur (JSON).
+
+    Request body:
+    - created_by_id: Görevleri oluşturan kullanıcı (hasta_yakini)
+    - rows: [{template_id, assigned_to_id, scheduled_for, title?, description?}, ...]
+    - atomic: True ise hatalı satır varsa hiçbir görev eklenmez
+
+    Geçerli satırlar tek transaction'da eklenir, hatalı satırlar
+    "errors" listesinde satır numarasıyla döner. Her bakıcıya tek bir
+    özet bildirim gönderilir.
+    """
+    creator = _get_import_creator(db, import_in.created_by_id)
+    _check_import_size(import_in.rows)
+    return import_task_instances(db, creator, import_in.rows, atomic=import_in.atomic)
+
+
+@router.post("/instances/import/csv", response_model=schemas.TaskImportResult)
+def import_task_instances_csv(
+    created_by_id: int,
+    atomic: bool = False,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
+    """
+    Birden fazla görevi CSV dosyasından oluşturur.
+
+    CSV başlığı: template_id,assigned_to_id,scheduled_for,title,description
+    (title ve description isteğe bağlı). Davranış JSON içe aktarma ile aynıdır;
+    satır numaraları başlık satırı hariç 1'den başlar.
+    """
+    try:
+        rows = read_csv_rows(file.file)
+    except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"CSV okunamadı: {exc}",
+        )
+    _check_import_size(rows)
+    # JSON içe aktarmada bu kontrolü get_db yapar (sharding.py); CSV gövdesi
+    # dependency'lerde okunmadığı için atanan bakıcılar burada, session'ın
+    # transaction'ı başlamadan haneye bağlanır
+    for assignee_id in {row.get("assigned_to_id") for row in rows}:
+        if assignee_id is not None and str(assignee_id).isdigit():
+            colocate_or_409(created_by_id, int(assignee_id))
+    creator = _get_import_creator(db, created_by_id)
+    return import_task_instances(db, creator, rows, atomic=atomic)
+
+
+@router.get(
+    "/assigned/{user_id}",
+    response_model=List[schemas.TaskInstanceView],
+    response_model_exclude_unset=True,
+)
 def list_assigned_tasks(
     user_id: int,
     status: Optional[str] = None,
+    selection: TaskSelection = Depends(),
     db: Session = Depends(get_db),
 ):
     """
@@ -258,16 +360,26 @@ def list_assigned_tasks(
     
     Query parametresi (opsiyonel):
     - status: Durum filtresi (?status=pending veya ?status=done)
+    - fields: Dönecek alanlar (?fields=title,status,scheduled_for)
+    - expand: Görevle birlikte dönecek ilişkiler (?expand=created_by,template)
     
     Response: Görevler zamana göre sıralı (en yakın tarih önce)
     """
-    return crud.list_tasks_for_user(db, user_id=user_id, status=status, sort_by_scheduled=True)
+    tasks = crud.list_tasks_for_user(
+        db, user_id=user_id, status=status, sort_by_scheduled=True, options=selection.options()
+    )
+    return selection.serialize_all(tasks)
 
 
-@router.get("/created/{user_id}", response_model=List[schemas.TaskInstanceRead])
+@router.get(
+    "/created/{user_id}",
+    response_model=List[schemas.TaskInstanceView],
+    response_model_exclude_unset=True,
+)
 def list_created_tasks(
     user_id: int,
     status: Optional[str] = None,
+    selection: TaskSelection = Depends(),
     db: Session = Depends(get_db),
 ):
     """
@@ -282,16 +394,226 @@ def list_created_tasks(
     
     Query parametresi (opsiyonel):
     - status: Durum filtresi
+    - fields: Dönecek alanlar (?fields=title,status,scheduled_for)
+    - expand: Görevle birlikte dönecek ilişkiler (?expand=assigned_to)
     
     Response: Görevler zamana göre sıralı
     """
-    return crud.list_tasks_created_by(db, user_id=user_id, status=status, sort_by_scheduled=True)
+    tasks = crud.list_tasks_created_by(
+        db, user_id=user_id, status=status, sort_by_scheduled=True, options=selection.options()
+    )
+    return selection.serialize_all(tasks)
+
+
+@router.get("/search", response_model=schemas.TaskSearchResult)
+def search_task_instances(
+    user_id: int,
+    q: Optional[str] = None,
+    task_status: Optional[str] = Query(None, alias="status"),
+    severity: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    caregiver_id: Optional[int] = None,
+    limit: int = 20,
+    offset: int = 0,
+    db: Session = Depends(get_db),
+):
+    """
+    Görevlerde metin ve filtre ile arama yapar.
+    Örnek: "Geçen çeyrekte sorun bildirilen insülin görevleri"
+    ?q=insülin&status=problem&date_from=2025-07-01&date_to=2025-10-01
+    
+    Kapsam:
+    - hasta_yakini: Kendi oluşturduğu görevler (caregiver_id ile bakıcıya göre daraltılabilir)
+    - hasta_bakici: Kendisine atanmış görevler
+    
+    Query parametreleri:
+    - user_id: Aramayı yapan kullanıcı
+    - q: Görev başlığı/açıklaması, sorun/çözüm/değerlendirme notları ve
+      şablon metninde aranacak kelimeler (opsiyonel)
+    - status: Durum filtresi (pending, done, problem, ...)
+    - severity: Sorun seviyesi (mild, moderate, critical)
+    - date_from, date_to: Görev zamanı aralığı [date_from, date_to)
+    - caregiver_id: Bakıcı filtresi (sadece hasta yakını için)
+    - limit, offset: Sayfalama
+    
+    Response: Metin araması varsa alaka düzeyine, yoksa tarihe göre sıralı görevler
+    """
+    user = crud.get_user(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Kullanıcı bulunamadı.",
+        )
+
+    if user.role == "hasta_yakini":
+        created_by_id, assigned_to_id = user.id, caregiver_id
+    else:
+        created_by_id, assigned_to_id = None, user.id
+
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+    hits = search_tasks(
+        db,
+        query=q,
+        created_by_id=created_by_id,
+        assigned_to_id=assigned_to_id,
+        status=task_status,
+        severity=severity,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        offset=offset,
+    )
+    page = hits[:limit]
+
+    # Görevleri tek sorguda yükle, arama sırasını koru
+    tasks_by_id = {
+        task.id: task
+        for task in db.query(models.TaskInstance).filter(
+            models.TaskInstance.id.in_([hit["task_id"] for hit in page])
+        )
+    }
+    items = [
+        {"task": tasks_by_id[hit["task_id"]], "snippet": hit["snippet"], "rank": hit["rank"]}
+        for hit in page
+        if hit["task_id"] in tasks_by_id
+    ]
+
+    return {
+        "items": items,
+        "limit": limit,
+        "offset": offset,
+        "has_more": len(hits) > limit,
+    }
+
+
+# Takvim ±365 gün gösterir; sayımlar en fazla bu kadar gün için istenebilir
+CALENDAR_MAX_DAYS = 731
+# Görev satırları döndürülen pencere (6 haftalık ay görünümü)
+CALENDAR_MAX_WINDOW_DAYS = 42
+
+
+@router.get("/calendar", response_model=schemas.TaskCalendar, response_model_exclude_unset=True)
+def get_task_calendar(
+    user_id: int,
+    date_from: date,
+    date_to: date,
+    window_from: Optional[date] = None,
+    window_to: Optional[date] = None,
+    caregiver_id: Optional[int] = None,
+    selection: TaskSelection = Depends(),
+    db: Session = Depends(get_db),
+):
+    """
+    Görev takvimi: Tarih aralığındaki her gün için durum sayıları ve sadece
+    istenen gün penceresindeki görevler. Takvimi doldurmak için kullanıcının
+    tüm görev geçmişini indirmek gerekmez.
+    ?user_id=5&date_from=2025-01-01&date_to=2025-12-31&window_from=2025-06-09&window_to=2025-06-15
+    
+    Kapsam (/tasks/search ile aynı):
+    - hasta_yakini: Kendi oluşturduğu görevler (caregiver_id ile daraltılabilir)
+    - hasta_bakici: Kendisine atanmış görevler
+    
+    Query parametreleri:
+    - date_from, date_to: Sayımların aralığı (iki gün de dahil, en fazla 731 gün)
+    - window_from, window_to: Görevleri dönecek gün penceresi (dahil, en fazla
+      42 gün; opsiyonel). Sadece window_from verilirse tek gün döner
+    - fields, expand: Penceredeki görevlerin alanları ve ilişkileri (fieldsets.py)
+    
+    Response: days (sadece görevi olan günler, {day, total, by_status}) ve tasks
+    """
+    if date_to < date_from or (date_to - date_from).days >= CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"date_to, date_from'dan önce olamaz ve aralık en fazla {CALENDAR_MAX_DAYS} gün olabilir.",
+        )
+    if window_to is not None and window_from is None:
+        window_from = window_to
+    if window_from is not None:
+        window_to = window_to or window_from
+        if window_to < window_from or (window_to - window_from).days >= CALENDAR_MAX_WINDOW_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"window_to, window_from'dan önce olamaz ve pencere en fazla {CALENDAR_MAX_WINDOW_DAYS} gün olabilir.",
+            )
+
+    user = crud.get_user(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Kullanıcı bulunamadı.",
+        )
+
+    if user.role == "hasta_yakini":
+        scope = {"created_by_id": user.id, "assigned_to_id": caregiver_id}
+    else:
+        scope = {"created_by_id": None, "assigned_to_id": user.id}
+
+    def day_start(d: date) -> datetime:
+        return datetime.combine(d, datetime.min.time())
+
+    counts = crud.count_tasks_by_day(
+        db, day_start(date_from), day_start(date_to + timedelta(days=1)), **scope
+    )
+    days = [
+        {"day": day, "total": sum(by_status.values()), "by_status": by_status}
+        for day, by_status in sorted(counts.items())
+    ]
+
+    tasks = []
+    if window_from is not None:
+        tasks = selection.serialize_all(crud.list_tasks_in_range(
+            db, day_start(window_from), day_start(window_to + timedelta(days=1)),
+            options=selection.options(), **scope
+        ))
+
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "days": days,
+        "window_from": window_from,
+        "window_to": window_to,
+        "tasks": tasks,
+    }
+
+
+# ===================================================================
+# İYİMSER EŞZAMANLILIK (görev sürümleri, task_versions.py)
+# ===================================================================
+
+def _expected_version(request: Request, version: Optional[int]) -> Optional[int]:
+    """İstemcinin gördüğü sürüm: gövdedeki/query'deki version, yoksa If-Match."""
+    return version if version is not None else if_match_version(request)
+
+
+@router.get("/instances/{task_id}", response_model=schemas.TaskInstanceRead)
+def get_task_instance(task_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Tek bir görevi getirir.
+    
+    Koşullu GET: ETag görevin sürümüdür. İstemci bunu If-None-Match ile geri
+    gönderirse ve görev değişmediyse gövdesiz 304 döner. Aynı değer
+    güncellemelerde If-Match ile gönderilebilir.
+    """
+    task = crud.get_task_instance(db, task_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Görev bulunamadı.",
+        )
+    cached = not_modified(request, response, version_etag(task.version))
+    if cached is not None:
+        return cached
+    return task
 
 
 @router.put("/instances/{task_id}", response_model=schemas.TaskInstanceRead)
 def update_task_instance_time(
     task_id: int,
     payload: schemas.TaskInstanceUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """
@@ -308,6 +630,8 @@ def update_task_instance_time(
     
     Request body:
     - scheduled_for: Yeni tarih/saat (ISO format)
+    - version: İstemcinin gördüğü görev sürümü (opsiyonel, If-Match de olur);
+      görev o arada değiştiyse 409 ve görevin güncel hali döner
     
     İşlem adımları:
     1. Görev var mı kontrol et
@@ -331,7 +655,22 @@ def update_task_instance_time(
             detail="Görevin oluşturucusu bulunamadı.",
         )
 
-    updated_task = crud.update_task_instance_time(db, task, payload.scheduled_for)
+    check_version(task, _expected_version(request, payload.version))
+
+    # Bildirim: Hasta bakıcıya -> görev zamanı değişti (güncellemeyle aynı commit'te)
+    message = f"Bir görevin zamanı güncellendi. Yeni tarih/saat: {payload.scheduled_for.isoformat()}"
+    crud.enqueue_notification(
+        db,
+        user_id=task.assigned_to_id,
+        message=message,
+        event_type="task_rescheduled",
+        entity_type="TaskInstance",
+        entity_id=task.id,
+    )
+
+    with compare_and_swap(db, task_id):
+        updated_task = crud.update_task_instance_time(db, task, payload.scheduled_for)
+    response.headers["ETag"] = version_etag(updated_task.version)
 
     # Activity Log
     crud.log_activity(
@@ -343,10 +682,6 @@ def update_task_instance_time(
         details=f"scheduled_for={updated_task.scheduled_for}",
     )
 
-    # Bildirim: Hasta bakıcıya -> görev zamanı değişti
-    message = f"Bir görevin zamanı güncellendi. Yeni tarih/saat: {updated_task.scheduled_for.isoformat()}"
-    crud.create_notification(db, user_id=task.assigned_to_id, message=message)
-
     return updated_task
 
 
@@ -405,6 +740,16 @@ def delete_task_instance(
             detail="Bu görev bu kullanıcı tarafından oluşturulmamış.",
         )
 
+    # Bildirim: Hasta bakıcıya -> görev silindi (silmeyle aynı commit'te)
+    crud.enqueue_notification(
+        db,
+        user_id=task.assigned_to_id,
+        message="Size atanmış bir görev silindi.",
+        event_type="task_deleted",
+        entity_type="TaskInstance",
+        entity_id=task_id,
+    )
+
     crud.delete_task_instance(db, task)
 
     # Activity Log
@@ -417,10 +762,6 @@ def delete_task_instance(
         details=None,
     )
 
-    # Bildirim: Hasta bakıcıya -> görev silindi
-    message = "Size atanmış bir görev silindi."
-    crud.create_notification(db, user_id=task.assigned_to_id, message=message)
-
     return {"detail": "Görev silindi."}
 
 
@@ -431,6 +772,8 @@ def delete_task_instance(
 @router.patch("/instances/status", response_model=schemas.TaskInstanceRead)
 def update_task_status(
     payload: schemas.TaskStatusUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """
@@ -449,6 +792,8 @@ def update_task_status(
     - user_id: Güncelleme yapan kullanıcı (hasta_bakici olmalı)
     - status: Yeni durum (pending/in_progress/done/problem/cancelled)
     - problem_message: Sorun açıklaması (sadece status="problem" ise)
+    - version: İstemcinin gördüğü görev sürümü (opsiyonel, If-Match de olur);
+      görev o arada değiştiyse 409 ve görevin güncel hali döner
     
     İşlem adımları:
     1. Kullanıcı hasta_bakici mi kontrol et
@@ -486,24 +831,7 @@ def update_task_status(
             detail="Bu görev bu kullanıcıya atanmış değil.",
         )
 
-    updated = crud.update_task_status(
-        db,
-        task,
-        payload.status,
-        problem_message=payload.problem_message,
-        problem_severity=payload.problem_severity,
-        resolution_note=payload.resolution_note,
-    )
-
-    # Activity Log
-    crud.log_activity(
-        db,
-        user_id=user.id,
-        action="UPDATE_TASK_STATUS",
-        entity_type="TaskInstance",
-        entity_id=task.id,
-        details=f"status={payload.status}, problem_message={payload.problem_message}",
-    )
+    check_version(task, _expected_version(request, payload.version))
 
     # Bildirim: Hasta yakınına görev durumu değişikliğini bildir
     owner_id = task.created_by_id
@@ -519,11 +847,140 @@ def update_task_status(
         # Diğer durum değişiklikleri (in_progress, cancelled, vb.)
         msg = f"Bir görevin durumu güncellendi: {payload.status}"
 
-    crud.create_notification(db, user_id=owner_id, message=msg)
+    # Olay durum güncellemesiyle aynı commit'te yazılır; kritik sorunlar
+    # worker tarafından diğer bildirimlerden önce teslim edilir
+    crud.enqueue_notification(
+        db,
+        user_id=owner_id,
+        message=msg,
+        event_type="task_problem" if payload.status == "problem" else "task_status",
+        entity_type="TaskInstance",
+        entity_id=task.id,
+        severity=payload.problem_severity if payload.status == "problem" else None,
+    )
+
+    with compare_and_swap(db, task.id):
+        updated = crud.update_task_status(
+            db,
+            task,
+            payload.status,
+            problem_message=payload.problem_message,
+            problem_severity=payload.problem_severity,
+            resolution_note=payload.resolution_note,
+        )
+    response.headers["ETag"] = version_etag(updated.version)
+
+    # Activity Log
+    crud.log_activity(
+        db,
+        user_id=user.id,
+        action="UPDATE_TASK_STATUS",
+        entity_type="TaskInstance",
+        entity_id=task.id,
+        details=f"status={payload.status}, problem_message={payload.problem_message}",
+    )
 
     return updated
 
 
+# Tek istekte güncellenebilecek en fazla görev
+MAX_BULK_STATUS_ITEMS = 50
+
+
+@router.patch("/instances/status/bulk", response_model=List[schemas.TaskInstanceRead])
+def update_task_statuses(
+    payload: schemas.TaskStatusBulkUpdate,
+    db: Session = Depends(get_db),
+):
+    """
+    Bakıcının birden fazla görevinin durumunu tek istekte günceller
+    (ör. sabah turunda tamamlanan 5-6 görev).
+    
+    Tek tek PATCH /tasks/instances/status yerine:
+    - Kullanıcı bir kez, tüm görevler tek sorguyla yüklenip kontrol edilir
+    - Tüm değişiklikler tek transaction'da uygulanır (ya hepsi ya hiçbiri)
+    - Aktivite kayıtları toplu yazılır
+    - Her hasta yakınına tek özet bildirim gider
+    
+    Request body:
+    - user_id: Güncelleme yapan kullanıcı (hasta_bakici olmalı)
+    - items: [{task_id, status, problem_message, problem_severity,
+      resolution_note, version}, ...] (en fazla MAX_BULK_STATUS_ITEMS)
+    
+    Hatalar:
+    - 404: Kullanıcı veya görevlerden biri bulunamadı
+    - 403: Görevlerden biri bu bakıcıya atanmış değil
+    - 409: Görevlerden biri istemcinin gördüğü sürümden sonra değişmiş
+      (detail.current: çakışan görevlerin güncel hali)
+    """
+    if not payload.items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="En az bir görev gönderilmelidir.",
+        )
+    if len(payload.items) > MAX_BULK_STATUS_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek istekte en fazla {MAX_BULK_STATUS_ITEMS} görev güncellenebilir.",
+        )
+    task_ids = [item.task_id for item in payload.items]
+    if len(set(task_ids)) != len(task_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Aynı görev birden fazla kez gönderilmiş.",
+        )
+
+    user = crud.get_user(db, payload.user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Kullanıcı bulunamadı.",
+        )
+
+    if user.role != "hasta_bakici":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sadece hasta bakıcı görev durumunu güncelleyebilir.",
+        )
+
+    tasks = {task.id: task for task in crud.get_task_instances(db, task_ids)}
+    missing = [task_id for task_id in task_ids if task_id not in tasks]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Görev bulunamadı: {', '.join(map(str, missing))}",
+        )
+
+    foreign = [task_id for task_id in task_ids if tasks[task_id].assigned_to_id != user.id]
+    if foreign:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Bu görevler bu kullanıcıya atanmış değil: {', '.join(map(str, foreign))}",
+        )
+
+    stale = [
+        tasks[item.task_id] for item in payload.items
+        if item.version is not None and item.version != tasks[item.task_id].version
+    ]
+    if not stale:
+        try:
+            return crud.update_task_statuses(
+                db, user, [(tasks[item.task_id], item) for item in payload.items]
+            )
+        except StaleDataError:
+            # Kontrolden sonra başka bir istek görevlerden birini değiştirdi
+            db.rollback()
+            stale = crud.get_task_instances(db, task_ids)
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "Bazı görevler siz görüntüledikten sonra değiştirildi. Güncel halleri ile tekrar deneyin.",
+            "current": jsonable_encoder([schemas.TaskInstanceRead.model_validate(task) for task in stale]),
+        },
+    )
+
+
 # ===================================================================
 # GÖREV DEĞERLENDİRME (Sadece hasta_yakini)
 # ===================================================================
@@ -533,7 +990,10 @@ def rate_task(
     task_id: int,
     current_user_id: int,
     rating: int,
+    request: Request,
+    response: Response,
     review_note: Optional[str] = None,
+    version: Optional[int] = None,
     db: Session = Depends(get_db),
 ):
     """
@@ -546,6 +1006,8 @@ def rate_task(
     - current_user_id: Değerlendirme yapan kullanıcı (hasta_yakini)
     - rating: Puan (1-5 arası)
     - review_note: Değerlendirme notu (opsiyonel)
+    - version: İstemcinin gördüğü görev sürümü (opsiyonel, If-Match de olur);
+      görev o arada değiştiyse 409 ve görevin güncel hali döner
     """
     user = crud.get_user(db, current_user_id)
     if not user:
@@ -573,6 +1035,8 @@ def rate_task(
             detail="Bu görev bu kullanıcı tarafından oluşturulmamış.",
         )
 
+    check_version(task, _expected_version(request, version))
+
     if task.status != "done":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -587,12 +1051,21 @@ def rate_task(
 
     task.rating = rating
     task.review_note = review_note
-    db.commit()
-    db.refresh(task)
 
-    # Bakıcıya bildirim gönder
+    # Bakıcıya bildirim gönder (değerlendirmeyle aynı commit'te)
     msg = f"Tamamladığınız görev değerlendirildi: {rating}/5 yıldız"
-    crud.create_notification(db, user_id=task.assigned_to_id, message=msg)
+    crud.enqueue_notification(
+        db,
+        user_id=task.assigned_to_id,
+        message=msg,
+        event_type="task_rated",
+        entity_type="TaskInstance",
+        entity_id=task.id,
+    )
+    with compare_and_swap(db, task_id):
+        db.commit()
+    db.refresh(task)
+    response.headers["ETag"] = version_etag(task.version)
 
     return task
 
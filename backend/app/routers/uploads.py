@@ -2,27 +2,27 @@
 # DOSYA YÜKLEME ROUTER'I (uploads.py)
 # ===================================================================
 # Görev fotoğrafı ve diğer dosya yükleme işlemleri.
+# Dosyalar storage.py'deki aktif backend'e (yerel disk veya S3) yazılır.
 # ===================================================================
 
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 from sqlalchemy.orm import Session
+import mimetypes
 import os
-import shutil
 
 from .. import crud, models
 from ..database import get_db
+from ..metrics import observe_upload
+from ..storage import IMAGE_EXTENSIONS, PARTIAL_SUFFIX, get_storage, is_safe_key, key_to_url, url_to_key
+from ..task_versions import compare_and_swap
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "..", "uploads")
-TASK_PHOTOS_DIR = os.path.join(UPLOAD_DIR, "task_photos")
-os.makedirs(TASK_PHOTOS_DIR, exist_ok=True)
-
 
 @router.post("/task-photo/{task_id}")
-async def upload_task_photo(
+def upload_task_photo(
     task_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
@@ -36,28 +36,32 @@ async def upload_task_photo(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Görev bulunamadı."
         )
-    
+
     # Dosya uzantısını kontrol et
     file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
+    if file_ext not in IMAGE_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Desteklenmeyen dosya formatı. Sadece jpg, jpeg, png, gif, webp kabul edilir."
         )
-    
+
     # Dosya adı oluştur
     file_name = f"task_{task_id}_{datetime.utcnow().timestamp()}{file_ext}"
-    file_path = os.path.join(TASK_PHOTOS_DIR, file_name)
-    
-    # Dosyayı kaydet
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # URL'i veritabanına kaydet
-    photo_url = f"/uploads/task_photos/{file_name}"
+    key = f"task_photos/{file_name}"
+
+    # Dosyayı kaydet (parça parça, tamamı belleğe alınmadan)
+    observe_upload("task_photo", get_storage().save(key, file.file))
+
+    # URL'i veritabanına kaydet (görev arada değiştiyse 409, dosya silinir)
+    photo_url = key_to_url(key)
     task.completion_photo_url = photo_url
-    db.commit()
-    
+    try:
+        with compare_and_swap(db, task_id):
+            db.commit()
+    except HTTPException:
+        get_storage().delete(key)
+        raise
+
     return {"message": "Fotoğraf yüklendi", "photo_url": photo_url}
 
 
@@ -72,36 +76,70 @@ def delete_task_photo(task_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Görev bulunamadı."
         )
-    
+
     if not task.completion_photo_url:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Görevde fotoğraf bulunmuyor."
         )
-    
-    # Dosyayı sil
-    file_name = task.completion_photo_url.split('/')[-1]
-    file_path = os.path.join(TASK_PHOTOS_DIR, file_name)
-    if os.path.exists(file_path):
-        os.remove(file_path)
-    
-    # URL'i kaldır
+
+    # Önce URL'i kaldır (görev arada değiştiyse 409), sonra dosyayı sil
+    key = url_to_key(task.completion_photo_url)
     task.completion_photo_url = None
-    db.commit()
-    
+    with compare_and_swap(db, task_id):
+        db.commit()
+    if is_safe_key(key):
+        get_storage().delete(key)
+
     return {"message": "Fotoğraf silindi"}
 
 
-@router.get("/task_photos/{file_name}")
-async def get_task_photo(file_name: str):
+def serve_file(key: str):
     """
-    Görev fotoğrafını döndürür.
+    Depolanan dosyayı döndürür.
+    - Yerel backend: Dosya diskten doğrudan sunulur
+    - S3 backend: İstemci süreli imzalı URL'e yönlendirilir (307),
+      böylece dosya byte'ları API sunucusundan geçmez
+    Yazılmakta olan dosyalar (PARTIAL_SUFFIX, storage.py) sunulmaz.
     """
-    file_path = os.path.join(TASK_PHOTOS_DIR, file_name)
-    if not os.path.exists(file_path):
+    if not is_safe_key(key) or key.endswith(PARTIAL_SUFFIX):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Dosya bulunamadı."
         )
-    
-    return FileResponse(file_path)
+
+    storage = get_storage()
+    presigned = storage.presigned_url(key)
+    if presigned:
+        return RedirectResponse(presigned, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    if not storage.exists(key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dosya bulunamadı."
+        )
+
+    if hasattr(storage, "path"):
+        return FileResponse(storage.path(key))
+
+    media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    return StreamingResponse(storage.open_stream(key), media_type=media_type)
+
+
+@router.get("/task_photos/{file_name}")
+async def get_task_photo(file_name: str):
+    """
+    Görev fotoğrafını döndürür.
+    """
+    return serve_file(f"task_photos/{file_name}")
+
+
+# Önemli: Genel dosya yolu en sonda tanımlanmalı,
+# aksi halde yukarıdaki sabit path'leri gölgeler
+@router.get("/{key:path}")
+def get_uploaded_file(key: str):
+    """
+    Veritabanında /uploads/<key> olarak saklanan herhangi bir dosyayı döndürür
+    (görev fotoğrafları, mesaj ekleri).
+    """
+    return serve_file(key)
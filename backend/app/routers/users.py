@@ -2,15 +2,19 @@
 # KULLANICI ROUTER'I (users.py)
 # ===================================================================
 # Kullanıcı bilgilerini sorgulama endpoint'lerini içerir.
-# Endpoint'ler: /users/caregivers, /users/{user_id}
+# Endpoint'ler: /users?ids=..., /users/caregivers, /users/{user_id},
+# /users/{user_id}/badges, /users/{user_id}/caregivers/{caregiver_id}
 # ===================================================================
 
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from .. import crud, schemas
+from ..etags import make_etag, not_modified
+from ..sharding import colocate_or_409, directory_entry, sharding_enabled
 
 # Router tanımlaması - Tüm endpoint'ler /users prefix'i ile başlar
 router = APIRouter(prefix="/users", tags=["users"])
@@ -19,6 +23,39 @@ router = APIRouter(prefix="/users", tags=["users"])
 # Önemli: Sabit path'ler ("/caregivers") dinamik path'lerden ("{user_id}") ÖNCE tanımlanmalı
 # Aksi halde FastAPI "caregivers" kelimesini user_id olarak algılar
 
+# Tek istekte sorgulanabilecek en fazla kullanıcı
+MAX_USER_IDS = 200
+
+
+@router.get("", response_model=List[schemas.UserRead])
+def get_users(ids: str = Query(..., description="Virgülle ayrılmış kullanıcı id'leri (ör. 1,2,3)"), db: Session = Depends(get_db)):
+    """
+    Birden fazla kullanıcının bilgilerini tek istekte getirir (tek IN sorgusu).
+    
+    Kullanım senaryosu:
+    - Görev/mesaj listesindeki tüm isimleri /users/{user_id} ile tek tek
+      sormak yerine bir seferde almak
+    
+    Query parametresi:
+    - ids: Kullanıcı id'leri (?ids=1,2,3; en fazla 200)
+    
+    Response: Kullanıcılar istenen sırada; bulunamayan id'ler listede yer almaz
+    """
+    try:
+        user_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids virgülle ayrılmış sayılardan oluşmalıdır.",
+        )
+    if len(user_ids) > MAX_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek istekte en fazla {MAX_USER_IDS} kullanıcı sorgulanabilir.",
+        )
+    return crud.get_users(db, user_ids)
+
+
 @router.get("/caregivers", response_model=List[schemas.UserRead])
 def list_caregivers(db: Session = Depends(get_db)):
     """
@@ -69,3 +106,71 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
             detail="Kullanıcı bulunamadı.",
         )
     return user
+
+
+@router.get("/{user_id}/badges", response_model=schemas.UserBadges)
+def get_badges(user_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Ana sayfa rozetleri: okunmamış mesaj ve bildirim sayıları, bugünün
+    bekleyen görevleri ve açık sorunlar. Tüm sayaçlar tek sorguda, indekslerden
+    hesaplanır; birkaç saniyede bir sorgulanabilir.
+    
+    Koşullu GET: Yanıt ETag header'ı içerir. İstemci bunu If-None-Match ile
+    geri gönderirse ve sayaçlar değişmediyse gövdesiz 304 döner.
+    
+    Hata: Kullanıcı bulunamazsa 404 NOT FOUND
+    """
+    user = crud.get_user(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Kullanıcı bulunamadı.",
+        )
+
+    today = datetime.utcnow().date()
+    badges = crud.get_badge_counts(db, user, today)
+    # "Bugün" değişince sayaçlar aynı kalsa da ETag değişir
+    cached = not_modified(request, response, make_etag({"day": today, **badges}))
+    if cached is not None:
+        return cached
+    return badges
+
+
+@router.put("/{user_id}/caregivers/{caregiver_id}")
+def assign_caregiver(user_id: int, caregiver_id: int, db: Session = Depends(get_db)):
+    """
+    Bakıcıyı hasta yakınının hanesine ekler (ilk görev atamasından önce).
+
+    Sharding açıksa (SHARD_COUNT > 0) bir bakıcı tek bir haneye ait olur;
+    görevleri ve mesajları o hanenin shard'ındadır. Başka bir hanede
+    görevi veya mesajı olan bakıcı bu adımda 409 ile reddedilir; görev
+    oluştururken veya mesaj gönderirken değil. Sharding kapalıysa sadece
+    roller kontrol edilir.
+
+    Response: {"message", "household_id", "shard"}
+    Hata: Kullanıcılardan biri yoksa 404, roller uygun değilse 400,
+    bakıcı başka bir haneye bağlıysa 409
+    """
+    relative = crud.get_user(db, user_id)
+    caregiver = crud.get_user(db, caregiver_id)
+    if not relative or not caregiver:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Kullanıcı bulunamadı.",
+        )
+    if relative.role != "hasta_yakini" or caregiver.role != "hasta_bakici":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Sadece bir bakıcı, bir hasta yakınının hanesine eklenebilir.",
+        )
+
+    if not sharding_enabled():
+        return {"message": "Bakıcı haneye eklendi", "household_id": None, "shard": 0}
+
+    colocate_or_409(user_id, caregiver_id)
+    entry = directory_entry(user_id, fresh=True)
+    return {
+        "message": "Bakıcı haneye eklendi",
+        "household_id": entry[1] if entry else None,
+        "shard": entry[0] if entry else 0,
+    }
@@ -5,8 +5,8 @@
 # Pydantic, gelen ve giden verilerin formatını doğrular.
 # ===================================================================
 
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Optional
 
 from pydantic import BaseModel, EmailStr
 
@@ -45,6 +45,14 @@ class UserRead(UserBase):
         from_attributes = True  # SQLAlchemy modellerinden otomatik dönüşüm
 
 
+class UserBadges(BaseModel):
+    """Ana sayfa rozet sayaçları (GET /users/{user_id}/badges)."""
+    unread_messages: int
+    unread_notifications: int
+    tasks_today: int  # Bugün planlanmış, bekleyen/devam eden görevler
+    open_problems: int  # Durumu "problem" olan görevler
+
+
 # ===================================================================
 # GÖREV ŞABLONU ŞEMALARI
 # ===================================================================
@@ -109,11 +117,110 @@ class TaskInstanceRead(BaseModel):
     updated_at: datetime
     created_by_id: int
     assigned_to_id: int
+    version: int               # Güncellemelerde If-Match/version ile geri gönderilir
+
+    class Config:
+        from_attributes = True
+
+
+class UserSummary(BaseModel):
+    """Görev kartlarında gösterilen kullanıcı bilgisi (expand=assigned_to,created_by)."""
+    id: int
+    full_name: str
+    role: str
 
     class Config:
         from_attributes = True
 
 
+class TaskInstanceView(BaseModel):
+    """
+    Görev listelerinin yanıtı (fieldsets.py): Sadece fields= ile istenen
+    alanlar ve expand= ile istenen ilişkiler döner. İkisi de verilmezse
+    TaskInstanceRead ile aynı alanlar döner.
+    """
+    id: int
+    template_id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    scheduled_for: Optional[datetime] = None
+    problem_message: Optional[str] = None
+    problem_severity: Optional[str] = None
+    resolution_note: Optional[str] = None
+    completion_photo_url: Optional[str] = None
+    rating: Optional[int] = None
+    review_note: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    created_by_id: Optional[int] = None
+    assigned_to_id: Optional[int] = None
+    version: Optional[int] = None
+    assigned_to: Optional[UserSummary] = None
+    created_by: Optional[UserSummary] = None
+    template: Optional[TaskTemplateRead] = None
+
+
+class TaskImportRow(BaseModel):
+    """
+    Toplu görev içe aktarmada tek satır (CSV sütunları ile aynı isimler).
+    """
+    template_id: int
+    assigned_to_id: int     # hasta bakıcı id'si
+    scheduled_for: datetime # YYYY-MM-DDTHH:MM:SS (ISO format)
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+
+class TaskImportRequest(BaseModel):
+    created_by_id: int  # İçe aktarmayı yapan hasta yakını
+    rows: list[dict]  # Satırlar tek tek doğrulanır, hatalı satırlar raporlanır
+    atomic: bool = False  # True ise tek bir hatalı satırda hiçbir görev eklenmez
+
+
+class TaskImportError(BaseModel):
+    row: int  # Satır numarası (1'den başlar, CSV'de başlık satırı hariç)
+    error: str
+
+
+class TaskImportResult(BaseModel):
+    created: int
+    task_ids: list[int]
+    errors: list[TaskImportError]
+
+
+class TaskSearchHit(BaseModel):
+    task: TaskInstanceRead
+    snippet: Optional[str] = None  # Eşleşen kelimeler [ ] içinde (metin araması yapıldıysa)
+    rank: float = 0  # bm25 skoru (küçük = daha alakalı)
+
+
+class TaskSearchResult(BaseModel):
+    items: list[TaskSearchHit]
+    limit: int
+    offset: int
+    has_more: bool  # Sonraki sayfa var mı?
+
+
+class TaskCalendarDay(BaseModel):
+    day: date
+    total: int
+    by_status: dict[str, int]  # {"pending": 2, "done": 1, ...}
+
+
+class TaskCalendar(BaseModel):
+    """
+    Takvim görünümü: Aralıktaki her gün için durum sayıları (görevi olmayan
+    günler listelenmez) ve sadece istenen gün penceresindeki görevler.
+    """
+    date_from: date
+    date_to: date
+    days: list[TaskCalendarDay]
+    window_from: Optional[date] = None
+    window_to: Optional[date] = None
+    tasks: list[TaskInstanceView]
+
+
 class TaskInstanceUpdate(BaseModel):
     """
     Hasta yakınının görev üzerinde yapacağı güncellemeler:
@@ -121,6 +228,7 @@ class TaskInstanceUpdate(BaseModel):
     Şimdilik sadece zamanı değiştiriyoruz, istenirse genişletilir.
     """
     scheduled_for: datetime
+    version: Optional[int] = None  # İstemcinin gördüğü sürüm (iyimser eşzamanlılık)
 
 
 class TaskStatusUpdate(BaseModel):
@@ -133,6 +241,26 @@ class TaskStatusUpdate(BaseModel):
     problem_message: Optional[str] = None  # Sorun mesajı (sadece status="problem" ise doldurulur)
     problem_severity: Optional[str] = None  # mild | moderate | critical
     resolution_note: Optional[str] = None   # Çözüm notu
+    version: Optional[int] = None           # İstemcinin gördüğü sürüm; farklıysa 409
+
+
+class TaskStatusBulkItem(BaseModel):
+    """Toplu durum güncellemesinde tek bir görevin değişikliği."""
+    task_id: int
+    status: str
+    problem_message: Optional[str] = None
+    problem_severity: Optional[str] = None
+    resolution_note: Optional[str] = None
+    version: Optional[int] = None
+
+
+class TaskStatusBulkUpdate(BaseModel):
+    """
+    Hasta bakıcının birden fazla görevinin durumunu tek istekte günceller
+    (PATCH /tasks/instances/status/bulk). Ya hepsi uygulanır ya hiçbiri.
+    """
+    user_id: int               # güncelleme yapan kullanıcı (hasta bakıcı)
+    items: list[TaskStatusBulkItem]
 
 
 # ===================================================================
@@ -214,6 +342,23 @@ class MessageRead(BaseModel):
         from_attributes = True
 
 
+class MessageSearchHit(BaseModel):
+    message_id: int
+    sender_id: int
+    receiver_id: int
+    other_user_id: int  # Konuşmanın karşı tarafı
+    sent_at: datetime
+    snippet: Optional[str] = None  # Eşleşen kelimeler [ ] içinde
+    rank: float  # bm25 skoru (küçük = daha alakalı)
+
+
+class MessageSearchResult(BaseModel):
+    items: list[MessageSearchHit]
+    limit: int
+    offset: int
+    has_more: bool  # Sonraki sayfa var mı?
+
+
 class ConversationPreview(BaseModel):
     other_user_id: int
     other_user_name: str
@@ -221,3 +366,65 @@ class ConversationPreview(BaseModel):
     last_message: Optional[str] = None
     last_message_time: Optional[datetime] = None
     unread_count: int = 0
+
+
+# ===================================================================
+# DEVAM ETTİRİLEBİLİR YÜKLEME ŞEMALARI
+# ===================================================================
+
+class UploadSessionCreate(BaseModel):
+    """
+    Parça parça yükleme oturumu başlatmak için kullanılır.
+    """
+    user_id: int  # Yüklemeyi yapan kullanıcı
+    purpose: str  # "message_attachment" | "task_photo"
+    target_id: int  # Mesaj ID'si veya görev ID'si
+    file_name: str  # Orijinal dosya adı
+    total_size: int  # Toplam dosya boyutu (byte)
+
+
+class UploadSessionRead(BaseModel):
+    """
+    Yükleme oturumunun güncel durumu.
+    İstemci bağlantı koptuğunda offset değerinden devam eder.
+    """
+    id: str
+    user_id: int
+    purpose: str
+    target_id: int
+    file_name: str
+    total_size: int
+    offset: int
+    created_at: datetime
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ===================================================================
+# TOPLU İSTEK (BATCH) ŞEMALARI
+# ===================================================================
+
+class BatchItem(BaseModel):
+    """
+    POST /batch içindeki tek bir okuma isteği.
+    Örnek: {"id": "tasks", "path": "/tasks/created/5?fields=title,status"}
+    """
+    id: Optional[str] = None  # İstemcinin yanıtı eşleştirmek için verdiği isim
+    method: str = "GET"  # Sadece GET desteklenir
+    path: str  # Query string dahil yol
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchItem]
+
+
+class BatchItemResult(BaseModel):
+    id: Optional[str] = None
+    status: int  # Alt isteğin HTTP durum kodu
+    body: Any = None  # JSON yanıt (JSON değilse metin)
+
+
+class BatchResponse(BaseModel):
+    responses: list[BatchItemResult]
@@ -0,0 +1,395 @@
+# ===================================================================
+# TAM METİN ARAMA (search.py)
+# ===================================================================
+# SQLite FTS5 sanal tabloları ile tam metin arama.
+#
+# Her indeks, kaynak tablodaki trigger'lar ile güncel tutulan bir
+# "external content" FTS5 tablosudur (metin ikinci kez saklanmaz).
+#
+# message_fts: message.content için indeks. message tablosuna
+# (message_fts_source view'ı üzerinden) rowid (= message.id) ile bağlıdır.
+# - Yeni mesaj eklendiğinde indekslenir
+# - Mesaj düzenlendiğinde eski metin çıkarılıp yenisi eklenir
+# - Mesaj soft delete edildiğinde (is_deleted=1) indeksten çıkarılır
+#
+# task_instance_fts: Görev başlığı, açıklaması, sorun mesajı, çözüm ve
+# değerlendirme notları. task_template_fts: Şablon başlığı ve açıklaması.
+# Şablonu eşleşen görevler de görev aramasında bulunur.
+#
+# SQLite derlemesinde FTS5 yoksa arama LIKE sorgusuna geri düşer.
+# PostgreSQL'de FTS5 olmadığı için arama her zaman ILIKE ile yapılır.
+# ===================================================================
+
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+# Trigger koşulu: Sadece silinmemiş ve içeriği olan mesajlar indekslenir
+_MESSAGE_INDEXED_OLD = "COALESCE(old.is_deleted, 0) = 0 AND old.content IS NOT NULL"
+_MESSAGE_INDEXED_NEW = "COALESCE(new.is_deleted, 0) = 0 AND new.content IS NOT NULL"
+
+# Konuşma tarafları "u<id>" token'ları olarak ayrı bir sütunda indekslenir.
+# Böylece "sadece kullanıcının konuşmaları" filtresi FTS içinde, kelime
+# eşleşmeleriyle kesişim olarak yapılır; yaygın bir kelime için bile tüm
+# eşleşmeleri message tablosuyla join'lemek gerekmez.
+_PARTICIPANTS = "'u' || {row}.sender_id || ' u' || {row}.receiver_id"
+
+MESSAGE_FTS_DDL = [
+    # FTS5 "external content" kaynağı: metin message tablosundan okunur.
+    # View, indeksle birebir aynı satırları (silinmemiş, içeriği olan) içerir.
+    f"""
+    CREATE VIEW IF NOT EXISTS message_fts_source AS
+    SELECT id, content, {_PARTICIPANTS.format(row="message")} AS participants
+    FROM message
+    WHERE COALESCE(is_deleted, 0) = 0 AND content IS NOT NULL
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5(
+        content,
+        participants,
+        content='message_fts_source',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS message_fts_ai AFTER INSERT ON message
+    WHEN {_MESSAGE_INDEXED_NEW}
+    BEGIN
+        INSERT INTO message_fts(rowid, content, participants)
+        VALUES (new.id, new.content, {_PARTICIPANTS.format(row="new")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS message_fts_ad AFTER DELETE ON message
+    WHEN {_MESSAGE_INDEXED_OLD}
+    BEGIN
+        INSERT INTO message_fts(message_fts, rowid, content, participants)
+        VALUES ('delete', old.id, old.content, {_PARTICIPANTS.format(row="old")});
+    END
+    """,
+    # Düzenleme ve soft delete: önce eski hali çıkar, sonra (hala geçerliyse) yenisini ekle.
+    # İki adım tek trigger'da olmalı; ayrı trigger'ların çalışma sırası garanti değildir.
+    f"""
+    CREATE TRIGGER IF NOT EXISTS message_fts_au AFTER UPDATE OF content, is_deleted ON message
+    BEGIN
+        INSERT INTO message_fts(message_fts, rowid, content, participants)
+        SELECT 'delete', old.id, old.content, {_PARTICIPANTS.format(row="old")}
+        WHERE {_MESSAGE_INDEXED_OLD};
+        INSERT INTO message_fts(rowid, content, participants)
+        SELECT new.id, new.content, {_PARTICIPANTS.format(row="new")}
+        WHERE {_MESSAGE_INDEXED_NEW};
+    END
+    """,
+]
+
+TASK_INSTANCE_FTS_COLUMNS = ("title", "description", "problem_message", "resolution_note", "review_note")
+TASK_TEMPLATE_FTS_COLUMNS = ("title", "description")
+
+
+def _external_content_ddl(fts_table: str, source_table: str, columns: Sequence[str]) -> List[str]:
+    """
+    Soft delete'i olmayan bir tablo için external content FTS5 tablosu ve
+    ekleme/güncelleme/silme trigger'larını üretir.
+    """
+    cols = ", ".join(columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            {cols},
+            content='{source_table}',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {source_table}
+        BEGIN
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {source_table}
+        BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {cols} ON {source_table}
+        BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_values});
+        END
+        """,
+    ]
+
+
+TASK_FTS_DDL = (
+    _external_content_ddl("task_instance_fts", "task_instance", TASK_INSTANCE_FTS_COLUMNS)
+    + _external_content_ddl("task_template_fts", "task_template", TASK_TEMPLATE_FTS_COLUMNS)
+)
+
+
+def fts5_available(conn: Connection) -> bool:
+    """SQLite derlemesinde FTS5 modülü var mı kontrol eder."""
+    if conn.dialect.name != "sqlite":
+        return False
+    try:
+        rows = conn.execute(text("PRAGMA compile_options")).scalars().all()
+    except Exception:
+        return False
+    return "ENABLE_FTS5" in rows
+
+
+def _table_exists(conn: Connection, name: str) -> bool:
+    if conn.dialect.name != "sqlite":
+        return False
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": name}
+    ).first() is not None
+
+
+def ensure_message_fts(conn: Connection) -> bool:
+    """
+    message_fts tablosunu ve trigger'larını oluşturur (idempotent).
+    Tablo ilk kez oluşturuluyorsa mevcut mesajlar indekse doldurulur.
+    FTS5 kullanılabiliyorsa True döner.
+    """
+    if not fts5_available(conn):
+        return False
+
+    is_new = not _table_exists(conn, "message_fts")
+    for ddl in MESSAGE_FTS_DDL:
+        conn.execute(text(ddl))
+
+    if is_new:
+        conn.execute(text("INSERT INTO message_fts(message_fts) VALUES ('rebuild')"))
+    return True
+
+
+def ensure_task_fts(conn: Connection) -> bool:
+    """
+    task_instance_fts ve task_template_fts tablolarını ve trigger'larını
+    oluşturur (idempotent). Yeni oluşturulan indeksler mevcut kayıtlarla doldurulur.
+    """
+    if not fts5_available(conn):
+        return False
+
+    new_tables = [
+        name for name in ("task_instance_fts", "task_template_fts")
+        if not _table_exists(conn, name)
+    ]
+    for ddl in TASK_FTS_DDL:
+        conn.execute(text(ddl))
+    for name in new_tables:
+        conn.execute(text(f"INSERT INTO {name}({name}) VALUES ('rebuild')"))
+    return True
+
+
+def _like(conn: Connection) -> str:
+    """LIKE yedeği: SQLite'ın LIKE'ı (ASCII) büyük/küçük harf duyarsızdır, PostgreSQL'de ILIKE gerekir."""
+    return "ILIKE" if conn.dialect.name == "postgresql" else "LIKE"
+
+
+def build_match_query(raw: str) -> Optional[str]:
+    """
+    Kullanıcının yazdığı metni güvenli bir FTS5 MATCH ifadesine çevirir.
+    Her kelime tırnak içine alınır (FTS5 operatörleri etkisiz kalır),
+    son kelime önek araması yapar (yazarken arama için: "ins" -> "insülin").
+    """
+    terms = [t.replace('"', '""') for t in raw.split() if t.strip('"')]
+    if not terms:
+        return None
+    parts = [f'"{t}"' for t in terms]
+    parts[-1] += "*"
+    return " ".join(parts)
+
+
+def search_messages(
+    db: Session,
+    user_id: int,
+    query: str,
+    other_user_id: Optional[int] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[dict]:
+    """
+    Kullanıcının dahil olduğu konuşmalardaki mesajlarda arama yapar.
+    Sonuçlar alaka düzeyine (bm25) göre sıralanır, eşleşen kelimeler
+    snippet içinde [ ] ile işaretlenir.
+
+    Sayfalama için limit+1 kayıt döner; çağıran taraf fazlalığı has_more
+    olarak yorumlar.
+    """
+    terms = build_match_query(query)
+    if terms is None:
+        return []
+
+    # Konuşma filtresi FTS içinde uygulanır (participants sütunu)
+    match = f"content : ({terms})"
+    match += f' AND participants : "u{int(user_id)}"'
+    if other_user_id is not None:
+        match += f' AND participants : "u{int(other_user_id)}"'
+
+    params = {
+        "match": match,
+        "user_id": user_id,
+        "other_user_id": other_user_id,
+        "limit": limit + 1,
+        "offset": offset,
+    }
+    conversation_filter = (
+        "(m.sender_id = :user_id OR m.receiver_id = :user_id)"
+        if other_user_id is None else
+        "((m.sender_id = :user_id AND m.receiver_id = :other_user_id) OR "
+        "(m.sender_id = :other_user_id AND m.receiver_id = :user_id))"
+    )
+
+    if _table_exists(db.connection(), "message_fts"):
+        # participants eşleşmesi yaklaşık filtredir; kesin kontrol join'de yapılır
+        sql = f"""
+            SELECT m.id, m.sender_id, m.receiver_id, m.sent_at,
+                   snippet(message_fts, 0, '[', ']', '…', 12) AS snippet,
+                   bm25(message_fts, 1.0, 0.0) AS rank
+            FROM message_fts
+            JOIN message m ON m.id = message_fts.rowid
+            WHERE message_fts MATCH :match
+              AND {conversation_filter}
+              AND m.is_deleted = 0
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        # FTS5 yoksa (veya PostgreSQL): basit LIKE araması (sıralama tarihe göre)
+        params["like"] = f"%{query.strip()}%"
+        params["deleted"] = False
+        sql = f"""
+            SELECT m.id, m.sender_id, m.receiver_id, m.sent_at,
+                   m.content AS snippet, 0 AS rank
+            FROM message m
+            WHERE m.content {_like(db.connection())} :like
+              AND {conversation_filter}
+              AND m.is_deleted = :deleted
+            ORDER BY m.sent_at DESC
+            LIMIT :limit OFFSET :offset
+        """
+
+    rows = db.execute(text(sql), params).mappings().all()
+    return [
+        {
+            "message_id": row["id"],
+            "sender_id": row["sender_id"],
+            "receiver_id": row["receiver_id"],
+            "other_user_id": row["receiver_id"] if row["sender_id"] == user_id else row["sender_id"],
+            "sent_at": row["sent_at"],
+            "snippet": row["snippet"],
+            "rank": row["rank"],
+        }
+        for row in rows
+    ]
+
+
+def search_tasks(
+    db: Session,
+    query: Optional[str] = None,
+    created_by_id: Optional[int] = None,
+    assigned_to_id: Optional[int] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[dict]:
+    """
+    Görevlerde metin + yapısal filtre ile arama yapar.
+
+    - query verilirse görev metinleri ve görevin şablonu FTS5 ile aranır,
+      sonuçlar alaka düzeyine göre sıralanır
+    - query boşsa sadece filtreler uygulanır, sonuçlar tarihe göre sıralanır
+    - created_by_id / assigned_to_id filtreleri (created_by_id, scheduled_for)
+      ve (assigned_to_id, scheduled_for) indekslerini kullanır
+
+    Dönüş: {"task_id", "rank", "snippet"} sözlükleri (limit+1 adet, has_more için)
+    """
+    filters = []
+    params = {"limit": limit + 1, "offset": offset}
+    if created_by_id is not None:
+        filters.append("t.created_by_id = :created_by_id")
+        params["created_by_id"] = created_by_id
+    if assigned_to_id is not None:
+        filters.append("t.assigned_to_id = :assigned_to_id")
+        params["assigned_to_id"] = assigned_to_id
+    if status:
+        filters.append("t.status = :status")
+        params["status"] = status
+    if severity:
+        filters.append("t.problem_severity = :severity")
+        params["severity"] = severity
+    if date_from is not None:
+        filters.append("t.scheduled_for >= :date_from")
+        params["date_from"] = date_from
+    if date_to is not None:
+        filters.append("t.scheduled_for < :date_to")
+        params["date_to"] = date_to
+    where = " AND ".join(filters) if filters else "1 = 1"
+
+    terms = build_match_query(query) if query else None
+    if terms is None:
+        sql = f"""
+            SELECT t.id AS task_id, 0 AS rank, NULL AS snippet
+            FROM task_instance t
+            WHERE {where}
+            ORDER BY t.scheduled_for DESC
+            LIMIT :limit OFFSET :offset
+        """
+    elif _table_exists(db.connection(), "task_instance_fts"):
+        params["match"] = terms
+        # SQLite: MIN() ile birlikte seçilen snippet, en iyi skorlu satırdan gelir
+        sql = f"""
+            SELECT t.id AS task_id, MIN(x.rank) AS rank, x.snippet AS snippet
+            FROM (
+                SELECT rowid AS task_id,
+                       bm25(task_instance_fts) AS rank,
+                       snippet(task_instance_fts, -1, '[', ']', '…', 10) AS snippet
+                FROM task_instance_fts
+                WHERE task_instance_fts MATCH :match
+                UNION ALL
+                SELECT ti.id AS task_id,
+                       bm25(task_template_fts) AS rank,
+                       snippet(task_template_fts, -1, '[', ']', '…', 10) AS snippet
+                FROM task_template_fts
+                JOIN task_instance ti ON ti.template_id = task_template_fts.rowid
+                WHERE task_template_fts MATCH :match
+            ) x
+            JOIN task_instance t ON t.id = x.task_id
+            WHERE {where}
+            GROUP BY t.id
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        # FTS5 yoksa (veya PostgreSQL): görev ve şablon metinlerinde LIKE araması
+        params["like"] = f"%{query.strip()}%"
+        like = _like(db.connection())
+        text_columns = " OR ".join(f"t.{c} {like} :like" for c in TASK_INSTANCE_FTS_COLUMNS)
+        sql = f"""
+            SELECT t.id AS task_id, 0 AS rank, NULL AS snippet
+            FROM task_instance t
+            JOIN task_template tt ON tt.id = t.template_id
+            WHERE {where}
+              AND ({text_columns} OR tt.title {like} :like OR tt.description {like} :like)
+            ORDER BY t.scheduled_for DESC
+            LIMIT :limit OFFSET :offset
+        """
+
+    stmt = text(sql)
+    for name in ("date_from", "date_to"):
+        if name in params:
+            stmt = stmt.bindparams(bindparam(name, type_=DateTime))
+    return [dict(row) for row in db.execute(stmt, params).mappings().all()]
@@ -0,0 +1,863 @@
+# ===================================================================
+# HANE BAZLI SHARDING (sharding.py)
+# ===================================================================
+# SHARD_COUNT > 0 ise her hane (hasta yakını + bakıcıları) kendi shard'ında
+# tutulur; yazmalar shard sayısı kadar veritabanına dağılır:
+#
+# - SQLite: shard k -> SHARD_DIR/shard_k.db (ayrı dosya, ayrı yazma kilidi)
+# - PostgreSQL: Aynı veritabanında shard_k şeması (search_path ile)
+# - Shard 0 ana veritabanıdır: Kullanıcılar, shard dizini (shard_directory)
+#   ve sharding açılmadan önceki haneler burada kalır
+#
+# Yönlendirme: get_db, isteğin kullanıcısını şu sırayla bulur: X-User-Id
+# header'ı, path/query parametreleri (user_id, current_user_id,
+# created_by_id, sender_id), JSON gövdesi. Sadece kayıt ID'si içeren
+# isteklerde (ör. PATCH /notifications/{notification_id}/read) kayıt
+# shard'larda aranır. Kullanıcısı bulunamayan istekler shard 0'a gider.
+#
+# Kimlikler: Shard k yeni kayıtlara k * SHARD_ID_SPAN'den başlayan id'ler
+# verir; id'ler tüm shard'larda benzersizdir, hane taşınırken yeniden
+# numaralandırma gerekmez ve id'den kaydın ilk bakılacak shard'ı bulunur.
+# SQLite shard'larında id'siz INSERT'lere id, taşınan hanelerin id'lerinden
+# bağımsız olarak shard'ın sayacından verilir (_assign_range_ids).
+#
+# Kullanıcılar (app_user) tüm shard'lara aynı id ile kopyalanır (yabancı
+# anahtarlar ve JOIN'ler için); asıl kayıt ana veritabanındadır.
+#
+# Kısıt: Sharding açıkken bir bakıcı tek bir haneye aittir ve mesajlar
+# sadece aynı hanedeki (shard'daki) kullanıcılar arasında gönderilebilir.
+# Birden fazla haneye hizmet veren bakıcılar ve haneler arası mesajlaşma
+# desteklenmez: Bakıcı haneye PUT /users/{user_id}/caregivers/{caregiver_id}
+# ile (veya ilk görev/mesajında) bağlanır; başka hanede verisi varsa bu
+# adımda 409 döner. Aynı kontrol yazma isteklerinde de yapılır (colocate),
+# çünkü farklı shard'lardaki kullanıcıları bağlayan satır yazılamaz.
+#
+# Bakım: backend/ klasöründe "python shards.py" (init, status, move, rebalance)
+# ===================================================================
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import Insert, bindparam, create_engine, event, text
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import instrument_engine
+from .slow_queries import install_slow_query_log
+from .sqlite_writes import WRITE_METHODS, configure_sqlite_engine, lazy_write_engine, write_engine
+
+logger = logging.getLogger(__name__)
+
+# 0: sharding kapalı (tüm veri ana veritabanında)
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", "0"))
+SHARD_DIR = os.environ.get("SHARD_DIR", "shards")
+# Dizin kayıtlarının süreç içinde önbellekte tutulma süresi (sn). Taşıma
+# aracı hane verisini kopyalamadan önce bu süre kadar bekler
+SHARD_DIRECTORY_TTL = float(os.environ.get("SHARD_DIRECTORY_TTL", "5"))
+
+SHARD_ID_SPAN = 10 ** 12
+
+# Haneyle birlikte taşınan tablolar (yabancı anahtar sırasıyla)
+HOUSEHOLD_TABLES = (
+    "task_template",
+    "task_instance",
+    "notification",
+    "activity_log",
+    "message",
+    "message_attachment",
+    "upload_session",
+    "notification_outbox",
+)
+
+PRINCIPAL_KEYS = ("user_id", "current_user_id", "created_by_id", "sender_id")
+# Yazma isteğinin karşı tarafı: Aynı hanede (shard'da) olmalıdır
+PEER_KEYS = ("assigned_to_id", "receiver_id")
+ENTITY_KEYS = {
+    "task_id": "task_instance",
+    "template_id": "task_template",
+    "notification_id": "notification",
+    "message_id": "message",
+    "attachment_id": "message_attachment",
+    "session_id": "upload_session",
+}
+
+ACTIVE = "active"
+MOVING = "moving"
+
+T = TypeVar("T")
+
+
+class ShardMovingError(RuntimeError):
+    """Kullanıcının hanesi başka bir shard'a taşınıyor (istemciye 503 döner)."""
+
+
+class ShardConflictError(RuntimeError):
+    """İki kullanıcı farklı shard'lardaki hanelere ait (istemciye 409 döner)."""
+
+
+def sharding_enabled() -> bool:
+    return SHARD_COUNT > 0
+
+
+# -------------------------------------------------------------------
+# Shard bağlantıları
+# -------------------------------------------------------------------
+
+class Shard:
+    """Bir shard'ın engine'i ve session fabrikası."""
+
+    def __init__(self, index: int, engine: Engine, session_factory: sessionmaker, writer: Engine):
+        self.index = index
+        self.engine = engine
+        self.session_factory = session_factory
+        self.write_engine = writer
+        self.request_engine = lazy_write_engine(engine)
+
+    @property
+    def id_base(self) -> int:
+        return self.index * SHARD_ID_SPAN
+
+    def session(self, write: bool = False, lazy: bool = False) -> Session:
+        """
+        write=True: Transaction'lar BEGIN IMMEDIATE ile başlar; lazy=True ile
+        yazma kilidi ilk yazma ifadesinde alınır (sqlite_writes.py).
+        """
+        if not write:
+            return self.session_factory()
+        return self.session_factory(bind=self.request_engine if lazy else self.write_engine)
+
+
+_shards: Dict[int, Shard] = {}
+_shards_lock = threading.Lock()
+
+
+def shard_schema(index: int) -> str:
+    return f"shard_{index}"
+
+
+def _assign_range_ids(conn: Connection, statement, multiparams, params, execution_options):
+    """
+    SQLite, AUTOINCREMENT'ta bile yeni id'yi tablodaki en büyük id'den sonra
+    verir: Daha yüksek numaralı bir shard'dan taşınan hanenin id'leri varsa
+    yeni kayıtlar o shard'ın aralığından id alır ve id'ler çakışır. id'siz
+    INSERT'lere id'ler shard'ın kendi sayacından (sqlite_sequence, bkz.
+    seed_id_ranges) açıkça verilir.
+    """
+    if not isinstance(statement, Insert) or statement.table.name not in _id_table_names():
+        return statement, multiparams, params
+    if statement.select is not None or statement._multi_values:
+        return statement, multiparams, params
+
+    rows = [dict(row) for row in multiparams] if multiparams else [dict(params)]
+    if statement._values and (multiparams or any(getattr(key, "key", key) == "id" for key in statement._values)):
+        return statement, multiparams, params
+    missing = [row for row in rows if row.get("id") is None]
+    if not missing:
+        return statement, multiparams, params
+    last = conn.execute(
+        text("UPDATE sqlite_sequence SET seq = seq + :count WHERE name = :name RETURNING seq"),
+        {"count": len(missing), "name": statement.table.name},
+    ).scalar()
+    if last is None:
+        return statement, multiparams, params
+    for row, new_id in zip(missing, range(last - len(missing) + 1, last + 1)):
+        row["id"] = new_id
+    if multiparams:
+        return statement, rows, {}
+    return statement, [], rows[0]
+
+
+def _create_shard(index: int) -> Shard:
+    from .database import SQLALCHEMY_DATABASE_URL, SessionLocal, WriteEngine, engine, engine_options
+
+    if index == 0:
+        return Shard(0, engine, SessionLocal, WriteEngine)
+
+    backend = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name()
+    if backend == "sqlite":
+        os.makedirs(SHARD_DIR, exist_ok=True)
+        url = f"sqlite:///{os.path.join(SHARD_DIR, f'shard_{index}.db')}"
+        options = engine_options(url)
+    else:
+        url = SQLALCHEMY_DATABASE_URL
+        options = engine_options(url)
+        connect_args = options.setdefault("connect_args", {})
+        connect_args["options"] = f"{connect_args.get('options', '')} -c search_path={shard_schema(index)}".strip()
+
+    shard_engine = create_engine(url, **options)
+
+    @event.listens_for(shard_engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        from .migrations import AUTOINCREMENT_IDS
+        record.info[AUTOINCREMENT_IDS] = True
+
+    if backend == "sqlite":
+        event.listen(shard_engine, "before_execute", _assign_range_ids, retval=True)
+    install_slow_query_log(shard_engine)
+    configure_sqlite_engine(shard_engine)
+    instrument_engine(shard_engine)
+    return Shard(
+        index,
+        shard_engine,
+        sessionmaker(autocommit=False, autoflush=False, bind=shard_engine),
+        write_engine(shard_engine),
+    )
+
+
+def get_shard(index: int) -> Shard:
+    shard = _shards.get(index)
+    if shard is None:
+        if not 0 <= index <= SHARD_COUNT:
+            raise ValueError(f"Geçersiz shard: {index} (SHARD_COUNT={SHARD_COUNT})")
+        with _shards_lock:
+            shard = _shards.get(index)
+            if shard is None:
+                shard = _shards[index] = _create_shard(index)
+    return shard
+
+
+def all_shards() -> List[Shard]:
+    """Ana veritabanı dahil tüm shard'lar (sharding kapalıysa sadece shard 0)."""
+    return [get_shard(index) for index in range(SHARD_COUNT + 1)]
+
+
+def scatter(fn: Callable[[Session], Iterable[T]]) -> List[T]:
+    """fn(session)'ı her shard'da çalıştırır ve sonuçları birleştirir (shard sırasıyla)."""
+    results: List[T] = []
+    for shard in all_shards():
+        db = shard.session()
+        try:
+            results.extend(fn(db))
+        finally:
+            db.close()
+    return results
+
+
+# -------------------------------------------------------------------
+# Shard hazırlığı (shards.py init ve AUTO_MIGRATE)
+# -------------------------------------------------------------------
+
+def _tables():
+    from .database import Base
+    from . import models  # noqa: F401  (tabloların metadata'ya kaydı için)
+
+    return Base.metadata.tables
+
+
+def _id_tables() -> List[str]:
+    tables = _tables()
+    return [
+        name for name in HOUSEHOLD_TABLES
+        if "id" in tables[name].c and tables[name].c.id.type.python_type is int
+    ]
+
+
+@lru_cache(maxsize=1)
+def _id_table_names() -> frozenset:
+    return frozenset(_id_tables())
+
+
+def id_counters(conn: Connection) -> Dict[str, Optional[int]]:
+    """Tabloların id sayaçlarının şu anki değeri (hiç id verilmemişse None)."""
+    counters: Dict[str, Optional[int]] = {}
+    for table in _id_tables():
+        if conn.dialect.name == "sqlite":
+            counters[table] = conn.execute(
+                text("SELECT seq FROM sqlite_sequence WHERE name = :name"), {"name": table}
+            ).scalar()
+        elif conn.dialect.name == "postgresql":
+            counters[table] = conn.execute(
+                text(f"SELECT pg_sequence_last_value(pg_get_serial_sequence('{table}', 'id')::regclass)")
+            ).scalar()
+    return counters
+
+
+def seed_id_ranges(conn: Connection, index: int, counters: Optional[Dict[str, Optional[int]]] = None) -> None:
+    """
+    Shard'ın id sayaçlarını kendi aralığındaki en büyük id'ye (yoksa aralık
+    başına) ayarlar. Taşınan hanelerle gelen başka aralıktaki id'ler sayacı
+    ilerletmez; taşıma sonrası da çağrılır. Sayaç hiç geri alınmaz: Başka
+    shard'a taşınan satırların id'leri tekrar verilmez. SQLite'ta satır
+    kopyalamak sayacı ilerletebileceği için taşıma, kopyadan önceki
+    değerleri (counters, bkz. id_counters) verir. SQLite'ta yeni id'ler bu
+    sayaçtan _assign_range_ids ile verilir.
+    """
+    if index == 0:
+        return
+    base = index * SHARD_ID_SPAN
+    if counters is None:
+        counters = id_counters(conn)
+    for table in _id_tables():
+        own_max = conn.execute(
+            text(f"SELECT MAX(id) FROM {table} WHERE id >= :low AND id < :high"),
+            {"low": base, "high": base + SHARD_ID_SPAN},
+        ).scalar()
+        current = counters.get(table)
+        in_range = current if current is not None and base <= current < base + SHARD_ID_SPAN else None
+        value = max(own_max or base, in_range or base)
+        if conn.dialect.name == "sqlite":
+            conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table})
+            conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                         {"name": table, "seq": value})
+        elif conn.dialect.name == "postgresql":
+            conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), :value)"),
+                         {"value": value})
+
+
+def mirror_users(conn: Connection, users: List[dict]) -> None:
+    """Kullanıcı satırlarını shard'a kopyalar (var olanlar atlanır)."""
+    if not users:
+        return
+    existing = {row[0] for row in conn.execute(
+        text("SELECT id FROM app_user WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+        {"ids": [u["id"] for u in users]},
+    )}
+    missing = [u for u in users if u["id"] not in existing]
+    if missing:
+        from . import models
+        conn.execute(models.AppUser.__table__.insert(), missing)
+
+
+def prepare_shard(index: int, log: Callable[[str], None] = logger.info) -> List[int]:
+    """Shard'ın şemasını oluşturur/günceller, id aralığını ayarlar ve kullanıcıları kopyalar."""
+    from .database import engine as main_engine
+    from .migrations import upgrade
+    from . import models
+
+    shard = get_shard(index)
+    if index and shard.engine.dialect.name == "postgresql":
+        with main_engine.begin() as conn:
+            conn.exec_driver_sql(f"CREATE SCHEMA IF NOT EXISTS {shard_schema(index)}")
+
+    applied = upgrade(shard.engine, log=log)
+    if index:
+        with main_engine.connect() as conn:
+            users = [dict(row) for row in conn.execute(models.AppUser.__table__.select()).mappings()]
+        with shard.write_engine.begin() as conn:
+            seed_id_ranges(conn, index)
+            mirror_users(conn, users)
+    return applied
+
+
+def check_shard_schemas() -> None:
+    """Açılışta çağrılır: Shard'ların şema sürümü ana veritabanıyla aynı olmalıdır."""
+    from .migrations import AUTO_MIGRATE, SchemaVersionError, check_schema_version, pending_migrations
+
+    for index in range(1, SHARD_COUNT + 1):
+        shard = get_shard(index)
+        if AUTO_MIGRATE and pending_migrations(shard.engine):
+            prepare_shard(index)
+        try:
+            check_schema_version(shard.engine)
+        except SchemaVersionError as exc:
+            raise SchemaVersionError(
+                f"Shard {index}: {exc} Shard'lar için 'python shards.py init' çalıştırın."
+            ) from exc
+
+
+# -------------------------------------------------------------------
+# Shard dizini
+# -------------------------------------------------------------------
+
+# user_id -> (okunma zamanı, (shard, household_id, state) veya None)
+_directory_cache: Dict[int, Tuple[float, Optional[Tuple[int, Optional[int], str]]]] = {}
+
+
+def directory_entry(user_id: int, fresh: bool = False) -> Optional[Tuple[int, Optional[int], str]]:
+    """Kullanıcının (shard, household_id, state) kaydı; kayıt yoksa None."""
+    now = time.monotonic()
+    cached = _directory_cache.get(user_id)
+    if cached and not fresh and now - cached[0] < SHARD_DIRECTORY_TTL:
+        return cached[1]
+    with get_shard(0).engine.connect() as conn:
+        row = conn.execute(
+            text("SELECT shard, household_id, state FROM shard_directory WHERE user_id = :user_id"),
+            {"user_id": user_id},
+        ).first()
+    entry = tuple(row) if row else None
+    _directory_cache[user_id] = (now, entry)
+    return entry
+
+
+def invalidate_directory(user_ids: Optional[Iterable[int]] = None) -> None:
+    if user_ids is None:
+        _directory_cache.clear()
+        return
+    for user_id in user_ids:
+        _directory_cache.pop(user_id, None)
+
+
+def resolve_user_shard(user_id: int) -> int:
+    entry = directory_entry(user_id)
+    if entry is None:
+        return 0
+    shard, _, state = entry
+    if state == MOVING:
+        raise ShardMovingError(f"Kullanıcı {user_id} taşınıyor")
+    return shard
+
+
+def locate_entity(table: str, entity_id) -> Optional[int]:
+    """
+    Kaydın bulunduğu shard. Önce id aralığının shard'ına bakılır; hane
+    taşınmışsa diğer shard'lar sırayla denenir.
+    """
+    order = list(range(SHARD_COUNT + 1))
+    if isinstance(entity_id, int):
+        preferred = entity_id // SHARD_ID_SPAN
+        if preferred in order:
+            order.remove(preferred)
+            order.insert(0, preferred)
+    for index in order:
+        with get_shard(index).engine.connect() as conn:
+            found = conn.execute(text(f"SELECT 1 FROM {table} WHERE id = :id"), {"id": entity_id}).first()
+        if found:
+            return index
+    return None
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _body_peers(body: dict) -> List[int]:
+    peers = [body.get(key) for key in PEER_KEYS]
+    rows = body.get("rows")
+    if isinstance(rows, list):
+        peers.extend(row.get("assigned_to_id") for row in rows if isinstance(row, dict))
+    return sorted({peer for peer in map(_as_int, peers) if peer is not None})
+
+
+async def _request_users(request: Request) -> Tuple[Optional[int], List[int]]:
+    """İsteği yapan kullanıcı ve JSON gövdesindeki karşı taraflar (görev atanan, mesaj alıcısı)."""
+    user_id = _as_int(request.headers.get("x-user-id"))
+    for params in (request.path_params, request.query_params):
+        for key in PRINCIPAL_KEYS:
+            if user_id is None:
+                user_id = _as_int(params.get(key))
+
+    body = None
+    if request.method in WRITE_METHODS and request.headers.get("content-type", "").startswith("application/json"):
+        # FastAPI gövdeyi dependency'lerden önce okur; request.json() önbellekten döner
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+    if not isinstance(body, dict):
+        return user_id, []
+    for key in PRINCIPAL_KEYS:
+        if user_id is None:
+            user_id = _as_int(body.get(key))
+    return user_id, _body_peers(body)
+
+
+def _resolve(user_id: int, peers: List[int]) -> int:
+    for peer in peers:
+        colocate_or_409(user_id, peer)
+    return resolve_user_shard(user_id)
+
+
+async def request_shard(request: Request) -> int:
+    """
+    İsteğin shard'ı (get_db bu dependency ile session'ı seçer). Yazma
+    isteğinin karşı tarafı henüz bir haneye bağlı değilse önce aynı shard'a
+    alınır (colocate). Dizin ve kayıt aramaları veritabanına gittiği için
+    threadpool'da yapılır.
+    """
+    if not sharding_enabled():
+        return 0
+    try:
+        user_id, peers = await _request_users(request)
+        if user_id is not None:
+            return await run_in_threadpool(_resolve, user_id, peers)
+        for key, table in ENTITY_KEYS.items():
+            value = request.path_params.get(key)
+            if value is None:
+                continue
+            entity_id = value if table == "upload_session" else _as_int(value)
+            shard = await run_in_threadpool(locate_entity, table, entity_id)
+            return 0 if shard is None else shard
+    except ShardMovingError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Hane verileri taşınıyor, lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": str(max(1, int(SHARD_DIRECTORY_TTL)))},
+        )
+    return 0
+
+
+# -------------------------------------------------------------------
+# Haneler
+# -------------------------------------------------------------------
+
+def _least_loaded_shard(conn: Connection) -> int:
+    counts = dict(conn.execute(text(
+        "SELECT shard, COUNT(DISTINCT household_id) FROM shard_directory "
+        "WHERE household_id IS NOT NULL GROUP BY shard"
+    )).all())
+    # Yeni haneler 1..SHARD_COUNT'a dağıtılır; shard 0 dizini ve eski haneleri tutar
+    return min(range(1, SHARD_COUNT + 1), key=lambda index: (counts.get(index, 0), index))
+
+
+def register_user(db: Session, user) -> None:
+    """
+    Yeni kullanıcıyı dizine ekler ve shard'lara kopyalar. Dizin kaydı
+    isteğin session'ında (ana veritabanı) yazılır. Hasta yakını yeni bir
+    hane olarak en az yüklü shard'a yerleşir; bakıcı ilk görev/mesajda
+    hasta yakınının hanesine bağlanır (colocate).
+    """
+    if not sharding_enabled():
+        return
+    from . import models
+
+    row = {column.name: getattr(user, column.name) for column in models.AppUser.__table__.columns}
+    if user.role == "hasta_yakini":
+        shard, household_id = _least_loaded_shard(db.connection()), user.id
+    else:
+        shard, household_id = 0, None
+    db.execute(
+        text(
+            "INSERT INTO shard_directory (user_id, household_id, shard, state, updated_at) "
+            "VALUES (:user_id, :household_id, :shard, :state, :now)"
+        ),
+        {"user_id": user.id, "household_id": household_id, "shard": shard,
+         "state": ACTIVE, "now": datetime.utcnow()},
+    )
+    db.commit()
+    for index in range(1, SHARD_COUNT + 1):
+        with get_shard(index).write_engine.begin() as conn:
+            mirror_users(conn, [row])
+    invalidate_directory([user.id])
+
+
+def _has_household_data(conn: Connection, user_id: int) -> bool:
+    return conn.execute(text(
+        "SELECT 1 FROM task_instance WHERE created_by_id = :u OR assigned_to_id = :u "
+        "UNION ALL SELECT 1 FROM task_template WHERE created_by_id = :u "
+        "UNION ALL SELECT 1 FROM message WHERE sender_id = :u OR receiver_id = :u "
+        "LIMIT 1"
+    ), {"u": user_id}).first() is not None
+
+
+def colocate(user_id: int, other_id: int) -> None:
+    """
+    İki kullanıcının (ör. görev oluşturan hasta yakını ve bakıcı, mesajın
+    iki tarafı) aynı shard'da olmasını sağlar. Henüz hanesi ve verisi olmayan
+    taraf diğerinin hanesine bağlanır; iki taraf farklı shard'lardaki
+    hanelere aitse ShardConflictError fırlatılır.
+    """
+    if not sharding_enabled() or user_id == other_id:
+        return
+    first, second = directory_entry(user_id, fresh=True), directory_entry(other_id, fresh=True)
+    first_shard = first[0] if first else 0
+    second_shard = second[0] if second else 0
+    if first_shard == second_shard:
+        return
+
+    for joiner, joiner_entry, owner_entry in ((other_id, second, first), (user_id, first, second)):
+        if joiner_entry is None or joiner_entry[1] is not None or owner_entry is None:
+            continue
+        with get_shard(joiner_entry[0]).engine.connect() as conn:
+            if _has_household_data(conn, joiner):
+                continue
+        with get_shard(0).write_engine.begin() as conn:
+            conn.execute(
+                text(
+                    "UPDATE shard_directory SET household_id = :household_id, shard = :shard, "
+                    "updated_at = :now WHERE user_id = :user_id AND household_id IS NULL"
+                ),
+                {"household_id": owner_entry[1], "shard": owner_entry[0],
+                 "now": datetime.utcnow(), "user_id": joiner},
+            )
+        invalidate_directory([joiner])
+        return
+
+    raise ShardConflictError(f"Kullanıcı {user_id} ve {other_id} farklı shard'larda")
+
+
+def colocate_or_409(user_id: int, other_id: int) -> None:
+    """colocate(); çakışmada endpoint'in döndüreceği HTTP hatası."""
+    try:
+        colocate(user_id, other_id)
+    except ShardConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                "Bu kullanıcılar farklı hanelere ait; işlem aynı hanedeki kullanıcılar arasında "
+                "yapılabilir. Bakıcılar tek bir haneye bağlanır (PUT /users/{user_id}/caregivers/{caregiver_id})."
+            ),
+        )
+
+
+# -------------------------------------------------------------------
+# Taşıma ve dengeleme (shards.py)
+# -------------------------------------------------------------------
+
+# Hane üyelerine (:members) ait satırlar
+_HOUSEHOLD_FILTERS = {
+    "task_template": "created_by_id IN :members",
+    "task_instance": "created_by_id IN :members OR assigned_to_id IN :members",
+    "notification": "user_id IN :members",
+    "activity_log": "user_id IN :members",
+    "message": "sender_id IN :members OR receiver_id IN :members",
+    "message_attachment": (
+        "message_id IN (SELECT id FROM message WHERE sender_id IN :members OR receiver_id IN :members)"
+    ),
+    "upload_session": "user_id IN :members",
+    "notification_outbox": "user_id IN :members",
+}
+
+# Hane dışındaki kullanıcılarla ortak satırlar (taşınırlarsa karşı taraf onları göremez)
+_FOREIGN_LINKS = (
+    "SELECT COUNT(*) FROM task_instance WHERE (created_by_id IN :members) != (assigned_to_id IN :members)",
+    "SELECT COUNT(*) FROM message WHERE (sender_id IN :members) != (receiver_id IN :members)",
+)
+
+COPY_CHUNK = 5000
+
+
+def _household_where(table: str):
+    return text(_HOUSEHOLD_FILTERS[table]).bindparams(bindparam("members", expanding=True))
+
+
+def household_members(household_id: int) -> Tuple[List[int], Optional[int]]:
+    """Hanenin üyeleri ve bulunduğu shard (hane yoksa ([], None))."""
+    with get_shard(0).engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT user_id, shard FROM shard_directory WHERE household_id = :household_id"),
+            {"household_id": household_id},
+        ).all()
+    if not rows:
+        return [], None
+    shards = {row[1] for row in rows}
+    if len(shards) > 1:
+        raise RuntimeError(f"Hane {household_id} birden fazla shard'da görünüyor: {sorted(shards)}")
+    return [row[0] for row in rows], shards.pop()
+
+
+def household_row_counts(conn: Connection, members: List[int]) -> Dict[str, int]:
+    from sqlalchemy import func, select
+
+    counts = {}
+    for name in HOUSEHOLD_TABLES:
+        table = _tables()[name]
+        counts[name] = conn.execute(
+            select(func.count()).select_from(table).where(_household_where(name)),
+            {"members": members},
+        ).scalar()
+    return counts
+
+
+def _set_household_state(household_id: int, state: str, shard: Optional[int] = None) -> None:
+    values = {"household_id": household_id, "state": state, "now": datetime.utcnow()}
+    shard_sql = ""
+    if shard is not None:
+        shard_sql = ", shard = :shard"
+        values["shard"] = shard
+    with get_shard(0).write_engine.begin() as conn:
+        conn.execute(text(
+            f"UPDATE shard_directory SET state = :state{shard_sql}, updated_at = :now "
+            f"WHERE household_id = :household_id"
+        ), values)
+    invalidate_directory()
+
+
+def _delete_household_rows(conn: Connection, members: List[int]) -> None:
+    for name in reversed(HOUSEHOLD_TABLES):
+        conn.execute(_tables()[name].delete().where(_household_where(name)), {"members": members})
+
+
+def move_household(
+    household_id: int,
+    target: int,
+    log: Callable[[str], None] = logger.info,
+    wait: float = SHARD_DIRECTORY_TTL,
+) -> Dict[str, int]:
+    """
+    Haneyi target shard'ına taşır; id'ler korunur. Adımlar:
+    1. Hane "moving" işaretlenir; üyelerin istekleri 503 + Retry-After alır.
+       Diğer süreçlerin dizin önbelleği dolana kadar (wait) beklenir
+    2. Hedefte yarım kalmış önceki bir kopya varsa silinir, satırlar tek
+       transaction'da kopyalanır ve hedefin id sayaçları düzeltilir
+    3. Dizin hedefi gösterecek şekilde güncellenir ("active")
+    4. Kaynaktaki satırlar silinir
+    Kopyalanan satır sayılarını tablo bazında döndürür.
+    """
+    from sqlalchemy import select
+    from .dialects import bulk_insert
+
+    if target == 0:
+        # Ana veritabanı id'leri aralıkla sınırlı değildir (rowid); gelen
+        # yüksek id'ler sonraki kayıtların id'lerini başka shard'ın aralığına taşır
+        raise ValueError("Haneler shard 0'a taşınamaz.")
+    get_shard(target)
+    members, source = household_members(household_id)
+    if source is None:
+        raise ValueError(f"Hane {household_id} dizinde yok.")
+    if source == target:
+        log(f"Hane {household_id} zaten shard {target}'de.")
+        return {}
+
+    src, dst = get_shard(source), get_shard(target)
+    with src.engine.connect() as conn:
+        for sql in _FOREIGN_LINKS:
+            linked = conn.execute(
+                text(sql).bindparams(bindparam("members", expanding=True)), {"members": members}
+            ).scalar()
+            if linked:
+                raise ValueError(
+                    f"Hane {household_id}'in hane dışındaki kullanıcılarla ortak kayıtları var ({linked}); taşınamaz."
+                )
+
+    log(f"Hane {household_id} ({len(members)} üye) shard {source} -> {target} taşınıyor")
+    _set_household_state(household_id, MOVING)
+    flipped = False
+    try:
+        time.sleep(wait)
+        copied = {}
+        with dst.write_engine.begin() as dst_conn:
+            counters = id_counters(dst_conn)
+            _delete_household_rows(dst_conn, members)
+            with src.engine.connect() as src_conn:
+                for name in HOUSEHOLD_TABLES:
+                    table = _tables()[name]
+                    result = src_conn.execute(select(table).where(_household_where(name)), {"members": members})
+                    copied[name] = 0
+                    while True:
+                        rows = [dict(row) for row in result.mappings().fetchmany(COPY_CHUNK)]
+                        if not rows:
+                            break
+                        bulk_insert(dst_conn, table, rows)
+                        copied[name] += len(rows)
+            seed_id_ranges(dst_conn, target, counters)
+        log("Kopyalandı: " + ", ".join(f"{name}={count}" for name, count in copied.items()))
+
+        _set_household_state(household_id, ACTIVE, shard=target)
+        flipped = True
+        with src.write_engine.begin() as src_conn:
+            _delete_household_rows(src_conn, members)
+        log(f"Hane {household_id} shard {target}'de; kaynak temizlendi.")
+        return copied
+    finally:
+        if not flipped:
+            _set_household_state(household_id, ACTIVE)
+
+
+def shard_overview() -> List[dict]:
+    """Shard başına hane/kullanıcı sayısı ve tablo satır sayıları (GET /admin/shards, shards.py status)."""
+    with get_shard(0).engine.connect() as conn:
+        directory = {
+            row[0]: {"households": row[1], "users": row[2]}
+            for row in conn.execute(text(
+                "SELECT shard, COUNT(DISTINCT household_id), COUNT(*) FROM shard_directory GROUP BY shard"
+            ))
+        }
+        moving = conn.execute(text("SELECT COUNT(*) FROM shard_directory WHERE state = :state"),
+                              {"state": MOVING}).scalar()
+
+    overview = []
+    for shard in all_shards():
+        with shard.engine.connect() as conn:
+            rows = {name: conn.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar() for name in HOUSEHOLD_TABLES}
+        entry = directory.get(shard.index, {"households": 0, "users": 0})
+        overview.append({
+            "shard": shard.index,
+            "households": entry["households"],
+            "users": entry["users"],
+            "rows": rows,
+        })
+    if moving:
+        logger.info("%d kullanıcının hanesi taşınıyor", moving)
+    return overview
+
+
+def plan_rebalance(include_main: bool = False) -> List[Tuple[int, int, int]]:
+    """
+    Hane sayılarını 1..SHARD_COUNT shard'ları arasında dengeleyen taşımalar:
+    [(household_id, kaynak, hedef), ...]. Her adımda en kalabalık shard'ın
+    en küçük (en az görevli) hanesi en boş shard'a taşınır. include_main=True
+    ise shard 0'daki haneler de dağıtılır.
+    """
+    with get_shard(0).engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT household_id, MIN(shard) FROM shard_directory "
+            "WHERE household_id IS NOT NULL GROUP BY household_id"
+        )).all()
+    placement = {household: shard for household, shard in rows}
+    targets = list(range(1, SHARD_COUNT + 1))
+
+    sizes: Dict[int, int] = {}
+    for household, shard in placement.items():
+        with get_shard(shard).engine.connect() as conn:
+            sizes[household] = conn.execute(
+                text("SELECT COUNT(*) FROM task_instance WHERE created_by_id = :household"),
+                {"household": household},
+            ).scalar()
+
+    moves = []
+    if include_main:
+        for household in sorted(h for h, s in placement.items() if s == 0):
+            counts = {t: sum(1 for s in placement.values() if s == t) for t in targets}
+            target = min(targets, key=lambda t: (counts[t], t))
+            moves.append((household, 0, target))
+            placement[household] = target
+
+    while True:
+        counts = {t: [h for h, s in placement.items() if s == t] for t in targets}
+        fullest = max(targets, key=lambda t: len(counts[t]))
+        emptiest = min(targets, key=lambda t: len(counts[t]))
+        if len(counts[fullest]) - len(counts[emptiest]) <= 1:
+            break
+        household = min(counts[fullest], key=lambda h: (sizes[h], h))
+        moves.append((household, fullest, emptiest))
+        placement[household] = emptiest
+    return moves
+
+
+def backfill_directory() -> int:
+    """
+    Sharding açılmadan önceki kullanıcıları dizine ekler (shard 0): Hasta
+    yakınları kendi hanelerini oluşturur; sadece bir hasta yakınıyla görev
+    veya mesaj kaydı olan bakıcılar o haneye bağlanır. Eklenen kayıt sayısını döndürür.
+    """
+    with get_shard(0).write_engine.begin() as conn:
+        users = conn.execute(text(
+            "SELECT id, role FROM app_user WHERE id NOT IN (SELECT user_id FROM shard_directory)"
+        )).all()
+        links: Dict[int, set] = {}
+        for caregiver, relative in conn.execute(text(
+            "SELECT DISTINCT t.assigned_to_id, t.created_by_id FROM task_instance t "
+            "UNION SELECT m.sender_id, m.receiver_id FROM message m "
+            "JOIN app_user r ON r.id = m.receiver_id AND r.role = 'hasta_yakini' "
+            "UNION SELECT m.receiver_id, m.sender_id FROM message m "
+            "JOIN app_user r ON r.id = m.sender_id AND r.role = 'hasta_yakini'"
+        )):
+            links.setdefault(caregiver, set()).add(relative)
+
+        now = datetime.utcnow()
+        rows = []
+        for user_id, role in users:
+            if role == "hasta_yakini":
+                household_id = user_id
+            else:
+                relatives = links.get(user_id, set())
+                household_id = next(iter(relatives)) if len(relatives) == 1 else None
+            rows.append({"user_id": user_id, "household_id": household_id, "shard": 0,
+                         "state": ACTIVE, "now": now})
+        if rows:
+            conn.execute(text(
+                "INSERT INTO shard_directory (user_id, household_id, shard, state, updated_at) "
+                "VALUES (:user_id, :household_id, 0, :state, :now)"
+            ), rows)
+    invalidate_directory()
+    return len(rows)
@@ -0,0 +1,186 @@
+# ===================================================================
+# YAVAŞ SORGU KAYDI (slow_queries.py)
+# ===================================================================
+# SLOW_QUERY_MS eşiğini (varsayılan 100 ms) aşan SQL ifadelerini kaydeder:
+# - SQL metni ve bağlı parametrelerin "şekli" (tipleri ve sayıları;
+#   değerler hasta bilgisi içerebileceği için kaydedilmez)
+# - İfadeyi çalıştıran route (ör. GET /statistics/relative/{user_id}/overview)
+# - SQLite'ın EXPLAIN QUERY PLAN çıktısı (ifade ilk kez yavaş
+#   göründüğünde alınır; "SCAN <tablo>" satırları eksik indeksi gösterir)
+#
+# Kayıtlar iki yerde tutulur:
+# - En kötü ifadeler: SQL kalıbı başına özet (adet, toplam/en yüksek süre),
+#   en fazla SLOW_QUERY_TOP kalıp; dolunca en hızlı olan çıkarılır
+# - Son yavaş çalıştırmalar: Sabit boyutlu halka (SLOW_QUERY_RECENT)
+# Her ikisi de GET /admin/slow-queries ile okunur ve ayrıca
+# app.slow_queries logger'ına WARNING olarak yazılır.
+# ===================================================================
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .instrumentation import current_route
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_TOP = int(os.environ.get("SLOW_QUERY_TOP", "50"))
+SLOW_QUERY_RECENT = int(os.environ.get("SLOW_QUERY_RECENT", "200"))
+
+# IN (?, ?, ?, ...) listeleri parametre sayısına göre farklı SQL metni
+# üretir; aynı kalıp altında toplamak için tek bir "(?, ...)" yapılır
+_IN_LIST = re.compile(r"\(\?(?:,\s*\?)+\)")
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+_lock = threading.Lock()
+_worst: dict = {}
+_recent: deque = deque(maxlen=SLOW_QUERY_RECENT)
+
+
+def fingerprint(statement: str) -> str:
+    return _IN_LIST.sub("(?, ...)", " ".join(statement.split()))
+
+
+def parameter_shape(parameters) -> str:
+    """
+    Parametre değerleri yerine tiplerini özetler.
+    (5, 'ali', 7, 8, 9) -> "int, str, int×3"
+    """
+    if parameters is None:
+        return ""
+    if isinstance(parameters, dict):
+        return ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items())
+    if isinstance(parameters, list):
+        return f"executemany×{len(parameters)}"
+
+    runs = []
+    for value in parameters:
+        name = type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return ", ".join(name if n == 1 else f"{name}×{n}" for name, n in runs)
+
+
+def _explain(cursor, statement: str, parameters) -> Optional[list]:
+    """
+    İfadenin sorgu planını aynı DBAPI bağlantısında ayrı bir cursor ile alır
+    (SQLAlchemy olaylarını tetiklemez). Sadece SQLite için.
+    """
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        plan_cursor = cursor.connection.cursor()
+        try:
+            plan_cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+            return [row[-1] for row in plan_cursor.fetchall()]
+        finally:
+            plan_cursor.close()
+    except Exception as exc:  # plan alınamaması sorguyu etkilememeli
+        return [f"(plan alınamadı: {exc})"]
+
+
+def _record(cursor, statement, parameters, executemany, duration_ms, dialect_name):
+    key = fingerprint(statement)
+    route = current_route()
+    shape = parameter_shape(parameters)
+    now = datetime.utcnow().isoformat(timespec="seconds")
+
+    with _lock:
+        entry = _worst.get(key)
+        needs_plan = entry is None
+
+    plan = None
+    if needs_plan and dialect_name == "sqlite" and not executemany:
+        plan = _explain(cursor, statement, parameters)
+
+    with _lock:
+        entry = _worst.get(key)
+        if entry is None:
+            if len(_worst) >= SLOW_QUERY_TOP:
+                # Liste doluysa en hızlı kalıbı, bu ifadeden hızlıysa çıkar
+                fastest = min(_worst, key=lambda k: _worst[k]["max_ms"])
+                if _worst[fastest]["max_ms"] < duration_ms:
+                    del _worst[fastest]
+            if len(_worst) < SLOW_QUERY_TOP:
+                entry = _worst[key] = {
+                    "statement": key,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": [],
+                    "parameter_shape": shape,
+                    "plan": plan,
+                    "first_seen": now,
+                }
+        if entry is not None:
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            if duration_ms > entry["max_ms"]:
+                entry["max_ms"] = duration_ms
+                entry["parameter_shape"] = shape
+            if route and route not in entry["routes"] and len(entry["routes"]) < 10:
+                entry["routes"].append(route)
+            entry["last_seen"] = now
+            if plan is None:
+                plan = entry["plan"]
+        _recent.append({
+            "at": now,
+            "duration_ms": round(duration_ms, 2),
+            "route": route,
+            "statement": key,
+            "parameter_shape": shape,
+        })
+
+    logger.warning(
+        "Yavaş sorgu (%.1f ms) [%s]: %s | parametreler: %s | plan: %s",
+        duration_ms, route or "-", key, shape, " / ".join(plan or []),
+    )
+
+
+def install_slow_query_log(engine: Engine) -> None:
+    """Engine'e yavaş sorgu dinleyicilerini ekler."""
+    dialect_name = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+        if duration_ms >= SLOW_QUERY_MS:
+            _record(cursor, statement, parameters, executemany, duration_ms, dialect_name)
+
+
+def slow_query_report(sort: str = "max_ms", limit: int = 50) -> dict:
+    """Admin endpoint'i için en kötü ifadeler ve son yavaş çalıştırmalar."""
+    with _lock:
+        worst = [dict(entry, routes=list(entry["routes"])) for entry in _worst.values()]
+        recent = list(_recent)
+    for entry in worst:
+        entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 2)
+        entry["total_ms"] = round(entry["total_ms"], 2)
+        entry["max_ms"] = round(entry["max_ms"], 2)
+    worst.sort(key=lambda e: e[sort], reverse=True)
+    return {
+        "threshold_ms": SLOW_QUERY_MS,
+        "worst": worst[:limit],
+        "recent": list(reversed(recent))[:limit],
+    }
+
+
+def reset_slow_queries() -> None:
+    with _lock:
+        _worst.clear()
+        _recent.clear()
@@ -0,0 +1,313 @@
+# ===================================================================
+# SQLITE YAZMA ÇEKİŞMESİ YÖNETİMİ (sqlite_writes.py)
+# ===================================================================
+# SQLite'ta aynı anda tek bir yazma işlemi yapılabilir. Birden fazla
+# uvicorn worker'ı (veya threadpool) ile çalışırken varsayılan davranış
+# "database is locked" (SQLITE_BUSY) hatalarına, yani 500'lere yol açar:
+#
+# - pysqlite transaction'ı DEFERRED başlatır: İşlem önce okur, ilk
+#   INSERT/UPDATE'te yazma kilidine yükseltmeye çalışır. Başka bir
+#   bağlantı o sırada yazıyorsa ve bu işlem eski bir anlık görüntüyü
+#   okumuşsa SQLite beklemeden SQLITE_BUSY döner (busy_timeout işe yaramaz)
+#
+# Bu modül şunları yapar:
+# - Transaction'ları sürücü yerine kendisi başlatır (isolation_level=None
+#   + "begin" olayı). Okuma istekleri DEFERRED kalır (WAL modunda yazmaları
+#   beklemez)
+# - Yazma isteklerinin (POST/PUT/PATCH/DELETE) session'ları "LAZY" modda
+#   çalışır: Transaction DEFERRED başlar; ilk yazma ifadesinde (INSERT,
+#   UPDATE, DELETE, SAVEPOINT...) okuma transaction'ı kapatılıp BEGIN
+#   IMMEDIATE ile yeni bir transaction açılır. Böylece yükseltme sırasındaki
+#   SQLITE_BUSY oluşmaz ve yazma kilidi isteğin tamamı (gövde akışı, dosya
+#   kaydetme, doğrulama okumaları) boyunca değil, sadece flush + commit
+#   süresince tutulur. Bedeli: Yazma, isteğin önceki okumalarıyla aynı
+#   anlık görüntüde değildir (read committed benzeri). Eşzamanlı
+#   güncellemeye açık kayıtlar sürüm kontrolüyle korunur (TaskInstance.version)
+# - Kısa ve okuyup-yazan işler (outbox claim, migrasyonlar, yazma
+#   sıralayıcısı) write_engine() ile BEGIN IMMEDIATE'i baştan alır
+# - BEGIN IMMEDIATE kilidi alamazsa sınırlı sayıda, rastgele dağıtılmış
+#   (jitter) üstel bekleme ile tekrar dener; yine alamazsa
+#   DatabaseBusyError fırlatılır ve istemciye 503 + Retry-After döner.
+#   Event loop thread'inde (async endpoint) beklenmez: Tek deneme yapılır,
+#   kilit boşta değilse hemen 503 döner
+# - WAL modu, busy_timeout ve synchronous=NORMAL bağlantı açılırken ayarlanır
+# - İsteğe bağlı yazma sıralayıcısı (SQLITE_WRITE_SERIALIZER=1): Küçük
+#   ekleme işlemleri (aktivite kaydı, bildirim) süreç içindeki tek bir
+#   thread'de toplanıp tek transaction'da commit edilir
+#
+# Metrikler (GET /metrics): db_write_lock_wait_seconds, db_busy_retries_total,
+# db_busy_failures_total, db_write_batches_total, db_write_batch_size
+# ===================================================================
+
+import asyncio
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from .metrics import inc, observe
+
+logger = logging.getLogger(__name__)
+
+# SQLite'ın kendi bekleme süresi (her deneme için)
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "1000"))
+# BEGIN IMMEDIATE için ek deneme sayısı ve bekleme sınırları (saniye)
+SQLITE_WRITE_RETRIES = int(os.environ.get("SQLITE_WRITE_RETRIES", "5"))
+SQLITE_RETRY_BASE = float(os.environ.get("SQLITE_RETRY_BASE", "0.02"))
+SQLITE_RETRY_MAX = float(os.environ.get("SQLITE_RETRY_MAX", "0.5"))
+
+SQLITE_WRITE_SERIALIZER = os.environ.get("SQLITE_WRITE_SERIALIZER", "0") == "1"
+# Sıralayıcının bir transaction'da topladığı en fazla işlem ve ilk işlemden
+# sonra diğerleri için beklediği süre (saniye)
+SQLITE_BATCH_MAX = int(os.environ.get("SQLITE_BATCH_MAX", "64"))
+SQLITE_BATCH_WAIT = float(os.environ.get("SQLITE_BATCH_WAIT", "0.002"))
+
+# Session'ın hangi BEGIN türünü kullanacağı bu execution option ile seçilir:
+# "IMMEDIATE" (kilit baştan), "LAZY" (kilit ilk yazma ifadesinde) veya yok (DEFERRED)
+BEGIN_OPTION = "sqlite_begin"
+
+# LAZY transaction'ı henüz yazma kilidini almadıysa bağlantının info'sunda True
+_LAZY_PENDING = "sqlite_lazy_pending"
+
+# Yazma kilidi gerektirmeyen ifadeler (diğer her şey LAZY modda kilidi alır)
+_READ_STATEMENTS = ("SELECT", "PRAGMA", "EXPLAIN")
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class DatabaseBusyError(RuntimeError):
+    """Yazma kilidi tüm denemelere rağmen alınamadı (istemciye 503 döner)."""
+
+
+def is_busy_error(exc: BaseException) -> bool:
+    """SQLITE_BUSY / SQLITE_LOCKED kaynaklı hata mı?"""
+    if isinstance(exc, OperationalError):
+        exc = exc.orig
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    message = str(exc).lower()
+    return "database is locked" in message or "database table is locked" in message or "busy" in message
+
+
+def backoff_delay(attempt: int) -> float:
+    """Tam jitter'lı üstel bekleme: [0, min(max, base * 2^attempt)]"""
+    return random.uniform(0, min(SQLITE_RETRY_MAX, SQLITE_RETRY_BASE * (2 ** attempt)))
+
+
+def _on_event_loop() -> bool:
+    """Bu thread'de çalışan bir asyncio event loop'u var mı (async endpoint)?"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _begin_immediate(dbapi_conn) -> None:
+    started = time.perf_counter()
+    # Event loop'ta uyumak tüm istekleri durdurur: tek deneme, busy_timeout yok
+    on_loop = _on_event_loop()
+    retries = 0 if on_loop else SQLITE_WRITE_RETRIES
+    if on_loop:
+        dbapi_conn.execute("PRAGMA busy_timeout=0")
+    try:
+        for attempt in range(retries + 1):
+            try:
+                dbapi_conn.execute("BEGIN IMMEDIATE")
+                observe("db_write_lock_wait_seconds", time.perf_counter() - started)
+                return
+            except sqlite3.OperationalError as exc:
+                if not is_busy_error(exc):
+                    raise
+                if attempt == retries:
+                    break
+                inc("db_busy_retries_total")
+                time.sleep(backoff_delay(attempt))
+    finally:
+        if on_loop:
+            dbapi_conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+
+    inc("db_busy_failures_total")
+    waited = time.perf_counter() - started
+    observe("db_write_lock_wait_seconds", waited)
+    logger.warning("Yazma kilidi %.2f sn içinde alınamadı (%d deneme)", waited, retries + 1)
+    raise DatabaseBusyError("Veritabanı şu anda meşgul, lütfen tekrar deneyin.")
+
+
+def _is_read_statement(statement: str) -> bool:
+    return statement.lstrip()[:7].upper().startswith(_READ_STATEMENTS)
+
+
+def configure_sqlite_engine(engine: Engine) -> None:
+    """
+    SQLite engine'i için bağlantı ayarlarını ve BEGIN yönetimini kurar.
+    Migrasyonların _begin() yardımcısı bununla uyumludur (transaction zaten
+    açıksa tekrar BEGIN göndermez). SQLite dışındaki veritabanlarında bir şey yapmaz.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        # Sürücünün kendi BEGIN'ini kapat; transaction'ları "begin" olayı açar
+        dbapi_conn.isolation_level = None
+        cursor = dbapi_conn.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        dbapi_conn = conn.connection.dbapi_connection
+        mode = conn.get_execution_options().get(BEGIN_OPTION)
+        conn.info[_LAZY_PENDING] = mode == "LAZY"
+        if mode == "IMMEDIATE":
+            _begin_immediate(dbapi_conn)
+        else:
+            dbapi_conn.execute("BEGIN")
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not conn.info.get(_LAZY_PENDING) or _is_read_statement(statement):
+            return
+        # İlk yazma: Okuma transaction'ını bitir, yazma kilidini al. Kilit
+        # alınamazsa bağlantı transaction dışında kalır (rollback bir şey yapmaz)
+        conn.info[_LAZY_PENDING] = False
+        dbapi_conn = conn.connection.dbapi_connection
+        dbapi_conn.execute("COMMIT")
+        _begin_immediate(dbapi_conn)
+
+    @event.listens_for(engine, "commit")
+    @event.listens_for(engine, "rollback")
+    def _on_end(conn):
+        conn.info.pop(_LAZY_PENDING, None)
+
+
+def write_engine(engine: Engine) -> Engine:
+    """
+    Aynı bağlantı havuzunu kullanan, transaction'ları BEGIN IMMEDIATE ile
+    başlatan engine (diğer veritabanlarında seçenek yok sayılır).
+    """
+    return engine.execution_options(**{BEGIN_OPTION: "IMMEDIATE"})
+
+
+def lazy_write_engine(engine: Engine) -> Engine:
+    """
+    Aynı bağlantı havuzunu kullanan, yazma kilidini ilk yazma ifadesinde
+    alan engine (yazma istekleri; diğer veritabanlarında seçenek yok sayılır).
+    """
+    return engine.execution_options(**{BEGIN_OPTION: "LAZY"})
+
+
+# -------------------------------------------------------------------
+# Yazma sıralayıcısı
+# -------------------------------------------------------------------
+
+class WriteSerializer:
+    """
+    Küçük yazma işlemlerini tek bir arka plan thread'inde toplar ve tek
+    transaction'da commit eder. Her işlem kendi SAVEPOINT'inde çalışır;
+    biri hata verirse sadece o işlemin Future'ı hata alır.
+
+    Örnek:
+        serializer.submit(lambda s: s.add(models.Notification(...))).result()
+    """
+
+    def __init__(self, session_factory, max_batch: int = SQLITE_BATCH_MAX, max_wait: float = SQLITE_BATCH_WAIT):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[Callable, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="sqlite-write-serializer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable) -> Future:
+        """fn(session) sıralayıcı thread'inde çalışır; dönüş değeri Future'a yazılır."""
+        future: Future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def _collect(self) -> List[Tuple[Callable, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            self._execute(batch)
+
+    def _execute(self, batch: List[Tuple[Callable, Future]]) -> None:
+        results = []
+        session = self.session_factory()
+        try:
+            for fn, future in batch:
+                try:
+                    with session.begin_nested():
+                        result = fn(session)
+                        session.flush()
+                    results.append((future, result))
+                except Exception as exc:
+                    future.set_exception(exc)
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            for future, _ in results:
+                future.set_exception(exc)
+            logger.exception("Yazma grubu commit edilemedi (%d işlem)", len(batch))
+            return
+        finally:
+            session.close()
+
+        inc("db_write_batches_total")
+        observe("db_write_batch_size", len(batch))
+        for future, result in results:
+            future.set_result(result)
+
+
+# Veritabanı (bağlantı havuzu) başına bir sıralayıcı; shard'lar ayrı dosyalardır
+_serializers: Dict[int, WriteSerializer] = {}
+_serializer_lock = threading.Lock()
+
+
+def get_write_serializer(bind: Optional[Engine] = None) -> Optional[WriteSerializer]:
+    """
+    SQLITE_WRITE_SERIALIZER=1 ise bind'in (varsayılan: ana veritabanı)
+    süreç genelindeki sıralayıcısı, değilse None.
+    """
+    if not SQLITE_WRITE_SERIALIZER:
+        return None
+    from .database import SerializerSession, engine
+
+    bind = bind or engine
+    key = id(bind.pool)
+    serializer = _serializers.get(key)
+    if serializer is None:
+        with _serializer_lock:
+            serializer = _serializers.get(key)
+            if serializer is None:
+                if bind.pool is engine.pool:
+                    factory = SerializerSession
+                else:
+                    from sqlalchemy.orm import sessionmaker
+                    factory = sessionmaker(autoflush=False, expire_on_commit=False, bind=write_engine(bind))
+                serializer = _serializers[key] = WriteSerializer(factory)
+    return serializer
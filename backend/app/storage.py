@@ -0,0 +1,306 @@
+# ===================================================================
+# DOSYA DEPOLAMA KATMANI (storage.py)
+# ===================================================================
+# Yüklenen dosyaların (görev fotoğrafları, mesaj ekleri) nerede
+# saklandığını soyutlar. İki backend vardır:
+#
+# 1. LocalStorage: Dosyalar sunucudaki uploads/ klasöründe tutulur
+#    (varsayılan, tek sunuculu kurulum için)
+# 2. S3Storage: Dosyalar S3 uyumlu bir object storage'da tutulur
+#    (AWS S3, MinIO vb.). Birden fazla API sunucusu aynı dosyaları görür.
+#
+# Seçim ortam değişkenleri ile yapılır:
+#   STORAGE_BACKEND=local | s3
+#   UPLOAD_DIR=/yol/uploads                  (local için, opsiyonel)
+#   S3_BUCKET=healthcare-uploads             (s3 için zorunlu)
+#   S3_ENDPOINT_URL=http://localhost:9000    (MinIO için)
+#   S3_REGION, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY, S3_PREFIX
+#   S3_PRESIGN_EXPIRES=3600                  (saniye)
+#
+# Dosyalar "key" ile adreslenir (örn: "task_photos/task_1_123.jpg").
+# Veritabanında ise "/uploads/<key>" şeklinde URL olarak saklanır.
+# ===================================================================
+
+import os
+import shutil
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+UPLOAD_DIR = os.environ.get(
+    "UPLOAD_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "uploads"),
+)
+
+# Veritabanında saklanan URL'lerin ön eki (örn: /uploads/task_photos/x.jpg)
+UPLOAD_URL_PREFIX = "/uploads/"
+
+# Yarım kalmış yüklemelerin uzantısı (yükleme bitince yeniden adlandırılır)
+PARTIAL_SUFFIX = ".part"
+
+# Resim olarak kabul edilen dosya uzantıları
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
+
+# Okuma/yazma sırasında kullanılan parça boyutu
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+def key_to_url(key: str) -> str:
+    """Depolama anahtarını veritabanında saklanan URL'e çevirir."""
+    return UPLOAD_URL_PREFIX + key
+
+
+def url_to_key(url: str) -> str:
+    """Veritabanındaki /uploads/... URL'ini depolama anahtarına çevirir."""
+    if url.startswith(UPLOAD_URL_PREFIX):
+        return url[len(UPLOAD_URL_PREFIX):]
+    return url.lstrip("/")
+
+
+def is_safe_key(key: str) -> bool:
+    """Anahtar uploads kökünün dışına çıkmaya çalışıyor mu kontrol eder."""
+    if not key or key.startswith("/") or "\\" in key:
+        return False
+    return all(part not in ("", ".", "..") for part in key.split("/"))
+
+
+# ===================================================================
+# YEREL DOSYA SİSTEMİ BACKEND'İ
+# ===================================================================
+
+class LocalStorage:
+    """
+    Dosyaları yerel diskte, UPLOAD_DIR altında saklar.
+    Yazma işlemi önce .part dosyasına yapılır, bitince yeniden adlandırılır.
+    """
+    name = "local"
+
+    def __init__(self, root: str = UPLOAD_DIR):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Anahtarın diskteki mutlak yolunu döndürür."""
+        return os.path.join(self.root, *key.split("/"))
+
+    def save(self, key: str, fileobj: BinaryIO) -> int:
+        """Dosyayı parça parça diske yazar, yazılan byte sayısını döndürür."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial_path = path + PARTIAL_SUFFIX
+        with open(partial_path, "wb") as buffer:
+            shutil.copyfileobj(fileobj, buffer, CHUNK_SIZE)
+        os.replace(partial_path, path)
+        return os.path.getsize(path)
+
+    def open_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Dosyayı parça parça okur (tamamı belleğe alınmaz)."""
+        with open(self.path(key), "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def iter_objects(self, start_after: Optional[str] = None) -> Iterator[Tuple[str, int, float]]:
+        """
+        Tüm dosyaları (key, boyut, değiştirilme zamanı) olarak, anahtara göre
+        sıralı döndürür. start_after verilirse o anahtardan sonrası gelir.
+
+        Sıra S3 ile aynı olmalıdır (tam anahtarların sözlük sırası), yoksa
+        start_after imleci alt klasörleri atlar: "messages-old/x" anahtarı
+        "messages/y"den önce gelir ('-' < '/'). Bu yüzden klasörler adlarının
+        sonuna "/" eklenerek dosyalarla birlikte sıralanır.
+        """
+        return self._iter_dir(self.root, "", start_after)
+
+    def _iter_dir(self, dirpath: str, prefix: str, start_after: Optional[str]) -> Iterator[Tuple[str, int, float]]:
+        try:
+            with os.scandir(dirpath) as it:
+                entries = [(e.name + "/" if e.is_dir(follow_symlinks=False) else e.name, e) for e in it]
+        except FileNotFoundError:
+            return
+        for name, entry in sorted(entries, key=lambda item: item[0]):
+            key = prefix + name
+            if name.endswith("/"):
+                # Alt ağaçtaki tüm anahtarlar "key" ile başlar: imleç bu
+                # ağacın içinde değilse ve ağaç imleçten önceyse atla
+                if start_after is not None and key <= start_after and not start_after.startswith(key):
+                    continue
+                yield from self._iter_dir(entry.path, key, start_after)
+                continue
+            if start_after is not None and key <= start_after:
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            yield key, stat.st_size, stat.st_mtime
+
+    def presigned_url(self, key: str, expires: Optional[int] = None) -> Optional[str]:
+        """Yerel backend doğrudan indirme URL'i üretmez (dosya API'den sunulur)."""
+        return None
+
+
+# ===================================================================
+# S3 UYUMLU BACKEND (AWS S3, MinIO, moto)
+# ===================================================================
+
+class S3Storage:
+    """
+    Dosyaları S3 uyumlu bir bucket'ta saklar.
+    boto3 sadece bu backend seçildiğinde gereklidir.
+    İndirmeler presigned URL ile doğrudan storage'dan yapılır,
+    böylece dosya byte'ları API sunucusundan geçmez.
+    """
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        prefix: str = "",
+        presign_expires: int = 3600,
+        client=None,
+    ):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as exc:
+                raise RuntimeError(
+                    "STORAGE_BACKEND=s3 için boto3 paketi kurulu olmalıdır (pip install boto3)."
+                ) from exc
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key,
+            )
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.presign_expires = presign_expires
+
+    def _object_key(self, key: str) -> str:
+        return self.prefix + key
+
+    def save(self, key: str, fileobj: BinaryIO) -> int:
+        """
+        Dosyayı bucket'a yükler. upload_fileobj büyük dosyaları multipart
+        olarak parça parça gönderir; dosya tamamı belleğe alınmaz.
+        Multipart yükleme tamamlanana kadar nesne görünmez, .part gerekmez.
+        """
+        self.client.upload_fileobj(fileobj, self.bucket, self._object_key(key))
+        return self.size(key)
+
+    def open_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        obj = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        body = obj["Body"]
+        try:
+            for chunk in body.iter_chunks(chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    def _head(self, key: str) -> Optional[dict]:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def size(self, key: str) -> int:
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(key)
+        return head["ContentLength"]
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def iter_objects(self, start_after: Optional[str] = None) -> Iterator[Tuple[str, int, float]]:
+        """
+        Bucket'taki nesneleri (key, boyut, değiştirilme zamanı) olarak döndürür.
+        S3 listeleri anahtar sırasına göre döner; StartAfter ile devam edilir.
+        """
+        paginator = self.client.get_paginator("list_objects_v2")
+        kwargs = {"Bucket": self.bucket, "Prefix": self.prefix}
+        if start_after is not None:
+            kwargs["StartAfter"] = self._object_key(start_after)
+        for page in paginator.paginate(**kwargs):
+            for obj in page.get("Contents", []):
+                key = obj["Key"][len(self.prefix):]
+                yield key, obj["Size"], obj["LastModified"].timestamp()
+
+    def presigned_url(self, key: str, expires: Optional[int] = None) -> Optional[str]:
+        """Süreli, imzalı doğrudan indirme URL'i üretir."""
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._object_key(key)},
+            ExpiresIn=expires or self.presign_expires,
+        )
+
+
+# ===================================================================
+# AKTİF BACKEND SEÇİMİ
+# ===================================================================
+
+def create_storage_from_env():
+    """Ortam değişkenlerine göre depolama backend'ini oluşturur."""
+    backend = os.environ.get("STORAGE_BACKEND", "local").lower()
+    if backend == "local":
+        return LocalStorage(UPLOAD_DIR)
+    if backend == "s3":
+        bucket = os.environ.get("S3_BUCKET")
+        if not bucket:
+            raise RuntimeError("STORAGE_BACKEND=s3 için S3_BUCKET tanımlanmalıdır.")
+        return S3Storage(
+            bucket=bucket,
+            endpoint_url=os.environ.get("S3_ENDPOINT_URL"),
+            region=os.environ.get("S3_REGION"),
+            access_key_id=os.environ.get("S3_ACCESS_KEY_ID"),
+            secret_access_key=os.environ.get("S3_SECRET_ACCESS_KEY"),
+            prefix=os.environ.get("S3_PREFIX", ""),
+            presign_expires=int(os.environ.get("S3_PRESIGN_EXPIRES", "3600")),
+        )
+    raise RuntimeError(f"Bilinmeyen STORAGE_BACKEND değeri: {backend}")
+
+
+_storage = None
+
+
+def get_storage():
+    """
+    Uygulama genelinde kullanılan depolama backend'ini döndürür.
+    İlk çağrıda ortam değişkenlerinden oluşturulur.
+    """
+    global _storage
+    if _storage is None:
+        _storage = create_storage_from_env()
+    return _storage
+
+
+def set_storage(storage) -> None:
+    """Aktif backend'i değiştirir (testler ve migration script'i için)."""
+    global _storage
+    _storage = storage
@@ -0,0 +1,175 @@
+# ===================================================================
+# TOPLU GÖREV İÇE AKTARMA (task_import.py)
+# ===================================================================
+# Yeni bir hasta için onlarca görevi tek istekte oluşturmak için kullanılır
+# (CSV veya JSON satırları).
+#
+# POST /tasks/instances her görev için ayrı rol kontrolleri ve üç commit
+# yapar. Burada ise:
+# 1. Tüm satırlar önce tek tek şema doğrulamasından geçer
+# 2. Satırlarda geçen kullanıcı ve şablon id'leri birer IN (...) sorgusuyla
+#    toplu olarak kontrol edilir
+# 3. Geçerli satırlar, aktivite kayıtları ve bakıcı başına TEK özet bildirim
+#    olayı (outbox.py) tek bir transaction içinde toplu INSERT ile yazılır (görevler
+#    INSERT ... RETURNING ile, id'si gerekmeyen satırlar PostgreSQL'de COPY ile)
+# Hatalı satırlar satır numarasıyla raporlanır.
+# ===================================================================
+
+import csv
+import io
+from collections import defaultdict
+from datetime import datetime
+from typing import IO, Iterable
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .dialects import bulk_insert
+from .outbox import outbox_row
+
+# Tek istekte içe aktarılabilecek en fazla satır
+MAX_IMPORT_ROWS = 10_000
+
+CSV_COLUMNS = ("template_id", "assigned_to_id", "scheduled_for", "title", "description")
+
+
+def read_csv_rows(stream: IO[bytes]) -> list[dict]:
+    """
+    CSV dosyasını satır sözlüklerine çevirir. İlk satır başlık olmalıdır
+    (CSV_COLUMNS). Boş hücreler None kabul edilir.
+    """
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text_stream)
+    missing = [c for c in CSV_COLUMNS[:3] if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV başlığında eksik sütunlar: {', '.join(missing)}")
+    return [
+        {key: (value if value != "" else None) for key, value in row.items() if key}
+        for row in reader
+    ]
+
+
+def _validation_message(exc: ValidationError) -> str:
+    parts = []
+    for error in exc.errors():
+        field = ".".join(str(loc) for loc in error["loc"])
+        parts.append(f"{field}: {error['msg']}")
+    return "; ".join(parts)
+
+
+def import_task_instances(
+    db: Session,
+    creator: models.AppUser,
+    raw_rows: Iterable[dict],
+    atomic: bool = False,
+) -> schemas.TaskImportResult:
+    """
+    Satırları doğrular ve geçerli olanları tek transaction'da görev olarak ekler.
+
+    Parametreler:
+    - creator: Görevleri oluşturan hasta yakını (rol kontrolü çağıran tarafta yapılır)
+    - raw_rows: Doğrulanmamış satır sözlükleri (CSV'den veya JSON gövdesinden)
+    - atomic: True ise tek bir hatalı satırda hiçbir görev eklenmez
+
+    Satır numaraları 1'den başlar.
+    """
+    errors: list[schemas.TaskImportError] = []
+    parsed: list[tuple[int, schemas.TaskImportRow]] = []
+
+    # 1. Şema doğrulaması (veritabanına gitmeden)
+    for row_number, raw in enumerate(raw_rows, start=1):
+        try:
+            parsed.append((row_number, schemas.TaskImportRow.model_validate(raw)))
+        except ValidationError as exc:
+            errors.append(schemas.TaskImportError(row=row_number, error=_validation_message(exc)))
+
+    # 2. Referans kontrolleri: kullanıcılar ve şablonlar için birer IN sorgusu
+    assignee_ids = {row.assigned_to_id for _, row in parsed}
+    template_ids = {row.template_id for _, row in parsed}
+
+    roles = {}
+    if assignee_ids:
+        roles = dict(db.execute(
+            select(models.AppUser.id, models.AppUser.role)
+            .where(models.AppUser.id.in_(assignee_ids))
+        ).all())
+    existing_templates = set()
+    if template_ids:
+        existing_templates = set(db.scalars(
+            select(models.TaskTemplate.id)
+            .where(models.TaskTemplate.id.in_(template_ids))
+        ).all())
+
+    valid: list[schemas.TaskImportRow] = []
+    for row_number, row in parsed:
+        if row.template_id not in existing_templates:
+            message = f"template_id={row.template_id} şablonu bulunamadı."
+        elif row.assigned_to_id not in roles:
+            message = f"assigned_to_id={row.assigned_to_id} kullanıcısı bulunamadı."
+        elif roles[row.assigned_to_id] != "hasta_bakici":
+            message = "Görev sadece hasta bakıcıya atanabilir."
+        else:
+            valid.append(row)
+            continue
+        errors.append(schemas.TaskImportError(row=row_number, error=message))
+
+    errors.sort(key=lambda e: e.row)
+    if not valid or (atomic and errors):
+        return schemas.TaskImportResult(created=0, task_ids=[], errors=errors)
+
+    # 3. Toplu yazma: görevler, aktivite kayıtları ve özet bildirimler tek commit'te
+    now = datetime.utcnow()
+    task_ids = list(db.scalars(
+        insert(models.TaskInstance).returning(
+            models.TaskInstance.id, sort_by_parameter_order=True
+        ),
+        [
+            {
+                "template_id": row.template_id,
+                "title": row.title,
+                "description": row.description,
+                "created_by_id": creator.id,
+                "assigned_to_id": row.assigned_to_id,
+                "scheduled_for": row.scheduled_for,
+                "status": "pending",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for row in valid
+        ],
+    ))
+
+    # Aktivite kayıtlarının id'leri gerekmez: PostgreSQL'de COPY ile yazılır
+    bulk_insert(db.connection(), models.ActivityLog.__table__, [
+        {
+            "user_id": creator.id,
+            "action": "CREATE_TASK",
+            "entity_type": "TaskInstance",
+            "entity_id": task_id,
+            "timestamp": now,
+            "details": f"assigned_to={row.assigned_to_id}, scheduled_for={row.scheduled_for}, import=1",
+        }
+        for task_id, row in zip(task_ids, valid)
+    ])
+
+    # Bakıcı başına tek bildirim (satır başına bildirim yerine)
+    per_caregiver = defaultdict(list)
+    for row in valid:
+        per_caregiver[row.assigned_to_id].append(row.scheduled_for)
+    # (bildirim outbox'ına; teslimat worker'ı oluşturur)
+    bulk_insert(db.connection(), models.NotificationOutbox.__table__, [
+        outbox_row(
+            caregiver_id,
+            f"{len(times)} yeni görev atandı. "
+            f"İlk görev: {min(times).isoformat()}, son görev: {max(times).isoformat()}",
+            "task_assigned",
+            now,
+        )
+        for caregiver_id, times in per_caregiver.items()
+    ])
+    db.info["outbox_pending"] = True
+
+    db.commit()
+    return schemas.TaskImportResult(created=len(task_ids), task_ids=task_ids, errors=errors)
@@ -0,0 +1,60 @@
+# ===================================================================
+# GÖREV SÜRÜMLERİ (task_versions.py)
+# ===================================================================
+# İyimser eşzamanlılık: Hasta yakını ve bakıcı aynı görevi aynı anda
+# değiştirebilir. Her görevin bir sürüm numarası vardır
+# (TaskInstance.version, ETag olarak da döner). İstemci güncellemede
+# gördüğü sürümü gönderirse ve görev o arada değişmişse 409 ile görevin
+# güncel hali döner. Sürüm gönderilmezse sadece istek içindeki okuma-yazma
+# arası korunur (UPDATE ... WHERE id = ? AND version = ?).
+#
+# Görevi değiştiren her endpoint (görev router'ı, fotoğraf yüklemeleri)
+# commit'i compare_and_swap() içinde yapar; böylece eşzamanlı bir
+# değişiklik 500 yerine 409 olarak döner.
+# ===================================================================
+
+from contextlib import contextmanager
+from typing import Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from . import crud, models, schemas
+from .etags import version_etag
+
+
+def version_conflict(task: models.TaskInstance) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "Görev siz görüntüledikten sonra değiştirildi. Güncel hali ile tekrar deneyin.",
+            "current": jsonable_encoder(schemas.TaskInstanceRead.model_validate(task)),
+        },
+        headers={"ETag": version_etag(task.version)},
+    )
+
+
+def check_version(task: models.TaskInstance, expected: Optional[int]) -> None:
+    if expected is not None and expected != task.version:
+        raise version_conflict(task)
+
+
+@contextmanager
+def compare_and_swap(db: Session, task_id: int):
+    """
+    Commit sırasında görev başka bir istek tarafından değiştirilmiş veya
+    silinmişse (StaleDataError) değişiklikleri geri alır; 409 veya 404 döner.
+    """
+    try:
+        yield
+    except StaleDataError:
+        db.rollback()
+        current = crud.get_task_instance(db, task_id)
+        if current is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Görev bulunamadı.",
+            )
+        raise version_conflict(current)
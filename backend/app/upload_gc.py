@@ -0,0 +1,204 @@
+# ===================================================================
+# YETİM DOSYA TEMİZLEYİCİ (upload_gc.py)
+# ===================================================================
+# uploads/ klasöründe veritabanında artık referansı olmayan dosyaları
+# bulur ve siler (garbage collection).
+#
+# Yetim dosya kaynakları:
+# - Silinen görevlerin completion_photo_url fotoğrafları
+# - Soft delete edilmiş mesajların ekleri
+# - Yarım kalmış yüklemeler (*.part dosyaları)
+#
+# Dosyalar storage.py'deki aktif backend üzerinden listelenir ve silinir
+# (yerel disk veya S3). Temizleyici artımlı (incremental) çalışır:
+# dosyalar sıralı olarak küçük partiler halinde okunur, her parti için
+# kısa ömürlü bir session açılıp indeksli IN (...) sorguları ile
+# referanslar kontrol edilir.
+# Böylece veritabanı kilidi uzun süre tutulmaz.
+# Sharding açıksa referanslar tüm shard'larda aranır (sharding.py).
+# ===================================================================
+
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, delete
+
+from . import models
+from .sharding import all_shards
+from .storage import PARTIAL_SUFFIX, get_storage, key_to_url
+
+# Varsayılan ayarlar
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_GRACE_SECONDS = 24 * 60 * 60  # 1 gün
+
+
+def _referenced_urls(urls: List[str]) -> Tuple[set, set]:
+    """
+    Verilen URL'lerden hangilerinin canlı kayıtlar tarafından kullanıldığını bulur.
+
+    Dönüş:
+    - live: Görev fotoğrafı veya silinmemiş mesaj eki olarak kullanılan URL'ler
+    - dead_attachment_ids: Soft delete edilmiş mesajlara ait ek kayıtlarının ID'leri
+    """
+    live, dead_attachment_ids = set(), set()
+    for shard in all_shards():
+        db = shard.session()
+        try:
+            live.update(
+                db.scalars(
+                    select(models.TaskInstance.completion_photo_url).where(
+                        models.TaskInstance.completion_photo_url.in_(urls)
+                    )
+                )
+            )
+
+            rows = db.execute(
+                select(
+                    models.MessageAttachment.id,
+                    models.MessageAttachment.file_path,
+                    models.Message.is_deleted,
+                )
+                .join(models.Message, models.Message.id == models.MessageAttachment.message_id)
+                .where(models.MessageAttachment.file_path.in_(urls))
+            ).all()
+        finally:
+            db.close()
+
+        for attachment_id, file_path, is_deleted in rows:
+            if is_deleted:
+                dead_attachment_ids.add(attachment_id)
+            else:
+                live.add(file_path)
+
+    # Aynı dosya başka bir shard'da canlı bir eke aitse ek kaydı silinir, dosya kalır
+    return live, dead_attachment_ids
+
+
+def _delete_attachment_rows(attachment_ids: set) -> None:
+    """
+    Soft delete edilmiş mesajlara ait ek kayıtlarını tek kısa transaction'da siler.
+    """
+    if not attachment_ids:
+        return
+    # Sharding açıksa id'ler tüm shard'larda benzersizdir; her shard'da silinir
+    for shard in all_shards():
+        db = shard.session(write=True)
+        try:
+            db.execute(
+                delete(models.MessageAttachment).where(
+                    models.MessageAttachment.id.in_(attachment_ids)
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+
+def collect_orphaned_uploads(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    grace_seconds: int = DEFAULT_GRACE_SECONDS,
+    max_batches: Optional[int] = None,
+    start_after: Optional[str] = None,
+    dry_run: bool = False,
+    pause_seconds: float = 0.0,
+    storage=None,
+) -> dict:
+    """
+    uploads/ klasöründeki yetim dosyaları temizler.
+
+    Parametreler:
+    - batch_size: Her partide kontrol edilecek dosya sayısı
+    - grace_seconds: Bu süreden yeni dosyalara dokunulmaz (devam eden yüklemeler için)
+    - max_batches: Tek çalıştırmada işlenecek en fazla parti sayısı (None = hepsi)
+    - start_after: Önceki çalıştırmanın next_cursor değeri (kaldığı yerden devam)
+    - dry_run: True ise hiçbir şey silinmez, sadece rapor üretilir
+    - pause_seconds: Partiler arasında beklenecek süre (diğer işlere yer açmak için)
+    - storage: Kullanılacak depolama backend'i (None = aktif backend)
+
+    Dönüş: Taranan/silinen dosya sayıları, geri kazanılan byte miktarı ve
+    bir sonraki çalıştırma için next_cursor değeri (tarama bittiyse None).
+    """
+    storage = storage or get_storage()
+    cutoff = time.time() - grace_seconds
+
+    report = {
+        "started_at": datetime.utcnow().isoformat(),
+        "dry_run": dry_run,
+        "batches": 0,
+        "scanned_files": 0,
+        "skipped_recent": 0,
+        "deleted_files": 0,
+        "deleted_partial_files": 0,
+        "deleted_attachment_rows": 0,
+        "bytes_reclaimed": 0,
+        "errors": 0,
+        "next_cursor": None,
+    }
+
+    objects = storage.iter_objects(start_after)
+    last_key = None
+    finished = True
+
+    while True:
+        if max_batches is not None and report["batches"] >= max_batches:
+            finished = False
+            break
+
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                break
+        if not batch:
+            break
+
+        report["batches"] += 1
+        report["scanned_files"] += len(batch)
+        last_key = batch[-1][0]
+
+        # Grace süresini doldurmamış dosyalar bu turda atlanır
+        candidates = []
+        for key, size, mtime in batch:
+            if mtime > cutoff:
+                report["skipped_recent"] += 1
+                continue
+            candidates.append((key, size))
+
+        # Yarım kalmış yüklemeler DB'ye bakılmadan silinir
+        partial = [c for c in candidates if c[0].endswith(PARTIAL_SUFFIX)]
+        complete = [c for c in candidates if not c[0].endswith(PARTIAL_SUFFIX)]
+
+        urls = [key_to_url(key) for key, _ in complete]
+        live, dead_attachment_ids = _referenced_urls(urls) if urls else (set(), set())
+
+        orphans = [c for c in complete if key_to_url(c[0]) not in live]
+
+        for key, size in partial + orphans:
+            if not dry_run:
+                try:
+                    storage.delete(key)
+                except Exception:
+                    report["errors"] += 1
+                    continue
+            if key.endswith(PARTIAL_SUFFIX):
+                report["deleted_partial_files"] += 1
+            else:
+                report["deleted_files"] += 1
+            report["bytes_reclaimed"] += size
+
+        if not dry_run:
+            _delete_attachment_rows(dead_attachment_ids)
+        report["deleted_attachment_rows"] += len(dead_attachment_ids)
+
+        if len(batch) < batch_size:
+            break
+
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    if not finished:
+        report["next_cursor"] = last_key
+
+    report["finished_at"] = datetime.utcnow().isoformat()
+    return report
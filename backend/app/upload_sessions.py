@@ -0,0 +1,90 @@
+# ===================================================================
+# YÜKLEME OTURUMU YARDIMCILARI (upload_sessions.py)
+# ===================================================================
+# Devam ettirilebilir (resumable) yüklemelerin geçici dosyalarını yönetir.
+# Gelen parçalar UPLOAD_SESSION_DIR altındaki <oturum_id>.part dosyasının
+# sonuna eklenir; yükleme tamamlanınca dosya storage.py'deki aktif
+# backend'e aktarılır ve geçici dosya silinir.
+#
+# Not: Geçici dosyalar sunucunun yerel diskinde tutulur. Birden fazla API
+# sunucusu varsa aynı oturumun parçaları aynı sunucuya gitmelidir
+# (load balancer'da oturum ID'sine göre yönlendirme).
+# ===================================================================
+
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from . import models
+from .storage import PARTIAL_SUFFIX, UPLOAD_DIR
+
+UPLOAD_SESSION_DIR = os.environ.get(
+    "UPLOAD_SESSION_DIR",
+    os.path.join(UPLOAD_DIR, "..", "upload_sessions"),
+)
+os.makedirs(UPLOAD_SESSION_DIR, exist_ok=True)
+
+# Oturumun son parçadan sonra geçerli kalacağı süre
+SESSION_TTL = timedelta(hours=24)
+
+# Tek bir yüklemenin alabileceği en büyük boyut
+MAX_UPLOAD_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE", str(200 * 1024 * 1024)))  # 200 MB
+
+
+def session_file_path(session_id: str) -> str:
+    """Oturumun parçalarının eklendiği geçici dosyanın yolunu döndürür."""
+    return os.path.join(UPLOAD_SESSION_DIR, session_id + PARTIAL_SUFFIX)
+
+
+def remove_session_file(session_id: str) -> None:
+    """Oturumun geçici dosyasını siler (yoksa bir şey yapmaz)."""
+    try:
+        os.remove(session_file_path(session_id))
+    except FileNotFoundError:
+        pass
+
+
+def discard_session(db: Session, session_id: str) -> None:
+    """
+    Oturumu ve geçici dosyasını siler. Kayıt id ile silinir; eşzamanlı
+    bir istek oturumu zaten sildiyse hata vermez.
+    """
+    db.execute(delete(models.UploadSession).where(models.UploadSession.id == session_id))
+    db.commit()
+    remove_session_file(session_id)
+
+
+def expire_upload_sessions(db: Session) -> int:
+    """
+    Süresi dolmuş yükleme oturumlarını ve geçici dosyalarını temizler.
+    Kaydı olmayan ve TTL'den eski geçici dosyalar da silinir.
+    Temizlenen oturum sayısını döndürür.
+    """
+    now = datetime.utcnow()
+    expired = (
+        db.query(models.UploadSession)
+        .filter(models.UploadSession.expires_at < now)
+        .all()
+    )
+    for upload in expired:
+        remove_session_file(upload.id)
+        db.delete(upload)
+    db.commit()
+
+    # Veritabanı kaydı kalmamış eski geçici dosyalar
+    cutoff = (now - SESSION_TTL).timestamp()
+    for entry in os.scandir(UPLOAD_SESSION_DIR):
+        if not entry.is_file() or not entry.name.endswith(PARTIAL_SUFFIX):
+            continue
+        if entry.stat().st_mtime >= cutoff:
+            continue
+        session_id = entry.name[:-len(PARTIAL_SUFFIX)]
+        if db.get(models.UploadSession, session_id) is None:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    return len(expired)
@@ -0,0 +1,109 @@
+# ===================================================================
+# MESAJ ARAMA BENCHMARK'I (bench_message_search.py)
+# ===================================================================
+# Geçici bir SQLite veritabanına sentetik mesajlar yükler (varsayılan
+# 1 milyon), FTS5 indeksinin trigger'lar üzerinden güncellenme hızını ve
+# /messages/search sorgusunun gecikme dağılımını ölçer.
+# backend/ klasöründen çalıştırılır:
+#
+#   python -m benchmarks.bench_message_search
+#   python -m benchmarks.bench_message_search --messages 100000 --queries 200
+# ===================================================================
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app import models  # noqa: F401  (tabloların metadata'ya kaydı için)
+from app.database import Base
+from app.search import ensure_message_fts, search_messages
+
+WORDS = (
+    "insülin ilaç kahvaltı tansiyon şeker ölçüm doktor randevu yürüyüş banyo "
+    "uyku ağrı ateş öksürük eczane reçete vitamin yemek su meyve sebze çorba "
+    "hemşire kontrol tahlil sonuç aile ziyaret telefon akşam sabah öğle gece "
+    "bugün yarın dün iyi kötü yorgun mutlu sakin huzursuz teşekkürler tamam"
+).split()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+parser = argparse.ArgumentParser(description="FTS5 mesaj arama benchmark'ı")
+parser.add_argument("--messages", type=int, default=1_000_000)
+parser.add_argument("--users", type=int, default=2_000)
+parser.add_argument("--queries", type=int, default=500)
+parser.add_argument("--batch", type=int, default=50_000)
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+random.seed(args.seed)
+db_path = os.path.join(tempfile.mkdtemp(), "bench_search.db")
+engine = create_engine(f"sqlite:///{db_path}")
+Base.metadata.create_all(bind=engine)
+
+with engine.begin() as conn:
+    if not ensure_message_fts(conn):
+        raise SystemExit("Bu SQLite derlemesinde FTS5 yok.")
+    conn.execute(text(
+        "INSERT INTO app_user (id, full_name, email, role, hashed_password, is_active) "
+        "VALUES (:id, :name, :email, 'hasta_bakici', 'x', 1)"
+    ), [{"id": i, "name": f"Kullanıcı {i}", "email": f"u{i}@example.com"} for i in range(1, args.users + 1)])
+
+# Mesajları trigger'lar açıkken yükle (gerçek yazma yolundaki indeksleme maliyeti)
+start_time = datetime(2025, 1, 1)
+insert_started = time.perf_counter()
+inserted = 0
+while inserted < args.messages:
+    rows = []
+    for i in range(min(args.batch, args.messages - inserted)):
+        sender = random.randint(1, args.users)
+        receiver = random.randint(1, args.users)
+        rows.append({
+            "sender_id": sender,
+            "receiver_id": receiver,
+            "content": " ".join(random.choices(WORDS, k=random.randint(3, 15))),
+            "sent_at": start_time + timedelta(seconds=inserted + i),
+            "is_deleted": 1 if random.random() < 0.02 else 0,
+        })
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO message (sender_id, receiver_id, content, sent_at, is_edited, is_deleted, is_read) "
+            "VALUES (:sender_id, :receiver_id, :content, :sent_at, 0, :is_deleted, 0)"
+        ), rows)
+    inserted += len(rows)
+insert_seconds = time.perf_counter() - insert_started
+
+Session = sessionmaker(bind=engine)
+db = Session()
+
+latencies = []
+total_hits = 0
+for _ in range(args.queries):
+    user_id = random.randint(1, args.users)
+    query = " ".join(random.sample(WORDS, random.randint(1, 2)))
+    started = time.perf_counter()
+    hits = search_messages(db, user_id, query, limit=20)
+    latencies.append((time.perf_counter() - started) * 1000)
+    total_hits += len(hits)
+db.close()
+
+print(f"Mesaj sayısı:          {args.messages:,}")
+print(f"Yükleme (trigger'lı):  {insert_seconds:.1f} sn ({args.messages / insert_seconds:,.0f} mesaj/sn)")
+print(f"Veritabanı boyutu:     {os.path.getsize(db_path) / 1024 / 1024:.1f} MB")
+print(f"Sorgu sayısı:          {args.queries} (ortalama {total_hits / args.queries:.1f} sonuç)")
+print(f"Gecikme p50/p95/p99:   {percentile(latencies, 50):.2f} / "
+      f"{percentile(latencies, 95):.2f} / {percentile(latencies, 99):.2f} ms")
+print(f"Gecikme ortalama:      {statistics.mean(latencies):.2f} ms")
+
+os.remove(db_path)
@@ -0,0 +1,115 @@
+# ===================================================================
+# TOPLU GÖREV İÇE AKTARMA BENCHMARK'I (bench_task_import.py)
+# ===================================================================
+# Geçici bir SQLite veritabanında 10.000 satırlık (varsayılan) bir görev
+# listesini iki yolla yükler ve sürelerini karşılaştırır:
+#
+# 1. Tekil yol: POST /tasks/instances'ın yaptığı gibi satır başına
+#    kullanıcı kontrolleri + görev, aktivite ve bildirim için üç commit
+#    (süre --single-rows satır için ölçülür ve toplam satıra oranlanır)
+# 2. Toplu yol: task_import.import_task_instances (tek transaction)
+#
+# backend/ klasöründen çalıştırılır:
+#
+#   python -m benchmarks.bench_task_import
+#   python -m benchmarks.bench_task_import --rows 50000 --single-rows 500
+# ===================================================================
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.database import Base
+from app.task_import import import_task_instances
+
+parser = argparse.ArgumentParser(description="Toplu görev içe aktarma benchmark'ı")
+parser.add_argument("--rows", type=int, default=10_000)
+parser.add_argument("--single-rows", type=int, default=1_000,
+                    help="Tekil yolla ölçülecek satır sayısı")
+parser.add_argument("--caregivers", type=int, default=20)
+parser.add_argument("--templates", type=int, default=50)
+parser.add_argument("--invalid-ratio", type=float, default=0.01,
+                    help="Bilinmeyen şablona işaret eden satır oranı")
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+random.seed(args.seed)
+db_path = os.path.join(tempfile.mkdtemp(), "bench_import.db")
+engine = create_engine(f"sqlite:///{db_path}")
+Base.metadata.create_all(bind=engine)
+Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+RELATIVE_ID = 1
+caregiver_ids = list(range(2, args.caregivers + 2))
+with engine.begin() as conn:
+    conn.execute(text(
+        "INSERT INTO app_user (id, full_name, email, role, hashed_password, is_active) "
+        "VALUES (:id, :name, :email, :role, 'x', 1)"
+    ), [{"id": RELATIVE_ID, "name": "Yakın", "email": "yakin@example.com", "role": "hasta_yakini"}] + [
+        {"id": i, "name": f"Bakıcı {i}", "email": f"b{i}@example.com", "role": "hasta_bakici"}
+        for i in caregiver_ids
+    ])
+    conn.execute(text(
+        "INSERT INTO task_template (id, title, created_by_id, is_active) "
+        "VALUES (:id, :title, :created_by_id, 1)"
+    ), [{"id": i, "title": f"Şablon {i}", "created_by_id": RELATIVE_ID}
+        for i in range(1, args.templates + 1)])
+
+
+def make_rows(count):
+    start = datetime(2025, 1, 1, 8, 0)
+    rows = []
+    for i in range(count):
+        invalid = random.random() < args.invalid_ratio
+        rows.append({
+            "template_id": args.templates + 1 if invalid else random.randint(1, args.templates),
+            "assigned_to_id": random.choice(caregiver_ids),
+            "scheduled_for": (start + timedelta(minutes=30 * i)).isoformat(),
+            "title": f"Görev {i}",
+        })
+    return rows
+
+
+# 1. Tekil yol (mevcut endpoint'in yaptığı işlemler)
+single_rows = make_rows(args.single_rows)
+db = Session()
+started = time.perf_counter()
+for raw in single_rows:
+    task_in = schemas.TaskInstanceCreate(created_by_id=RELATIVE_ID, **raw)
+    creator = crud.get_user(db, task_in.created_by_id)
+    assignee = crud.get_user(db, task_in.assigned_to_id)
+    task = crud.create_task_instance(db, task_in)
+    crud.log_activity(db, user_id=creator.id, action="CREATE_TASK",
+                      entity_type="TaskInstance", entity_id=task.id,
+                      details=f"assigned_to={assignee.id}, scheduled_for={task.scheduled_for}")
+    crud.create_notification(db, user_id=assignee.id,
+                             message=f"Yeni görev atandı. Tarih/Saat: {task.scheduled_for.isoformat()}")
+single_elapsed = time.perf_counter() - started
+db.close()
+
+# 2. Toplu yol
+bulk_rows = make_rows(args.rows)
+db = Session()
+creator = db.get(models.AppUser, RELATIVE_ID)
+started = time.perf_counter()
+result = import_task_instances(db, creator, bulk_rows)
+bulk_elapsed = time.perf_counter() - started
+notifications = db.scalar(select(func.count()).select_from(models.Notification))
+db.close()
+
+per_row_single = single_elapsed / max(1, args.single_rows)
+print(f"Tekil yol: {args.single_rows} satır {single_elapsed:.2f} sn "
+      f"({per_row_single * 1000:.2f} ms/satır, {args.rows} satır için tahmini "
+      f"{per_row_single * args.rows:.1f} sn)")
+print(f"Toplu yol: {args.rows} satır {bulk_elapsed:.2f} sn "
+      f"({bulk_elapsed / args.rows * 1000:.3f} ms/satır), "
+      f"{result.created} görev eklendi, {len(result.errors)} hatalı satır")
+print(f"Hızlanma: ~{per_row_single * args.rows / bulk_elapsed:.0f}x")
+print(f"Toplam bildirim: {notifications} (toplu yolda bakıcı başına 1)")
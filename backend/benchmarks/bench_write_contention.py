@@ -0,0 +1,197 @@
+# ===================================================================
+# SQLITE YAZMA ÇEKİŞMESİ BENCHMARK'I (bench_write_contention.py)
+# ===================================================================
+# Birden fazla uvicorn worker'ını taklit eder: --processes süreç ve her
+# süreçte --threads thread, --duration saniye boyunca geçici bir SQLite
+# veritabanına küçük yazma işlemleri yapar. Her işlem bir yazma isteğinin
+# tipik kalıbıdır: kullanıcıyı oku, bildirim ekle, aktivite kaydı ekle.
+#
+# Modlar:
+# - default: pysqlite varsayılanı (DEFERRED transaction, WAL yok)
+# - managed: sqlite_writes.py (WAL, BEGIN IMMEDIATE + jitter'lı tekrar)
+# - serializer: managed + SQLITE_WRITE_SERIALIZER=1 (eklemeler süreç
+#   içinde toplanıp tek transaction'da commit edilir)
+# - sharded: managed + hane bazlı sharding (sharding.py); kullanıcılar
+#   --shards veritabanı dosyasına dağıtılır, her dosyanın ayrı yazma kilidi vardır
+#
+# Saniyedeki başarılı işlem sayısı, hata sayısı (SQLITE_BUSY / 503),
+# işlem gecikmesi (p50/p99) ve çekişme metrikleri raporlanır.
+#
+# backend/ klasöründen çalıştırılır:
+#
+#   python -m benchmarks.bench_write_contention
+#   python -m benchmarks.bench_write_contention --processes 8 --threads 8 --modes managed,serializer
+#   python -m benchmarks.bench_write_contention --modes managed,sharded --shards 4
+# ===================================================================
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("default", "managed", "serializer", "sharded")
+USERS = 50
+
+
+def _metric(text: str, name: str) -> float:
+    """render() çıktısından etiketsiz bir sayacın değerini okur."""
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[1])
+    return 0.0
+
+
+def worker(mode: str, data_dir: str, threads: int, duration: float, shards: int, results) -> None:
+    # app.database veritabanını (ve shard'ları) çalışma dizinine göre açar
+    os.chdir(data_dir)
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ["SQLITE_WRITE_SERIALIZER"] = "1" if mode == "serializer" else "0"
+    os.environ["SHARD_COUNT"] = str(shards) if mode == "sharded" else "0"
+
+    import random
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app import crud, metrics
+    from app.database import WriteEngine
+    from app.sharding import get_shard
+
+    if mode == "default":
+        default_session = sessionmaker(bind=create_engine("sqlite:///./healthcare.db"), autoflush=False)
+        Session = lambda user_id: default_session()  # noqa: E731
+    elif mode == "sharded":
+        # Hane -> shard eşlemesi dizinden okunmaz; dağılım sabit tutulur
+        Session = lambda user_id: get_shard(1 + user_id % shards).session(write=True)  # noqa: E731
+    else:
+        managed_session = sessionmaker(bind=WriteEngine, autoflush=False)
+        Session = lambda user_id: managed_session()  # noqa: E731
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def run():
+        local_latencies, local_errors = [], 0
+        while time.perf_counter() < deadline:
+            user_id = random.randint(1, USERS)
+            started = time.perf_counter()
+            db = Session(user_id)
+            try:
+                user = crud.get_user(db, user_id)
+                crud.create_notification(db, user_id=user.id, message="Benchmark bildirimi")
+                crud.log_activity(db, user_id=user.id, action="BENCH", entity_type="AppUser", entity_id=user.id)
+                local_latencies.append(time.perf_counter() - started)
+            except Exception as exc:
+                db.rollback()
+                local_errors += 1
+                if local_errors == 1:
+                    print(f"[{mode}] {type(exc).__name__}: {str(exc).splitlines()[0]}", file=sys.stderr)
+            finally:
+                db.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    rendered = metrics.render()
+    results.put({
+        "ok": len(latencies),
+        "errors": sum(errors),
+        "latencies": latencies,
+        "retries": _metric(rendered, "db_busy_retries_total"),
+        "failures": _metric(rendered, "db_busy_failures_total"),
+        "batches": _metric(rendered, "db_write_batches_total"),
+    })
+
+
+def prepare(data_dir: str, shards: int = 0) -> None:
+    sys.path.insert(0, BACKEND_DIR)
+    from sqlalchemy import create_engine, text
+
+    from app.migrations import upgrade
+
+    # Ana veritabanı ve (sharded modunda) shards/shard_k.db dosyaları; kullanıcılar hepsinde
+    paths = [os.path.join(data_dir, "healthcare.db")]
+    if shards:
+        os.makedirs(os.path.join(data_dir, "shards"))
+        paths += [os.path.join(data_dir, "shards", f"shard_{k}.db") for k in range(1, shards + 1)]
+    for path in paths:
+        engine = create_engine(f"sqlite:///{path}")
+        upgrade(engine, log=lambda message: None)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO app_user (id, full_name, email, role, hashed_password, is_active) "
+                "VALUES (:id, :name, :email, 'hasta_bakici', 'x', 1)"
+            ), [{"id": i, "name": f"Bakıcı {i}", "email": f"b{i}@example.com"} for i in range(1, USERS + 1)])
+        engine.dispose()
+
+
+def run_mode(mode: str, args) -> dict:
+    data_dir = tempfile.mkdtemp(prefix=f"bench_writes_{mode}_")
+    shards = args.shards if mode == "sharded" else 0
+    prepare(data_dir, shards)
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(mode, data_dir, args.threads, args.duration, shards, results))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    parts = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = sorted(l for part in parts for l in part["latencies"])
+    ok = sum(part["ok"] for part in parts)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return {
+        "mode": mode,
+        "ok": ok,
+        "errors": sum(part["errors"] for part in parts),
+        "per_sec": ok / args.duration,
+        "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99": pct(0.99),
+        "retries": sum(part["retries"] for part in parts),
+        "failures": sum(part["failures"] for part in parts),
+        "batches": sum(part["batches"] for part in parts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite yazma çekişmesi benchmark'ı")
+    parser.add_argument("--processes", type=int, default=4, help="Worker süreç sayısı")
+    parser.add_argument("--threads", type=int, default=4, help="Süreç başına thread sayısı")
+    parser.add_argument("--duration", type=float, default=10.0, help="Mod başına süre (saniye)")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--shards", type=int, default=4, help="sharded modunda shard sayısı")
+    args = parser.parse_args()
+
+    print(f"{args.processes} süreç x {args.threads} thread, mod başına {args.duration:.0f} sn")
+    print(f"{'mod':<11}{'işlem/sn':>10}{'hata':>8}{'p50 ms':>9}{'p99 ms':>9}{'tekrar':>9}{'503':>6}{'grup':>8}")
+    for mode in args.modes.split(","):
+        if mode not in MODES:
+            parser.error(f"Bilinmeyen mod: {mode}")
+        r = run_mode(mode, args)
+        print(f"{r['mode']:<11}{r['per_sec']:>10.0f}{r['errors']:>8d}{r['p50']:>9.1f}{r['p99']:>9.1f}"
+              f"{r['retries']:>9.0f}{r['failures']:>6.0f}{r['batches']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
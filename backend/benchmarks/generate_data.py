@@ -0,0 +1,352 @@
+# ===================================================================
+# ÖLÇEK TEST VERİSİ ÜRETİCİ (generate_data.py)
+# ===================================================================
+# Üretim ölçeğindeki davranışı yerelde tekrar üretebilmek için sentetik
+# bir veritabanı oluşturur. Veri "hane" (household) bazında üretilir:
+# her hanede bir hasta yakını, 1-3 bakıcı ve yakının şablonları bulunur.
+#
+# Dağılımlar:
+# - Görevler: Geçmiş --days gün + gelecek --future-days gün, bakıcı başına
+#   günde ortalama --tasks-per-day görev (07:00-22:00 arası)
+# - Geçmiş görev durumları: %82 done, %6 problem, %2 cancelled, %10 pending
+#   (kaçırılmış); done görevlerin %55'i değerlendirilmiş (4-5 ağırlıklı)
+# - Mesajlar: Yakın-bakıcı çiftleri arasında, çift başına sayı log-normal
+#   (birkaç çift çok yoğun, çoğu sakin); %2 silinmiş, %3 düzenlenmiş
+# - Bildirim ve aktivite kayıtları: Görev oluşturma ve durum değişiklikleri
+#   ile aynı zamanlarda, uygulamanın kendi yazdığı şekilde
+#
+# Çıktı klasörüne healthcare.db ve yük testinin kullandığı manifest.json
+# yazılır. Tüm kullanıcıların şifresi "password123"tür. --database-url
+# verilirse veri (boş) bir PostgreSQL veritabanına COPY ile yüklenir;
+# manifest yine --out klasörüne yazılır.
+# backend/ klasöründen çalıştırılır:
+#
+#   python -m benchmarks.generate_data --out scale_data
+#   python -m benchmarks.generate_data --out scale_data --households 2000 --days 180
+#   python -m benchmarks.generate_data --out scale_pg --database-url postgresql+psycopg2://localhost/healthcare
+# ===================================================================
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from app import crud, models  # noqa: F401  (tabloların metadata'ya kaydı için)
+from app.database import Base
+from app.dialects import bulk_insert, reset_sequences
+from app.migrations import upgrade
+
+TEMPLATE_TITLES = [
+    ("Sabah ilaçları", "Kahvaltıdan sonra tansiyon ve şeker ilaçları"),
+    ("Akşam ilaçları", "Akşam yemeğinden sonra verilecek ilaçlar"),
+    ("İnsülin", "Yemekten önce insülin, dozu kontrol edin"),
+    ("Tansiyon ölçümü", "Ölçümü kaydedip mesaj olarak gönderin"),
+    ("Şeker ölçümü", "Açlık şekeri ölçülecek"),
+    ("Kahvaltı", "Az tuzlu kahvaltı, bol su"),
+    ("Öğle yemeği", "Sebze çorbası ve yoğurt"),
+    ("Akşam yemeği", "Hafif akşam yemeği"),
+    ("Yürüyüş", "Bahçede 20 dakika yürüyüş"),
+    ("Banyo", "Banyo ve cilt bakımı"),
+    ("Fizik tedavi egzersizleri", "Doktorun verdiği egzersiz listesi"),
+    ("Pansuman", "Yara pansumanı ve kontrol"),
+    ("Su takibi", "Gün içinde en az 6 bardak su"),
+    ("Doktor randevusu", "Randevuya eşlik edin, raporları götürün"),
+    ("Eczane", "Reçetedeki ilaçları alın"),
+    ("Uyku öncesi kontrol", "Yatak, su ve ilaç kontrolü"),
+]
+
+MESSAGE_WORDS = (
+    "insülin ilaç kahvaltı tansiyon şeker ölçüm doktor randevu yürüyüş banyo "
+    "uyku ağrı ateş öksürük eczane reçete vitamin yemek su meyve sebze çorba "
+    "hemşire kontrol tahlil sonuç aile ziyaret telefon akşam sabah öğle gece "
+    "bugün yarın dün iyi kötü yorgun mutlu sakin huzursuz teşekkürler tamam"
+).split()
+
+PROBLEM_MESSAGES = [
+    "İlacı almak istemedi",
+    "Tansiyon yüksek çıktı",
+    "Şeker ölçümü düşük",
+    "Yürüyüşte baş dönmesi oldu",
+    "İlaç bitmiş, eczaneye gidilmeli",
+    "İştahsız, yemeğini bitirmedi",
+]
+
+FIRST_NAMES = "Ayşe Fatma Emine Hatice Zeynep Elif Mehmet Mustafa Ahmet Ali Hüseyin Hasan İbrahim Murat".split()
+LAST_NAMES = "Yılmaz Kaya Demir Şahin Çelik Yıldız Yıldırım Öztürk Aydın Özdemir Arslan Doğan".split()
+
+parser = argparse.ArgumentParser(description="Sentetik ölçek verisi üretici")
+parser.add_argument("--out", default="scale_data", help="healthcare.db ve manifest.json'ın yazılacağı klasör")
+parser.add_argument("--households", type=int, default=500)
+parser.add_argument("--days", type=int, default=90, help="Geçmişe dönük gün sayısı")
+parser.add_argument("--future-days", type=int, default=14)
+parser.add_argument("--tasks-per-day", type=float, default=5.0, help="Bakıcı başına günlük ortalama görev")
+parser.add_argument("--messages-per-pair", type=float, default=150.0, help="Yakın-bakıcı çifti başına ortalama mesaj")
+parser.add_argument("--batch", type=int, default=20_000)
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--force", action="store_true", help="Var olan veritabanının üzerine yaz")
+parser.add_argument("--database-url", default=None,
+                    help="SQLite dosyası yerine bu veritabanına yükle (ör. boş bir PostgreSQL veritabanı)")
+args = parser.parse_args()
+
+random.seed(args.seed)
+os.makedirs(args.out, exist_ok=True)
+db_path = os.path.join(args.out, "healthcare.db")
+if args.database_url:
+    engine = create_engine(args.database_url)
+else:
+    if os.path.exists(db_path):
+        if not args.force:
+            raise SystemExit(f"{db_path} zaten var (--force ile üzerine yazılabilir).")
+        os.remove(db_path)
+    engine = create_engine(f"sqlite:///{db_path}")
+upgrade(engine)
+if engine.dialect.name == "sqlite":
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+now = datetime.utcnow().replace(microsecond=0)
+today = now.replace(hour=0, minute=0, second=0)
+hashed_password = crud.get_password_hash("password123")
+
+
+class Buffer:
+    """
+    Satırları tablo başına biriktirip bir tablo --batch'e ulaşınca tüm
+    tabloları yabancı anahtar sırasıyla (önce üst tablolar) toplu yazar.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.counts = {}
+        self.next_ids = {}
+
+    def next_id(self, table):
+        self.next_ids[table] = self.next_ids.get(table, 0) + 1
+        return self.next_ids[table]
+
+    def add(self, table, row):
+        rows = self.rows.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= args.batch:
+            self.flush()
+
+    def flush(self):
+        for table in Base.metadata.sorted_tables:
+            rows = self.rows.get(table.name)
+            if not rows:
+                continue
+            with engine.begin() as conn:
+                bulk_insert(conn, table, rows)
+            self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+            self.rows[table.name] = []
+
+
+def person_name():
+    return f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
+
+
+def add_user(buffer, role):
+    user_id = buffer.next_id("app_user")
+    buffer.add("app_user", {
+        "id": user_id,
+        "full_name": person_name(),
+        "email": f"{'yakin' if role == 'hasta_yakini' else 'bakici'}{user_id}@example.com",
+        "role": role,
+        "hashed_password": hashed_password,
+        "is_active": True,
+    })
+    return user_id
+
+
+def add_notification(buffer, user_id, message, created_at):
+    buffer.add("notification", {
+        "id": buffer.next_id("notification"),
+        "user_id": user_id,
+        "message": message,
+        # Eski bildirimlerin çoğu okunmuştur
+        "is_read": created_at < now - timedelta(days=2) and random.random() < 0.95,
+        "created_at": created_at,
+    })
+
+
+def add_activity(buffer, user_id, action, task_id, details, timestamp):
+    buffer.add("activity_log", {
+        "id": buffer.next_id("activity_log"),
+        "user_id": user_id,
+        "action": action,
+        "entity_type": "TaskInstance",
+        "entity_id": task_id,
+        "timestamp": timestamp,
+        "details": details,
+    })
+
+
+def past_status():
+    roll = random.random()
+    if roll < 0.82:
+        return "done"
+    if roll < 0.88:
+        return "problem"
+    if roll < 0.90:
+        return "cancelled"
+    return "pending"
+
+
+def generate_tasks(buffer, relative_id, caregiver_id, templates, sample):
+    for day in range(-args.days, args.future_days + 1):
+        date = today + timedelta(days=day)
+        count = max(0, int(random.gauss(args.tasks_per_day, args.tasks_per_day / 3)))
+        for _ in range(count):
+            template_id, title, description = random.choice(templates)
+            scheduled_for = date + timedelta(minutes=random.randint(7 * 60, 22 * 60))
+            # Görevler genellikle 1-7 gün önceden planlanır
+            created_at = min(now, scheduled_for - timedelta(hours=random.randint(2, 168)))
+            task_id = buffer.next_id("task_instance")
+            row = {
+                "id": task_id,
+                "template_id": template_id,
+                "title": title,
+                "description": description,
+                "scheduled_for": scheduled_for,
+                "status": "pending",
+                "problem_message": None,
+                "problem_severity": None,
+                "resolution_note": None,
+                "rating": None,
+                "review_note": None,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "created_by_id": relative_id,
+                "assigned_to_id": caregiver_id,
+            }
+            add_activity(buffer, relative_id, "CREATE_TASK", task_id,
+                         f"assigned_to={caregiver_id}, scheduled_for={scheduled_for}", created_at)
+            add_notification(buffer, caregiver_id,
+                             f"Yeni görev atandı. Tarih/Saat: {scheduled_for.isoformat()}", created_at)
+
+            if scheduled_for < now:
+                status = past_status()
+                updated_at = min(now, scheduled_for + timedelta(minutes=random.randint(0, 90)))
+                row["status"] = status
+                row["updated_at"] = updated_at
+                if status == "problem":
+                    row["problem_message"] = random.choice(PROBLEM_MESSAGES)
+                    row["problem_severity"] = random.choices(["low", "medium", "high"], [50, 35, 15])[0]
+                    if random.random() < 0.5:
+                        row["resolution_note"] = "Doktorla görüşüldü, takip ediliyor"
+                    message = f"Bir görevde sorun bildirildi: {row['problem_message']}"
+                elif status == "done":
+                    if random.random() < 0.55:
+                        row["rating"] = random.choices([1, 2, 3, 4, 5], [2, 3, 10, 35, 50])[0]
+                        if random.random() < 0.3:
+                            row["review_note"] = "Teşekkürler"
+                    message = f"Bir görev tamamlandı. Tarih/Saat: {scheduled_for.isoformat()}"
+                else:
+                    message = f"Bir görevin durumu güncellendi: {status}"
+                if status != "pending":
+                    add_activity(buffer, caregiver_id, "UPDATE_TASK_STATUS", task_id,
+                                 f"status={status}, problem_message={row['problem_message']}", updated_at)
+                    add_notification(buffer, relative_id, message, updated_at)
+                if status == "done" and len(sample["done"]) < 20:
+                    sample["done"].append(task_id)
+            elif len(sample["pending"]) < 20:
+                sample["pending"].append(task_id)
+
+            buffer.add("task_instance", row)
+
+
+def generate_messages(buffer, relative_id, caregiver_id):
+    # Log-normal: ortalama args.messages_per_pair, uzun kuyruklu
+    sigma = 1.0
+    mu = math.log(max(1.0, args.messages_per_pair)) - sigma ** 2 / 2
+    count = int(random.lognormvariate(mu, sigma))
+    span = timedelta(days=args.days).total_seconds()
+    times = sorted(now - timedelta(seconds=random.random() * span) for _ in range(count))
+    for sent_at in times:
+        relative_sends = random.random() < 0.5
+        is_edited = random.random() < 0.03
+        buffer.add("message", {
+            "id": buffer.next_id("message"),
+            "sender_id": relative_id if relative_sends else caregiver_id,
+            "receiver_id": caregiver_id if relative_sends else relative_id,
+            "content": " ".join(random.choices(MESSAGE_WORDS, k=random.randint(2, 18))),
+            "sent_at": sent_at,
+            "is_edited": is_edited,
+            "edited_at": sent_at + timedelta(minutes=2) if is_edited else None,
+            "is_deleted": random.random() < 0.02,
+            "is_read": sent_at < now - timedelta(hours=6) or random.random() < 0.5,
+        })
+
+
+started = time.perf_counter()
+buffer = Buffer()
+households = []
+for _ in range(args.households):
+    relative_id = add_user(buffer, "hasta_yakini")
+    caregiver_ids = [
+        add_user(buffer, "hasta_bakici")
+        for _ in range(random.choices([1, 2, 3], [60, 30, 10])[0])
+    ]
+
+    templates = []
+    for title, description in random.sample(TEMPLATE_TITLES, random.randint(5, 12)):
+        template_id = buffer.next_id("task_template")
+        buffer.add("task_template", {
+            "id": template_id,
+            "title": title,
+            "description": description,
+            "default_time": f"{random.randint(7, 21):02d}:00",
+            "created_by_id": relative_id,
+            "is_active": True,
+            "created_at": today - timedelta(days=args.days + 1),
+        })
+        templates.append((template_id, title, description))
+
+    household = {
+        "relative_id": relative_id,
+        "caregiver_ids": caregiver_ids,
+        "template_ids": [t[0] for t in templates],
+        "pending_task_ids": {},
+        "done_task_ids": [],
+    }
+    for caregiver_id in caregiver_ids:
+        sample = {"pending": [], "done": []}
+        generate_tasks(buffer, relative_id, caregiver_id, templates, sample)
+        generate_messages(buffer, relative_id, caregiver_id)
+        household["pending_task_ids"][str(caregiver_id)] = sample["pending"]
+        household["done_task_ids"].extend(sample["done"])
+    households.append(household)
+
+# Tamponda kalan satırlar
+buffer.flush()
+with engine.begin() as conn:
+    # id'ler açıkça verildi; uygulamanın eklediği yeni satırlar için
+    reset_sequences(conn, Base.metadata.sorted_tables)
+load_elapsed = time.perf_counter() - started
+
+started = time.perf_counter()
+with engine.connect() as conn:
+    conn.exec_driver_sql("ANALYZE")
+index_elapsed = time.perf_counter() - started
+
+manifest = {
+    "generated_at": now.isoformat(),
+    "args": vars(args),
+    "counts": buffer.counts,
+    "households": households,
+}
+with open(os.path.join(args.out, "manifest.json"), "w", encoding="utf-8") as f:
+    json.dump(manifest, f, ensure_ascii=False)
+
+for table, count in buffer.counts.items():
+    print(f"{table:15s} {count:>10,}")
+print(f"Yükleme: {load_elapsed:.1f} sn, ANALYZE: {index_elapsed:.1f} sn")
+if engine.dialect.name == "sqlite":
+    print(f"Veritabanı: {db_path} ({os.path.getsize(db_path) / 1024 / 1024:.1f} MB)")
+else:
+    print(f"Veritabanı: {engine.url.render_as_string(hide_password=True)}")
@@ -0,0 +1,300 @@
+# ===================================================================
+# UÇTAN UCA YÜK TESTİ (load_test.py)
+# ===================================================================
+# Flutter uygulamasının (lib/core/api_client.dart) çağrı karışımını
+# generate_data.py ile üretilmiş bir veritabanına karşı tekrar oynatır ve
+# route başına throughput ile p50/p95/p99 gecikmeyi raporlar.
+#
+# İki çalışma şekli vardır:
+# - Süreç içi (varsayılan): Uygulama bu süreçte --data-dir'deki
+#   healthcare.db ile açılır ve TestClient ile çağrılır
+# - Ağ üzerinden: --base-url verilirse çalışan bir sunucuya (uvicorn)
+#   HTTP istekleri gönderilir; sunucu aynı veritabanıyla başlatılmış olmalıdır
+#
+# Sonuçlar JSON olarak kaydedilir; --baseline ile önceki bir çalıştırmayla
+# route bazında karşılaştırılabilir. backend/ klasöründen çalıştırılır:
+#
+#   python -m benchmarks.load_test --data-dir scale_data --duration 30 --concurrency 8
+#   python -m benchmarks.load_test --data-dir scale_data --base-url http://127.0.0.1:8000
+#   python -m benchmarks.load_test --data-dir scale_data --baseline load_results/önceki.json
+#
+# Not: Fotoğraf/ek yükleme çağrıları karışıma dahil değildir (diske dosya
+# yazarlar ve gecikmeleri veritabanından çok disk/ağ hızına bağlıdır).
+# ===================================================================
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description="API yük testi (api_client.dart çağrı karışımı)")
+parser.add_argument("--data-dir", default="scale_data", help="generate_data.py çıktı klasörü")
+parser.add_argument("--base-url", default=None, help="Çalışan sunucu adresi (verilmezse süreç içi)")
+parser.add_argument("--duration", type=float, default=30.0, help="Saniye")
+parser.add_argument("--concurrency", type=int, default=8, help="Eşzamanlı sanal kullanıcı sayısı")
+parser.add_argument("--warmup", type=float, default=3.0, help="Ölçülmeyen ısınma süresi (saniye)")
+parser.add_argument("--no-writes", action="store_true", help="Sadece okuma çağrılarını oynat")
+parser.add_argument("--output", default="load_results", help="JSON sonuçlarının yazılacağı klasör")
+parser.add_argument("--baseline", default=None, help="Karşılaştırılacak önceki sonuç dosyası")
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+with open(os.path.join(args.data_dir, "manifest.json"), encoding="utf-8") as f:
+    manifest = json.load(f)
+households = manifest["households"]
+
+
+# -------------------------------------------------------------------
+# Çağrı karışımı
+# -------------------------------------------------------------------
+# Her senaryo: (ağırlık, rol, route etiketi, yazma mı, istek üretici)
+# Ağırlıklar uygulamanın ekran akışına göre belirlenmiştir: ana ekranlar
+# her açılışta görev listesi + bildirimleri çeker, yazma işlemleri seyrektir.
+# İstek üretici (method, url, json_body) döndürür.
+
+def _caregiver(household, rng):
+    return rng.choice(household["caregiver_ids"])
+
+
+def _pending_task(household, caregiver_id, rng):
+    task_ids = household["pending_task_ids"].get(str(caregiver_id)) or [1]
+    return rng.choice(task_ids)
+
+
+def _future_time(rng):
+    return (datetime.utcnow() + timedelta(days=rng.randint(1, 14), hours=rng.randint(0, 12))).replace(microsecond=0).isoformat()
+
+
+CAREGIVER_CALLS = [
+    (18, "GET /tasks/assigned/{user_id}", False,
+     lambda h, u, r: ("GET", f"/tasks/assigned/{u}", None)),
+    (6, "GET /tasks/assigned/{user_id}?status", False,
+     lambda h, u, r: ("GET", f"/tasks/assigned/{u}?status=pending", None)),
+    (12, "GET /notifications/{user_id}", False,
+     lambda h, u, r: ("GET", f"/notifications/{u}", None)),
+    (1, "POST /notifications/{user_id}/read_all", True,
+     lambda h, u, r: ("POST", f"/notifications/{u}/read_all", None)),
+    (6, "PATCH /tasks/instances/status", True,
+     lambda h, u, r: ("PATCH", "/tasks/instances/status", {
+         "task_id": _pending_task(h, u, r),
+         "user_id": u,
+         "status": r.choices(["in_progress", "done", "problem"], [3, 6, 1])[0],
+         "problem_message": None,
+         "problem_severity": None,
+         "resolution_note": None,
+     })),
+    (4, "GET /statistics/caregiver/{user_id}/overview", False,
+     lambda h, u, r: ("GET", f"/statistics/caregiver/{u}/overview", None)),
+    (2, "GET /statistics/caregiver/{user_id}/weekly-summary", False,
+     lambda h, u, r: ("GET", f"/statistics/caregiver/{u}/weekly-summary", None)),
+    (5, "GET /messages/conversations/{user_id}", False,
+     lambda h, u, r: ("GET", f"/messages/conversations/{u}", None)),
+    (6, "GET /messages/conversation/{other_user_id}", False,
+     lambda h, u, r: ("GET", f"/messages/conversation/{h['relative_id']}?current_user_id={u}", None)),
+    (4, "POST /messages/send", True,
+     lambda h, u, r: ("POST", "/messages/send", {
+         "sender_id": u, "receiver_id": h["relative_id"], "content": "Görev tamamlandı, her şey yolunda",
+     })),
+    (2, "GET /users/{user_id}", False,
+     lambda h, u, r: ("GET", f"/users/{u}", None)),
+]
+
+RELATIVE_CALLS = [
+    (12, "GET /tasks/created/{user_id}", False,
+     lambda h, u, r: ("GET", f"/tasks/created/{u}", None)),
+    (4, "GET /tasks/templates/user/{user_id}", False,
+     lambda h, u, r: ("GET", f"/tasks/templates/user/{u}", None)),
+    (2, "GET /tasks/templates/{template_id}", False,
+     lambda h, u, r: ("GET", f"/tasks/templates/{r.choice(h['template_ids'])}", None)),
+    (3, "GET /users/caregivers", False,
+     lambda h, u, r: ("GET", "/users/caregivers", None)),
+    (6, "GET /notifications/{user_id}", False,
+     lambda h, u, r: ("GET", f"/notifications/{u}", None)),
+    (3, "POST /tasks/instances", True,
+     lambda h, u, r: ("POST", "/tasks/instances", {
+         "template_id": r.choice(h["template_ids"]),
+         "title": "Yük testi görevi",
+         "description": None,
+         "created_by_id": u,
+         "assigned_to_id": _caregiver(h, r),
+         "scheduled_for": _future_time(r),
+     })),
+    (1, "PUT /tasks/instances/{task_id}", True,
+     lambda h, u, r: ("PUT", f"/tasks/instances/{_pending_task(h, _caregiver(h, r), r)}",
+                      {"scheduled_for": _future_time(r)})),
+    (1, "PATCH /tasks/instances/{task_id}/rating", True,
+     lambda h, u, r: ("PATCH", f"/tasks/instances/{r.choice(h['done_task_ids'] or [1])}/rating"
+                      f"?current_user_id={u}&rating={r.randint(3, 5)}", None)),
+    (4, "GET /statistics/relative/{user_id}/overview", False,
+     lambda h, u, r: ("GET", f"/statistics/relative/{u}/overview", None)),
+    (2, "GET /statistics/relative/{user_id}/caregiver-performance", False,
+     lambda h, u, r: ("GET", f"/statistics/relative/{u}/caregiver-performance", None)),
+    (2, "GET /statistics/relative/{user_id}/problem-trends", False,
+     lambda h, u, r: ("GET", f"/statistics/relative/{u}/problem-trends?days=30", None)),
+    (4, "GET /messages/conversations/{user_id}", False,
+     lambda h, u, r: ("GET", f"/messages/conversations/{u}", None)),
+    (4, "GET /messages/conversation/{other_user_id}", False,
+     lambda h, u, r: ("GET", f"/messages/conversation/{_caregiver(h, r)}?current_user_id={u}", None)),
+    (3, "POST /messages/send", True,
+     lambda h, u, r: ("POST", "/messages/send", {
+         "sender_id": u, "receiver_id": _caregiver(h, r), "content": "Akşam ilacını unutmayalım",
+     })),
+]
+
+CALLS = (
+    [("hasta_bakici",) + call for call in CAREGIVER_CALLS]
+    + [("hasta_yakini",) + call for call in RELATIVE_CALLS]
+)
+if args.no_writes:
+    CALLS = [call for call in CALLS if not call[3]]
+WEIGHTS = [call[1] for call in CALLS]
+
+
+# -------------------------------------------------------------------
+# İstemci
+# -------------------------------------------------------------------
+
+def make_client():
+    if args.base_url:
+        import httpx
+        return httpx.Client(base_url=args.base_url, timeout=30.0)
+    from fastapi.testclient import TestClient
+    return TestClient(app)
+
+
+if not args.base_url:
+    # Uygulama veritabanını çalışma klasöründeki ./healthcare.db'den açar
+    os.chdir(args.data_dir)
+    from app.main import app  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+samples = defaultdict(list)   # route -> [ms]
+errors = defaultdict(int)     # route -> hata sayısı
+samples_lock = threading.Lock()
+
+
+def worker(worker_id, measure_from, deadline):
+    rng = random.Random(args.seed + worker_id)
+    client = make_client()
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        role, _, label, _, build = rng.choices(CALLS, WEIGHTS)[0]
+        household = rng.choice(households)
+        user_id = household["relative_id"] if role == "hasta_yakini" else _caregiver(household, rng)
+        method, url, body = build(household, user_id, rng)
+
+        started = time.perf_counter()
+        try:
+            response = client.request(method, url, json=body)
+            failed = response.status_code >= 400
+        except Exception:
+            failed = True
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if started < measure_from:
+            continue
+        with samples_lock:
+            samples[label].append(elapsed_ms)
+            if failed:
+                errors[label] += 1
+
+
+start = time.perf_counter()
+measure_from = start + args.warmup
+deadline = measure_from + args.duration
+threads = [
+    threading.Thread(target=worker, args=(i, measure_from, deadline))
+    for i in range(args.concurrency)
+]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+
+
+# -------------------------------------------------------------------
+# Rapor
+# -------------------------------------------------------------------
+
+def summarize(values, error_count):
+    return {
+        "count": len(values),
+        "errors": error_count,
+        "rps": round(len(values) / args.duration, 2),
+        "mean_ms": round(statistics.fmean(values), 2),
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(max(values), 2),
+    }
+
+
+all_values = [v for values in samples.values() for v in values]
+if not all_values:
+    raise SystemExit("Hiç istek ölçülemedi (--duration çok kısa olabilir).")
+
+try:
+    commit = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+    ).stdout.strip()
+except (OSError, subprocess.CalledProcessError):
+    commit = None
+
+result = {
+    "started_at": datetime.utcnow().replace(microsecond=0).isoformat(),
+    "commit": commit,
+    "config": {
+        "mode": "http" if args.base_url else "in_process",
+        "base_url": args.base_url,
+        "duration": args.duration,
+        "concurrency": args.concurrency,
+        "no_writes": args.no_writes,
+        "seed": args.seed,
+        "data_counts": manifest.get("counts"),
+    },
+    "total": summarize(all_values, sum(errors.values())),
+    "routes": {
+        label: summarize(values, errors[label])
+        for label, values in sorted(samples.items())
+    },
+}
+
+baseline = None
+if args.baseline:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+print(f"{'route':58s} {'adet':>7s} {'hata':>5s} {'rps':>7s} {'p50':>8s} {'p95':>8s} {'p99':>8s}"
+      + ("  p95 değişim" if baseline else ""))
+for label, stats in list(result["routes"].items()) + [("TOPLAM", result["total"])]:
+    line = (f"{label:58s} {stats['count']:>7d} {stats['errors']:>5d} {stats['rps']:>7.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    if baseline:
+        old = baseline["total"] if label == "TOPLAM" else baseline["routes"].get(label)
+        if old and old["p95_ms"]:
+            line += f"  {(stats['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:+7.1f}%"
+    print(line)
+
+output_dir = args.output
+if not args.base_url and not os.path.isabs(output_dir):
+    # Süreç içi modda çalışma klasörü --data-dir'e taşındı
+    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", output_dir)
+os.makedirs(output_dir, exist_ok=True)
+output_path = os.path.join(output_dir, f"load_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json")
+with open(output_path, "w", encoding="utf-8") as f:
+    json.dump(result, f, ensure_ascii=False, indent=2)
+print(f"Sonuçlar: {os.path.normpath(output_path)}")
@@ -0,0 +1,53 @@
+# ===================================================================
+# BİLDİRİM TESLİMAT SCRIPT'İ (deliver_notifications.py)
+# ===================================================================
+# notification_outbox tablosundaki bekleyen bildirim olaylarını teslim eder
+# (app/outbox.py). Uygulama worker'ı kapalıysa (OUTBOX_WORKER=0) ayrı bir
+# süreç olarak çalıştırılır. backend/ klasöründen çalıştırılır:
+#
+#   python deliver_notifications.py            # bekleyenleri teslim et, çık
+#   python deliver_notifications.py --loop     # sürekli çalış
+#   python deliver_notifications.py --status   # durum sayıları
+#   python deliver_notifications.py --purge --retention-hours 24
+# ===================================================================
+
+import argparse
+import json
+import time
+
+from app.outbox import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_POLL_INTERVAL,
+    OUTBOX_RETENTION_HOURS,
+    drain,
+    outbox_stats,
+    purge_delivered,
+)
+
+parser = argparse.ArgumentParser(description="Bildirim outbox'ını teslim eder")
+parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+parser.add_argument("--max-batches", type=int, default=None)
+parser.add_argument("--loop", action="store_true", help="Sürekli çalış (Ctrl+C ile durdur)")
+parser.add_argument("--interval", type=float, default=OUTBOX_POLL_INTERVAL, help="--loop bekleme süresi (saniye)")
+parser.add_argument("--status", action="store_true", help="Sadece durum sayılarını göster")
+parser.add_argument("--purge", action="store_true", help="Saklama süresi dolmuş teslim edilmiş olayları sil")
+parser.add_argument("--retention-hours", type=float, default=OUTBOX_RETENTION_HOURS)
+args = parser.parse_args()
+
+if args.status:
+    print(json.dumps(outbox_stats(), indent=2))
+elif args.purge:
+    print(f"Silinen olay: {purge_delivered(args.retention_hours)}")
+elif args.loop:
+    try:
+        while True:
+            delivered = drain(args.batch_size, args.max_batches)
+            if delivered:
+                print(f"Teslim edilen/işlenen olay: {delivered}")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+else:
+    delivered = drain(args.batch_size, args.max_batches)
+    print(f"İşlenen olay: {delivered}")
+    print(json.dumps(outbox_stats(), indent=2))
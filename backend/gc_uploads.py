@@ -0,0 +1,52 @@
+# ===================================================================
+# YETİM DOSYA TEMİZLEME SCRIPT'İ (gc_uploads.py)
+# ===================================================================
+# uploads/ klasöründe veritabanında referansı kalmamış dosyaları ve
+# süresi dolmuş parça parça yükleme oturumlarını siler.
+# backend/ klasöründen çalıştırılır:
+#
+#   python gc_uploads.py --dry-run
+#   python gc_uploads.py --batch-size 500 --grace-hours 24
+#   python gc_uploads.py --max-batches 10 --start-after task_photos/x.jpg
+# ===================================================================
+
+import argparse
+import json
+
+from app.sharding import all_shards
+from app.upload_sessions import expire_upload_sessions
+from app.upload_gc import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_GRACE_SECONDS,
+    collect_orphaned_uploads,
+)
+
+parser = argparse.ArgumentParser(description="Yetim upload dosyalarını temizler")
+parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+parser.add_argument("--grace-hours", type=float, default=DEFAULT_GRACE_SECONDS / 3600)
+parser.add_argument("--max-batches", type=int, default=None)
+parser.add_argument("--start-after", default=None, help="Önceki çalıştırmanın next_cursor değeri")
+parser.add_argument("--pause", type=float, default=0.0, help="Partiler arası bekleme (saniye)")
+parser.add_argument("--dry-run", action="store_true", help="Hiçbir şey silmeden raporla")
+args = parser.parse_args()
+
+report = collect_orphaned_uploads(
+    batch_size=args.batch_size,
+    grace_seconds=int(args.grace_hours * 3600),
+    max_batches=args.max_batches,
+    start_after=args.start_after,
+    dry_run=args.dry_run,
+    pause_seconds=args.pause,
+)
+
+if not args.dry_run:
+    report["expired_upload_sessions"] = 0
+    for shard in all_shards():
+        db = shard.session(write=True)
+        try:
+            report["expired_upload_sessions"] += expire_upload_sessions(db)
+        finally:
+            db.close()
+
+print(json.dumps(report, indent=2, ensure_ascii=False))
+print(f"\nGeri kazanılan alan: {report['bytes_reclaimed'] / 1024:.1f} KB")
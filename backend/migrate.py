@@ -0,0 +1,50 @@
+# ===================================================================
+# ŞEMA MİGRASYON SCRIPT'İ (migrate.py)
+# ===================================================================
+# app/migrations/ altındaki sıralı migrasyonları veritabanına uygular
+# (eski update_db.py ve açılıştaki create_all'ın yerini alır).
+# backend/ klasöründen çalıştırılır:
+#
+#   python migrate.py               # Bekleyen tüm migrasyonları uygula
+#   python migrate.py upgrade --to 5
+#   python migrate.py status        # Uygulanan ve bekleyen sürümler
+#   python migrate.py verify        # models.py ile veritabanını karşılaştır
+# ===================================================================
+
+import argparse
+import sys
+
+from app import models  # noqa: F401  (tabloların metadata'ya kaydı için)
+from app.database import Base, engine
+from app.migrations import applied_versions, load_migrations, schema_problems, upgrade
+
+parser = argparse.ArgumentParser(description="Veritabanı şema migrasyonları")
+sub = parser.add_subparsers(dest="command")
+upgrade_parser = sub.add_parser("upgrade", help="Bekleyen migrasyonları uygula (varsayılan)")
+upgrade_parser.add_argument("--to", type=int, default=None, help="Hedef sürüm")
+sub.add_parser("status", help="Uygulanan ve bekleyen migrasyonlar")
+sub.add_parser("verify", help="models.py'deki tablo/sütun/indekslerin veritabanında olduğunu kontrol et")
+args = parser.parse_args()
+
+command = args.command or "upgrade"
+
+if command == "upgrade":
+    applied = upgrade(engine, target=getattr(args, "to", None), log=print)
+    print(f"{len(applied)} migrasyon uygulandı." if applied else "Şema güncel.")
+
+elif command == "status":
+    with engine.connect() as conn:
+        applied = {row["version"]: row for row in applied_versions(conn)}
+    for migration in load_migrations():
+        row = applied.get(migration.version)
+        state = f"uygulandı {row['applied_at']} ({row['duration_ms']} ms)" if row else "BEKLİYOR"
+        print(f"v{migration.version:04d}  {migration.description:55s} {state}")
+
+elif command == "verify":
+    problems = schema_problems(engine, Base.metadata)
+    for problem in problems:
+        print(problem)
+    if problems:
+        print("\nmodels.py'deki değişiklikler için yeni bir migrasyon ekleyin.")
+        sys.exit(1)
+    print("Veritabanı şeması models.py ile uyumlu.")
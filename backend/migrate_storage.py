@@ -0,0 +1,68 @@
+# ===================================================================
+# DEPOLAMA TAŞIMA SCRIPT'İ (migrate_storage.py)
+# ===================================================================
+# Yerel uploads/ klasöründeki dosyaları ortam değişkenleri ile seçilen
+# hedef backend'e (genelde S3/MinIO) kopyalar. Dosyalar parça parça
+# aktarılır; hedefte aynı boyutta mevcut olan dosyalar atlanır, bu yüzden
+# script yarıda kesilse bile tekrar çalıştırılabilir.
+#
+# Veritabanındaki /uploads/<key> URL'leri değişmez, sadece dosyalar taşınır.
+# backend/ klasöründen çalıştırılır:
+#
+#   STORAGE_BACKEND=s3 S3_BUCKET=healthcare S3_ENDPOINT_URL=http://localhost:9000 \
+#       python migrate_storage.py --dry-run
+#   ... python migrate_storage.py --delete-source
+# ===================================================================
+
+import argparse
+
+from app.storage import PARTIAL_SUFFIX, UPLOAD_DIR, LocalStorage, create_storage_from_env
+
+parser = argparse.ArgumentParser(description="Upload dosyalarını yeni depolama backend'ine taşır")
+parser.add_argument("--source", default=UPLOAD_DIR, help="Kaynak uploads klasörü")
+parser.add_argument("--dry-run", action="store_true", help="Hiçbir şey kopyalamadan raporla")
+parser.add_argument("--delete-source", action="store_true", help="Kopyalanan dosyaları kaynaktan sil")
+args = parser.parse_args()
+
+source = LocalStorage(args.source)
+target = create_storage_from_env()
+
+if isinstance(target, LocalStorage) and target.root == source.root:
+    raise SystemExit("Hedef backend kaynak ile aynı. STORAGE_BACKEND=s3 ayarlayın.")
+
+copied = skipped = failed = 0
+copied_bytes = 0
+
+for key, size, _ in source.iter_objects():
+    # Yarım kalmış yüklemeler taşınmaz
+    if key.endswith(PARTIAL_SUFFIX):
+        continue
+
+    if target.exists(key) and target.size(key) == size:
+        skipped += 1
+        continue
+
+    if args.dry_run:
+        print(f"Kopyalanacak: {key} ({size} byte)")
+        copied += 1
+        copied_bytes += size
+        continue
+
+    try:
+        with open(source.path(key), "rb") as f:
+            target.save(key, f)
+    except Exception as e:
+        print(f"Hata ({key}): {e}")
+        failed += 1
+        continue
+
+    copied += 1
+    copied_bytes += size
+    print(f"Kopyalandı: {key}")
+
+    if args.delete_source:
+        source.delete(key)
+
+print(f"\nKopyalanan: {copied} dosya ({copied_bytes / 1024:.1f} KB)")
+print(f"Atlanan (zaten mevcut): {skipped}")
+print(f"Hatalı: {failed}")
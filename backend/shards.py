@@ -0,0 +1,78 @@
+# ===================================================================
+# SHARD YÖNETİM SCRIPT'İ (shards.py)
+# ===================================================================
+# Hane bazlı sharding'in (app/sharding.py) bakım araçları. SHARD_COUNT
+# ortam değişkeni uygulamayla aynı olmalıdır. backend/ klasöründen çalıştırılır:
+#
+#   SHARD_COUNT=4 python shards.py init       # Shard'ları oluştur/migrasyonları uygula,
+#                                             # mevcut kullanıcıları dizine ekle
+#   SHARD_COUNT=4 python shards.py status     # Shard başına hane/satır sayıları
+#   SHARD_COUNT=4 python shards.py move --household 12 --to 3
+#   SHARD_COUNT=4 python shards.py rebalance --dry-run
+#   SHARD_COUNT=4 python shards.py rebalance --include-main
+#
+# Taşıma sırasında hanenin istekleri 503 + Retry-After alır (birkaç saniye).
+# ===================================================================
+
+import argparse
+import json
+import sys
+
+from app.database import engine
+from app.migrations import upgrade
+from app.sharding import (
+    SHARD_COUNT,
+    backfill_directory,
+    move_household,
+    plan_rebalance,
+    prepare_shard,
+    shard_overview,
+)
+
+parser = argparse.ArgumentParser(description="Hane bazlı shard yönetimi")
+sub = parser.add_subparsers(dest="command")
+sub.add_parser("init", help="Shard'ları oluştur, migrasyonları uygula, kullanıcıları kopyala")
+sub.add_parser("status", help="Shard başına hane, kullanıcı ve satır sayıları")
+move_parser = sub.add_parser("move", help="Bir haneyi başka bir shard'a taşı")
+move_parser.add_argument("--household", type=int, required=True, help="Hane ID'si (hasta yakınının kullanıcı ID'si)")
+move_parser.add_argument("--to", type=int, required=True, help="Hedef shard (1..SHARD_COUNT)")
+rebalance_parser = sub.add_parser("rebalance", help="Haneleri shard'lar arasında dengele")
+rebalance_parser.add_argument("--dry-run", action="store_true", help="Sadece planı yazdır")
+rebalance_parser.add_argument("--include-main", action="store_true",
+                              help="Ana veritabanındaki (shard 0) haneleri de dağıt")
+args = parser.parse_args()
+
+if SHARD_COUNT <= 0:
+    print("Sharding kapalı: SHARD_COUNT ortam değişkenini ayarlayın (ör. SHARD_COUNT=4).")
+    sys.exit(1)
+
+command = args.command or "status"
+
+if command == "init":
+    upgrade(engine, log=print)
+    for index in range(1, SHARD_COUNT + 1):
+        applied = prepare_shard(index, log=lambda message, index=index: print(f"[shard {index}] {message}"))
+        print(f"[shard {index}] {len(applied)} migrasyon uygulandı." if applied else f"[shard {index}] Şema güncel.")
+    print(f"{backfill_directory()} kullanıcı shard dizinine eklendi.")
+
+elif command == "status":
+    print(json.dumps(shard_overview(), indent=2, ensure_ascii=False))
+
+elif command == "move":
+    try:
+        move_household(args.household, args.to, log=print)
+    except ValueError as exc:
+        print(exc)
+        sys.exit(1)
+
+elif command == "rebalance":
+    moves = plan_rebalance(include_main=args.include_main)
+    if not moves:
+        print("Shard'lar dengeli.")
+    for household, source, target in moves:
+        print(f"Hane {household}: shard {source} -> {target}")
+        if not args.dry_run:
+            try:
+                move_household(household, target, log=print)
+            except ValueError as exc:
+                print(f"  atlandı: {exc}")
@@ -0,0 +1,144 @@
+# ===================================================================
+# TEST ORTAMI (tests/conftest.py)
+# ===================================================================
+# Testler uygulamayı süreç içinde (TestClient) geçici bir SQLite
+# veritabanına karşı çalıştırır; şema migrasyonlarla oluşturulur
+# (AUTO_MIGRATE=1). Yüklenen dosyalar da geçici klasöre yazılır.
+#
+# DATABASE_URL bir PostgreSQL adresiyse tüm testler o veritabanına karşı
+# çalışır ve @pytest.mark.postgres testleri de etkinleşir; aksi halde
+# postgres testleri atlanır.
+#
+# Sorgu bütçesi eklentisi (app/pytest_plugin.py) etkindir: Tüm testler
+# raiseload modunda çalışır, @pytest.mark.query_budget(n) kullanılabilir.
+#
+# Çalıştırma (backend/ klasöründen):
+#   python -m pytest -q
+#   DATABASE_URL=postgresql+psycopg2://... python -m pytest -q
+# ===================================================================
+
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="healthcare-tests-")
+POSTGRES_URL = os.environ.get("DATABASE_URL", "") if os.environ.get("DATABASE_URL", "").startswith("postgresql") else None
+
+# Uygulama modülleri ortam değişkenlerini import sırasında okur
+os.environ["DATABASE_URL"] = POSTGRES_URL or f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_TMP_DIR, "uploads")
+os.environ["SHARD_DIR"] = os.path.join(_TMP_DIR, "shards")
+os.environ["AUTO_MIGRATE"] = "1"
+os.environ["OUTBOX_WORKER"] = "0"
+os.environ["SHARD_COUNT"] = "0"
+os.environ.pop("ADMIN_TOKEN", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.idempotency import store as idempotency_store  # noqa: E402
+from app.main import app  # noqa: E402
+from app.rate_limit import limiter  # noqa: E402
+
+pytest_plugins = ["app.pytest_plugin"]
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "postgres: Gerçek bir PostgreSQL gerektirir (DATABASE_URL=postgresql+psycopg2://...).",
+    )
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+def pytest_collection_modifyitems(config, items):
+    if POSTGRES_URL:
+        return
+    skip = pytest.mark.skip(reason="DATABASE_URL bir PostgreSQL adresi değil")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def _reset_limits():
+    """Testler birbirinin hız sınırı bucket'larını ve idempotency anahtarlarını görmez."""
+    limiter.reset()
+    idempotency_store.clear()
+    yield
+
+
+# -------------------------------------------------------------------
+# Test verisi (her biri kendi kısa session'ında yazılır, id döndürür)
+# -------------------------------------------------------------------
+
+def _insert(obj) -> int:
+    with SessionLocal() as db:
+        db.add(obj)
+        db.commit()
+        return obj.id
+
+
+@pytest.fixture
+def make_user():
+    def _make(role: str = "hasta_yakini", full_name: str = "Test Kullanıcı") -> int:
+        return _insert(models.AppUser(
+            full_name=full_name,
+            email=f"{uuid.uuid4().hex}@test.local",
+            role=role,
+            hashed_password="-",
+            is_active=True,
+        ))
+    return _make
+
+
+@pytest.fixture
+def make_task():
+    templates = {}
+
+    def _make(created_by_id: int, assigned_to_id: int, **fields) -> int:
+        if created_by_id not in templates:
+            templates[created_by_id] = _insert(models.TaskTemplate(
+                title="İlaç", created_by_id=created_by_id, is_active=True,
+            ))
+        now = datetime.utcnow()
+        values = {"title": "İlaç", "status": "pending", "scheduled_for": now,
+                  "created_at": now, "updated_at": now, **fields}
+        return _insert(models.TaskInstance(
+            template_id=templates[created_by_id],
+            created_by_id=created_by_id,
+            assigned_to_id=assigned_to_id,
+            **values,
+        ))
+    return _make
+
+
+@pytest.fixture
+def make_message():
+    def _make(sender_id: int, receiver_id: int, content: str = "Merhaba", attachments: int = 0) -> int:
+        message_id = _insert(models.Message(
+            sender_id=sender_id, receiver_id=receiver_id, content=content,
+            sent_at=datetime.utcnow(), is_read=False, is_deleted=False,
+        ))
+        for index in range(attachments):
+            _insert(models.MessageAttachment(
+                message_id=message_id, file_type="document",
+                file_path=f"/uploads/messages/{message_id}_{index}.pdf",
+                file_name=f"ek_{index}.pdf", file_size=10,
+            ))
+        return message_id
+    return _make
@@ -0,0 +1,33 @@
+# ===================================================================
+# YÖNETİM ENDPOINT TESTLERİ (test_admin.py)
+# ===================================================================
+# /admin/* erişimi: ADMIN_TOKEN yoksa kapalı (403), varsa X-Admin-Token
+# header'ı gerekir; ADMIN_OPEN=1 geliştirme için token'sız açar.
+# ===================================================================
+
+from app.routers import admin
+
+
+def test_admin_is_closed_without_token(client, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    monkeypatch.setattr(admin, "ADMIN_OPEN", False)
+
+    assert client.get("/admin/slow-queries").status_code == 403
+    assert client.get("/admin/shards", headers={"X-Admin-Token": ""}).status_code == 403
+
+
+def test_admin_requires_matching_token(client, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "gizli")
+
+    assert client.get("/admin/shards").status_code == 403
+    assert client.get("/admin/shards", headers={"X-Admin-Token": "baska"}).status_code == 403
+    response = client.get("/admin/shards", headers={"X-Admin-Token": "gizli"})
+    assert response.status_code == 200
+    assert response.json()["shard_count"] == 0
+
+
+def test_admin_open_opt_in(client, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    monkeypatch.setattr(admin, "ADMIN_OPEN", True)
+
+    assert client.get("/admin/slow-queries").status_code == 200
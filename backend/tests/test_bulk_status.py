@@ -0,0 +1,138 @@
+# ===================================================================
+# TOPLU DURUM GÜNCELLEME TESTLERİ (test_bulk_status.py)
+# ===================================================================
+# PATCH /tasks/instances/status/bulk: Ya hepsi ya hiçbiri (eski sürüm,
+# başkasının görevi, eşzamanlı değişiklik), tekrarlanan görev reddi ve
+# hasta yakını başına tek özet bildirim.
+# ===================================================================
+
+import pytest
+from sqlalchemy import update
+
+from app import crud, models
+from app.database import SessionLocal
+
+
+@pytest.fixture
+def round_tasks(make_user, make_task):
+    """İki hasta yakınının, aynı bakıcıya atanmış görevleri (2 + 1)."""
+    first, second, caregiver = make_user(), make_user(), make_user("hasta_bakici")
+    tasks = [make_task(first, caregiver), make_task(first, caregiver), make_task(second, caregiver)]
+    return caregiver, tasks, {first: tasks[:2], second: tasks[2:]}
+
+
+def _bulk(client, caregiver, items):
+    return client.patch("/tasks/instances/status/bulk", json={"user_id": caregiver, "items": items})
+
+
+def _state(task_ids):
+    with SessionLocal() as db:
+        return {
+            task.id: (task.status, task.version)
+            for task in db.query(models.TaskInstance).filter(models.TaskInstance.id.in_(task_ids))
+        }
+
+
+def _outbox(owner_ids):
+    with SessionLocal() as db:
+        return db.query(models.NotificationOutbox).filter(
+            models.NotificationOutbox.user_id.in_(owner_ids)
+        ).all()
+
+
+def test_applies_all_and_sends_one_notification_per_owner(client, round_tasks):
+    caregiver, tasks, owners = round_tasks
+    response = _bulk(client, caregiver, [
+        {"task_id": tasks[0], "status": "done", "version": 1},
+        {"task_id": tasks[1], "status": "problem", "problem_message": "Kusma", "problem_severity": "critical"},
+        {"task_id": tasks[2], "status": "done"},
+    ])
+
+    assert response.status_code == 200
+    assert {task["id"]: task["version"] for task in response.json()} == dict.fromkeys(tasks, 2)
+    assert _state(tasks) == {tasks[0]: ("done", 2), tasks[1]: ("problem", 2), tasks[2]: ("done", 2)}
+
+    outbox = _outbox(owners)
+    events = {event.user_id: event for event in outbox}
+    assert len(outbox) == len(events) == len(owners)
+    first, second = owners
+    assert events[first].event_type == "task_problem"
+    assert events[first].entity_id is None
+    assert "Kusma" in events[first].message
+    assert events[first].severity == "critical"
+    assert events[second].event_type == "task_status"
+    assert events[second].entity_id == tasks[2]
+
+
+def test_one_stale_item_rejects_whole_batch(client, round_tasks):
+    caregiver, tasks, owners = round_tasks
+    assert _bulk(client, caregiver, [{"task_id": tasks[2], "status": "in_progress"}]).status_code == 200
+    before = _state(tasks)
+    outbox_before = len(_outbox(owners))
+
+    response = _bulk(client, caregiver, [
+        {"task_id": tasks[0], "status": "done", "version": 1},
+        {"task_id": tasks[2], "status": "done", "version": 1},
+    ])
+
+    assert response.status_code == 409
+    current = response.json()["detail"]["current"]
+    assert [(task["id"], task["version"]) for task in current] == [(tasks[2], 2)]
+    assert _state(tasks) == before
+    assert len(_outbox(owners)) == outbox_before
+
+
+def test_foreign_task_rejects_whole_batch(client, round_tasks, make_user, make_task):
+    caregiver, tasks, _ = round_tasks
+    other_caregiver = make_user("hasta_bakici")
+    foreign = make_task(make_user(), other_caregiver)
+    before = _state(tasks + [foreign])
+
+    response = _bulk(client, caregiver, [
+        {"task_id": tasks[0], "status": "done"},
+        {"task_id": foreign, "status": "done"},
+    ])
+
+    assert response.status_code == 403
+    assert str(foreign) in response.json()["detail"]
+    assert _state(tasks + [foreign]) == before
+
+
+def test_duplicate_task_ids_rejected(client, round_tasks):
+    caregiver, tasks, _ = round_tasks
+    before = _state(tasks)
+
+    response = _bulk(client, caregiver, [
+        {"task_id": tasks[0], "status": "done"},
+        {"task_id": tasks[0], "status": "problem"},
+    ])
+
+    assert response.status_code == 400
+    assert _state(tasks) == before
+
+
+def test_concurrent_change_rolls_back_whole_batch(client, round_tasks, monkeypatch):
+    """Görevler kontrol edildikten sonra, UPDATE'ten önce biri değişir."""
+    caregiver, tasks, owners = round_tasks
+    load = crud.get_task_instances
+    raced = []
+
+    def load_then_race(db, task_ids):
+        loaded = load(db, task_ids)
+        if not raced:
+            raced.append(True)
+            with SessionLocal() as other:
+                other.execute(
+                    update(models.TaskInstance)
+                    .where(models.TaskInstance.id == tasks[1])
+                    .values(status="cancelled", version=models.TaskInstance.version + 1)
+                )
+                other.commit()
+        return loaded
+
+    monkeypatch.setattr(crud, "get_task_instances", load_then_race)
+    response = _bulk(client, caregiver, [{"task_id": task_id, "status": "done"} for task_id in tasks])
+
+    assert response.status_code == 409
+    assert _state(tasks) == {tasks[0]: ("pending", 1), tasks[1]: ("cancelled", 2), tasks[2]: ("pending", 1)}
+    assert _outbox(owners) == []
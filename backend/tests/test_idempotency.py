@@ -0,0 +1,107 @@
+# ===================================================================
+# IDEMPOTENCY-KEY TESTLERİ (test_idempotency.py)
+# ===================================================================
+
+import asyncio
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import crud, models
+from app.database import SessionLocal
+from app.main import app
+from app.sqlite_writes import DatabaseBusyError
+
+
+def _message_count(sender_id: int) -> int:
+    with SessionLocal() as db:
+        return db.query(models.Message).filter(models.Message.sender_id == sender_id).count()
+
+
+def _send(client, body, key):
+    return client.post("/messages/send", json=body, headers={"Idempotency-Key": key})
+
+
+def test_concurrent_duplicate_waits_and_replays(make_user, monkeypatch):
+    sender, receiver = make_user(), make_user("hasta_bakici")
+    body = {"sender_id": sender, "receiver_id": receiver, "content": "Tek mesaj"}
+
+    # İlk istek işlenirken ikincisi gelsin diye endpoint yavaşlatılır
+    get_user = crud.get_user
+
+    def slow_get_user(db, user_id):
+        time.sleep(0.2)
+        return get_user(db, user_id)
+
+    monkeypatch.setattr(crud, "get_user", slow_get_user)
+
+    async def send_twice():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/messages/send", json=body, headers={"Idempotency-Key": "k-1"}))
+            await asyncio.sleep(0.05)
+            second = await client.post("/messages/send", json=body, headers={"Idempotency-Key": "k-1"})
+            return await first, second
+
+    first, second = asyncio.run(send_twice())
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert "idempotent-replayed" not in first.headers
+    assert second.headers["idempotent-replayed"] == "true"
+    assert _message_count(sender) == 1
+
+
+def test_same_key_different_body_is_rejected(client, make_user):
+    sender, receiver = make_user(), make_user("hasta_bakici")
+    body = {"sender_id": sender, "receiver_id": receiver, "content": "Birinci"}
+
+    assert _send(client, body, "k-2").status_code == 200
+    response = _send(client, {**body, "content": "İkinci"}, "k-2")
+
+    assert response.status_code == 422
+    assert _message_count(sender) == 1
+
+
+def test_client_errors_are_replayed(client, make_user):
+    sender = make_user()
+    body = {"sender_id": sender, "receiver_id": 10 ** 9, "content": "Alıcı yok"}
+
+    assert _send(client, body, "k-3").status_code == 404
+    response = _send(client, body, "k-3")
+
+    assert response.status_code == 404
+    assert response.headers["idempotent-replayed"] == "true"
+
+
+def test_server_errors_are_not_cached(make_user, monkeypatch):
+    sender, receiver = make_user(), make_user("hasta_bakici")
+    body = {"sender_id": sender, "receiver_id": receiver, "content": "Tekrar dene"}
+    client = TestClient(app, raise_server_exceptions=False)
+
+    def busy(db, user_id):
+        raise DatabaseBusyError("meşgul")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(crud, "get_user", busy)
+        assert _send(client, body, "k-4").status_code == 503
+
+    response = _send(client, body, "k-4")
+
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+    assert _message_count(sender) == 1
+
+
+def test_keys_are_scoped_to_the_body_user(client, make_user):
+    """İstemci X-User-Id göndermez: Aynı anahtarı kullanan iki gönderen çakışmaz."""
+    receiver = make_user("hasta_bakici")
+    first, second = make_user(), make_user()
+
+    assert _send(client, {"sender_id": first, "receiver_id": receiver, "content": "Birinci"}, "k-5").status_code == 200
+    response = _send(client, {"sender_id": second, "receiver_id": receiver, "content": "İkinci"}, "k-5")
+
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+    assert _message_count(first) == _message_count(second) == 1
@@ -0,0 +1,200 @@
+# ===================================================================
+# BİLDİRİM OUTBOX TESTLERİ (test_outbox.py)
+# ===================================================================
+# Olayın görev değişikliğiyle aynı transaction'da yazılması, öncelik
+# sırası, tekrar deneme, "failed" durumu, kanal bazında eksik kalan
+# teslimatın tekrarı ve kiralaması dolan worker. Teslimat
+# deliver_batch/drain ile, sahte MemoryChannel'a karşı yapılır (testlerde
+# worker kapalıdır).
+# ===================================================================
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app import crud, models, outbox
+from app.database import SessionLocal
+from app.outbox import DELIVERED, FAILED, PENDING, InAppChannel, MemoryChannel
+from app.sharding import get_shard
+
+
+@pytest.fixture(autouse=True)
+def channels(client, monkeypatch):
+    """Önceki testlerin bıraktığı olaylar teslim edilir; kanallar test başına kurulur."""
+    monkeypatch.setattr(outbox, "_channels", [])
+    outbox.drain()
+
+    def _set(*channel_list):
+        monkeypatch.setattr(outbox, "_channels", list(channel_list))
+    return _set
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_RETRY_BASE", 0.0)
+    monkeypatch.setattr(outbox, "OUTBOX_RETRY_MAX", 0.0)
+
+
+def _enqueue(user_id, *events):
+    with SessionLocal() as db:
+        for message, event_type, severity in events:
+            crud.enqueue_notification(db, user_id=user_id, message=message, event_type=event_type, severity=severity)
+        db.commit()
+
+
+def _events(user_id):
+    with SessionLocal() as db:
+        return db.query(models.NotificationOutbox).filter(
+            models.NotificationOutbox.user_id == user_id
+        ).order_by(models.NotificationOutbox.id).all()
+
+
+def _in_app(user_id):
+    with SessionLocal() as db:
+        return db.query(models.Notification).filter(models.Notification.user_id == user_id).count()
+
+
+def _delivered_to(channel, user_id):
+    return [payload["message"] for payload in channel.delivered if payload["user_id"] == user_id]
+
+
+def test_event_is_committed_and_rolled_back_with_task_change(make_user, make_task):
+    relative, caregiver = make_user(), make_user("hasta_bakici")
+    task_id = make_task(relative, caregiver)
+
+    with SessionLocal() as db:
+        task = db.get(models.TaskInstance, task_id)
+        task.status = "done"
+        crud.enqueue_notification(db, user_id=relative, message="Geri alınacak", event_type="task_status")
+        db.rollback()
+    assert _events(relative) == []
+    with SessionLocal() as db:
+        assert db.get(models.TaskInstance, task_id).status == "pending"
+
+        task = db.get(models.TaskInstance, task_id)
+        task.status = "done"
+        crud.enqueue_notification(db, user_id=relative, message="Kaydedilecek", event_type="task_status")
+        db.commit()
+    [event] = _events(relative)
+    assert (event.message, event.status) == ("Kaydedilecek", PENDING)
+
+
+def test_api_write_and_its_event_share_one_transaction(client, make_user, make_task):
+    relative, caregiver = make_user(), make_user("hasta_bakici")
+    task_id = make_task(relative, caregiver)
+    patch = {"task_id": task_id, "user_id": caregiver, "status": "in_progress"}
+
+    assert client.patch("/tasks/instances/status", json={**patch, "version": 1}).status_code == 200
+    assert [e.entity_id for e in _events(relative)] == [task_id]
+
+    # Eski sürümle reddedilen değişiklik olay da bırakmaz
+    assert client.patch("/tasks/instances/status", json={**patch, "version": 1, "status": "done"}).status_code == 409
+    assert len(_events(relative)) == 1
+
+
+def test_critical_events_are_delivered_first(channels, make_user):
+    memory = MemoryChannel()
+    channels(memory)
+    user_id = make_user()
+    _enqueue(user_id,
+             ("normal", "task_status", None),
+             ("sorun", "task_problem", "moderate"),
+             ("kritik", "task_problem", "critical"))
+
+    assert outbox.drain(batch_size=1) == 3
+
+    assert _delivered_to(memory, user_id) == ["kritik", "sorun", "normal"]
+    assert {e.status for e in _events(user_id)} == {DELIVERED}
+
+
+def test_failed_delivery_is_retried_with_backoff(channels, make_user):
+    memory = MemoryChannel(fail_times=1)
+    channels(memory)
+    user_id = make_user()
+    _enqueue(user_id, ("tekrar", "task_status", None))
+
+    outbox.drain()
+
+    [event] = _events(user_id)
+    assert (event.status, event.attempts) == (PENDING, 1)
+    assert event.last_error == "memory: sahte hata"
+    assert event.available_at > event.created_at
+    assert event.locked_until is None
+    # Bekleme süresi dolmadan tekrar denenmez
+    outbox.drain()
+    assert _delivered_to(memory, user_id) == []
+
+
+def test_retry_delay_is_bounded_and_grows():
+    for attempts in range(12):
+        ceiling = min(outbox.OUTBOX_RETRY_MAX, outbox.OUTBOX_RETRY_BASE * 2 ** attempts)
+        assert outbox.OUTBOX_RETRY_BASE <= outbox.retry_delay(attempts) <= ceiling
+
+
+def test_event_fails_after_max_attempts(channels, make_user, no_backoff, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 3)
+    memory = MemoryChannel(fail_times=10)
+    channels(memory)
+    user_id = make_user()
+    _enqueue(user_id, ("hep hata", "task_status", None))
+
+    outbox.drain()
+
+    [event] = _events(user_id)
+    assert (event.status, event.attempts) == (FAILED, 3)
+    assert event.last_error == "memory: sahte hata"
+    assert _delivered_to(memory, user_id) == []
+
+
+def test_retry_redelivers_only_failed_channel(channels, make_user, no_backoff):
+    hook = MemoryChannel("hook", fail_times=1)
+    channels(InAppChannel(), hook)
+    user_id = make_user()
+    _enqueue(user_id, ("iki kanal", "task_status", None))
+
+    assert outbox.drain(max_batches=1) == 1
+    [event] = _events(user_id)
+    assert (event.status, event.delivered_channels) == (PENDING, "in_app")
+    assert _in_app(user_id) == 1
+
+    outbox.drain()
+
+    [event] = _events(user_id)
+    assert (event.status, event.delivered_channels, event.attempts) == (DELIVERED, "hook,in_app", 1)
+    assert _delivered_to(hook, user_id) == ["iki kanal"]
+    assert _in_app(user_id) == 1
+
+
+def test_worker_that_lost_its_lease_does_not_write(channels, make_user):
+    """Harici teslimat kiralamadan uzun sürer; olayı başka bir worker alıp teslim eder."""
+    user_id = make_user()
+    shard = get_shard(0)
+
+    class SlowChannel(MemoryChannel):
+        def deliver(self, db, events):
+            if not self.delivered:
+                # Kiralama dolar, ikinci worker olayı alır ve teslim eder
+                with SessionLocal() as other:
+                    other.execute(
+                        update(models.NotificationOutbox)
+                        .where(models.NotificationOutbox.id.in_([e.id for e in events]))
+                        .values(locked_until=datetime.utcnow() - timedelta(seconds=1))
+                    )
+                    other.commit()
+                super().deliver(db, events)
+                assert outbox.deliver_batch(shard) == 1
+                return {}
+            return super().deliver(db, events)
+
+    hook = SlowChannel("hook")
+    channels(InAppChannel(), hook)
+    _enqueue(user_id, ("tek bildirim", "task_status", None))
+
+    assert outbox.deliver_batch(shard) == 1
+
+    [event] = _events(user_id)
+    assert (event.status, event.delivered_channels) == (DELIVERED, "hook,in_app")
+    assert _in_app(user_id) == 1
+    # Harici kanal en az bir kez: iki worker da göndermiş olabilir
+    assert _delivered_to(hook, user_id) == ["tek bildirim", "tek bildirim"]
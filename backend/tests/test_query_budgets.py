@@ -0,0 +1,74 @@
+# ===================================================================
+# SORGU BÜTÇESİ TESTLERİ (test_query_budgets.py)
+# ===================================================================
+# Liste ve istatistik endpoint'lerinin sorgu sayısı veriyle büyümemelidir.
+# Her test birden fazla karşı taraf/bakıcı ile (N+1 eşiğinin üstünde)
+# veri oluşturur; kişi başına sorgu atan bir değişiklik bütçeyi aşar.
+# ===================================================================
+
+import pytest
+
+PEERS = 6
+
+
+@pytest.fixture
+def household(make_user, make_task, make_message):
+    """Bir hasta yakını, PEERS bakıcı; her bakıcıyla görevler ve ekli mesajlar."""
+    relative = make_user("hasta_yakini")
+    caregivers = [make_user("hasta_bakici", full_name=f"Bakıcı {i}") for i in range(PEERS)]
+    for caregiver in caregivers:
+        make_task(relative, caregiver, status="done", rating=4)
+        make_task(relative, caregiver, status="problem", problem_severity="critical")
+        make_message(relative, caregiver, attachments=1)
+        make_message(caregiver, relative, attachments=2)
+    return relative, caregivers
+
+
+@pytest.mark.query_budget(3)
+def test_get_conversation(client, household):
+    relative, caregivers = household
+    response = client.get(f"/messages/conversation/{caregivers[0]}", params={"current_user_id": relative})
+    assert response.status_code == 200
+    messages = response.json()
+    assert len(messages) == 2
+    assert sorted(len(m["attachments"]) for m in messages) == [1, 2]
+
+
+@pytest.mark.query_budget(3)
+def test_get_conversations(client, household):
+    relative, caregivers = household
+    response = client.get(f"/messages/conversations/{relative}")
+    assert response.status_code == 200
+    conversations = response.json()
+    assert {c["other_user_id"] for c in conversations} == set(caregivers)
+    assert all(c["unread_count"] == 1 for c in conversations)
+    assert all(c["other_user_role"] == "hasta_bakici" for c in conversations)
+
+
+@pytest.mark.parametrize(
+    "path, budget",
+    [
+        ("/statistics/relative/{relative}/overview", 6),
+        ("/statistics/relative/{relative}/caregiver-performance", 3),
+        ("/statistics/relative/{relative}/problem-trends", 5),
+        ("/statistics/caregiver/{caregiver}/overview", 6),
+        ("/statistics/caregiver/{caregiver}/weekly-summary", 2),
+    ],
+)
+def test_statistics_budget(client, household, query_counter, path, budget):
+    relative, caregivers = household
+    response = client.get(path.format(relative=relative, caregiver=caregivers[0]))
+    assert response.status_code == 200
+    assert query_counter.count <= budget, query_counter.summary()
+    assert not query_counter.repeated(), query_counter.summary()
+
+
+def test_caregiver_performance_values(client, household):
+    relative, caregivers = household
+    performance = client.get(f"/statistics/relative/{relative}/caregiver-performance").json()
+    assert {row["caregiver_id"] for row in performance} == set(caregivers)
+    for row in performance:
+        assert row["total_tasks"] == 2
+        assert row["completed_tasks"] == 1
+        assert row["completion_rate"] == 50.0
+        assert row["average_rating"] == 4.0
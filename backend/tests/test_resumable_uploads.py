@@ -0,0 +1,246 @@
+# ===================================================================
+# DEVAM ETTİRİLEBİLİR YÜKLEME TESTLERİ (test_resumable_uploads.py)
+# ===================================================================
+# Oturum oluşturma, parça gönderme (PATCH), offset sorgulama (HEAD),
+# kopan bağlantıdan devam, tamamlama, eşzamanlı ikinci tamamlama,
+# iptal ve süre dolması.
+# ===================================================================
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import update
+
+from app import models
+from app.database import SessionLocal
+from app.main import app
+from app.routers import resumable_uploads
+from app.storage import get_storage, url_to_key
+from app.upload_sessions import session_file_path
+
+DATA = b"0123456789" * 10
+
+
+@pytest.fixture
+def message(make_user, make_message):
+    sender, receiver = make_user(), make_user("hasta_bakici")
+    return sender, make_message(sender, receiver)
+
+
+@pytest.fixture
+def task(make_user, make_task):
+    relative, caregiver = make_user(), make_user("hasta_bakici")
+    return caregiver, make_task(relative, caregiver)
+
+
+def _create(client, user_id, target_id, purpose="message_attachment", file_name="rapor.pdf", size=len(DATA)):
+    return client.post("/uploads/sessions", json={
+        "user_id": user_id, "purpose": purpose, "target_id": target_id,
+        "file_name": file_name, "total_size": size,
+    })
+
+
+def _patch(client, session_id, offset, chunk):
+    return client.patch(f"/uploads/sessions/{session_id}", content=chunk, headers={"Upload-Offset": str(offset)})
+
+
+def _uploaded(client, user_id, target_id, **kwargs):
+    session_id = _create(client, user_id, target_id, **kwargs).json()["id"]
+    assert _patch(client, session_id, 0, DATA).status_code == 204
+    return session_id
+
+
+def _attachments(message_id):
+    with SessionLocal() as db:
+        return db.query(models.MessageAttachment).filter(models.MessageAttachment.message_id == message_id).all()
+
+
+class _SlowStorage:
+    """Aktif storage'a devreder; save() önce `before_save`'i çağırır."""
+
+    def __init__(self, before_save):
+        self._storage = get_storage()
+        self._before_save = before_save
+
+    def save(self, key, fileobj):
+        self._before_save()
+        return self._storage.save(key, fileobj)
+
+    def __getattr__(self, name):
+        return getattr(self._storage, name)
+
+
+def test_create_returns_location_and_offset(client, message):
+    sender, message_id = message
+    response = _create(client, sender, message_id)
+
+    assert response.status_code == 201
+    session_id = response.json()["id"]
+    assert response.headers["Location"] == f"/uploads/sessions/{session_id}"
+    assert response.headers["Upload-Offset"] == "0"
+    assert response.headers["Upload-Length"] == str(len(DATA))
+    assert os.path.exists(session_file_path(session_id))
+
+
+def test_create_rejects_foreign_message_and_oversize(client, message, make_user):
+    sender, message_id = message
+    assert _create(client, make_user(), message_id).status_code == 403
+    assert _create(client, sender, message_id, size=0).status_code == 413
+
+
+def test_resume_after_dropped_connection(client, message):
+    sender, message_id = message
+    session_id = _create(client, sender, message_id).json()["id"]
+
+    first = _patch(client, session_id, 0, DATA[:30])
+    assert first.status_code == 204
+    assert first.headers["Upload-Offset"] == "30"
+
+    # İstemci offset'i bilmiyor: HEAD ile sorar, yanlış offset 409 alır
+    head = client.head(f"/uploads/sessions/{session_id}")
+    assert head.status_code == 200
+    assert head.headers["Upload-Offset"] == "30"
+    stale = _patch(client, session_id, 0, DATA)
+    assert stale.status_code == 409
+    assert stale.headers["Upload-Offset"] == "30"
+
+    assert _patch(client, session_id, 30, DATA[30:]).status_code == 204
+    assert client.get(f"/uploads/sessions/{session_id}").json()["offset"] == len(DATA)
+
+
+def test_chunk_beyond_total_size_is_rejected(client, message):
+    sender, message_id = message
+    session_id = _create(client, sender, message_id).json()["id"]
+
+    assert _patch(client, session_id, 0, DATA + b"x").status_code == 413
+
+
+def test_complete_creates_attachment_and_removes_session(client, message):
+    sender, message_id = message
+    session_id = _uploaded(client, sender, message_id)
+
+    response = client.post(f"/uploads/sessions/{session_id}/complete")
+
+    assert response.status_code == 200
+    [attachment] = _attachments(message_id)
+    assert attachment.id == response.json()["attachment_id"]
+    assert attachment.file_size == len(DATA)
+    assert client.get(attachment.file_path).content == DATA
+    assert client.head(f"/uploads/sessions/{session_id}").status_code == 404
+    assert not os.path.exists(session_file_path(session_id))
+
+
+def test_complete_before_all_bytes_returns_409(client, message):
+    sender, message_id = message
+    session_id = _create(client, sender, message_id).json()["id"]
+    _patch(client, session_id, 0, DATA[:10])
+
+    response = client.post(f"/uploads/sessions/{session_id}/complete")
+
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == "10"
+    assert _attachments(message_id) == []
+
+
+def test_concurrent_complete_stores_file_once(client, message, monkeypatch):
+    sender, message_id = message
+    session_id = _uploaded(client, sender, message_id)
+    # İlk istek dosyayı aktarırken ikincisi (istemcinin tekrarı) gelir
+    monkeypatch.setattr(resumable_uploads, "get_storage", lambda: _SlowStorage(lambda: time.sleep(0.3)))
+
+    async def complete_twice():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            first = asyncio.create_task(ac.post(f"/uploads/sessions/{session_id}/complete"))
+            await asyncio.sleep(0.1)
+            second = await ac.post(f"/uploads/sessions/{session_id}/complete")
+            return await first, second
+
+    first, second = asyncio.run(complete_twice())
+
+    assert first.status_code == 200
+    assert second.status_code == 409
+    assert len(_attachments(message_id)) == 1
+    # Tamamlandıktan sonraki tekrar: oturum yok
+    assert client.post(f"/uploads/sessions/{session_id}/complete").status_code == 404
+
+
+def test_cancel_during_complete_is_rejected(client, message, monkeypatch):
+    sender, message_id = message
+    session_id = _uploaded(client, sender, message_id)
+    cancelled = []
+    monkeypatch.setattr(resumable_uploads, "get_storage", lambda: _SlowStorage(
+        lambda: cancelled.append(client.delete(f"/uploads/sessions/{session_id}").status_code)
+    ))
+
+    assert client.post(f"/uploads/sessions/{session_id}/complete").status_code == 200
+    assert cancelled == [409]
+    assert len(_attachments(message_id)) == 1
+
+
+def test_task_photo_conflict_returns_409_and_can_retry(client, task, monkeypatch):
+    caregiver, task_id = task
+    session_id = _uploaded(client, caregiver, task_id, purpose="task_photo", file_name="foto.jpg")
+
+    def race():
+        with SessionLocal() as other:
+            other.execute(
+                update(models.TaskInstance)
+                .where(models.TaskInstance.id == task_id)
+                .values(status="done", version=models.TaskInstance.version + 1)
+            )
+            other.commit()
+
+    stored = []
+    slow = _SlowStorage(race)
+    original_save = slow.save
+
+    def save(key, fileobj):
+        stored.append(key)
+        return original_save(key, fileobj)
+
+    slow.save = save
+    monkeypatch.setattr(resumable_uploads, "get_storage", lambda: slow)
+    response = client.post(f"/uploads/sessions/{session_id}/complete")
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["current"]["version"] == 2
+    assert not get_storage().exists(stored[0])
+    monkeypatch.undo()
+
+    retry = client.post(f"/uploads/sessions/{session_id}/complete")
+    assert retry.status_code == 200
+    with SessionLocal() as db:
+        task_row = db.get(models.TaskInstance, task_id)
+        assert task_row.completion_photo_url == retry.json()["photo_url"]
+        assert task_row.version == 3
+    assert get_storage().exists(url_to_key(retry.json()["photo_url"]))
+
+
+def test_cancel_removes_session(client, message):
+    sender, message_id = message
+    session_id = _create(client, sender, message_id).json()["id"]
+
+    assert client.delete(f"/uploads/sessions/{session_id}").status_code == 200
+    assert client.head(f"/uploads/sessions/{session_id}").status_code == 404
+    assert not os.path.exists(session_file_path(session_id))
+
+
+def test_expired_session_returns_410_and_is_removed(client, message):
+    sender, message_id = message
+    session_id = _create(client, sender, message_id).json()["id"]
+    with SessionLocal() as db:
+        db.execute(
+            update(models.UploadSession)
+            .where(models.UploadSession.id == session_id)
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.commit()
+
+    assert client.head(f"/uploads/sessions/{session_id}").status_code == 410
+    assert _patch(client, session_id, 0, DATA).status_code == 404
+    assert not os.path.exists(session_file_path(session_id))
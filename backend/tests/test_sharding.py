@@ -0,0 +1,214 @@
+# ===================================================================
+# SHARDING TESTLERİ (test_sharding.py)
+# ===================================================================
+# Diğer testler sharding kapalı çalışır (conftest: SHARD_COUNT=0). Buradaki
+# `sharded` fixture'ı test süresince SHARD_COUNT=2 yapar; SQLite'ta shard
+# dosyaları geçici klasöre, PostgreSQL'de shard_k şemalarına yazılır.
+#
+# Yazmaların hanenin shard'ına gitmesi, id aralıkları, haneler arası
+# bakıcı atamasında 409, tüm shard'lardan okuma (scatter, dışa aktarma,
+# yükleme GC'si), haneyi taşıyıp geri getirme (move_household) ve
+# dengeleme planı.
+# ===================================================================
+
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app import models, sharding, upload_gc
+from app.routers import admin
+from app.sharding import SHARD_ID_SPAN, directory_entry, get_shard, move_household, plan_rebalance
+
+
+@pytest.fixture
+def sharded(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(sharding, "SHARD_COUNT", 2)
+    monkeypatch.setattr(sharding, "SHARD_DIR", str(tmp_path))
+    monkeypatch.setattr(admin, "SHARD_COUNT", 2)
+    monkeypatch.setattr(sharding, "_shards", {0: get_shard(0)})
+    for index in (1, 2):
+        sharding.prepare_shard(index, log=lambda line: None)
+    sharding.invalidate_directory()
+    yield
+    for index in (1, 2):
+        sharding._shards[index].engine.dispose()
+    sharding.invalidate_directory()
+
+
+def _register(client, role="hasta_yakini") -> int:
+    response = client.post("/auth/register", json={
+        "full_name": "Shard Kullanıcı", "email": f"{uuid.uuid4().hex}@example.com",
+        "role": role, "password": "gizli",
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def _household(client):
+    """Hasta yakını, haneye bağlı bakıcı ve hanenin shard'ı."""
+    relative, caregiver = _register(client), _register(client, "hasta_bakici")
+    response = client.put(f"/users/{relative}/caregivers/{caregiver}")
+    assert response.status_code == 200
+    assert response.json()["household_id"] == relative
+    return relative, caregiver, response.json()["shard"]
+
+
+def _create_task(client, relative, caregiver, title="İlaç"):
+    template = client.post("/tasks/templates", json={"title": title, "created_by_id": relative})
+    assert template.status_code == 200
+    return client.post("/tasks/instances", json={
+        "template_id": template.json()["id"], "created_by_id": relative,
+        "assigned_to_id": caregiver, "scheduled_for": datetime.utcnow().isoformat(),
+    })
+
+
+def _shard_of(table, row_id):
+    """Satırın bulunduğu shard'lar."""
+    found = []
+    for index in (0, 1, 2):
+        with get_shard(index).engine.connect() as conn:
+            if conn.execute(text(f"SELECT 1 FROM {table} WHERE id = :id"), {"id": row_id}).first():
+                found.append(index)
+    return found
+
+
+def _on_shard(client, relative, target):
+    """Haneyi (gerekirse taşıyarak) target shard'ına yerleştirir."""
+    if directory_entry(relative, fresh=True)[0] != target:
+        move_household(relative, target, log=lambda line: None, wait=0)
+    assert directory_entry(relative, fresh=True)[0] == target
+
+
+def test_new_household_writes_land_on_its_shard(client, sharded):
+    relative, caregiver, shard = _household(client)
+    assert shard in (1, 2)
+
+    task = _create_task(client, relative, caregiver)
+    message = client.post("/messages/send", json={"sender_id": caregiver, "receiver_id": relative, "content": "Tamam"})
+
+    assert task.status_code == 200 and message.status_code == 200
+    task_id, message_id = task.json()["id"], message.json()["id"]
+    # Shard kendi id aralığından verir; kayıt sadece hanenin shard'ındadır
+    assert task_id // SHARD_ID_SPAN == shard
+    assert _shard_of("task_instance", task_id) == [shard]
+    assert _shard_of("message", message_id) == [shard]
+    # Sadece kayıt id'si içeren istek kaydı shard'larda bulur
+    assert client.get(f"/tasks/instances/{task_id}").json()["assigned_to_id"] == caregiver
+    assert [t["id"] for t in client.get(f"/tasks/assigned/{caregiver}").json()] == [task_id]
+
+
+def test_caregiver_of_another_shards_household_gets_409(client, sharded):
+    first, caregiver, shard = _household(client)
+    assert _create_task(client, first, caregiver).status_code == 200
+    second = _register(client)
+    _on_shard(client, second, 3 - shard)
+
+    assert client.put(f"/users/{second}/caregivers/{caregiver}").status_code == 409
+    assert _create_task(client, second, caregiver).status_code == 409
+    message = client.post("/messages/send", json={"sender_id": second, "receiver_id": caregiver, "content": "Merhaba"})
+    assert message.status_code == 409
+    assert directory_entry(caregiver, fresh=True)[:2] == (shard, first)
+
+
+def test_scatter_reads_all_shards(client, sharded):
+    first, first_caregiver, _ = _household(client)
+    second, second_caregiver, _ = _household(client)
+    _on_shard(client, first, 1)
+    _on_shard(client, second, 2)
+    titles = {first: f"Birinci {uuid.uuid4().hex}", second: f"İkinci {uuid.uuid4().hex}"}
+    for relative, caregiver in ((first, first_caregiver), (second, second_caregiver)):
+        assert _create_task(client, relative, caregiver, title=titles[relative]).status_code == 200
+
+    listed = {t["title"] for t in client.get("/tasks/templates").json()}
+
+    assert set(titles.values()) <= listed
+    assert len(sharding.all_shards()) == 3
+    overview = {entry["shard"]: entry for entry in sharding.shard_overview()}
+    assert overview[1]["rows"]["task_template"] >= 1 and overview[2]["rows"]["task_template"] >= 1
+
+
+def test_export_and_upload_gc_read_the_households_shard(client, sharded):
+    relative, caregiver, shard = _household(client)
+    task_id = _create_task(client, relative, caregiver).json()["id"]
+    photo_url = f"/uploads/tasks/{task_id}_shard.jpg"
+    with get_shard(shard).session(write=True) as db:
+        db.get(models.TaskInstance, task_id).completion_photo_url = photo_url
+        db.commit()
+
+    export = client.get("/exports/tasks", params={"user_id": relative, "format": "ndjson"})
+
+    assert export.status_code == 200
+    assert [row["id"] for row in map(json.loads, export.text.splitlines())] == [task_id]
+    live, _ = upload_gc._referenced_urls([photo_url, "/uploads/tasks/yetim.jpg"])
+    assert live == {photo_url}
+
+
+def test_move_household_round_trip(client, sharded):
+    relative, caregiver, source = _household(client)
+    target = 3 - source
+    task_id = _create_task(client, relative, caregiver).json()["id"]
+    message_id = client.post("/messages/send", json={
+        "sender_id": relative, "receiver_id": caregiver, "content": "Taşınacak",
+    }).json()["id"]
+
+    copied = move_household(relative, target, log=lambda line: None, wait=0)
+
+    assert copied["task_instance"] == 1 and copied["message"] == 1
+    assert directory_entry(relative, fresh=True)[0] == target
+    assert directory_entry(caregiver, fresh=True)[0] == target
+    assert _shard_of("task_instance", task_id) == [target]
+    assert _shard_of("message", message_id) == [target]
+    # id'ler korunur; yeni kayıtlar hedefin aralığından id alır
+    assert client.get(f"/tasks/instances/{task_id}").status_code == 200
+    new_task_id = _create_task(client, relative, caregiver).json()["id"]
+    assert new_task_id // SHARD_ID_SPAN == target
+
+    move_household(relative, source, log=lambda line: None, wait=0)
+
+    assert directory_entry(relative, fresh=True)[0] == source
+    assert _shard_of("task_instance", task_id) == [source]
+    assert _shard_of("task_instance", new_task_id) == [source]
+    assert {t["id"] for t in client.get(f"/tasks/created/{relative}").json()} == {task_id, new_task_id}
+    assert client.get(f"/messages/conversation/{caregiver}", params={"current_user_id": relative}).json()[0]["content"] == "Taşınacak"
+    # Kaynağın sayacı geri gelen yüksek id'lerden etkilenmez
+    assert _create_task(client, relative, caregiver).json()["id"] // SHARD_ID_SPAN == source
+
+
+def test_ids_of_moved_households_are_not_reused(client, sharded):
+    leaving, leaving_caregiver, shard = _household(client)
+    moved_id = _create_task(client, leaving, leaving_caregiver).json()["id"]
+    move_household(leaving, 3 - shard, log=lambda line: None, wait=0)
+    staying, caregiver, _ = _household(client)
+    _on_shard(client, staying, 3 - shard)
+    # Hane geri taşınınca ve shard yeniden hazırlanınca sayaç geri gitmez
+    move_household(staying, shard, log=lambda line: None, wait=0)
+    sharding.prepare_shard(shard, log=lambda line: None)
+
+    task_id = _create_task(client, staying, caregiver).json()["id"]
+
+    assert moved_id < task_id < (shard + 1) * SHARD_ID_SPAN
+    assert _shard_of("task_instance", moved_id) == [3 - shard]
+
+
+def test_rebalance_plan_evens_out_households(client, sharded):
+    households = [_register(client) for _ in range(3)]
+    for relative in households:
+        _on_shard(client, relative, 1)
+
+    moves = plan_rebalance()
+
+    counts = {1: 0, 2: 0}
+    with get_shard(0).engine.connect() as conn:
+        for (shard,) in conn.execute(text(
+            "SELECT MIN(shard) FROM shard_directory WHERE household_id IS NOT NULL GROUP BY household_id"
+        )):
+            if shard in counts:
+                counts[shard] += 1
+    for _, source, target in moves:
+        counts[source] -= 1
+        counts[target] += 1
+    assert abs(counts[1] - counts[2]) <= 1
+    assert all(target in (1, 2) for _, _, target in moves)
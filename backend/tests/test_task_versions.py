@@ -0,0 +1,100 @@
+# ===================================================================
+# GÖREV SÜRÜMÜ TESTLERİ (test_task_versions.py)
+# ===================================================================
+# Koşullu GET (ETag / If-None-Match) ve iyimser eşzamanlılık (version,
+# If-Match, commit sırasında compare-and-swap).
+# ===================================================================
+
+import pytest
+from sqlalchemy import update
+
+from app import crud, models
+from app.database import SessionLocal
+
+
+@pytest.fixture
+def task(make_user, make_task):
+    relative, caregiver = make_user(), make_user("hasta_bakici")
+    return make_task(relative, caregiver), caregiver
+
+
+def _status(client, task_id, caregiver, headers=None, **fields):
+    body = {"task_id": task_id, "user_id": caregiver, "status": "in_progress", **fields}
+    return client.patch("/tasks/instances/status", json=body, headers=headers or {})
+
+
+def test_get_returns_304_when_etag_matches(client, task):
+    task_id, _ = task
+    first = client.get(f"/tasks/instances/{task_id}")
+    assert first.status_code == 200
+    assert first.headers["ETag"] == '"v1"'
+
+    cached = client.get(f"/tasks/instances/{task_id}", headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_update_bumps_version_and_etag(client, task):
+    task_id, caregiver = task
+    response = _status(client, task_id, caregiver, version=1)
+
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] == '"v2"'
+    assert client.get(f"/tasks/instances/{task_id}", headers={"If-None-Match": '"v1"'}).status_code == 200
+
+
+def test_stale_body_version_returns_409(client, task):
+    task_id, caregiver = task
+    assert _status(client, task_id, caregiver).status_code == 200
+
+    response = _status(client, task_id, caregiver, version=1, status="done")
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["current"]["version"] == 2
+    assert response.headers["ETag"] == '"v2"'
+
+
+def test_stale_if_match_returns_409(client, task):
+    task_id, caregiver = task
+    assert _status(client, task_id, caregiver).status_code == 200
+
+    response = _status(client, task_id, caregiver, headers={"If-Match": '"v1"'}, status="done")
+
+    assert response.status_code == 409
+    assert _status(client, task_id, caregiver, headers={"If-Match": '"v2"'}, status="done").status_code == 200
+
+
+def test_invalid_if_match_returns_400(client, task):
+    task_id, caregiver = task
+    assert _status(client, task_id, caregiver, headers={"If-Match": "abc"}).status_code == 400
+
+
+def test_concurrent_change_before_commit_returns_409(client, task, monkeypatch):
+    """Sürüm kontrolünden sonra, commit'ten önce başka bir istek görevi değiştirir."""
+    task_id, caregiver = task
+    enqueue = crud.enqueue_notification
+
+    def enqueue_then_race(db, **kwargs):
+        enqueue(db, **kwargs)
+        with SessionLocal() as other:
+            other.execute(
+                update(models.TaskInstance)
+                .where(models.TaskInstance.id == task_id)
+                .values(status="cancelled", version=models.TaskInstance.version + 1)
+            )
+            other.commit()
+
+    monkeypatch.setattr(crud, "enqueue_notification", enqueue_then_race)
+    response = _status(client, task_id, caregiver, version=1, status="done")
+
+    assert response.status_code == 409
+    current = response.json()["detail"]["current"]
+    assert current["version"] == 2
+    assert current["status"] == "cancelled"
+    with SessionLocal() as db:
+        assert db.get(models.TaskInstance, task_id).status == "cancelled"
+        # Geri alınan istek bildirim olayı da bırakmaz
+        assert db.query(models.NotificationOutbox).filter(
+            models.NotificationOutbox.entity_id == task_id
+        ).count() == 0
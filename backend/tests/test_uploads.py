@@ -0,0 +1,26 @@
+# ===================================================================
+# DOSYA SUNMA TESTLERİ (test_uploads.py)
+# ===================================================================
+# /uploads/<key>: Tamamlanan dosyalar sunulur; yazılmakta olan
+# (PARTIAL_SUFFIX) dosyalar ve güvenli olmayan anahtarlar 404 döner.
+# ===================================================================
+
+import io
+import os
+
+from app.storage import PARTIAL_SUFFIX, get_storage
+
+
+def test_partial_files_are_not_served(client):
+    storage = get_storage()
+    storage.save("messages/sunum_test.pdf", io.BytesIO(b"tamam"))
+    partial = storage.path("messages/yarim_test.pdf") + PARTIAL_SUFFIX
+    with open(partial, "wb") as f:
+        f.write(b"yar")
+    try:
+        assert client.get("/uploads/messages/sunum_test.pdf").content == b"tamam"
+        assert client.get(f"/uploads/messages/yarim_test.pdf{PARTIAL_SUFFIX}").status_code == 404
+        assert client.get(f"/uploads/task_photos/yarim.jpg{PARTIAL_SUFFIX}").status_code == 404
+    finally:
+        os.remove(partial)
+        storage.delete("messages/sunum_test.pdf")